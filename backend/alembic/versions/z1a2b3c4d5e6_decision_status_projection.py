@@ -0,0 +1,74 @@
+"""Decision status projection (read model over decision_ledger_events).
+
+One row per decision with the derived status, maintained on every ledger append.
+Backfilled here from the ledger (last relevant event wins); rebuild/verify with
+scripts/rebuild_status_projection.py.
+
+Revision ID: z1a2b3c4d5e6
+Revises: y3c4d5e6f7a8
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.alembic_utils import table_exists
+
+revision: str = "z1a2b3c4d5e6"
+down_revision: Union[str, Sequence[str], None] = "y3c4d5e6f7a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not table_exists(conn, "decision_status_projection"):
+        op.create_table(
+            "decision_status_projection",
+            sa.Column("decision_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("decisions.decision_id", ondelete="CASCADE"), primary_key=True),
+            sa.Column("enterprise_id", sa.Integer(), sa.ForeignKey("enterprises.id", ondelete="SET NULL"), nullable=True, index=True),
+            sa.Column("status", sa.String(50), nullable=False, server_default="draft", index=True),
+            sa.Column("ledger_seq", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("last_event_type", sa.String(50), nullable=True),
+            sa.Column("last_event_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        )
+
+    # Backfill: one row per decision; status from the latest status-bearing ledger event.
+    op.execute("""
+        INSERT INTO decision_status_projection (decision_id, enterprise_id, status, ledger_seq, last_event_type, last_event_at)
+        SELECT
+            d.decision_id,
+            d.enterprise_id,
+            COALESCE(
+                (
+                    SELECT CASE e.event_type
+                        WHEN 'DECISION_ARCHIVED' THEN 'archived'
+                        WHEN 'OUTCOME_CAPTURED' THEN 'outcome_tracked'
+                        WHEN 'IMPLEMENTATION_COMPLETED' THEN 'implemented'
+                        WHEN 'IMPLEMENTATION_STARTED' THEN 'in_progress'
+                        WHEN 'FINALIZATION_ACKNOWLEDGED' THEN 'signed'
+                        WHEN 'ARTIFACT_FINALIZED' THEN 'finalized'
+                    END
+                    FROM decision_ledger_events e
+                    WHERE e.decision_id = d.decision_id
+                      AND e.event_type IN (
+                        'DECISION_ARCHIVED', 'OUTCOME_CAPTURED', 'IMPLEMENTATION_COMPLETED',
+                        'IMPLEMENTATION_STARTED', 'FINALIZATION_ACKNOWLEDGED', 'ARTIFACT_FINALIZED'
+                      )
+                    ORDER BY e.created_at DESC, e.id DESC
+                    LIMIT 1
+                ),
+                'draft'
+            ),
+            (SELECT COUNT(*) FROM decision_ledger_events e WHERE e.decision_id = d.decision_id),
+            (SELECT e.event_type FROM decision_ledger_events e WHERE e.decision_id = d.decision_id ORDER BY e.created_at DESC, e.id DESC LIMIT 1),
+            (SELECT MAX(e.created_at) FROM decision_ledger_events e WHERE e.decision_id = d.decision_id)
+        FROM decisions d
+        ON CONFLICT (decision_id) DO NOTHING
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table("decision_status_projection")
@@ -0,0 +1,23 @@
+"""Index decisions (created_at, decision_id) for keyset paging of GET /api/clear/decisions.
+
+Revision ID: z2b3c4d5e6f7
+Revises: z1a2b3c4d5e6
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "z2b3c4d5e6f7"
+down_revision: Union[str, Sequence[str], None] = "z1a2b3c4d5e6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_decisions_created_at_decision_id ON decisions (created_at, decision_id)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_decisions_created_at_decision_id")
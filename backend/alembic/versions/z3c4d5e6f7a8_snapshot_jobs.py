@@ -0,0 +1,57 @@
+"""Snapshot jobs: resumable background runs of monthly Health/Velocity/ECRI snapshots.
+
+snapshot_jobs holds one row per run; snapshot_job_chunks holds the enterprise id slices and
+is the checkpoint (a chunk is marked done in the same transaction as its snapshots).
+
+Revision ID: z3c4d5e6f7a8
+Revises: z2b3c4d5e6f7
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.alembic_utils import table_exists
+
+revision: str = "z3c4d5e6f7a8"
+down_revision: Union[str, Sequence[str], None] = "z2b3c4d5e6f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not table_exists(conn, "snapshot_jobs"):
+        op.create_table(
+            "snapshot_jobs",
+            sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+            sa.Column("status", sa.String(20), nullable=False, server_default="pending", index=True),
+            sa.Column("scope", postgresql.JSONB(), nullable=True),
+            sa.Column("snapshot_date", sa.Date(), nullable=False),
+            sa.Column("total_enterprises", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("total_chunks", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        )
+    if not table_exists(conn, "snapshot_job_chunks"):
+        op.create_table(
+            "snapshot_job_chunks",
+            sa.Column("id", sa.Integer(), primary_key=True, index=True),
+            sa.Column("job_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("snapshot_jobs.id", ondelete="CASCADE"), nullable=False, index=True),
+            sa.Column("chunk_index", sa.Integer(), nullable=False),
+            sa.Column("enterprise_ids", postgresql.JSONB(), nullable=False),
+            sa.Column("status", sa.String(20), nullable=False, server_default="pending"),
+            sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("snapshots_written", postgresql.JSONB(), nullable=True),
+            sa.Column("errors", postgresql.JSONB(), nullable=True),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+            sa.UniqueConstraint("job_id", "chunk_index", name="uq_snapshot_job_chunks_job_chunk"),
+        )
+
+
+def downgrade() -> None:
+    op.drop_table("snapshot_job_chunks")
+    op.drop_table("snapshot_jobs")
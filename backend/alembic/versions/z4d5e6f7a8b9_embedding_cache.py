@@ -0,0 +1,40 @@
+"""Embedding cache: persistent tier for get_embedding, keyed by (model, sha256(text)).
+
+Rows older than EMBEDDING_CACHE_MAX_AGE_DAYS are ignored on read and deleted by eviction
+(index on created_at).
+
+Revision ID: z4d5e6f7a8b9
+Revises: z3c4d5e6f7a8
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.alembic_utils import table_exists
+
+revision: str = "z4d5e6f7a8b9"
+down_revision: Union[str, Sequence[str], None] = "z3c4d5e6f7a8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not table_exists(conn, "embedding_cache"):
+        op.create_table(
+            "embedding_cache",
+            sa.Column("model", sa.String(100), nullable=False),
+            sa.Column("text_hash", sa.String(64), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.PrimaryKeyConstraint("model", "text_hash"),
+        )
+        op.execute("ALTER TABLE embedding_cache ADD COLUMN embedding vector NOT NULL")
+        op.create_index("ix_embedding_cache_created_at", "embedding_cache", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if table_exists(conn, "embedding_cache"):
+        op.drop_index("ix_embedding_cache_created_at", table_name="embedding_cache")
+        op.drop_table("embedding_cache")
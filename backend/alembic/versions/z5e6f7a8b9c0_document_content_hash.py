@@ -0,0 +1,68 @@
+"""Document content hashes for bulk ingestion (app/rag/ingest.py).
+
+Adds content_hash (sha256 hex of content) to the domain document tables and knowledge_chunks,
+backfills it, and indexes the ingestion identity key (title; source_type + title for knowledge)
+so unchanged documents can be skipped with one lookup per batch.
+
+Revision ID: z5e6f7a8b9c0
+Revises: z4d5e6f7a8b9
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.alembic_utils import index_exists, table_exists
+
+revision: str = "z5e6f7a8b9c0"
+down_revision: Union[str, Sequence[str], None] = "z4d5e6f7a8b9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# table -> identity key columns
+_TABLES = {
+    "finance_documents": ["title"],
+    "marketing_documents": ["title"],
+    "ops_documents": ["title"],
+    "tech_documents": ["title"],
+    "knowledge_chunks": ["source_type", "title"],
+}
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    r = conn.execute(
+        sa.text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :t AND column_name = :c
+            LIMIT 1
+        """),
+        {"t": table, "c": column},
+    )
+    return r.first() is not None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for table, key in _TABLES.items():
+        if not table_exists(conn, table):
+            continue
+        if not _column_exists(conn, table, "content_hash"):
+            op.add_column(table, sa.Column("content_hash", sa.String(64), nullable=True))
+            op.execute(
+                f"UPDATE {table} SET content_hash = encode(sha256(convert_to(content, 'UTF8')), 'hex')"
+            )
+        ix = f"ix_{table}_{'_'.join(key)}"
+        if not index_exists(conn, ix):
+            op.create_index(ix, table, key, unique=False)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    for table, key in _TABLES.items():
+        if not table_exists(conn, table):
+            continue
+        ix = f"ix_{table}_{'_'.join(key)}"
+        if index_exists(conn, ix):
+            op.drop_index(ix, table_name=table)
+        if _column_exists(conn, table, "content_hash"):
+            op.drop_column(table, "content_hash")
@@ -0,0 +1,60 @@
+"""Knowledge chunks full-text search: generated search_tsv (title + tags weight A, content B) + GIN.
+
+Used by knowledge/retrieval.py for the lexical half of hybrid (lexical + vector, RRF) retrieval,
+and on its own when the embedding API is unavailable. Also a GIN index on tags for tag filters.
+
+Revision ID: z6f7a8b9c0d1
+Revises: z5e6f7a8b9c0
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.alembic_utils import index_exists, table_exists
+
+revision: str = "z6f7a8b9c0d1"
+down_revision: Union[str, Sequence[str], None] = "z5e6f7a8b9c0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    r = conn.execute(
+        sa.text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :t AND column_name = :c
+            LIMIT 1
+        """),
+        {"t": table, "c": column},
+    )
+    return r.first() is not None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not table_exists(conn, "knowledge_chunks"):
+        return
+    if not _column_exists(conn, "knowledge_chunks", "search_tsv"):
+        op.execute("""
+            ALTER TABLE knowledge_chunks ADD COLUMN search_tsv tsvector GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A')
+                || setweight(jsonb_to_tsvector('english', coalesce(tags, '[]'::jsonb), '["string"]'), 'A')
+                || setweight(to_tsvector('english', coalesce(content, '')), 'B')
+            ) STORED
+        """)
+    if not index_exists(conn, "ix_knowledge_chunks_search_tsv"):
+        op.create_index("ix_knowledge_chunks_search_tsv", "knowledge_chunks", ["search_tsv"], postgresql_using="gin")
+    if not index_exists(conn, "ix_knowledge_chunks_tags"):
+        op.create_index("ix_knowledge_chunks_tags", "knowledge_chunks", ["tags"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if not table_exists(conn, "knowledge_chunks"):
+        return
+    for ix in ("ix_knowledge_chunks_tags", "ix_knowledge_chunks_search_tsv"):
+        if index_exists(conn, ix):
+            op.drop_index(ix, table_name="knowledge_chunks")
+    if _column_exists(conn, "knowledge_chunks", "search_tsv"):
+        op.drop_column("knowledge_chunks", "search_tsv")
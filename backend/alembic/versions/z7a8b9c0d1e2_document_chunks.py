@@ -0,0 +1,48 @@
+"""Document chunks: token-sized pieces of long uploaded documents, each with its own embedding.
+
+Rows point back to the parent (doc_table, doc_id), like document_links. chunk_id is a stable
+sha256 of (doc_table, doc_id, chunk_index, text), so re-uploading unchanged text reuses rows.
+Domain searches rank parents and chunks together and dedupe hits to the parent document.
+
+Revision ID: z7a8b9c0d1e2
+Revises: z6f7a8b9c0d1
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.alembic_utils import table_exists
+
+revision: str = "z7a8b9c0d1e2"
+down_revision: Union[str, Sequence[str], None] = "z6f7a8b9c0d1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not table_exists(conn, "document_chunks"):
+        op.create_table(
+            "document_chunks",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("chunk_id", sa.String(64), nullable=False),
+            sa.Column("doc_table", sa.String(100), nullable=False),
+            sa.Column("doc_id", sa.Integer(), nullable=False),
+            sa.Column("chunk_index", sa.Integer(), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("token_count", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.execute("ALTER TABLE document_chunks ADD COLUMN embedding vector(1536) NULL")
+        op.create_index("ix_document_chunks_chunk_id", "document_chunks", ["chunk_id"], unique=True)
+        op.create_index("ix_document_chunks_doc", "document_chunks", ["doc_table", "doc_id", "chunk_index"], unique=False)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if table_exists(conn, "document_chunks"):
+        op.drop_index("ix_document_chunks_doc", table_name="document_chunks")
+        op.drop_index("ix_document_chunks_chunk_id", table_name="document_chunks")
+        op.drop_table("document_chunks")
@@ -0,0 +1,84 @@
+"""Embedding provenance and re-embedding jobs.
+
+Adds embedding_model (the model that produced embedding) to the RAG tables, backfilled with
+text-embedding-3-small for rows that have an embedding, and reembed_jobs for app/rag/reembed.py.
+Shadow columns (embedding_shadow, embedding_shadow_model) are added on demand by
+prepare_shadow_columns, since their dimension depends on the target model.
+
+Revision ID: z8b9c0d1e2f3
+Revises: z7a8b9c0d1e2
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.alembic_utils import table_exists
+
+revision: str = "z8b9c0d1e2f3"
+down_revision: Union[str, Sequence[str], None] = "z7a8b9c0d1e2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_TABLES = (
+    "finance_documents",
+    "marketing_documents",
+    "ops_documents",
+    "tech_documents",
+    "knowledge_chunks",
+    "document_chunks",
+)
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    r = conn.execute(
+        sa.text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :t AND column_name = :c
+            LIMIT 1
+        """),
+        {"t": table, "c": column},
+    )
+    return r.first() is not None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    for table in _TABLES:
+        if table_exists(conn, table) and not _column_exists(conn, table, "embedding_model"):
+            op.add_column(table, sa.Column("embedding_model", sa.String(100), nullable=True))
+            op.execute(
+                f"UPDATE {table} SET embedding_model = 'text-embedding-3-small' WHERE embedding IS NOT NULL"
+            )
+    if not table_exists(conn, "reembed_jobs"):
+        op.create_table(
+            "reembed_jobs",
+            sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("status", sa.String(20), server_default="pending", nullable=False),
+            sa.Column("target", sa.String(20), nullable=False),
+            sa.Column("model", sa.String(100), nullable=False),
+            sa.Column("tables", postgresql.JSONB(), nullable=False),
+            sa.Column("total_rows", sa.Integer(), server_default="0", nullable=False),
+            sa.Column("rows_embedded", sa.Integer(), server_default="0", nullable=False),
+            sa.Column("rows_failed", sa.Integer(), server_default="0", nullable=False),
+            sa.Column("requests", sa.Integer(), server_default="0", nullable=False),
+            sa.Column("active_seconds", sa.Float(), server_default="0", nullable=False),
+            sa.Column("errors", postgresql.JSONB(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_reembed_jobs_status", "reembed_jobs", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if table_exists(conn, "reembed_jobs"):
+        op.drop_index("ix_reembed_jobs_status", table_name="reembed_jobs")
+        op.drop_table("reembed_jobs")
+    for table in _TABLES:
+        if table_exists(conn, table) and _column_exists(conn, table, "embedding_model"):
+            op.drop_column(table, "embedding_model")
@@ -0,0 +1,43 @@
+"""LLM response cache: persistent tier for agent completions (app/agents/llm_cache.py).
+
+Keyed by sha256 of (provider, model, temperature and other request params, normalized messages).
+Rows older than LLM_CACHE_TTL_SECONDS are ignored on read; eviction deletes them and trims the table
+to LLM_CACHE_MAX_ROWS, oldest first (index on created_at).
+
+Revision ID: z9c0d1e2f3a4
+Revises: z8b9c0d1e2f3
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.alembic_utils import table_exists
+
+revision: str = "z9c0d1e2f3a4"
+down_revision: Union[str, Sequence[str], None] = "z8b9c0d1e2f3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not table_exists(conn, "llm_response_cache"):
+        op.create_table(
+            "llm_response_cache",
+            sa.Column("key_hash", sa.String(64), nullable=False),
+            sa.Column("model", sa.String(100), nullable=True),
+            sa.Column("route", sa.String(50), nullable=True),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("latency_ms", sa.Integer(), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.PrimaryKeyConstraint("key_hash"),
+        )
+        op.create_index("ix_llm_response_cache_created_at", "llm_response_cache", ["created_at"], unique=False)
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if table_exists(conn, "llm_response_cache"):
+        op.drop_index("ix_llm_response_cache_created_at", table_name="llm_response_cache")
+        op.drop_table("llm_response_cache")
@@ -0,0 +1,54 @@
+"""Diagnostic jobs: Postgres-backed queue for POST /api/clear/diagnostic/run?async=1 (app/diagnostic/job_queue.py).
+
+Workers claim the oldest queued job with available_at <= now() via FOR UPDATE SKIP LOCKED (index on
+status, available_at). Failed attempts go back to queued with a later available_at; after max_attempts
+the job is dead (dead letter) and keeps its last_error until requeued.
+
+Revision ID: za0d1e2f3a4b5
+Revises: z9c0d1e2f3a4
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from app.alembic_utils import table_exists
+
+revision: str = "za0d1e2f3a4b5"
+down_revision: Union[str, Sequence[str], None] = "z9c0d1e2f3a4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if not table_exists(conn, "diagnostic_jobs"):
+        op.create_table(
+            "diagnostic_jobs",
+            sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+            sa.Column("status", sa.String(20), server_default="queued", nullable=False),
+            sa.Column("payload", postgresql.JSONB(), nullable=False),
+            sa.Column("trace_id", sa.String(36), nullable=True),
+            sa.Column("attempts", sa.Integer(), server_default="0", nullable=False),
+            sa.Column("max_attempts", sa.Integer(), server_default="3", nullable=False),
+            sa.Column("available_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.Column("worker_id", sa.String(100), nullable=True),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("result", postgresql.JSONB(), nullable=True),
+            sa.Column("decision_id", postgresql.UUID(as_uuid=True), nullable=True),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+            sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            "ix_diagnostic_jobs_status_available_at", "diagnostic_jobs", ["status", "available_at"], unique=False
+        )
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if table_exists(conn, "diagnostic_jobs"):
+        op.drop_index("ix_diagnostic_jobs_status_available_at", table_name="diagnostic_jobs")
+        op.drop_table("diagnostic_jobs")
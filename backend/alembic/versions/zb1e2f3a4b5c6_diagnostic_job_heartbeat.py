@@ -0,0 +1,45 @@
+"""Diagnostic job heartbeat (app/diagnostic/job_queue.py).
+
+Adds heartbeat_at, refreshed by the worker while a job runs; a running job is reclaimed only once its
+heartbeat is older than DIAGNOSTIC_JOB_STALE_SECONDS, so long runs are not taken over while alive.
+Running jobs are backfilled from started_at.
+
+Revision ID: zb1e2f3a4b5c6
+Revises: za0d1e2f3a4b5
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.alembic_utils import table_exists
+
+revision: str = "zb1e2f3a4b5c6"
+down_revision: Union[str, Sequence[str], None] = "za0d1e2f3a4b5"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _column_exists(conn, table: str, column: str) -> bool:
+    r = conn.execute(
+        sa.text("""
+            SELECT 1 FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :t AND column_name = :c
+            LIMIT 1
+        """),
+        {"t": table, "c": column},
+    )
+    return r.first() is not None
+
+
+def upgrade() -> None:
+    conn = op.get_bind()
+    if table_exists(conn, "diagnostic_jobs") and not _column_exists(conn, "diagnostic_jobs", "heartbeat_at"):
+        op.add_column("diagnostic_jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+        op.execute("UPDATE diagnostic_jobs SET heartbeat_at = started_at WHERE status = 'running'")
+
+
+def downgrade() -> None:
+    conn = op.get_bind()
+    if table_exists(conn, "diagnostic_jobs") and _column_exists(conn, "diagnostic_jobs", "heartbeat_at"):
+        op.drop_column("diagnostic_jobs", "heartbeat_at")
@@ -1,5 +1,8 @@
 """AI-CFO agent using OpenAI."""
 from openai import OpenAI
+from typing import AsyncIterator
+
+from app.agents.llm import chat_completion, stream_chat_completion
 from app.config import settings, model_supports_json_object
 from app.schemas.cfo.cfo_input import CFOInput
 import json
@@ -7,8 +10,6 @@ import logging
 
 logger = logging.getLogger(__name__)
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
 SYSTEM_PROMPT = """You are an AI-CFO (Chief Financial Officer) for Small and Medium Enterprises (SMEs) in South-East Asia. Your role is to:
 
 1. Diagnose financial health based on structured diagnostic inputs
@@ -92,13 +93,13 @@ When discussing:
 - Trade: Consider regional supply chains and cross-border business dynamics"""
 
 
-def run_ai_cfo_agent(
+async def run_ai_cfo_agent(
     input_data: CFOInput,
     docs: list[str] | None = None,
     tools_results: dict | None = None,
     onboarding_context: dict | None = None,
 ) -> dict:
-    """Run the AI-CFO agent and return structured analysis."""
+    """Run the AI-CFO agent and return structured analysis (async; cancellable)."""
     from app.diagnostic.mapping import format_onboarding_context_line
     context_line = format_onboarding_context_line(onboarding_context)
     system_prompt = (SYSTEM_PROMPT + "\n\n" + context_line) if context_line else SYSTEM_PROMPT
@@ -139,7 +140,7 @@ Relevant Finance Best Practices:
         }
         if model_supports_json_object(settings.LLM_MODEL):
             kwargs["response_format"] = {"type": "json_object"}
-        response = client.chat.completions.create(**kwargs)
+        response = await chat_completion(**kwargs)
         
         content = response.choices[0].message.content
         
@@ -181,20 +182,24 @@ Relevant Finance Best Practices:
         raise
 
 
-def run_ai_cfo_chat(message: str, context: dict | None = None) -> str:
-    """Handle free-form chat conversations."""
-
+def _chat_messages(message: str, context: dict | None = None) -> list[dict[str, str]]:
     user_message = message.strip()
     if context:
         user_message += f"\n\nContext:\n{json.dumps(context, indent=2)}"
+    return [
+        {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+        {"role": "user", "content": user_message},
+    ]
 
+
+def run_ai_cfo_chat(message: str, context: dict | None = None) -> str:
+    """Handle free-form chat conversations."""
     try:
+        # Built per call (like decision_chat) so importing the agent never needs OPENAI_API_KEY.
+        client = OpenAI(api_key=settings.OPENAI_API_KEY)
         response = client.chat.completions.create(
             model=settings.LLM_MODEL,
-            messages=[
-                {"role": "system", "content": CHAT_SYSTEM_PROMPT},
-                {"role": "user", "content": user_message},
-            ],
+            messages=_chat_messages(message, context),
             temperature=0.6,
         )
 
@@ -203,3 +208,7 @@ def run_ai_cfo_chat(message: str, context: dict | None = None) -> str:
         logger.error(f"AI-CFO chat failed: {exc}")
         raise
 
+
+def stream_ai_cfo_chat(message: str, context: dict | None = None) -> AsyncIterator[str]:
+    """Free-form chat, streamed: reply tokens as they arrive."""
+    return stream_chat_completion(model=settings.LLM_MODEL, messages=_chat_messages(message, context), temperature=0.6)
@@ -2,9 +2,9 @@
 AI-CMO Agent: Main agent logic for marketing diagnostics.
 """
 from typing import Dict, Any, List, Optional
-from openai import OpenAI
 import json
 
+from app.agents.llm import chat_completion
 from app.config import settings, model_supports_json_object
 from app.tools.marketing_tools import (
     calculate_CAC,
@@ -13,12 +13,8 @@ from app.tools.marketing_tools import (
     detect_risk_level,
     basic_marketing_hint
 )
-from app.rag.vectorstore import search_marketing_docs
+from app.rag.vectorstore import search_in_own_session, search_marketing_docs
 from app.db.models import MarketingDocument
-from sqlalchemy.orm import Session
-
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
 # System prompt for AI-CMO
 SYSTEM_PROMPT = """You are "AI-CMO", an expert marketing consultant specializing in helping SMEs (Small and Medium Enterprises) in Southeast Asia improve their marketing strategies.
@@ -55,9 +51,17 @@ Guidelines:
 """
 
 
-def run_ai_cmo_agent(
+def marketing_search_query(input_data: Dict[str, Any]) -> str:
+    """RAG search query built from CMO diagnostic input."""
+    return f"""
+            Marketing challenge: {input_data.get('primary_challenge', '')}
+            Channels: {', '.join(input_data.get('effective_channels', []))}
+            Strategy: {input_data.get('strategy_alignment', '')}
+            """
+
+
+async def run_ai_cmo_agent(
     input_data: Dict[str, Any],
-    db: Session,
     docs: Optional[List[MarketingDocument]] = None,
     onboarding_context: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
@@ -66,8 +70,7 @@ def run_ai_cmo_agent(
     
     Args:
         input_data: CMO diagnostic input data
-        db: Database session for RAG
-        docs: Optional pre-fetched documents
+        docs: Optional pre-fetched documents (otherwise searched on a session of its own)
     
     Returns:
         Dictionary containing the analysis
@@ -83,13 +86,9 @@ def run_ai_cmo_agent(
     rag_context = ""
     if settings.RAG_ENABLED:
         if docs is None:
-            # Build a search query from input data
-            search_query = f"""
-            Marketing challenge: {input_data.get('primary_challenge', '')}
-            Channels: {', '.join(input_data.get('effective_channels', []))}
-            Strategy: {input_data.get('strategy_alignment', '')}
-            """
-            docs = search_marketing_docs(db, search_query, top_k=settings.RAG_TOP_K)
+            docs = await search_in_own_session(
+                search_marketing_docs, marketing_search_query(input_data), top_k=settings.RAG_TOP_K
+            )
         
         if docs:
             rag_context = "\n\nRelevant Marketing Knowledge:\n"
@@ -132,7 +131,7 @@ Provide a comprehensive analysis in the required JSON format."""
         }
         if model_supports_json_object(settings.LLM_MODEL):
             kwargs["response_format"] = {"type": "json_object"}
-        response = client.chat.completions.create(**kwargs)
+        response = await chat_completion(**kwargs)
         
         # Parse the response
         content = response.choices[0].message.content
@@ -1,8 +1,9 @@
 import json
-from typing import Any
+from typing import Any, AsyncIterator
 
-from openai import AsyncOpenAI, OpenAIError
+from openai import OpenAIError
 
+from app.agents.llm import chat_completion, stream_chat_completion
 from app.config import settings, model_supports_json_object
 from app.schemas.coo.coo_input import COOInput
 from app.tools import operational_tools as ops_tools
@@ -96,9 +97,6 @@ Always respond in natural, conversational language. Be helpful, accurate, and fo
 """.strip()
 
 
-client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-
-
 def _prepare_tools_results(payload: COOInput) -> dict[str, Any]:
     monthly_outputs = payload.monthly_output_units or [0, 0, 0]
     monthly_costs = payload.monthly_ops_costs or [0.0, 0.0, 0.0]
@@ -136,7 +134,7 @@ async def _call_llm(messages: list[dict[str, str]], json_mode: bool = True) -> s
     }
     if json_mode and model_supports_json_object(settings.LLM_MODEL):
         kwargs["response_format"] = {"type": "json_object"}
-    response = await client.chat.completions.create(**kwargs)
+    response = await chat_completion(**kwargs)
     return response.choices[0].message.content or ("{}" if json_mode else "")
 
 
@@ -191,12 +189,11 @@ async def run_ai_coo_agent(
             }
 
 
-async def run_chat_agent(
+def _chat_messages(
     user_message: str,
     chat_history: list[dict[str, str]] | None = None,
     analysis_context: dict | None = None,
-) -> str:
-    """Handle conversational chat with the AI-COO agent."""
+) -> list[dict[str, str]]:
     messages = [{"role": "system", "content": CHAT_SYSTEM_PROMPT}]
     
     if analysis_context:
@@ -209,9 +206,18 @@ async def run_chat_agent(
         messages.extend(chat_history[-10:])  # Keep last 10 messages for context
     
     messages.append({"role": "user", "content": user_message})
-    
+    return messages
+
+
+async def run_chat_agent(
+    user_message: str,
+    chat_history: list[dict[str, str]] | None = None,
+    analysis_context: dict | None = None,
+) -> str:
+    """Handle conversational chat with the AI-COO agent."""
+    messages = _chat_messages(user_message, chat_history, analysis_context)
     try:
-        response = await client.chat.completions.create(
+        response = await chat_completion(
             model=settings.LLM_MODEL,
             messages=messages,
             temperature=0.7,
@@ -220,3 +226,15 @@ async def run_chat_agent(
     except OpenAIError as e:
         return f"I encountered an error: {str(e)}. Please try again."
 
+
+def stream_chat_agent(
+    user_message: str,
+    chat_history: list[dict[str, str]] | None = None,
+    analysis_context: dict | None = None,
+) -> AsyncIterator[str]:
+    """Conversational chat with the AI-COO agent, streamed: reply tokens as they arrive."""
+    return stream_chat_completion(
+        model=settings.LLM_MODEL,
+        messages=_chat_messages(user_message, chat_history, analysis_context),
+        temperature=0.7,
+    )
@@ -3,8 +3,7 @@ AI-CTO Agent powered by OpenAI.
 """
 import json
 from typing import Dict, Any, List, Optional
-from openai import OpenAI
-import httpx
+from app.agents.llm import chat_completion
 from app.config import settings, model_supports_json_object
 from app.schemas.cto.cto_analysis import CTOAnalysisSchema, Risk, Recommendation, ActionPlan, ActionPlanItem
 
@@ -29,7 +28,7 @@ Always respond with structured JSON following the exact schema provided. Be spec
 Output format must be valid JSON matching the CTOAnalysisSchema structure."""
 
 
-def run_ai_cto_agent(
+async def run_ai_cto_agent(
     input_data: Dict[str, Any],
     tools_results: Dict[str, Any],
     rag_context: Optional[List[Dict[str, Any]]] = None,
@@ -44,19 +43,6 @@ def run_ai_cto_agent(
     if not settings.OPENAI_API_KEY:
         raise ValueError("OPENAI_API_KEY is not configured")
     
-    try:
-        # Create custom httpx client to avoid proxies compatibility issue
-        http_client = httpx.Client(
-            timeout=httpx.Timeout(60.0),
-            limits=httpx.Limits(max_keepalive_connections=5, max_connections=10)
-        )
-        client = OpenAI(
-            api_key=settings.OPENAI_API_KEY,
-            http_client=http_client
-        )
-    except Exception as e:
-        raise ValueError(f"Error initializing OpenAI client: {str(e)}")
-    
     # Build context from tools results
     tools_summary = f"""
 Technology Metrics:
@@ -129,7 +115,7 @@ Ensure all JSON is valid and properly formatted."""
         }
         if model_supports_json_object(settings.LLM_MODEL):
             kwargs["response_format"] = {"type": "json_object"}
-        response = client.chat.completions.create(**kwargs)
+        response = await chat_completion(**kwargs)
         
         content = response.choices[0].message.content
         
@@ -0,0 +1,152 @@
+"""
+Shared async LLM access for the agents.
+
+One AsyncOpenAI client per event loop and a per-provider concurrency limit (LLM_MAX_CONCURRENCY):
+at most that many completions are in flight per process, the rest wait on the semaphore instead of
+a fixed thread pool. Calls are plain coroutines, so asyncio.wait_for / task cancellation aborts the
+HTTP request and releases the slot; nothing keeps running after a timeout. Under an enabled
+llm_cache.cache_route, identical requests are answered from the response cache without a slot.
+Identical concurrent requests (same llm_cache.cache_key) share one call and one slot via single-flight,
+also with sync callers of coalesced_completion; the shared call is cancelled only once every waiter is.
+"""
+import asyncio
+import time
+import weakref
+from typing import Any, AsyncIterator
+
+import httpx
+
+from app.config import settings
+from app.utils.single_flight import SingleFlight
+
+DEFAULT_PROVIDER = "openai"
+_DEFAULT_LIMIT = 16
+
+_chat_flight = SingleFlight("chat_completions", lambda: settings.SINGLE_FLIGHT_ENABLED)
+
+# event loop -> {"clients": {provider: client}, "limits": {provider: Semaphore}, "counts": {provider: {...}}}
+_loops: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, dict]]" = weakref.WeakKeyDictionary()
+
+
+def _loop_state() -> dict[str, dict]:
+    loop = asyncio.get_running_loop()
+    state = _loops.get(loop)
+    if state is None:
+        state = {"clients": {}, "limits": {}, "counts": {}}
+        _loops[loop] = state
+    return state
+
+
+def concurrency_limit(provider: str = DEFAULT_PROVIDER) -> int:
+    return max(1, int((settings.LLM_MAX_CONCURRENCY or {}).get(provider, _DEFAULT_LIMIT)))
+
+
+def limiter(provider: str = DEFAULT_PROVIDER) -> asyncio.Semaphore:
+    """Semaphore bounding in-flight requests to provider on the running loop."""
+    limits = _loop_state()["limits"]
+    if provider not in limits:
+        limits[provider] = asyncio.Semaphore(concurrency_limit(provider))
+    return limits[provider]
+
+
+def get_async_client(provider: str = DEFAULT_PROVIDER) -> Any:
+    """AsyncOpenAI client for the running loop (its connection pool is sized to the provider limit)."""
+    if provider != DEFAULT_PROVIDER:
+        raise ValueError(f"Unknown LLM provider: {provider!r}")
+    if not settings.OPENAI_API_KEY:
+        raise ValueError("OPENAI_API_KEY is not configured")
+    clients = _loop_state()["clients"]
+    if provider not in clients:
+        from openai import AsyncOpenAI
+
+        limit = concurrency_limit(provider)
+        # Own httpx client: avoids the openai/httpx proxies incompatibility and sizes the pool.
+        http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.LLM_REQUEST_TIMEOUT_SECONDS),
+            limits=httpx.Limits(max_keepalive_connections=limit, max_connections=limit),
+        )
+        clients[provider] = AsyncOpenAI(api_key=settings.OPENAI_API_KEY, http_client=http_client)
+    return clients[provider]
+
+
+async def chat_completion(provider: str = DEFAULT_PROVIDER, **kwargs: Any) -> Any:
+    """chat.completions.create under the provider's concurrency limit; cancellable while waiting or in flight."""
+    from app.agents import llm_cache
+
+    route = llm_cache.active_route()
+    key = llm_cache.cache_key(provider, kwargs) if route or _chat_flight.enabled() else None
+    if key and route:
+        cached = await llm_cache.get(key, route, kwargs.get("model"))
+        if cached is not None:
+            return cached
+    return await _chat_flight.do_async(key, lambda: _create(provider, kwargs, key if route else None, route))
+
+
+async def _create(provider: str, kwargs: dict[str, Any], cache_key: str | None, route: str | None) -> Any:
+    from app.agents import llm_cache
+
+    counts = _loop_state()["counts"].setdefault(provider, {"waiting": 0, "in_flight": 0})
+    sem = limiter(provider)
+    counts["waiting"] += 1
+    try:
+        await sem.acquire()
+    finally:
+        counts["waiting"] -= 1
+    counts["in_flight"] += 1
+    try:
+        started = time.perf_counter()
+        response = await get_async_client(provider).chat.completions.create(**kwargs)
+        elapsed = time.perf_counter() - started
+    finally:
+        counts["in_flight"] -= 1
+        sem.release()
+    if cache_key:
+        await llm_cache.put(cache_key, route, response, elapsed)
+    return response
+
+
+def coalesced_completion(client: Any, provider: str = DEFAULT_PROVIDER, **kwargs: Any) -> Any:
+    """Sync client.chat.completions.create(**kwargs), shared with identical concurrent requests (sync or async)."""
+    from app.agents import llm_cache
+
+    key = llm_cache.cache_key(provider, kwargs) if _chat_flight.enabled() else None
+    return _chat_flight.do(key, lambda: client.chat.completions.create(**kwargs))
+
+
+async def stream_chat_completion(provider: str = DEFAULT_PROVIDER, **kwargs: Any) -> AsyncIterator[str]:
+    """
+    Content deltas of a streamed chat completion. The provider slot is held until the stream ends;
+    closing the generator early (client disconnect, cancellation) closes the upstream response.
+    Streamed replies are never cached.
+    """
+    counts = _loop_state()["counts"].setdefault(provider, {"waiting": 0, "in_flight": 0})
+    sem = limiter(provider)
+    counts["waiting"] += 1
+    try:
+        await sem.acquire()
+    finally:
+        counts["waiting"] -= 1
+    counts["in_flight"] += 1
+    stream = None
+    try:
+        stream = await get_async_client(provider).chat.completions.create(stream=True, **kwargs)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        if stream is not None:
+            await stream.close()
+        counts["in_flight"] -= 1
+        sem.release()
+
+
+def llm_stats() -> dict[str, Any]:
+    """Limit, in-flight and queued requests per provider on the running loop (for admin cache-stats)."""
+    try:
+        state = _loop_state()
+    except RuntimeError:
+        return {}
+    return {
+        provider: {"limit": concurrency_limit(provider), **counts}
+        for provider, counts in state["counts"].items()
+    }
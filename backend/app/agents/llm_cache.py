@@ -0,0 +1,285 @@
+"""
+Opt-in cache for agent LLM completions (llm.chat_completion), keyed by the request itself.
+
+The key is sha256 over provider, every request parameter except messages (model, temperature,
+response_format, ...) and the normalized messages (role lower-cased, line-ending and trailing
+whitespace differences removed). Agent prompts are built deterministically from the mapped
+payloads, so a repeated diagnostic hits for every agent.
+
+Caching only applies inside cache_route(name) for a name listed in LLM_CACHE_ROUTES, and only when
+LLM_CACHE_ENABLED. Tier 1 is a bounded LRU per worker process; tier 2 is the llm_response_cache table
+(own short sessions, run off the event loop). Entries expire after LLM_CACHE_TTL_SECONDS; eviction
+deletes expired rows and trims the table to LLM_CACHE_MAX_ROWS, at most once an hour from the write
+path and on demand via evict_expired(). Database errors are logged and treated as a miss.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Any, Iterator, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_EVICT_INTERVAL_SECONDS = 3600
+
+_route: ContextVar[Optional[str]] = ContextVar("llm_cache_route", default=None)
+
+
+@contextmanager
+def cache_route(name: str) -> Iterator[None]:
+    """LLM calls made inside (including tasks started inside) are cacheable if name is in LLM_CACHE_ROUTES."""
+    token = _route.set(name)
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+def enabled_routes() -> set[str]:
+    return {r.strip() for r in (settings.LLM_CACHE_ROUTES or "").split(",") if r.strip()}
+
+
+def active_route() -> Optional[str]:
+    """Current route if caching applies to it, else None."""
+    route = _route.get()
+    if not settings.LLM_CACHE_ENABLED or route is None or route not in enabled_routes():
+        return None
+    return route
+
+
+def _normalize_content(content: Any) -> Any:
+    if isinstance(content, str):
+        return "\n".join(line.rstrip() for line in content.strip().splitlines())
+    return content
+
+
+def normalize_messages(messages: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    out = []
+    for m in messages:
+        m = dict(m)
+        m["role"] = str(m.get("role", "")).strip().lower()
+        m["content"] = _normalize_content(m.get("content"))
+        out.append(m)
+    return out
+
+
+def cache_key(provider: str, request: dict[str, Any]) -> Optional[str]:
+    """SHA-256 hex of the normalized request, or None if it is not cacheable (streaming, n > 1)."""
+    if request.get("stream") or (request.get("n") or 1) > 1:
+        return None
+    params = {k: v for k, v in request.items() if k != "messages"}
+    params.setdefault("temperature", None)
+    payload = {"provider": provider, "params": params, "messages": normalize_messages(request.get("messages") or [])}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+
+def cached_completion(content: str, model: Optional[str] = None) -> Any:
+    """Minimal stand-in for a ChatCompletion: what the agents read (choices[0].message.content)."""
+    message = SimpleNamespace(role="assistant", content=content)
+    return SimpleNamespace(model=model, cached=True, choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")])
+
+
+class _ResponseLRU:
+    """Thread-safe bounded LRU: key_hash -> (stored_at epoch seconds, content, latency_ms)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple[float, str, Optional[int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, ttl_seconds: float) -> Optional[tuple[str, Optional[int]]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > ttl_seconds:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1], entry[2]
+
+    def set(self, key: str, content: str, latency_ms: Optional[int], stored_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (stored_at if stored_at is not None else time.time(), content, latency_ms)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def evict_older_than(self, ttl_seconds: float) -> int:
+        cutoff = time.time() - ttl_seconds
+        with self._lock:
+            expired = [k for k, (stored_at, _c, _l) in self._data.items() if stored_at < cutoff]
+            for k in expired:
+                del self._data[k]
+            return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_local = _ResponseLRU(settings.LLM_CACHE_MAX_ENTRIES)
+_stats: dict[str, Any] = {
+    "hits": 0, "db_hits": 0, "misses": 0, "writes": 0, "evicted": 0, "backend_errors": 0, "saved_ms": 0, "routes": {},
+}
+_last_evict_at = 0.0
+
+
+def _count(route: str, outcome: str, saved_ms: Optional[int] = None) -> None:
+    _stats[outcome] += 1
+    per_route = _stats["routes"].setdefault(route, {"hits": 0, "misses": 0})
+    per_route["misses" if outcome == "misses" else "hits"] += 1
+    if saved_ms:
+        _stats["saved_ms"] += saved_ms
+
+
+async def get(key: str, route: str, model: Optional[str] = None) -> Any:
+    """Cached completion for key, or None. Checks the LRU, then the table (in a worker thread)."""
+    ttl = settings.LLM_CACHE_TTL_SECONDS
+    entry = _local.get(key, ttl)
+    if entry is not None:
+        _count(route, "hits", entry[1])
+        return cached_completion(entry[0], model)
+    if settings.LLM_CACHE_PERSIST:
+        try:
+            row = await asyncio.to_thread(_db_get, key, ttl)
+        except Exception as e:
+            _stats["backend_errors"] += 1
+            logger.warning("llm cache db get failed: %s", e)
+            row = None
+        if row is not None:
+            content, latency_ms, created_at = row
+            _local.set(key, content, latency_ms, stored_at=created_at.timestamp())
+            _count(route, "db_hits", latency_ms)
+            return cached_completion(content, model)
+    _count(route, "misses")
+    return None
+
+
+async def put(key: str, route: str, response: Any, latency_seconds: float) -> None:
+    """Store a completion's text in both tiers. Truncated / filtered / empty completions are not cached."""
+    try:
+        choice = response.choices[0]
+        content = choice.message.content
+    except (AttributeError, IndexError):
+        return
+    if not content or getattr(choice, "finish_reason", None) not in (None, "stop"):
+        return
+    latency_ms = int(latency_seconds * 1000)
+    _local.set(key, content, latency_ms)
+    _stats["writes"] += 1
+    if settings.LLM_CACHE_PERSIST:
+        try:
+            await asyncio.to_thread(_db_put, key, getattr(response, "model", None), route, content, latency_ms)
+        except Exception as e:
+            _stats["backend_errors"] += 1
+            logger.warning("llm cache db put failed: %s", e)
+        if time.time() - _last_evict_at > _EVICT_INTERVAL_SECONDS:
+            await asyncio.to_thread(evict_expired)
+
+
+def _db_get(key: str, ttl_seconds: float) -> Optional[tuple[str, Optional[int], datetime]]:
+    from app.db.database import SessionLocal
+    from app.db.models import LLMResponseCacheEntry
+
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl_seconds)
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(LLMResponseCacheEntry.content, LLMResponseCacheEntry.latency_ms, LLMResponseCacheEntry.created_at)
+            .filter(LLMResponseCacheEntry.key_hash == key, LLMResponseCacheEntry.created_at >= cutoff)
+            .first()
+        )
+    finally:
+        db.close()
+    return tuple(row) if row is not None else None
+
+
+def _db_put(key: str, model: Optional[str], route: str, content: str, latency_ms: int) -> None:
+    from sqlalchemy import func
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    from app.db.database import SessionLocal
+    from app.db.models import LLMResponseCacheEntry
+
+    table = LLMResponseCacheEntry.__table__
+    stmt = pg_insert(table).values(key_hash=key, model=model, route=route, content=content, latency_ms=latency_ms)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.key_hash],
+        set_={"content": stmt.excluded.content, "latency_ms": stmt.excluded.latency_ms, "created_at": func.now()},
+    )
+    db = SessionLocal()
+    try:
+        db.execute(stmt)
+        db.commit()
+    finally:
+        db.close()
+
+
+def evict_expired() -> dict[str, int]:
+    """Drop entries older than LLM_CACHE_TTL_SECONDS from both tiers and trim the table to LLM_CACHE_MAX_ROWS."""
+    global _last_evict_at
+    _last_evict_at = time.time()
+    ttl = settings.LLM_CACHE_TTL_SECONDS
+    out = {"local": _local.evict_older_than(ttl), "db": 0}
+    if settings.LLM_CACHE_PERSIST:
+        from sqlalchemy import text
+
+        from app.db.database import SessionLocal
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl)
+        db = SessionLocal()
+        try:
+            out["db"] = db.execute(
+                text("DELETE FROM llm_response_cache WHERE created_at < :cutoff"), {"cutoff": cutoff}
+            ).rowcount
+            out["db"] += db.execute(
+                text("""
+                    DELETE FROM llm_response_cache WHERE key_hash IN (
+                        SELECT key_hash FROM llm_response_cache ORDER BY created_at DESC OFFSET :keep
+                    )
+                """),
+                {"keep": max(0, settings.LLM_CACHE_MAX_ROWS)},
+            ).rowcount
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            _stats["backend_errors"] += 1
+            logger.warning("llm cache eviction failed: %s", e)
+        finally:
+            db.close()
+    _stats["evicted"] += out["local"] + out["db"]
+    return out
+
+
+def cache_stats() -> dict[str, Any]:
+    """Counters for this worker (overall and per route) plus current local size."""
+    lookups = _stats["hits"] + _stats["db_hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "routes": {r: dict(c) for r, c in _stats["routes"].items()},
+        "hit_rate": round((_stats["hits"] + _stats["db_hits"]) / lookups, 4) if lookups else None,
+        "enabled": settings.LLM_CACHE_ENABLED,
+        "enabled_routes": sorted(enabled_routes()),
+        "local_entries": len(_local),
+        "local_max_entries": _local.max_entries,
+        "persist": settings.LLM_CACHE_PERSIST,
+        "ttl_seconds": settings.LLM_CACHE_TTL_SECONDS,
+    }
+
+
+def clear_local_cache() -> None:
+    """Empty this worker's LRU (tests, admin)."""
+    _local.clear()
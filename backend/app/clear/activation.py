@@ -16,7 +16,7 @@ from app.db.models import (
     DecisionExecutionMilestone,
     OutcomeReview,
 )
-from app.governance.ledger_service import _derive_status_from_ledger
+from app.governance.ledger_service import derive_statuses
 
 ACTIVATION_STEP_KEYS = ["describe", "diagnostic", "finalize", "milestones", "review"]
 
@@ -74,9 +74,9 @@ def compute_activation_for_enterprise(db: Session, enterprise_id: int) -> dict[s
     has_milestones = False
     has_review = False
 
+    statuses = derive_statuses(db, [d.decision_id for d in decisions])
     for d in decisions:
-        status = _derive_status_from_ledger(db, d.decision_id)
-        if _is_finalized(status):
+        if _is_finalized(statuses[d.decision_id]):
             has_finalized = True
         if _has_review_scheduled(db, d.decision_id):
             has_review = True
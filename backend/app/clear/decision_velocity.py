@@ -5,11 +5,11 @@ Cycle = situation recorded → decision finalized → first milestone started 
 from __future__ import annotations
 
 from datetime import datetime, timezone
-from typing import Any, Optional
+from typing import Any, Callable, Optional
 from uuid import UUID
 
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy import func, select
 
 from app.db.models import (
     Decision,
@@ -56,77 +56,78 @@ def compute_decision_velocity(
         avg_cycle_days, avg_time_to_decision, avg_time_to_execution, avg_time_to_review,
         velocity_band, trend_direction, cycle_count, per_decision (optional detail).
     """
-    # Base query: decisions (optionally filtered by enterprise or explicit list)
-    q = db.query(Decision)
+    # One query: per decision, correlated MIN(created_at) lookups for the first ARTIFACT_FINALIZED
+    # event, first milestone and first outcome review (each served by the decision_id index).
+    finalized_at = (
+        select(func.min(DecisionLedgerEvent.created_at))
+        .where(
+            DecisionLedgerEvent.decision_id == Decision.decision_id,
+            DecisionLedgerEvent.event_type == LedgerEventType.ARTIFACT_FINALIZED.value,
+        )
+        .scalar_subquery()
+    )
+    milestone_at = (
+        select(func.min(DecisionExecutionMilestone.created_at))
+        .where(DecisionExecutionMilestone.decision_id == Decision.decision_id)
+        .scalar_subquery()
+    )
+    review_at = (
+        select(func.min(OutcomeReview.created_at))
+        .where(OutcomeReview.decision_id == Decision.decision_id)
+        .scalar_subquery()
+    )
+    q = db.query(Decision.decision_id, Decision.enterprise_id, Decision.created_at, finalized_at, milestone_at, review_at)
     if enterprise_id is not None:
         q = q.filter(Decision.enterprise_id == enterprise_id)
     if decision_ids is not None:
         q = q.filter(Decision.decision_id.in_(decision_ids))
-    decisions = q.all()
+    # Only full cycles (first review completed) can count.
+    q = q.filter(
+        select(OutcomeReview.id).where(OutcomeReview.decision_id == Decision.decision_id).exists()
+    ).order_by(Decision.id)
 
-    # For each decision get: situation_created_at, decision_finalized_at, first_milestone_started_at, first_review_completed_at
     cycles: list[dict[str, Any]] = []
+    for did, ent_id, situation_created_at, finalized_at, milestone_at, review_at in q.all():
+        cycle = _cycle_from_timestamps(did, ent_id, situation_created_at, finalized_at, milestone_at, review_at)
+        if cycle is not None:
+            cycles.append(cycle)
 
-    for d in decisions:
-        did = d.decision_id
-        situation_created_at = d.created_at
-
-        # First ARTIFACT_FINALIZED event for this decision
-        finalized_ev = (
-            db.query(DecisionLedgerEvent)
-            .filter(
-                and_(
-                    DecisionLedgerEvent.decision_id == did,
-                    DecisionLedgerEvent.event_type == LedgerEventType.ARTIFACT_FINALIZED.value,
-                )
-            )
-            .order_by(DecisionLedgerEvent.created_at.asc())
-            .limit(1)
-            .first()
-        )
-        decision_finalized_at = finalized_ev.created_at if finalized_ev else None
-
-        # First milestone (earliest created_at)
-        first_milestone = (
-            db.query(DecisionExecutionMilestone)
-            .filter(DecisionExecutionMilestone.decision_id == did)
-            .order_by(DecisionExecutionMilestone.created_at.asc())
-            .limit(1)
-            .first()
-        )
-        first_milestone_started_at = first_milestone.created_at if first_milestone else None
-
-        # First outcome review
-        first_review = (
-            db.query(OutcomeReview)
-            .filter(OutcomeReview.decision_id == did)
-            .order_by(OutcomeReview.created_at.asc())
-            .limit(1)
-            .first()
-        )
-        first_review_completed_at = first_review.created_at if first_review else None
+    return _velocity_from_cycles(cycles, lambda avg: _trend_from_snapshots(db, enterprise_id, avg))
+
+
+def _cycle_from_timestamps(
+    decision_id: UUID,
+    enterprise_id: Optional[int],
+    situation_created_at: datetime | None,
+    decision_finalized_at: datetime | None,
+    first_milestone_started_at: datetime | None,
+    first_review_completed_at: datetime | None,
+) -> Optional[dict[str, Any]]:
+    """One decision's cycle timings, or None unless the cycle is complete (has a first review)."""
+    # Only include full cycles (have review completed)
+    if first_review_completed_at is None:
+        return None
 
-        # Only include full cycles (have review completed)
-        if first_review_completed_at is None:
-            continue
+    time_to_decision = _days_between(situation_created_at, decision_finalized_at)
+    time_to_execution = _days_between(decision_finalized_at, first_milestone_started_at)
+    time_to_review = _days_between(first_milestone_started_at, first_review_completed_at)
+    total_cycle = _days_between(situation_created_at, first_review_completed_at)
 
-        time_to_decision = _days_between(situation_created_at, decision_finalized_at)
-        time_to_execution = _days_between(decision_finalized_at, first_milestone_started_at)
-        time_to_review = _days_between(first_milestone_started_at, first_review_completed_at)
-        total_cycle = _days_between(situation_created_at, first_review_completed_at)
+    if total_cycle is None:
+        return None
 
-        if total_cycle is None:
-            continue
+    return {
+        "decision_id": str(decision_id),
+        "enterprise_id": enterprise_id,
+        "time_to_decision_days": time_to_decision,
+        "time_to_execution_days": time_to_execution,
+        "time_to_review_days": time_to_review,
+        "total_cycle_days": total_cycle,
+    }
 
-        cycles.append({
-            "decision_id": str(did),
-            "enterprise_id": d.enterprise_id,
-            "time_to_decision_days": time_to_decision,
-            "time_to_execution_days": time_to_execution,
-            "time_to_review_days": time_to_review,
-            "total_cycle_days": total_cycle,
-        })
 
+def _velocity_from_cycles(cycles: list[dict[str, Any]], trend: Callable[[float], str]) -> dict[str, Any]:
+    """Averages, band and trend over completed cycles; trend(avg_cycle_days) is only called when cycles exist."""
     if not cycles:
         return {
             "avg_cycle_days": None,
@@ -148,7 +149,7 @@ def compute_decision_velocity(
     velocity_band = _band_from_avg_days(avg_cycle)
 
     # Trend: compare to previous snapshot if we have one (optional; can be implemented with snapshot table)
-    trend_direction = _trend_from_snapshots(db, enterprise_id, avg_cycle)
+    trend_direction = trend(avg_cycle)
 
     return {
         "avg_cycle_days": round(avg_cycle, 1),
@@ -175,18 +176,23 @@ def _trend_from_snapshots(db: Session, enterprise_id: Optional[int], current_avg
         if enterprise_id is not None:
             q = q.filter(DecisionVelocitySnapshot.enterprise_id == enterprise_id)
         prev = q.order_by(DecisionVelocitySnapshot.snapshot_date.desc()).limit(1).first()
-        if prev is None or prev.avg_cycle_days is None:
-            return "stable"
-        prev_avg = float(prev.avg_cycle_days) if prev.avg_cycle_days is not None else current_avg
-        if current_avg < prev_avg:
-            return "improving"
-        if current_avg > prev_avg:
-            return "slowing"
-        return "stable"
+        return _trend_from_previous(prev.avg_cycle_days if prev is not None else None, current_avg)
     except Exception:
         return "stable"
 
 
+def _trend_from_previous(prev_avg: Any, current_avg: float) -> str:
+    """improving | slowing | stable vs the previous snapshot average (stable when there is none)."""
+    if prev_avg is None:
+        return "stable"
+    prev_avg = float(prev_avg)
+    if current_avg < prev_avg:
+        return "improving"
+    if current_avg > prev_avg:
+        return "slowing"
+    return "stable"
+
+
 def save_velocity_snapshot(
     db: Session,
     enterprise_id: Optional[int],
@@ -0,0 +1,334 @@
+"""
+Portfolio enrichment engine: every enterprise in a portfolio in a fixed number of set-based queries.
+
+load_portfolio_data bulk-loads decisions, statuses, latest-artifact fragments, milestones, evidence,
+diagnostic runs, outcome reviews, first finalization times, partner members and previous snapshots
+for all enterprises at once. enrich_enterprises then computes the same rows as the per-enterprise
+services (compute_health_score, compute_decision_velocity, compute_readiness_index_for_enterprise,
+compute_readiness) through their shared pure helpers, applying the cheap filters first and each
+metric filter as soon as that metric is known.
+"""
+from datetime import date, datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    Decision,
+    DecisionArtifact,
+    DecisionEvidenceLink,
+    DecisionExecutionMilestone,
+    DecisionLedgerEvent,
+    DecisionVelocitySnapshot,
+    DiagnosticRun,
+    Enterprise,
+    EnterpriseHealthSnapshot,
+    EnterpriseMember,
+    EnterpriseReadinessSnapshot,
+    OutcomeReview,
+)
+from app.governance.ledger_service import derive_statuses
+from app.governance import health_score as health_mod
+from app.governance import readiness_index as ecri_mod
+from app.governance.readiness import _readiness_from_rows
+from app.clear import decision_velocity as velocity_mod
+from app.schemas.clear.ledger import LedgerEventType
+
+
+def _group(rows: list, key: str) -> dict[Any, list]:
+    out: dict[Any, list] = {}
+    for r in rows:
+        out.setdefault(getattr(r, key), []).append(r)
+    return out
+
+
+def _latest_snapshot_values(db: Session, model, value_col, enterprise_ids: list[int]) -> dict[int, Any]:
+    """Latest value per enterprise from a snapshot table, dated before today (trend baseline)."""
+    rows = (
+        db.query(model.enterprise_id, value_col)
+        .filter(model.enterprise_id.in_(enterprise_ids), model.snapshot_date < date.today())
+        .distinct(model.enterprise_id)
+        .order_by(model.enterprise_id, model.snapshot_date.desc())
+        .all()
+    )
+    return {eid: value for eid, value in rows}
+
+
+def load_portfolio_data(db: Session, enterprise_ids: list[int]) -> dict[str, Any]:
+    """
+    Bulk-load everything the portfolio metrics need for these enterprises.
+    Child rows are selected by joining decisions on enterprise_id, never by per-decision lookups.
+    """
+    by_enterprise = Decision.enterprise_id.in_(enterprise_ids)
+    decisions = (
+        db.query(
+            Decision.decision_id,
+            Decision.enterprise_id,
+            Decision.created_at,
+            Decision.responsible_owner,
+            Decision.outcome_review_reminder,
+        )
+        .filter(by_enterprise)
+        .all()
+    )
+    decision_ids = [d.decision_id for d in decisions]
+
+    # Latest artifact per decision; only the JSON fragments the metrics read.
+    artifacts = {
+        r.decision_id: {"emr": r.emr, "governance": r.governance, "primary_domain": r.primary_domain}
+        for r in (
+            db.query(
+                DecisionArtifact.decision_id,
+                DecisionArtifact.canonical_json["emr"].label("emr"),
+                DecisionArtifact.canonical_json["governance"].label("governance"),
+                DecisionArtifact.canonical_json[("synthesis_summary", "primary_domain")].label("primary_domain"),
+            )
+            .join(Decision, Decision.decision_id == DecisionArtifact.decision_id)
+            .filter(by_enterprise)
+            .distinct(DecisionArtifact.decision_id)
+            .order_by(DecisionArtifact.decision_id, DecisionArtifact.created_at.desc())
+        )
+    }
+    milestones = (
+        db.query(
+            DecisionExecutionMilestone.decision_id,
+            DecisionExecutionMilestone.status,
+            DecisionExecutionMilestone.due_date,
+            DecisionExecutionMilestone.updated_at,
+            DecisionExecutionMilestone.created_at,
+        )
+        .join(Decision, Decision.decision_id == DecisionExecutionMilestone.decision_id)
+        .filter(by_enterprise)
+        .all()
+    )
+    reviews = (
+        db.query(OutcomeReview.decision_id, OutcomeReview.created_at, OutcomeReview.key_learnings)
+        .join(Decision, Decision.decision_id == OutcomeReview.decision_id)
+        .filter(by_enterprise)
+        .all()
+    )
+    evidence_ids = {
+        r[0] for r in db.query(DecisionEvidenceLink.decision_id)
+        .join(Decision, Decision.decision_id == DecisionEvidenceLink.decision_id)
+        .filter(by_enterprise)
+        .distinct()
+    }
+    diagnostic_ids = {
+        r[0] for r in db.query(DiagnosticRun.decision_id)
+        .join(Decision, Decision.decision_id == DiagnosticRun.decision_id)
+        .filter(by_enterprise)
+        .distinct()
+    }
+    first_finalized = dict(
+        db.query(DecisionLedgerEvent.decision_id, func.min(DecisionLedgerEvent.created_at))
+        .join(Decision, Decision.decision_id == DecisionLedgerEvent.decision_id)
+        .filter(by_enterprise, DecisionLedgerEvent.event_type == LedgerEventType.ARTIFACT_FINALIZED.value)
+        .group_by(DecisionLedgerEvent.decision_id)
+        .all()
+    )
+    partner_enterprises = {
+        r[0] for r in db.query(EnterpriseMember.enterprise_id)
+        .filter(EnterpriseMember.enterprise_id.in_(enterprise_ids), EnterpriseMember.role.in_(ecri_mod.PARTNER_ROLES))
+        .distinct()
+    }
+    return {
+        "decisions": _group(decisions, "enterprise_id"),
+        "statuses": derive_statuses(db, decision_ids) if decision_ids else {},
+        "artifacts": artifacts,
+        "milestones": _group(milestones, "decision_id"),
+        "reviews": _group(reviews, "decision_id"),
+        "evidence_ids": evidence_ids,
+        "diagnostic_ids": diagnostic_ids,
+        "first_finalized": first_finalized,
+        "partner_enterprises": partner_enterprises,
+        "prev_health": _latest_snapshot_values(db, EnterpriseHealthSnapshot, EnterpriseHealthSnapshot.score, enterprise_ids),
+        "prev_velocity": _latest_snapshot_values(db, DecisionVelocitySnapshot, DecisionVelocitySnapshot.avg_cycle_days, enterprise_ids),
+        "prev_ecri": _latest_snapshot_values(db, EnterpriseReadinessSnapshot, EnterpriseReadinessSnapshot.readiness_index, enterprise_ids),
+    }
+
+
+def _artifact_json(data: dict[str, Any], decision_id: UUID) -> Optional[dict[str, Any]]:
+    art = data["artifacts"].get(decision_id)
+    if art is None:
+        return None
+    return {"emr": art["emr"], "governance": art["governance"]}
+
+
+def _health(data: dict[str, Any], enterprise_id: int, decisions: list) -> dict[str, Any]:
+    if not decisions:
+        return health_mod._empty_score("No decisions")
+    milestones = [m for d in decisions for m in data["milestones"].get(d.decision_id, [])]
+    reviews = [r for d in decisions for r in data["reviews"].get(d.decision_id, [])]
+    plan_ids = {
+        d.decision_id for d in decisions
+        if health_mod._artifact_has_execution_plan(_artifact_json(data, d.decision_id))
+    }
+    result = health_mod._score_from_rows(
+        decisions, data["statuses"], milestones, data["evidence_ids"], plan_ids,
+        data["diagnostic_ids"], reviews, date.today(),
+    )
+    result["trend_direction"] = health_mod._trend_from_previous(data["prev_health"].get(enterprise_id), result["total_score"])
+    return result
+
+
+def _first(rows: list, attr: str) -> Optional[datetime]:
+    values = [getattr(r, attr) for r in rows if getattr(r, attr) is not None]
+    return min(values) if values else None
+
+
+def _velocity(data: dict[str, Any], enterprise_id: int, decisions: list) -> dict[str, Any]:
+    cycles = []
+    for d in decisions:
+        cycle = velocity_mod._cycle_from_timestamps(
+            d.decision_id,
+            d.enterprise_id,
+            d.created_at,
+            data["first_finalized"].get(d.decision_id),
+            _first(data["milestones"].get(d.decision_id, []), "created_at"),
+            _first(data["reviews"].get(d.decision_id, []), "created_at"),
+        )
+        if cycle is not None:
+            cycles.append(cycle)
+    prev = data["prev_velocity"].get(enterprise_id)
+    return velocity_mod._velocity_from_cycles(cycles, lambda avg: velocity_mod._trend_from_previous(prev, avg))
+
+
+def _ecri(data: dict[str, Any], enterprise_id: int, decisions: list, health: dict, velocity: dict) -> dict[str, Any]:
+    n_evidence = sum(1 for d in decisions if d.decision_id in data["evidence_ids"])
+    gov_metrics = ecri_mod._governance_metrics_from_rows(
+        decisions, data["statuses"], n_evidence,
+        bool(decisions) and enterprise_id in data["partner_enterprises"],
+    )
+    cycles = sum(len(data["reviews"].get(d.decision_id, [])) for d in decisions)
+    result = ecri_mod.compute_readiness_index(
+        activation_progress=None,
+        enterprise_health_score=health.get("total_score"),
+        decision_velocity=velocity,
+        governance_maturity_metrics=gov_metrics,
+        cycles_completed=cycles,
+    )
+    trend = ecri_mod._trend_from_previous(data["prev_ecri"].get(enterprise_id), result["readiness_index"])
+    if trend:
+        result["trend_direction"] = trend
+    return result
+
+
+def _last_decision_fields(data: dict[str, Any], decisions: list) -> dict[str, Any]:
+    if not decisions:
+        return {
+            "last_decision_id": None,
+            "last_primary_domain": None,
+            "readiness_band": None,
+            "last_review_date": None,
+            "has_committed_plan": False,
+        }
+    last = max(decisions, key=lambda d: d.created_at)
+    art = data["artifacts"].get(last.decision_id) or {}
+    emr = art.get("emr") or {}
+    reviews = data["reviews"].get(last.decision_id, [])
+    readiness = _readiness_from_rows(
+        len(reviews), _artifact_json(data, last.decision_id), data["milestones"].get(last.decision_id, [])
+    )
+    last_review_at = max((r.created_at for r in reviews if r.created_at), default=None)
+    return {
+        "last_decision_id": str(last.decision_id),
+        "last_primary_domain": art.get("primary_domain"),
+        "readiness_band": readiness.get("band"),
+        "last_review_date": last_review_at.date().isoformat() if last_review_at else None,
+        "has_committed_plan": emr.get("plan_committed") is True,
+    }
+
+
+def compute_enterprise_metrics(db: Session, enterprise_ids: list[int]) -> dict[int, dict[str, Any]]:
+    """
+    Health, velocity and ECRI for many enterprises from one bulk load. Each value matches
+    compute_health_score / compute_decision_velocity / compute_readiness_index_for_enterprise.
+    Returns {enterprise_id: {"health", "velocity", "readiness_index"}}.
+    """
+    if not enterprise_ids:
+        return {}
+    data = load_portfolio_data(db, enterprise_ids)
+    out = {}
+    for eid in enterprise_ids:
+        decisions = data["decisions"].get(eid, [])
+        vel = _velocity(data, eid, decisions)
+        health = _health(data, eid, decisions)
+        out[eid] = {"health": health, "velocity": vel, "readiness_index": _ecri(data, eid, decisions, health, vel)}
+    return out
+
+
+def enrich_enterprises(
+    db: Session,
+    enterprise_ids: list[int],
+    readiness_band: str | None = None,
+    primary_domain: str | None = None,
+    country: str | None = None,
+    industry: str | None = None,
+    no_review_days: int | None = None,
+    health_score_min: int | None = None,
+    health_score_max: int | None = None,
+    velocity_band: str | None = None,
+    ecri_readiness_band: str | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Enriched portfolio rows for these enterprises, in the given order (same shape and filter
+    semantics as list_portfolio_enriched). country/industry are applied in SQL before any bulk load.
+    """
+    q = db.query(Enterprise).filter(Enterprise.id.in_(enterprise_ids))
+    if country:
+        q = q.filter(func.lower(func.coalesce(Enterprise.geography, "")) == country.lower())
+    if industry:
+        q = q.filter(func.lower(func.coalesce(Enterprise.sector, "")) == industry.lower())
+    enterprises = {e.id: e for e in q.all()}
+    if not enterprises:
+        return []
+    data = load_portfolio_data(db, list(enterprises))
+    today = date.today()
+
+    out = []
+    for eid in enterprise_ids:
+        ent = enterprises.get(eid)
+        if ent is None:
+            continue
+        decisions = data["decisions"].get(eid, [])
+        last = _last_decision_fields(data, decisions)
+        if readiness_band and last["readiness_band"] != readiness_band:
+            continue
+        if primary_domain and last["last_primary_domain"] != primary_domain:
+            continue
+        if no_review_days is not None and no_review_days > 0 and last["last_review_date"]:
+            if (today - date.fromisoformat(last["last_review_date"])).days <= no_review_days:
+                continue
+
+        vel = _velocity(data, eid, decisions)
+        if velocity_band and vel.get("velocity_band") != velocity_band:
+            continue
+        health = _health(data, eid, decisions)
+        if health_score_min is not None and (health["total_score"] or 0) < health_score_min:
+            continue
+        if health_score_max is not None and (health["total_score"] or 100) > health_score_max:
+            continue
+        ecri = _ecri(data, eid, decisions, health, vel)
+        if ecri_readiness_band and ecri.get("readiness_band") != ecri_readiness_band:
+            continue
+
+        out.append({
+            "enterprise_id": eid,
+            "enterprise_name": ent.name,
+            "country": ent.geography,
+            "industry": ent.sector,
+            "company_size_band": ent.size_band,
+            **last,
+            "health_score": health["total_score"],
+            "health_status_label": health["status_label"],
+            "health_trend_direction": health.get("trend_direction"),
+            "avg_cycle_days": vel.get("avg_cycle_days"),
+            "velocity_band": vel.get("velocity_band"),
+            "trend_direction": vel.get("trend_direction"),
+            "readiness_index": ecri.get("readiness_index"),
+            "ecri_readiness_band": ecri.get("readiness_band"),
+            "ecri_trend_direction": ecri.get("trend_direction"),
+        })
+    return out
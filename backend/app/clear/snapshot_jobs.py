@@ -0,0 +1,325 @@
+"""
+Monthly snapshot jobs: Health, Velocity and ECRI snapshots for many enterprises, in the background.
+
+A job freezes its enterprise ids at creation and splits them into snapshot_job_chunks. Workers
+(threads, each with its own session) claim chunks with FOR UPDATE SKIP LOCKED, compute metrics for
+the whole chunk with portfolio_engine.compute_enterprise_metrics, upsert the month's snapshots and
+mark the chunk done in the same transaction. A crashed run is resumed by running the job again:
+done chunks are skipped and chunks left "running" longer than SNAPSHOT_JOB_STALE_SECONDS are
+reclaimed. Used by the admin API and scripts/run_monthly_snapshots.py.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.database import SessionLocal
+from app.db.models import (
+    CohortEnterprise,
+    DecisionVelocitySnapshot,
+    Enterprise,
+    EnterpriseHealthSnapshot,
+    EnterpriseReadinessSnapshot,
+    PortfolioEnterprise,
+    SnapshotJob,
+    SnapshotJobChunk,
+)
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KINDS = ("health", "velocity", "readiness")
+
+
+def resolve_enterprise_ids(
+    db: Session,
+    enterprise_id: Optional[int] = None,
+    cohort_id: Optional[int] = None,
+    portfolio_id: Optional[int] = None,
+) -> list[int]:
+    """Enterprise ids for one enterprise, a cohort, a portfolio, or all enterprises (sorted)."""
+    if enterprise_id is not None:
+        ent = db.query(Enterprise.id).filter(Enterprise.id == enterprise_id).first()
+        return [enterprise_id] if ent else []
+    if cohort_id is not None:
+        rows = db.query(CohortEnterprise.enterprise_id).filter(CohortEnterprise.cohort_id == cohort_id).distinct().all()
+    elif portfolio_id is not None:
+        rows = db.query(PortfolioEnterprise.enterprise_id).filter(PortfolioEnterprise.portfolio_id == portfolio_id).distinct().all()
+    else:
+        rows = db.query(Enterprise.id).all()
+    return sorted(r[0] for r in rows)
+
+
+def create_snapshot_job(
+    db: Session,
+    scope: Optional[dict[str, Any]] = None,
+    chunk_size: Optional[int] = None,
+    snapshot_date: Optional[date] = None,
+) -> SnapshotJob:
+    """Resolve the scope, split enterprise ids into chunks and persist the job (commits)."""
+    scope = {k: v for k, v in (scope or {}).items() if v is not None}
+    chunk_size = max(1, chunk_size or settings.SNAPSHOT_JOB_CHUNK_SIZE)
+    enterprise_ids = resolve_enterprise_ids(
+        db, scope.get("enterprise_id"), scope.get("cohort_id"), scope.get("portfolio_id")
+    )
+    chunks = [enterprise_ids[i:i + chunk_size] for i in range(0, len(enterprise_ids), chunk_size)]
+    job = SnapshotJob(
+        scope=scope,
+        snapshot_date=snapshot_date or date.today().replace(day=1),
+        total_enterprises=len(enterprise_ids),
+        total_chunks=len(chunks),
+        status="pending" if chunks else "completed",
+    )
+    db.add(job)
+    db.flush()
+    for index, ids in enumerate(chunks):
+        db.add(SnapshotJobChunk(job_id=job.id, chunk_index=index, enterprise_ids=ids))
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _claim_chunk(db: Session, job_id: UUID) -> Optional[SnapshotJobChunk]:
+    """Lock the next pending (or stale running) chunk of this job and mark it running (commits)."""
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=settings.SNAPSHOT_JOB_STALE_SECONDS)
+    chunk = (
+        db.query(SnapshotJobChunk)
+        .filter(
+            SnapshotJobChunk.job_id == job_id,
+            or_(
+                SnapshotJobChunk.status == "pending",
+                (SnapshotJobChunk.status == "running") & (SnapshotJobChunk.started_at < stale_before),
+            ),
+        )
+        .order_by(SnapshotJobChunk.chunk_index)
+        .with_for_update(skip_locked=True)
+        .limit(1)
+        .first()
+    )
+    if chunk is None:
+        db.rollback()
+        return None
+    chunk.status = "running"
+    chunk.attempts = (chunk.attempts or 0) + 1
+    chunk.started_at = datetime.now(timezone.utc)
+    db.commit()
+    return chunk
+
+
+def _round_or_none(value: Optional[float]) -> Optional[float]:
+    return round(value, 2) if value is not None else None
+
+
+def _write_chunk_snapshots(db: Session, enterprise_ids: list[int], snapshot_date: date) -> tuple[dict[str, int], list[str]]:
+    """Compute metrics for a chunk and upsert this month's snapshots (no commit)."""
+    from app.clear.decision_velocity import _band_from_avg_days
+    from app.clear.portfolio_engine import compute_enterprise_metrics
+
+    existing_ids = {r[0] for r in db.query(Enterprise.id).filter(Enterprise.id.in_(enterprise_ids))}
+    errors = [f"enterprise_id={eid}: not found" for eid in enterprise_ids if eid not in existing_ids]
+    ids = [eid for eid in enterprise_ids if eid in existing_ids]
+    counts = dict.fromkeys(SNAPSHOT_KINDS, 0)
+    if not ids:
+        return counts, errors
+    metrics = compute_enterprise_metrics(db, ids)
+
+    def existing(model) -> dict[int, Any]:
+        rows = db.query(model).filter(model.enterprise_id.in_(ids), model.snapshot_date == snapshot_date).all()
+        return {r.enterprise_id: r for r in rows}
+
+    health_rows = existing(EnterpriseHealthSnapshot)
+    velocity_rows = existing(DecisionVelocitySnapshot)
+    readiness_rows = existing(EnterpriseReadinessSnapshot)
+
+    for eid in ids:
+        health = metrics[eid]["health"]
+        snap = health_rows.get(eid) or EnterpriseHealthSnapshot(enterprise_id=eid, snapshot_date=snapshot_date)
+        snap.score = health["total_score"]
+        snap.execution_score = health["execution_score"]
+        snap.governance_score = health["governance_score"]
+        snap.learning_score = health["learning_score"]
+        db.add(snap)
+        counts["health"] += 1
+
+        vel = metrics[eid]["velocity"]
+        avg_cycle = float(vel.get("avg_cycle_days") or 0.0)
+        snap = velocity_rows.get(eid)
+        if snap is not None:
+            snap.avg_cycle_days = round(avg_cycle, 2)
+            snap.avg_time_to_decision = round(vel.get("avg_time_to_decision") or 0, 2)
+            snap.avg_time_to_execution = round(vel.get("avg_time_to_execution") or 0, 2)
+            snap.avg_time_to_review = round(vel.get("avg_time_to_review") or 0, 2)
+            snap.velocity_band = vel.get("velocity_band")
+        else:
+            # Same values as decision_velocity.save_velocity_snapshot, which commits on its own.
+            db.add(DecisionVelocitySnapshot(
+                enterprise_id=eid,
+                snapshot_date=snapshot_date,
+                avg_cycle_days=round(avg_cycle, 2),
+                avg_time_to_decision=_round_or_none(vel.get("avg_time_to_decision")),
+                avg_time_to_execution=_round_or_none(vel.get("avg_time_to_execution")),
+                avg_time_to_review=_round_or_none(vel.get("avg_time_to_review")),
+                velocity_band=vel.get("velocity_band") or _band_from_avg_days(avg_cycle),
+            ))
+        counts["velocity"] += 1
+
+        ecri = metrics[eid]["readiness_index"]
+        snap = readiness_rows.get(eid) or EnterpriseReadinessSnapshot(enterprise_id=eid, snapshot_date=snapshot_date)
+        snap.readiness_index = ecri["readiness_index"]
+        snap.activation_component = ecri.get("activation_component")
+        snap.health_component = ecri.get("health_component")
+        snap.velocity_component = ecri.get("velocity_component")
+        snap.governance_component = ecri.get("governance_component")
+        snap.readiness_band = ecri.get("readiness_band")
+        db.add(snap)
+        counts["readiness"] += 1
+    return counts, errors
+
+
+def _run_chunks(job_id: UUID, snapshot_date: date) -> int:
+    """Worker loop with its own session: claim and process chunks until none are left."""
+    processed = 0
+    db = SessionLocal()
+    try:
+        while True:
+            chunk = _claim_chunk(db, job_id)
+            if chunk is None:
+                return processed
+            chunk_id, ids = chunk.id, list(chunk.enterprise_ids or [])
+            try:
+                counts, errors = _write_chunk_snapshots(db, ids, snapshot_date)
+                chunk.status = "done"
+                chunk.snapshots_written = counts
+                chunk.errors = errors
+                chunk.finished_at = datetime.now(timezone.utc)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.exception("snapshot job %s chunk %s failed", job_id, chunk_id)
+                chunk = db.query(SnapshotJobChunk).filter(SnapshotJobChunk.id == chunk_id).first()
+                chunk.status = "failed" if chunk.attempts >= settings.SNAPSHOT_JOB_MAX_ATTEMPTS else "pending"
+                chunk.errors = [f"chunk {chunk.chunk_index}: {e!s}"]
+                db.commit()
+            processed += 1
+    finally:
+        db.close()
+
+
+def _finish_job(db: Session, job_id: UUID) -> None:
+    """Set the job's final status once no chunk is pending or running."""
+    statuses = [r[0] for r in db.query(SnapshotJobChunk.status).filter(SnapshotJobChunk.job_id == job_id)]
+    if any(s in ("pending", "running") for s in statuses):
+        return
+    job = db.query(SnapshotJob).filter(SnapshotJob.id == job_id).first()
+    job.status = "failed" if "failed" in statuses else "completed"
+    job.finished_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def run_snapshot_job(job_id: UUID, workers: Optional[int] = None) -> dict[str, Any]:
+    """
+    Process (or resume) a job on a pool of workers and block until this runner has no more chunks
+    to claim. Safe to run concurrently with other runners of the same job. Returns progress.
+    """
+    workers = max(1, workers or settings.SNAPSHOT_JOB_WORKERS)
+    db = SessionLocal()
+    try:
+        job = db.query(SnapshotJob).filter(SnapshotJob.id == job_id).first()
+        if job is None:
+            raise ValueError(f"Snapshot job {job_id} not found")
+        snapshot_date = job.snapshot_date
+        if job.status != "completed":
+            job.status = "running"
+            job.started_at = job.started_at or datetime.now(timezone.utc)
+            job.finished_at = None
+            # A resumed failed job retries its failed chunks.
+            db.query(SnapshotJobChunk).filter(
+                SnapshotJobChunk.job_id == job_id, SnapshotJobChunk.status == "failed"
+            ).update({SnapshotJobChunk.status: "pending", SnapshotJobChunk.attempts: 0}, synchronize_session=False)
+            db.commit()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(lambda _: _run_chunks(job_id, snapshot_date), range(workers)))
+            _finish_job(db, job_id)
+        return get_snapshot_job_progress(db, job_id)
+    finally:
+        db.close()
+
+
+def start_snapshot_job(job_id: UUID, workers: Optional[int] = None) -> threading.Thread:
+    """Run a job on a daemon thread (used by the admin API so the request returns immediately)."""
+
+    def target() -> None:
+        try:
+            run_snapshot_job(job_id, workers)
+        except Exception:
+            logger.exception("snapshot job %s runner crashed", job_id)
+
+    thread = threading.Thread(target=target, name=f"snapshot-job-{job_id}", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_snapshot_job_progress(db: Session, job_id: UUID, include_chunks: bool = False) -> Optional[dict[str, Any]]:
+    """Job status and progress from its chunks; None if the job does not exist."""
+    job = db.query(SnapshotJob).filter(SnapshotJob.id == job_id).first()
+    if job is None:
+        return None
+    chunks = (
+        db.query(SnapshotJobChunk)
+        .filter(SnapshotJobChunk.job_id == job_id)
+        .order_by(SnapshotJobChunk.chunk_index)
+        .all()
+    )
+    by_status = dict.fromkeys(("pending", "running", "done", "failed"), 0)
+    written = dict.fromkeys(SNAPSHOT_KINDS, 0)
+    errors: list[str] = []
+    enterprises_processed = 0
+    for c in chunks:
+        by_status[c.status] = by_status.get(c.status, 0) + 1
+        errors.extend(c.errors or [])
+        if c.status == "done":
+            enterprises_processed += len(c.enterprise_ids or [])
+            for k in SNAPSHOT_KINDS:
+                written[k] += (c.snapshots_written or {}).get(k, 0)
+    out = {
+        "job_id": str(job.id),
+        "status": job.status,
+        "scope": job.scope or {},
+        "snapshot_date": job.snapshot_date.isoformat(),
+        "total_enterprises": job.total_enterprises,
+        "enterprises_processed": enterprises_processed,
+        "total_chunks": job.total_chunks,
+        "chunks": by_status,
+        "progress_pct": round(100.0 * by_status["done"] / job.total_chunks, 1) if job.total_chunks else 100.0,
+        "snapshots_written": written,
+        "errors": errors,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if include_chunks:
+        out["chunk_detail"] = [
+            {
+                "chunk_index": c.chunk_index,
+                "status": c.status,
+                "attempts": c.attempts,
+                "enterprise_ids": c.enterprise_ids,
+                "snapshots_written": c.snapshots_written,
+                "errors": c.errors or [],
+                "started_at": c.started_at.isoformat() if c.started_at else None,
+                "finished_at": c.finished_at.isoformat() if c.finished_at else None,
+            }
+            for c in chunks
+        ]
+    return out
+
+
+def list_snapshot_jobs(db: Session, limit: int = 20) -> list[dict[str, Any]]:
+    """Most recent jobs with their progress."""
+    ids = [r[0] for r in db.query(SnapshotJob.id).order_by(SnapshotJob.created_at.desc()).limit(limit)]
+    return [get_snapshot_job_progress(db, job_id) for job_id in ids]
@@ -34,10 +34,81 @@ class Settings(BaseSettings):
     # OpenAI
     OPENAI_API_KEY: str = ""
     LLM_MODEL: str = "gpt-5.1"  # Default model
+    # Agent completions (app/agents/llm.py) are async; at most LLM_MAX_CONCURRENCY[provider] are in flight
+    # per process, the rest queue. Env as JSON, e.g. LLM_MAX_CONCURRENCY='{"openai": 32}'.
+    LLM_MAX_CONCURRENCY: dict[str, int] = {"openai": 16}
+    LLM_REQUEST_TIMEOUT_SECONDS: float = 60.0
 
     # RAG Configuration
     RAG_ENABLED: bool = True
     RAG_TOP_K: int = 4
+    # Minimum cosine similarity (1 - distance) for vector search hits; None keeps every top-k hit.
+    RAG_MIN_SIMILARITY: float | None = None
+    # Knowledge snippets (knowledge/retrieval.py): hybrid full-text + vector with reciprocal-rank fusion.
+    # The query embedding gets this long before retrieval continues lexical-only.
+    KNOWLEDGE_EMBED_TIMEOUT_SECONDS: float = 2.0
+    # Optional in-process index (knowledge/vector_index.py, requires numpy): knowledge_chunks embeddings
+    # in a memory-mapped float32 snapshot under KNOWLEDGE_INDEX_DIR (default: system temp dir), shared by
+    # workers. It replaces only the pgvector scan: its candidates are still fused with full-text ones and
+    # RAG_MIN_SIMILARITY applies. The corpus version is re-checked in the background every
+    # KNOWLEDGE_INDEX_REFRESH_SECONDS.
+    KNOWLEDGE_INDEX_ENABLED: bool = False
+    KNOWLEDGE_INDEX_DIR: str | None = None
+    KNOWLEDGE_INDEX_REFRESH_SECONDS: int = 300
+    # ANN indexes on embedding columns (app/rag/ann_index.py, scripts/manage_ann_indexes.py).
+    # Build parameters are defaults for create/rebuild; ef_search/probes are applied to every DB
+    # connection (higher = better recall, slower). Tune with scripts/bench_ann_index.py.
+    RAG_ANN_INDEX_METHOD: Literal["hnsw", "ivfflat"] = "hnsw"
+    RAG_HNSW_M: int = 16
+    RAG_HNSW_EF_CONSTRUCTION: int = 64
+    RAG_HNSW_EF_SEARCH: int | None = 40
+    RAG_IVFFLAT_PROBES: int | None = 10
+
+    # Embedding model for queries and new rows; each row records the model that produced it (embedding_model).
+    # Re-embedding (app/rag/reembed.py, scripts/reembed.py) repairs NULL / other-model rows. For a model
+    # migration, set EMBEDDING_SHADOW_MODEL: writes also fill the embedding_shadow column, the job backfills
+    # it, and cutover swaps the columns. Jobs send at most REEMBED_REQUESTS_PER_MINUTE requests of
+    # REEMBED_BATCH_SIZE inputs; a job not heard from for REEMBED_JOB_STALE_SECONDS can be resumed.
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_SHADOW_MODEL: str | None = None
+    EMBEDDING_SHADOW_DIM: int = 1536
+    REEMBED_BATCH_SIZE: int = 100
+    REEMBED_REQUESTS_PER_MINUTE: int = 60
+    REEMBED_JOB_STALE_SECONDS: int = 600
+
+    # LLM response cache (app/agents/llm_cache.py), opt-in: agent completions keyed by sha256 of (model,
+    # temperature and other params, normalized messages). Only calls made under a route named in
+    # LLM_CACHE_ROUTES are cached (diagnostic_run, cfo_diagnose, cmo_diagnose, coo_diagnose, cto_diagnose).
+    # Per-process LRU of LLM_CACHE_MAX_ENTRIES + llm_response_cache table trimmed to LLM_CACHE_MAX_ROWS.
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_ROUTES: str = "diagnostic_run,cfo_diagnose,cmo_diagnose,coo_diagnose,cto_diagnose"
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_MAX_ENTRIES: int = 512
+    LLM_CACHE_PERSIST: bool = True
+    LLM_CACHE_MAX_ROWS: int = 50000
+
+    # Embedding cache (app/rag/embedding_cache.py): per-process LRU + embedding_cache table.
+    # Entries older than EMBEDDING_CACHE_MAX_AGE_DAYS are ignored and evicted.
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_ENTRIES: int = 2048
+    EMBEDDING_CACHE_PERSIST: bool = True
+    EMBEDDING_CACHE_MAX_AGE_DAYS: int = 30
+
+    # Single-flight coalescing (app/utils/single_flight.py): identical concurrent embedding and chat-completion
+    # requests in one process share a single remote call. Fan-in counters are under single_flight in
+    # GET /api/admin/cache-stats.
+    SINGLE_FLIGHT_ENABLED: bool = True
+
+    # Batched embeddings (vectorstore.get_embeddings) and bulk ingestion (app/rag/ingest.py).
+    # INGEST_BATCH_SIZE documents are embedded and written per statement; INGEST_COMMIT_EVERY per transaction.
+    EMBEDDING_BATCH_SIZE: int = 100
+    EMBEDDING_MAX_CONCURRENCY: int = 4
+    INGEST_BATCH_SIZE: int = 500
+    INGEST_COMMIT_EVERY: int = 5000
+    # Long uploads (app/rag/chunking.py): documents over RAG_CHUNK_TOKENS are split into chunks of that
+    # size with RAG_CHUNK_OVERLAP_TOKENS carried over, each embedded and stored in document_chunks.
+    RAG_CHUNK_TOKENS: int = 400
+    RAG_CHUNK_OVERLAP_TOKENS: int = 60
 
     # STT: "openai" (Whisper) or "wispr" (Wispr Flow). Default openai to avoid Wispr dependency.
     STT_PROVIDER: Literal["openai", "wispr"] = "openai"
@@ -74,6 +145,36 @@ class Settings(BaseSettings):
     # Admin: API key for POST /api/admin/snapshots/run-monthly
     ADMIN_API_KEY: str = ""
 
+    # Decision detail cache (GET /api/clear/decisions/{id}); versioned by ledger high-water mark.
+    # Optional shared tier: set DECISION_CACHE_REDIS_URL (requires the redis package).
+    DECISION_CACHE_ENABLED: bool = True
+    DECISION_CACHE_MAX_ENTRIES: int = 1024
+    DECISION_CACHE_REDIS_URL: str = ""
+    DECISION_CACHE_SHARED_TTL_SECONDS: int = 3600
+
+    # Monthly snapshot jobs (app/clear/snapshot_jobs.py): chunked, checkpointed, resumable.
+    # A chunk left "running" longer than SNAPSHOT_JOB_STALE_SECONDS is reclaimed by the next runner.
+    SNAPSHOT_JOB_CHUNK_SIZE: int = 50
+    SNAPSHOT_JOB_WORKERS: int = 4
+    SNAPSHOT_JOB_STALE_SECONDS: int = 900
+    SNAPSHOT_JOB_MAX_ATTEMPTS: int = 3
+
+    # Streaming diagnostic run (POST /api/clear/diagnostic/run?stream=true): SSE comment sent after this
+    # many idle seconds; keep below the load balancer idle timeout.
+    DIAGNOSTIC_SSE_KEEPALIVE_SECONDS: float = 15.0
+
+    # Diagnostic job queue (POST /api/clear/diagnostic/run?async=1, app/diagnostic/job_queue.py), drained by
+    # scripts/run_diagnostic_worker.py. Each worker process runs up to WORKER_CONCURRENCY jobs at once.
+    # A failed attempt is retried after RETRY_BACKOFF_SECONDS * 2^(attempt-1); after MAX_ATTEMPTS the job
+    # is dead. The worker refreshes a running job's heartbeat every HEARTBEAT_SECONDS; a job whose heartbeat
+    # is older than STALE_SECONDS (crashed worker) is reclaimed.
+    DIAGNOSTIC_JOB_WORKER_CONCURRENCY: int = 4
+    DIAGNOSTIC_JOB_MAX_ATTEMPTS: int = 3
+    DIAGNOSTIC_JOB_RETRY_BACKOFF_SECONDS: float = 30.0
+    DIAGNOSTIC_JOB_STALE_SECONDS: int = 600
+    DIAGNOSTIC_JOB_HEARTBEAT_SECONDS: float = 30.0
+    DIAGNOSTIC_JOB_POLL_SECONDS: float = 2.0
+
     # SLO targets (seconds)
     SLO_DIAGNOSTIC_RUN_P95_SEC: float = 90.0
     SLO_CHAT_MESSAGE_P95_SEC: float = 15.0
@@ -1,7 +1,7 @@
 """Database connection and session management."""
 from urllib.parse import urlparse, urlunparse
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.orm import declarative_base, sessionmaker
 from typing import Generator
 from sqlalchemy.orm import Session
@@ -51,6 +51,26 @@ except ModuleNotFoundError as e:
         ) from e
     raise
 
+
+@event.listens_for(engine, "connect")
+def _set_vector_search_params(dbapi_connection, connection_record):
+    """Per-connection ANN scan settings (RAG_HNSW_EF_SEARCH / RAG_IVFFLAT_PROBES); no per-query round trip."""
+    params = [
+        (name, value)
+        for name, value in (("hnsw.ef_search", settings.RAG_HNSW_EF_SEARCH), ("ivfflat.probes", settings.RAG_IVFFLAT_PROBES))
+        if value is not None
+    ]
+    if not params:
+        return
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in params:
+            cursor.execute("SELECT set_config(%s, %s, false)", (name, str(int(value))))
+    finally:
+        cursor.close()
+    dbapi_connection.commit()
+
+
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -3,10 +3,10 @@ Unified SQLAlchemy database models for Exec-Connect.
 Combines models from all four AI agents (CFO, CMO, COO, CTO) and CLEAR governance.
 """
 import uuid
-from sqlalchemy import Boolean, Column, Integer, BigInteger, String, DateTime, Date, ForeignKey, JSON, Text, Numeric, UniqueConstraint
+from sqlalchemy import Boolean, Column, Computed, Integer, BigInteger, String, DateTime, Date, Float, ForeignKey, JSON, Text, Numeric, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, JSONB, TSVECTOR
 from pgvector.sqlalchemy import Vector
 from app.db.database import Base
 
@@ -67,9 +67,11 @@ class FinanceDocument(Base):
     __tablename__ = "finance_documents"
     
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(500), nullable=False)
+    title = Column(String(500), nullable=False, index=True)
     content = Column(Text, nullable=False)
     embedding = Column(Vector(1536), nullable=True)  # OpenAI embedding dimension
+    embedding_model = Column(String(100), nullable=True)  # model that produced embedding (rag/reembed.py)
+    content_hash = Column(String(64), nullable=True)  # sha256 of content; bulk ingest skips unchanged
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
@@ -109,9 +111,11 @@ class MarketingDocument(Base):
     __tablename__ = "marketing_documents"
     
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(500), nullable=False)
+    title = Column(String(500), nullable=False, index=True)
     content = Column(Text, nullable=False)
     embedding = Column(Vector(1536), nullable=True)  # OpenAI embeddings are 1536 dimensions
+    embedding_model = Column(String(100), nullable=True)  # model that produced embedding (rag/reembed.py)
+    content_hash = Column(String(64), nullable=True)  # sha256 of content; bulk ingest skips unchanged
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
@@ -153,9 +157,11 @@ class OpsDocument(Base):
     __tablename__ = "ops_documents"
     
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(255), nullable=False)
+    title = Column(String(255), nullable=False, index=True)
     content = Column(Text, nullable=False)
     embedding = Column(Vector(1536), nullable=True)
+    embedding_model = Column(String(100), nullable=True)  # model that produced embedding (rag/reembed.py)
+    content_hash = Column(String(64), nullable=True)  # sha256 of content; bulk ingest skips unchanged
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
@@ -197,9 +203,11 @@ class TechDocument(Base):
     __tablename__ = "tech_documents"
     
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String(500), nullable=False)
+    title = Column(String(500), nullable=False, index=True)
     content = Column(Text, nullable=False)
     embedding = Column(Vector(1536), nullable=True)  # OpenAI embedding dimension
+    embedding_model = Column(String(100), nullable=True)  # model that produced embedding (rag/reembed.py)
+    content_hash = Column(String(64), nullable=True)  # sha256 of content; bulk ingest skips unchanged
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
 
@@ -251,6 +259,7 @@ class EnterpriseUser(Base):
 class Decision(Base):
     """Decision head record. State derived from ledger; no mutable authority (current_status/current_artifact_version deprecated)."""
     __tablename__ = "decisions"
+    __table_args__ = (Index("ix_decisions_created_at_decision_id", "created_at", "decision_id"),)
     
     id = Column(Integer, primary_key=True, index=True)
     decision_id = Column(PG_UUID(as_uuid=True), unique=True, nullable=False, index=True)
@@ -325,6 +334,19 @@ class DecisionLedgerEvent(Base):
     decision = relationship("Decision", back_populates="ledger_events", foreign_keys=[decision_id])
 
 
+class DecisionStatusProjection(Base):
+    """Read model: derived status per decision, maintained in the same transaction as each ledger append. Rebuildable from the ledger."""
+    __tablename__ = "decision_status_projection"
+
+    decision_id = Column(PG_UUID(as_uuid=True), ForeignKey("decisions.decision_id", ondelete="CASCADE"), primary_key=True)
+    enterprise_id = Column(Integer, ForeignKey("enterprises.id", ondelete="SET NULL"), nullable=True, index=True)
+    status = Column(String(50), nullable=False, server_default="draft", index=True)
+    ledger_seq = Column(Integer, nullable=False, server_default="0")  # number of ledger events applied (high-water mark)
+    last_event_type = Column(String(50), nullable=True)
+    last_event_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+
+
 class DecisionEvidenceLink(Base):
     """First-class evidence with provenance. source_ref (system, table, id, uri) is required."""
     __tablename__ = "decision_evidence_links"
@@ -426,6 +448,28 @@ class DiagnosticRun(Base):
     decision_id = Column(PG_UUID(as_uuid=True), nullable=True, index=True)
 
 
+class DiagnosticJob(Base):
+    """Queued diagnostic run (POST /diagnostic/run?async=1), claimed by worker processes (app/diagnostic/job_queue.py)."""
+    __tablename__ = "diagnostic_jobs"
+    __table_args__ = (Index("ix_diagnostic_jobs_status_available_at", "status", "available_at"),)
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(String(20), nullable=False, server_default="queued")  # queued | running | completed | dead
+    payload = Column(JSONB, nullable=False)  # DiagnosticRunRequest body
+    trace_id = Column(String(36), nullable=True)
+    attempts = Column(Integer, nullable=False, server_default="0")
+    max_attempts = Column(Integer, nullable=False, server_default="3")
+    available_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)  # retry backoff
+    worker_id = Column(String(100), nullable=True)  # last claimant (host:pid)
+    last_error = Column(Text, nullable=True)
+    result = Column(JSONB, nullable=True)  # DiagnosticRunResponse body when completed
+    decision_id = Column(PG_UUID(as_uuid=True), nullable=True)  # set with the decision (same commit): retries reuse it
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)  # current attempt
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # refreshed while running; stale jobs are reclaimed
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
 class HumanReviewRequest(Base):
     """Lead capture when user requests human review for a decision."""
     __tablename__ = "human_review_requests"
@@ -489,6 +533,11 @@ class IdeaStageLead(Base):
 class KnowledgeChunk(Base):
     """Curated knowledge for RAG: frameworks, case studies, articles. No autonomous ingestion."""
     __tablename__ = "knowledge_chunks"
+    __table_args__ = (
+        Index("ix_knowledge_chunks_source_type_title", "source_type", "title"),
+        Index("ix_knowledge_chunks_search_tsv", "search_tsv", postgresql_using="gin"),
+        Index("ix_knowledge_chunks_tags", "tags", postgresql_using="gin"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -496,7 +545,41 @@ class KnowledgeChunk(Base):
     title = Column(String(500), nullable=False)
     content = Column(Text, nullable=False)
     tags = Column(JSONB, nullable=True)  # e.g. ["finance", "ops", "Malaysia", "COSO"]
+    content_hash = Column(String(64), nullable=True)  # sha256 of content; bulk ingest skips unchanged
     embedding = Column(Vector(1536), nullable=True)
+    embedding_model = Column(String(100), nullable=True)  # model that produced embedding (rag/reembed.py)
+    # Full-text search over title + tags (weight A) and content (B); generated by Postgres.
+    search_tsv = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') "
+            "|| setweight(jsonb_to_tsvector('english', coalesce(tags, '[]'::jsonb), '[\"string\"]'), 'A') "
+            "|| setweight(to_tsvector('english', coalesce(content, '')), 'B')",
+            persisted=True,
+        ),
+    )
+
+
+class EmbeddingCacheEntry(Base):
+    """Persistent tier of the embedding cache (app/rag/embedding_cache.py). Keyed by model + SHA-256 of the input text."""
+    __tablename__ = "embedding_cache"
+
+    model = Column(String(100), primary_key=True)
+    text_hash = Column(String(64), primary_key=True)  # sha256 hex of the exact input text
+    embedding = Column(Vector(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)  # eviction by age
+
+
+class LLMResponseCacheEntry(Base):
+    """Persistent tier of the LLM response cache (app/agents/llm_cache.py). Keyed by SHA-256 of the normalized request."""
+    __tablename__ = "llm_response_cache"
+
+    key_hash = Column(String(64), primary_key=True)
+    model = Column(String(100), nullable=True)
+    route = Column(String(50), nullable=True)  # LLM_CACHE_ROUTES scope the entry was written under
+    content = Column(Text, nullable=False)
+    latency_ms = Column(Integer, nullable=True)  # original call latency (saved time on hits)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)  # TTL / trim by age
 
 
 class DecisionContext(Base):
@@ -569,6 +652,23 @@ class DocumentLink(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
 
+class DocumentChunk(Base):
+    """Token-sized chunk of a long RAG document (app/rag/chunking.py); parent is (doc_table, doc_id)."""
+    __tablename__ = "document_chunks"
+    __table_args__ = (Index("ix_document_chunks_doc", "doc_table", "doc_id", "chunk_index"),)
+
+    id = Column(Integer, primary_key=True)
+    chunk_id = Column(String(64), nullable=False, unique=True, index=True)  # sha256(doc_table, doc_id, index, text)
+    doc_table = Column(String(100), nullable=False)
+    doc_id = Column(Integer, nullable=False)
+    chunk_index = Column(Integer, nullable=False)
+    content = Column(Text, nullable=False)
+    token_count = Column(Integer, nullable=False)
+    embedding = Column(Vector(1536), nullable=True)
+    embedding_model = Column(String(100), nullable=True)  # model that produced embedding (rag/reembed.py)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
 # ----- Phase 3: Capability intelligence -----
 
 class Capability(Base):
@@ -700,6 +800,59 @@ class EnterpriseReadinessSnapshot(Base):
     readiness_band = Column(String(50), nullable=True)
 
 
+class SnapshotJob(Base):
+    """Background run of monthly Health/Velocity/ECRI snapshots. Work is split into snapshot_job_chunks."""
+    __tablename__ = "snapshot_jobs"
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(String(20), nullable=False, server_default="pending", index=True)  # pending | running | completed | failed
+    scope = Column(JSONB, nullable=True)  # { enterprise_id?, cohort_id?, portfolio_id? }
+    snapshot_date = Column(Date, nullable=False)  # first day of month
+    total_enterprises = Column(Integer, nullable=False, server_default="0")
+    total_chunks = Column(Integer, nullable=False, server_default="0")
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class ReembedJob(Base):
+    """Background re-embedding of RAG rows (rag/reembed.py). Resumes from per-table keyset checkpoints."""
+    __tablename__ = "reembed_jobs"
+
+    id = Column(PG_UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    status = Column(String(20), nullable=False, server_default="pending", index=True)  # pending | running | completed | failed
+    target = Column(String(20), nullable=False)  # embedding | shadow
+    model = Column(String(100), nullable=False)
+    tables = Column(JSONB, nullable=False)  # { table: { after_id, embedded, failed, done } }
+    total_rows = Column(Integer, nullable=False, server_default="0")  # rows needing work at creation
+    rows_embedded = Column(Integer, nullable=False, server_default="0")
+    rows_failed = Column(Integer, nullable=False, server_default="0")
+    requests = Column(Integer, nullable=False, server_default="0")
+    active_seconds = Column(Float, nullable=False, server_default="0")  # time spent running, across resumes
+    errors = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
+class SnapshotJobChunk(Base):
+    """Checkpoint unit of a snapshot job: a fixed slice of enterprise ids, committed with its snapshots."""
+    __tablename__ = "snapshot_job_chunks"
+    __table_args__ = (UniqueConstraint("job_id", "chunk_index", name="uq_snapshot_job_chunks_job_chunk"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(PG_UUID(as_uuid=True), ForeignKey("snapshot_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    chunk_index = Column(Integer, nullable=False)
+    enterprise_ids = Column(JSONB, nullable=False)  # list[int]
+    status = Column(String(20), nullable=False, server_default="pending")  # pending | running | done | failed
+    attempts = Column(Integer, nullable=False, server_default="0")
+    snapshots_written = Column(JSONB, nullable=True)  # { health, velocity, readiness }
+    errors = Column(JSONB, nullable=True)  # list[str]
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+
 # ----- CLEAR v0: usage, feedback, comments, members -----
 
 class UsageEvent(Base):
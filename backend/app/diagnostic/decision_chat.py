@@ -3,7 +3,7 @@ Decision-scoped chat: build context from DiagnosticRun + Decision artifact, gene
 """
 import json
 import logging
-from typing import Any
+from typing import Any, AsyncIterator
 from uuid import UUID
 
 from openai import OpenAI
@@ -124,8 +124,12 @@ def generate_first_assistant_message(db: Session, decision_id: UUID) -> str:
 Generate your first message to the user now."""
 
     try:
+        from app.agents.llm import coalesced_completion
+
+        # Seeding the same decision from several tabs / retries at once shares one completion.
         client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        response = client.chat.completions.create(
+        response = coalesced_completion(
+            client,
             model=settings.LLM_MODEL,
             messages=[
                 {"role": "system", "content": system_prompt},
@@ -172,11 +176,8 @@ def _format_context_summary(chat_context: dict[str, Any]) -> str:
     return " ".join(parts)
 
 
-def generate_assistant_reply(db: Session, decision_id: UUID, user_message: str) -> str:
-    """
-    Build context, send user message + full chat_context to LLM, return assistant reply.
-    Session is not persisted; this is a stateless reply for the decision-scoped chat.
-    """
+def _reply_messages(db: Session, decision_id: UUID, user_message: str) -> list[dict[str, str]]:
+    """System prompt (advisor role + context summary) and user turn (EMR reference, snippets, message)."""
     chat_context = build_chat_context_for_advisor(db, decision_id)
     context_summary = _format_context_summary(chat_context) if chat_context else "Decision context not available."
     emr_summary = chat_context.get("emr_summary") or {}
@@ -220,18 +221,37 @@ Metrics: {metrics_list}
 User message: {user_message}
 
 Respond as the advisor."""
+    return [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_content},
+    ]
+
 
+def generate_assistant_reply(db: Session, decision_id: UUID, user_message: str) -> str:
+    """
+    Build context, send user message + full chat_context to LLM, return assistant reply.
+    Session is not persisted; this is a stateless reply for the decision-scoped chat.
+    """
+    messages = _reply_messages(db, decision_id, user_message)
     try:
         client = OpenAI(api_key=settings.OPENAI_API_KEY)
         response = client.chat.completions.create(
             model=settings.LLM_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_content},
-            ],
+            messages=messages,
             temperature=0.5,
         )
         return (response.choices[0].message.content or "").strip()
     except Exception as e:
         logger.exception("Decision chat message failed: %s", e)
         return "I couldn't process that right now. Try rephrasing or check back in a moment."
+
+
+def stream_assistant_reply(db: Session, decision_id: UUID, user_message: str) -> AsyncIterator[str]:
+    """
+    Same reply as generate_assistant_reply, streamed token by token. Context is read from db up
+    front; the returned iterator only talks to the LLM.
+    """
+    from app.agents.llm import stream_chat_completion
+
+    messages = _reply_messages(db, decision_id, user_message)
+    return stream_chat_completion(model=settings.LLM_MODEL, messages=messages, temperature=0.5)
@@ -0,0 +1,347 @@
+"""
+Postgres-backed job queue for diagnostic runs (POST /api/clear/diagnostic/run?async=1).
+
+The API only inserts a diagnostic_jobs row and returns its id; worker processes
+(scripts/run_diagnostic_worker.py, any number of them) claim jobs with FOR UPDATE SKIP LOCKED, so two
+workers never take the same job and a slow claim never blocks the others. Each worker runs up to
+DIAGNOSTIC_JOB_WORKER_CONCURRENCY jobs at once on its event loop (LLM calls are further bounded by
+LLM_MAX_CONCURRENCY). A failed attempt goes back to "queued" with available_at pushed out by
+DIAGNOSTIC_JOB_RETRY_BACKOFF_SECONDS * 2^(attempt-1); after max_attempts the job is "dead" (dead letter)
+until requeue_diagnostic_job. While a job runs its worker refreshes heartbeat_at every
+DIAGNOSTIC_JOB_HEARTBEAT_SECONDS; a "running" job whose heartbeat is older than DIAGNOSTIC_JOB_STALE_SECONDS
+(worker killed) is reclaimed by the next claim, which counts as an attempt. Every later write of an
+attempt (heartbeat, failure, completion) applies only while the job is still "running" under that
+worker and attempt number, so a reclaimed attempt that finishes late cannot overwrite the new owner.
+
+Retries are idempotent: the decision is linked to the job (decision_id) in the same commit that creates
+it, so an attempt that finds decision_id set rebuilds the result from the stored run instead of running
+the agents again (and does not record the run's usage events or decision context a second time).
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from uuid import UUID
+
+from pydantic import ValidationError
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.database import SessionLocal
+from app.db.models import DiagnosticJob
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "completed", "dead")
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def retry_delay_seconds(attempts: int) -> float:
+    """Backoff before the next attempt after `attempts` failed ones."""
+    return settings.DIAGNOSTIC_JOB_RETRY_BACKOFF_SECONDS * (2 ** max(0, attempts - 1))
+
+
+def enqueue_diagnostic_job(db: Session, payload: dict[str, Any], trace_id: Optional[str] = None) -> DiagnosticJob:
+    """Insert a queued job for a DiagnosticRunRequest body (commits)."""
+    job = DiagnosticJob(
+        payload=payload,
+        trace_id=trace_id,
+        max_attempts=max(1, settings.DIAGNOSTIC_JOB_MAX_ATTEMPTS),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def claim_diagnostic_job(db: Session, worker_id: str) -> Optional[UUID]:
+    """
+    Lock the oldest runnable job (queued and due, or running but stale), mark it running and return its
+    id (commits). Stale jobs that already used all their attempts are dead-lettered instead.
+    """
+    while True:
+        now = datetime.now(timezone.utc)
+        stale_before = now - timedelta(seconds=settings.DIAGNOSTIC_JOB_STALE_SECONDS)
+        job = (
+            db.query(DiagnosticJob)
+            .filter(
+                or_(
+                    (DiagnosticJob.status == "queued") & (DiagnosticJob.available_at <= now),
+                    (DiagnosticJob.status == "running") & (DiagnosticJob.heartbeat_at < stale_before),
+                )
+            )
+            .order_by(DiagnosticJob.available_at)
+            .with_for_update(skip_locked=True)
+            .limit(1)
+            .first()
+        )
+        if job is None:
+            db.rollback()
+            return None
+        if job.status == "running":
+            logger.warning("diagnostic job %s reclaimed from stale worker %s", job.id, job.worker_id)
+            if job.attempts >= job.max_attempts:
+                job.status = "dead"
+                job.last_error = f"worker {job.worker_id} did not finish attempt {job.attempts} (stale)"
+                job.finished_at = now
+                db.commit()
+                continue
+        job.status = "running"
+        job.attempts = (job.attempts or 0) + 1
+        job.worker_id = worker_id
+        job.started_at = now
+        job.heartbeat_at = now
+        db.commit()
+        return job.id
+
+
+def _owned_by(job_id: UUID, worker_id: Optional[str], attempt: int) -> tuple:
+    """Filter for a job still running under this worker and attempt (not reclaimed since)."""
+    return (
+        DiagnosticJob.id == job_id,
+        DiagnosticJob.status == "running",
+        DiagnosticJob.worker_id == worker_id,
+        DiagnosticJob.attempts == attempt,
+    )
+
+
+def _lock_owned_job(db: Session, job_id: UUID, worker_id: Optional[str], attempt: int) -> Optional[DiagnosticJob]:
+    """Lock the job for this attempt's final write; None (rolled back) if it was reclaimed meanwhile."""
+    job = db.query(DiagnosticJob).filter(*_owned_by(job_id, worker_id, attempt)).with_for_update().first()
+    if job is None:
+        db.rollback()
+        logger.warning("diagnostic job %s attempt %s was reclaimed by another worker; dropping its outcome", job_id, attempt)
+    return job
+
+
+def _record_failure(
+    db: Session, job_id: UUID, worker_id: Optional[str], attempt: int, error: str, permanent: bool = False
+) -> str:
+    """Requeue with backoff, or dead-letter when out of attempts (commits). Returns the new status."""
+    job = _lock_owned_job(db, job_id, worker_id, attempt)
+    if job is None:
+        return "reclaimed"
+    job.last_error = error[:4000]
+    if permanent or job.attempts >= job.max_attempts:
+        job.status = "dead"
+        job.finished_at = datetime.now(timezone.utc)
+    else:
+        job.status = "queued"
+        job.available_at = datetime.now(timezone.utc) + timedelta(seconds=retry_delay_seconds(job.attempts))
+    db.commit()
+    return job.status
+
+
+def _touch_heartbeat(job_id: UUID, worker_id: Optional[str], attempt: int) -> None:
+    """Refresh heartbeat_at while this attempt still owns the running job (own session)."""
+    db = SessionLocal()
+    try:
+        db.query(DiagnosticJob).filter(*_owned_by(job_id, worker_id, attempt)).update(
+            {"heartbeat_at": datetime.now(timezone.utc)}, synchronize_session=False
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+async def _heartbeat(job_id: UUID, worker_id: Optional[str], attempt: int) -> None:
+    """Until cancelled, refresh the job's heartbeat every DIAGNOSTIC_JOB_HEARTBEAT_SECONDS."""
+    while True:
+        await asyncio.sleep(settings.DIAGNOSTIC_JOB_HEARTBEAT_SECONDS)
+        try:
+            await asyncio.to_thread(_touch_heartbeat, job_id, worker_id, attempt)
+        except Exception:
+            logger.exception("diagnostic job %s heartbeat failed", job_id)
+
+
+async def run_diagnostic_job(job_id: UUID) -> str:
+    """Run one claimed job in its own Session; store the result or record the failure. Returns the final status."""
+    from app.agents.llm_cache import cache_route
+    from app.diagnostic.run_service import complete_diagnostic_run, diagnostic_run_result, run_diagnostic_run
+    from app.schemas.clear.diagnostic_run import DiagnosticRunRequest
+
+    db = SessionLocal()
+    heartbeat = None
+    try:
+        job = db.query(DiagnosticJob).filter(DiagnosticJob.id == job_id).first()
+        if job is None:
+            return "missing"
+        trace_id = job.trace_id or str(job.id)
+        worker_id, attempt = job.worker_id, job.attempts
+        try:
+            body = DiagnosticRunRequest(**(job.payload or {}))
+        except ValidationError as e:
+            return _record_failure(db, job_id, worker_id, attempt, f"invalid payload: {e}", permanent=True)
+        heartbeat = asyncio.create_task(_heartbeat(job_id, worker_id, attempt))
+        t0 = time.perf_counter()
+        try:
+            if job.decision_id is not None:
+                # An earlier attempt created the decision but did not finish the job.
+                logger.info("diagnostic job %s reusing decision %s", job_id, job.decision_id)
+                result = diagnostic_run_result(db, job.decision_id)
+            else:
+                with cache_route("diagnostic_run"):
+                    result = await run_diagnostic_run(
+                        db,
+                        diagnostic_data=body.diagnostic_data,
+                        onboarding_context=body.onboarding_context,
+                        enterprise_id=body.enterprise_id,
+                        actor_id="guest",
+                        actor_role="msme",
+                        job_id=job_id,
+                    )
+            # A rebuilt result's events and decision context were recorded by the attempt that created it.
+            response = complete_diagnostic_run(db, body, result, trace_id, t0, side_effects=not result.get("reused"))
+        except Exception as e:
+            db.rollback()
+            logger.exception("diagnostic job %s attempt %s failed", job_id, attempt)
+            return _record_failure(db, job_id, worker_id, attempt, f"{type(e).__name__}: {e!s}")
+        job = _lock_owned_job(db, job_id, worker_id, attempt)
+        if job is None:
+            return "reclaimed"
+        job.status = "completed"
+        job.result = response.model_dump(mode="json")
+        job.decision_id = UUID(response.decision_id) if response.decision_id else None
+        job.last_error = None
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        return job.status
+    finally:
+        if heartbeat is not None:
+            heartbeat.cancel()
+        db.close()
+
+
+def _claim_in_own_session(worker_id: str) -> Optional[UUID]:
+    db = SessionLocal()
+    try:
+        return claim_diagnostic_job(db, worker_id)
+    finally:
+        db.close()
+
+
+async def run_worker(
+    concurrency: Optional[int] = None,
+    poll_seconds: Optional[float] = None,
+    stop: Optional[asyncio.Event] = None,
+    drain: bool = False,
+    worker_id: Optional[str] = None,
+) -> int:
+    """
+    Claim and run jobs, at most `concurrency` at a time, until stop is set (in-flight jobs finish first).
+    With drain=True return as soon as the queue has nothing runnable and nothing is in flight.
+    Returns the number of jobs processed.
+    """
+    concurrency = max(1, concurrency or settings.DIAGNOSTIC_JOB_WORKER_CONCURRENCY)
+    poll_seconds = poll_seconds if poll_seconds is not None else settings.DIAGNOSTIC_JOB_POLL_SECONDS
+    stop = stop or asyncio.Event()
+    worker_id = worker_id or default_worker_id()
+    running: set[asyncio.Task] = set()
+    processed = 0
+    logger.info("diagnostic worker %s started (concurrency=%s)", worker_id, concurrency)
+    while not stop.is_set():
+        job_id = None
+        if len(running) < concurrency:
+            try:
+                job_id = await asyncio.to_thread(_claim_in_own_session, worker_id)
+            except Exception:
+                logger.exception("diagnostic worker %s claim failed", worker_id)
+        if job_id is not None:
+            running.add(asyncio.create_task(run_diagnostic_job(job_id), name=f"diagnostic-job-{job_id}"))
+            continue
+        if drain and not running:
+            break
+        # Full, or nothing runnable: wake on the first finished job, a stop request, or the poll interval.
+        stop_wait = asyncio.create_task(stop.wait())
+        done, _ = await asyncio.wait(
+            running | {stop_wait},
+            timeout=poll_seconds if len(running) < concurrency else None,
+            return_when=asyncio.FIRST_COMPLETED,
+        )
+        stop_wait.cancel()
+        for task in done - {stop_wait}:
+            running.discard(task)
+            processed += 1
+            if task.exception() is not None:
+                logger.error("diagnostic worker %s: job task crashed: %s", worker_id, task.exception())
+    if running:
+        logger.info("diagnostic worker %s stopping; waiting for %s running job(s)", worker_id, len(running))
+        await asyncio.gather(*running, return_exceptions=True)
+        processed += len(running)
+    return processed
+
+
+def get_diagnostic_job(db: Session, job_id: UUID, include_result: bool = False) -> Optional[dict[str, Any]]:
+    """Job status (and result when include_result); None if the job does not exist."""
+    job = db.query(DiagnosticJob).filter(DiagnosticJob.id == job_id).first()
+    if job is None:
+        return None
+    out = {
+        "job_id": str(job.id),
+        "status": job.status,
+        "trace_id": job.trace_id,
+        "attempts": job.attempts,
+        "max_attempts": job.max_attempts,
+        "decision_id": str(job.decision_id) if job.decision_id else None,
+        "last_error": job.last_error,
+        "available_at": job.available_at.isoformat() if job.available_at else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "heartbeat_at": job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+    if job.status == "queued":
+        out["queue_position"] = (
+            db.query(func.count(DiagnosticJob.id))
+            .filter(DiagnosticJob.status == "queued", DiagnosticJob.available_at < job.available_at)
+            .scalar()
+        )
+    if include_result:
+        out["result"] = job.result
+    return out
+
+
+def list_diagnostic_jobs(db: Session, status: Optional[str] = None, limit: int = 20) -> list[dict[str, Any]]:
+    """Most recent jobs, optionally filtered by status."""
+    q = db.query(DiagnosticJob.id)
+    if status:
+        q = q.filter(DiagnosticJob.status == status)
+    ids = [r[0] for r in q.order_by(DiagnosticJob.created_at.desc()).limit(limit)]
+    return [get_diagnostic_job(db, job_id) for job_id in ids]
+
+
+def diagnostic_queue_stats(db: Session) -> dict[str, Any]:
+    """Job counts by status and age of the oldest due queued job."""
+    counts = dict.fromkeys(JOB_STATUSES, 0)
+    counts.update(dict(db.query(DiagnosticJob.status, func.count(DiagnosticJob.id)).group_by(DiagnosticJob.status).all()))
+    oldest = (
+        db.query(func.min(DiagnosticJob.available_at))
+        .filter(DiagnosticJob.status == "queued", DiagnosticJob.available_at <= func.now())
+        .scalar()
+    )
+    lag = (datetime.now(timezone.utc) - oldest).total_seconds() if oldest else 0.0
+    return {"counts": counts, "oldest_due_seconds": round(max(0.0, lag), 1)}
+
+
+def requeue_diagnostic_job(db: Session, job_id: UUID) -> Optional[dict[str, Any]]:
+    """Put a dead job back on the queue with fresh attempts (commits). ValueError if it is not dead."""
+    job = db.query(DiagnosticJob).filter(DiagnosticJob.id == job_id).with_for_update().first()
+    if job is None:
+        db.rollback()
+        return None
+    if job.status != "dead":
+        db.rollback()
+        raise ValueError(f"Only dead jobs can be requeued; job {job_id} is {job.status}")
+    job.status = "queued"
+    job.attempts = 0
+    job.available_at = datetime.now(timezone.utc)
+    job.finished_at = None
+    db.commit()
+    return get_diagnostic_job(db, job_id)
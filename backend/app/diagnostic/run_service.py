@@ -3,8 +3,8 @@ Run multi-agent diagnostic: map payloads -> call agents (with timeout) -> synthe
 """
 import asyncio
 import logging
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any
+import time
+from typing import Any, Callable
 from uuid import UUID
 
 from sqlalchemy.orm import Session
@@ -13,28 +13,73 @@ from app.agents.cfo_agent import run_ai_cfo_agent
 from app.agents.cmo_agent import run_ai_cmo_agent
 from app.agents.coo_agent import run_ai_coo_agent
 from app.agents.cto_agent import run_ai_cto_agent
-from app.db.models import DiagnosticRun
+from app.db.models import Decision, DiagnosticJob, DiagnosticRun
 from app.diagnostic.emr_rules import choose_primary_domain, build_emr_plan
 from app.diagnostic.mapping import build_all_payloads
 from app.diagnostic.synthesis import run_synthesis, _decision_snapshot
 from app.governance.ledger_service import create_decision
 from app.enterprise.service import get_or_create_enterprise_from_onboarding
 from app.schemas.cfo.cfo_input import CFOInput
+from app.schemas.clear.diagnostic_run import DiagnosticRunRequest, DiagnosticRunResponse
 from app.schemas.cmo.cmo_input import CMOInputSchema
 from app.schemas.coo.coo_input import COOInput
 from app.schemas.cto.cto_input import CTOInputSchema
 from app.tools.financial_tools import compute_financial_summary
 from app.tools.tech_tools import calculate_all_tools
-from app.rag.vectorstore import search_finance_docs, search_ops_docs, search_tech_docs
+from app.rag.vectorstore import (
+    multi_domain_search,
+    search_finance_docs,
+    search_in_own_session,
+    search_ops_docs,
+    search_tech_docs,
+)
 
 logger = logging.getLogger(__name__)
 
-AGENT_TIMEOUT = 55.0  # seconds per agent
-EXECUTOR = ThreadPoolExecutor(max_workers=4)
+AGENT_TIMEOUT = 55.0  # seconds per agent; on timeout the agent task (and its LLM request) is cancelled
 
 
-def _run_cfo(payload: dict, db: Session, onboarding_context: dict | None = None) -> dict:
-    """Sync CFO agent call (run in thread)."""
+def _rag_queries(payloads: dict) -> dict[str, str]:
+    """RAG search string per document domain for one run (the queries each agent would issue)."""
+    from app.agents.cmo_agent import marketing_search_query
+
+    queries = {
+        "finance": "SME cash flow best practices",
+        "ops": "SME operations best practices for inventory and throughput",
+    }
+    try:
+        cmo_input = CMOInputSchema(**payloads["cmo"]).model_dump(exclude={"enterprise_id", "decision_context"})
+        queries["marketing"] = marketing_search_query(cmo_input)
+    except Exception:
+        pass
+    try:
+        cto_input = CTOInputSchema(**payloads["cto"]).model_dump(exclude={"enterprise_id", "decision_context"})
+        queries["tech"] = f"{cto_input.get('biggest_challenge')} {cto_input.get('tech_stack_maturity', '')}"
+    except Exception:
+        pass
+    return queries
+
+
+async def _prefetch_rag(payloads: dict) -> dict[str, list] | None:
+    """
+    All RAG context for a run in one step: one batched embedding request and one UNION ALL search,
+    on a session of its own. Returns {domain: rows}, or None on failure (agents then search on their own).
+    """
+    from app.config import settings
+
+    try:
+        return await search_in_own_session(
+            multi_domain_search,
+            _rag_queries(payloads),
+            top_k={"finance": 4, "tech": 4, "ops": settings.RAG_TOP_K, "marketing": settings.RAG_TOP_K},
+        )
+    except Exception as e:
+        logger.warning("RAG prefetch failed: %s", e)
+        return None
+
+
+async def _run_cfo(payload: dict, onboarding_context: dict | None = None, rag: dict | None = None) -> dict:
+    """CFO agent call. Uses prefetched rag["finance"] when present."""
     input_data = CFOInput(**payload)
     tools_results = compute_financial_summary(
         revenue=input_data.monthly_revenue,
@@ -44,42 +89,52 @@ def _run_cfo(payload: dict, db: Session, onboarding_context: dict | None = None)
     )
     docs = None
     try:
-        finance_docs = search_finance_docs(db, query="SME cash flow best practices", top_k=4)
+        if rag is not None and "finance" in rag:
+            finance_docs = rag["finance"]
+        else:
+            finance_docs = await search_in_own_session(search_finance_docs, query="SME cash flow best practices", top_k=4)
         docs = [doc.content[:500] for doc in finance_docs]
     except Exception as e:
         logger.warning("CFO RAG failed: %s", e)
-    return run_ai_cfo_agent(input_data=input_data, docs=docs, tools_results=tools_results, onboarding_context=onboarding_context)
+    return await run_ai_cfo_agent(input_data=input_data, docs=docs, tools_results=tools_results, onboarding_context=onboarding_context)
 
 
-def _run_cmo(payload: dict, db: Session, onboarding_context: dict | None = None) -> dict:
-    """Sync CMO agent call (run in thread)."""
+async def _run_cmo(payload: dict, onboarding_context: dict | None = None, rag: dict | None = None) -> dict:
+    """CMO agent call. Uses prefetched rag["marketing"] when present."""
     input_dict = CMOInputSchema(**payload).model_dump(exclude={"enterprise_id", "decision_context"})
-    return run_ai_cmo_agent(input_dict, db, onboarding_context=onboarding_context)
+    docs = rag.get("marketing") if rag is not None else None
+    return await run_ai_cmo_agent(input_dict, docs=docs, onboarding_context=onboarding_context)
 
 
-def _run_cto(payload: dict, db: Session, onboarding_context: dict | None = None) -> dict:
-    """Sync CTO agent call (run in thread)."""
+async def _run_cto(payload: dict, onboarding_context: dict | None = None, rag: dict | None = None) -> dict:
+    """CTO agent call. Uses prefetched rag["tech"] when present."""
     input_dict = CTOInputSchema(**payload).model_dump(exclude={"enterprise_id", "decision_context"})
     tools_results = calculate_all_tools(input_dict)
     rag_context = []
     try:
-        q = f"{input_dict.get('biggest_challenge')} {input_dict.get('tech_stack_maturity', '')}"
-        rag_context = search_tech_docs(db, q, top_k=4)
+        if rag is not None and "tech" in rag:
+            rag_context = [{"title": r.title, "content": r.content, "similarity": float(r.similarity)} for r in rag["tech"]]
+        else:
+            q = f"{input_dict.get('biggest_challenge')} {input_dict.get('tech_stack_maturity', '')}"
+            rag_context = await search_in_own_session(search_tech_docs, q, top_k=4)
     except Exception as e:
         logger.warning("CTO RAG failed: %s", e)
-    return run_ai_cto_agent(input_dict, tools_results, rag_context, onboarding_context=onboarding_context)
+    return await run_ai_cto_agent(input_dict, tools_results, rag_context, onboarding_context=onboarding_context)
 
 
-async def _run_coo(payload: dict, db: Session, onboarding_context: dict | None = None) -> dict:
-    """Async COO agent call."""
+async def _run_coo(payload: dict, onboarding_context: dict | None = None, rag: dict | None = None) -> dict:
+    """COO agent call. Uses prefetched rag["ops"] when present."""
     from app.config import settings
     coo_input = COOInput(**payload)
     docs = None
     if settings.RAG_ENABLED:
         try:
-            rag_results = search_ops_docs(
-                db, "SME operations best practices for inventory and throughput", top_k=settings.RAG_TOP_K
-            )
+            if rag is not None and "ops" in rag:
+                rag_results = rag["ops"]
+            else:
+                rag_results = await search_in_own_session(
+                    search_ops_docs, "SME operations best practices for inventory and throughput", top_k=settings.RAG_TOP_K
+                )
             if rag_results:
                 docs = [f"{doc.title}: {doc.content[:400]}" for doc in rag_results]
         except Exception as exc:
@@ -88,6 +143,49 @@ async def _run_coo(payload: dict, db: Session, onboarding_context: dict | None =
     return response
 
 
+AGENT_RUNNERS = {"cfo": _run_cfo, "cmo": _run_cmo, "coo": _run_coo, "cto": _run_cto}
+
+
+def agent_event(domain: str, out: dict) -> dict:
+    """Compact per-agent result for progress events (streaming run)."""
+    return {
+        "domain": domain,
+        "ok": "_error" not in out,
+        "summary": out.get("summary") or "",
+        "primary_issue": out.get("primary_issue"),
+        "risk_level": out.get("risk_level"),
+        "error": out.get("_error"),
+    }
+
+
+async def run_agents(
+    payloads: dict,
+    onboarding_context: dict | None = None,
+    on_result: Callable[[str, dict], Any] | None = None,
+) -> list[tuple[str, dict]]:
+    """
+    Run the four agents concurrently, each bounded by AGENT_TIMEOUT. A timed-out agent is cancelled
+    (its LLM request is aborted); failures come back as {"_error": ...} so synthesis can go on without them.
+    on_result(domain, out) is called as each agent finishes.
+    """
+    rag = await _prefetch_rag(payloads)
+
+    async def run_with_timeout(domain: str) -> tuple[str, dict]:
+        try:
+            out = await asyncio.wait_for(AGENT_RUNNERS[domain](payloads[domain], onboarding_context, rag), timeout=AGENT_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.warning("Agent %s timed out", domain)
+            out = {"_error": "timeout", "summary": "", "risk_level": "yellow"}
+        except Exception as e:
+            logger.exception("Agent %s failed: %s", domain, e)
+            out = {"_error": str(e), "summary": "", "risk_level": "yellow"}
+        if on_result is not None:
+            on_result(domain, out)
+        return domain, out
+
+    return await asyncio.gather(*(run_with_timeout(d) for d in AGENT_RUNNERS))
+
+
 def _synthesis_to_draft_artifact(
     synthesis: dict,
     primary_domain: str,
@@ -169,49 +267,21 @@ async def run_diagnostic_run(
     enterprise_id: int | None = None,
     actor_id: str | None = "guest",
     actor_role: str | None = "msme",
+    on_event: Callable[[str, dict], Any] | None = None,
+    job_id: UUID | None = None,
 ) -> dict[str, Any]:
     """
     Run all four agents (with timeout), synthesize, create one decision, persist DiagnosticRun.
     Returns dict: decision_id, synthesis_summary, synthesis (full), next_step recommendation, etc.
     Partial results allowed: if an agent fails, synthesis uses remaining agents.
+    on_event(name, data) reports progress: "agent" as each agent finishes (agent_event), then "synthesis".
+    job_id (queued runs): the decision is linked to the diagnostic job in the same commit; if another
+    attempt of the job already linked one, that decision's result is returned instead of a second one.
     """
     payloads = build_all_payloads(diagnostic_data, onboarding_context)
     agent_outputs: dict[str, Any] = {}
-    loop = asyncio.get_event_loop()
-
-    async def run_with_timeout(domain: str):
-        try:
-            if domain == "cfo":
-                out = await asyncio.wait_for(
-                    loop.run_in_executor(EXECUTOR, lambda: _run_cfo(payloads["cfo"], db, onboarding_context)),
-                    timeout=AGENT_TIMEOUT,
-                )
-            elif domain == "cmo":
-                out = await asyncio.wait_for(
-                    loop.run_in_executor(EXECUTOR, lambda: _run_cmo(payloads["cmo"], db, onboarding_context)),
-                    timeout=AGENT_TIMEOUT,
-                )
-            elif domain == "cto":
-                out = await asyncio.wait_for(
-                    loop.run_in_executor(EXECUTOR, lambda: _run_cto(payloads["cto"], db, onboarding_context)),
-                    timeout=AGENT_TIMEOUT,
-                )
-            else:
-                out = await asyncio.wait_for(_run_coo(payloads["coo"], db, onboarding_context), timeout=AGENT_TIMEOUT)
-            return domain, out
-        except asyncio.TimeoutError:
-            logger.warning("Agent %s timed out", domain)
-            return domain, {"_error": "timeout", "summary": "", "risk_level": "yellow"}
-        except Exception as e:
-            logger.exception("Agent %s failed: %s", domain, e)
-            return domain, {"_error": str(e), "summary": "", "risk_level": "yellow"}
-
-    results = await asyncio.gather(
-        run_with_timeout("cfo"),
-        run_with_timeout("cmo"),
-        run_with_timeout("coo"),
-        run_with_timeout("cto"),
-    )
+    on_result = (lambda domain, out: on_event("agent", agent_event(domain, out))) if on_event else None
+    results = await run_agents(payloads, onboarding_context, on_result=on_result)
     for domain, out in results:
         if isinstance(out, dict) and "_error" not in out:
             agent_outputs[domain] = out
@@ -228,16 +298,29 @@ async def run_diagnostic_run(
     synthesis["decision_snapshot"] = _decision_snapshot(
         agent_outputs, primary, onboarding_context, diagnostic_data
     )
+    synthesis_summary = _synthesis_summary(synthesis)
+    if on_event is not None:
+        on_event("synthesis", synthesis_summary)
+
     # Option B: get-or-create enterprise from onboarding so portfolio has data when enterprises are in a portfolio
     if enterprise_id is None and onboarding_context:
         enterprise_id = get_or_create_enterprise_from_onboarding(db, onboarding_context)
     draft = _synthesis_to_draft_artifact(synthesis, primary, onboarding_context, agent_outputs)
+    job = None
+    if job_id is not None:
+        # Lock the job row so two attempts (e.g. a stale reclaim) cannot both commit a decision.
+        job = db.query(DiagnosticJob).filter(DiagnosticJob.id == job_id).with_for_update().first()
+        if job is not None and job.decision_id is not None:
+            decision_id = job.decision_id
+            db.rollback()
+            return diagnostic_run_result(db, decision_id)
     decision = create_decision(
         db,
         enterprise_id=enterprise_id,
         initial_artifact=draft,
         actor_id=actor_id,
         actor_role=actor_role,
+        commit=False,
     )
 
     diagnostic_run = DiagnosticRun(
@@ -248,11 +331,17 @@ async def run_diagnostic_run(
         decision_id=decision.decision_id,
     )
     db.add(diagnostic_run)
+    if job is not None:
+        job.decision_id = decision.decision_id
     db.commit()
 
+    return _run_result(decision.decision_id, decision.enterprise_id, synthesis)
+
+
+def _synthesis_summary(synthesis: dict) -> dict[str, Any]:
     snapshot = synthesis.get("decision_snapshot") or {}
-    synthesis_summary = {
-        "primary_domain": primary,
+    return {
+        "primary_domain": synthesis.get("primary_domain"),
         "emerging_decision": synthesis.get("emerging_decision"),
         "decision_statement": snapshot.get("decision_statement"),
         "recommended_next_step": synthesis.get("recommended_next_step"),
@@ -260,15 +349,72 @@ async def run_diagnostic_run(
         "recommended_first_milestones": synthesis.get("recommended_first_milestones"),
     }
 
+
+def _run_result(decision_id: UUID, enterprise_id: int | None, synthesis: dict) -> dict[str, Any]:
     return {
-        "decision_id": str(decision.decision_id),
-        "enterprise_id": decision.enterprise_id,
-        "synthesis_summary": synthesis_summary,
+        "decision_id": str(decision_id),
+        "enterprise_id": enterprise_id,
+        "synthesis_summary": _synthesis_summary(synthesis),
         "synthesis": synthesis,
         "next_step": synthesis.get("recommended_next_step", "playbooks"),
         "next_step_payload": {
-            "primary_domain": primary,
+            "primary_domain": synthesis.get("primary_domain"),
             "playbooks": synthesis.get("recommended_playbooks"),
             "milestones": synthesis.get("recommended_first_milestones"),
         },
     }
+
+
+def diagnostic_run_result(db: Session, decision_id: UUID) -> dict[str, Any]:
+    """run_diagnostic_run's result for an already persisted run (retried jobs), flagged reused. ValueError if none."""
+    run = (
+        db.query(DiagnosticRun)
+        .filter(DiagnosticRun.decision_id == decision_id)
+        .order_by(DiagnosticRun.id.desc())
+        .first()
+    )
+    if run is None:
+        raise ValueError(f"No diagnostic run for decision {decision_id}")
+    enterprise_id = db.query(Decision.enterprise_id).filter(Decision.decision_id == decision_id).scalar()
+    return {**_run_result(decision_id, enterprise_id, run.synthesis or {}), "reused": True}
+
+
+def complete_diagnostic_run(
+    db: Session, body: DiagnosticRunRequest, result: dict, trace_id: str, t0: float, side_effects: bool = True
+) -> DiagnosticRunResponse:
+    """
+    Post-run steps shared by the blocking, streaming and queued modes: decision context, usage events,
+    SLO log. t0 is the time.perf_counter() the latency is measured from. side_effects=False only builds
+    the response (a queued job rebuilding the result of an earlier attempt).
+    """
+    from app.clear.usage import record_event, EVENT_DIAGNOSTIC_COMPLETED, EVENT_DECISION_CREATED
+    from app.config import settings
+
+    if side_effects:
+        if body.decision_context and result.get("decision_id"):
+            try:
+                from app.enterprise.decision_context_service import store_context
+                store_context(UUID(result["decision_id"]), body.decision_context, db, body.enterprise_id)
+                db.commit()
+            except Exception as e:
+                logger.warning("Store decision context failed (non-blocking): %s", e)
+                db.rollback()
+        try:
+            record_event(db, EVENT_DIAGNOSTIC_COMPLETED, enterprise_id=result.get("enterprise_id"), decision_id=UUID(result["decision_id"]) if result.get("decision_id") else None)
+            record_event(db, EVENT_DECISION_CREATED, enterprise_id=result.get("enterprise_id"), decision_id=UUID(result["decision_id"]) if result.get("decision_id") else None)
+        except Exception:
+            pass
+    latency_sec = time.perf_counter() - t0
+    logger.info("diagnostic_run completed trace_id=%s latency_sec=%.2f decision_id=%s", trace_id, latency_sec, result.get("decision_id"))
+    if latency_sec > getattr(settings, "SLO_DIAGNOSTIC_RUN_P95_SEC", 90):
+        logger.warning("diagnostic_run above SLO trace_id=%s latency_sec=%.2f", trace_id, latency_sec)
+    return DiagnosticRunResponse(
+        decision_id=result["decision_id"],
+        idea_stage=False,
+        synthesis_summary=result["synthesis_summary"],
+        synthesis=result.get("synthesis"),
+        next_step=result.get("next_step", "playbooks"),
+        next_step_payload=result.get("next_step_payload", {}),
+        enterprise_id=result.get("enterprise_id"),
+        trace_id=trace_id,
+    )
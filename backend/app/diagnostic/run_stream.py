@@ -0,0 +1,72 @@
+"""
+Server-Sent Events for the streaming diagnostic run (POST /api/clear/diagnostic/run?stream=true).
+
+The run executes in a task of its own (with its own Session); the response only relays the events
+the run emits through a queue. A client disconnect ends the relay, not the run: agents, synthesis,
+the decision and the DiagnosticRun row are still completed and stored. While no event is pending, a
+comment line is sent every DIAGNOSTIC_SSE_KEEPALIVE_SECONDS so proxies and load balancers keep the
+connection open.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from app.config import settings
+from app.utils.sse import sse
+
+logger = logging.getLogger(__name__)
+
+Emit = Callable[[str, Any], None]
+
+# Strong references so detached runs are not garbage-collected mid-flight.
+_background: set[asyncio.Task] = set()
+
+
+def stream_run(run: Callable[[Emit], Awaitable[None]], keepalive_seconds: Optional[float] = None) -> AsyncIterator[str]:
+    """
+    Start run(emit) as a detached task and return the SSE relay of what it emits, ending with "done".
+    An exception in run becomes an "error" event (status 400 with the message for ValueError, else 500).
+    """
+    keepalive = keepalive_seconds or settings.DIAGNOSTIC_SSE_KEEPALIVE_SECONDS
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def emit(event: str, data: Any) -> None:
+        queue.put_nowait((event, data))
+
+    async def _task() -> None:
+        try:
+            await run(emit)
+        except ValueError as e:
+            emit("error", {"status": 400, "detail": str(e)})
+        except Exception as e:
+            logger.exception("streamed diagnostic run failed: %s", e)
+            emit("error", {"status": 500, "detail": "Diagnostic run failed. Please try again."})
+        finally:
+            queue.put_nowait(None)
+
+    task = asyncio.create_task(_task())
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+    async def _relay() -> AsyncIterator[str]:
+        getter: Optional[asyncio.Task] = None
+        try:
+            while True:
+                if getter is None:
+                    getter = asyncio.ensure_future(queue.get())
+                done, _pending = await asyncio.wait({getter}, timeout=keepalive)
+                if not done:
+                    yield ": keepalive\n\n"
+                    continue
+                item, getter = getter.result(), None
+                if item is None:
+                    yield sse("done", {})
+                    return
+                yield sse(*item)
+        finally:
+            if getter is not None:
+                getter.cancel()
+            if not task.done():
+                logger.info("diagnostic stream client disconnected; run continues in background")
+
+    return _relay()
@@ -1,7 +1,11 @@
 """Phase 2: Document upload API (RAG + optional linkage)."""
-from typing import Optional
+from typing import AsyncIterator, Callable, Iterator, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+import codecs
+import json
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, Query, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
@@ -10,6 +14,10 @@ from app.documents.service import document_service
 
 router = APIRouter(prefix="/api", tags=["Documents (Phase 2)"])
 
+_READ_BLOCK_BYTES = 64 * 1024
+# JSON-array bodies of /documents/bulk must be parsed whole; JSONL is streamed line by line instead.
+_MAX_JSON_ARRAY_BYTES = 10 * 1024 * 1024
+
 
 class DocumentUploadBody(BaseModel):
     """POST /api/documents body."""
@@ -37,3 +45,118 @@ def upload_document(body: DocumentUploadBody, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Document upload failed: {e!s}")
+
+
+def _iter_text(upload: UploadFile) -> Iterator[str]:
+    """Decode an uploaded file block by block (UTF-8; invalid bytes replaced)."""
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        block = upload.file.read(_READ_BLOCK_BYTES)
+        if not block:
+            break
+        yield decoder.decode(block)
+    yield decoder.decode(b"", final=True)
+
+
+@router.post("/documents/file")
+def upload_document_file(
+    domain: str = Form(...),
+    file: UploadFile = File(...),
+    title: Optional[str] = Form(None),
+    enterprise_id: Optional[int] = Form(None),
+    decision_id: Optional[UUID] = Form(None),
+    db: Session = Depends(get_db),
+):
+    """
+    Upload a long text document (txt, md, csv, ...) as a file. The file is read and chunked as a
+    stream and chunks are embedded in batches, so memory stays bounded. Title defaults to the filename.
+    Returns the document id and chunk counts.
+    """
+    doc_title = (title or file.filename or "").strip()
+    if not doc_title:
+        raise HTTPException(status_code=400, detail="title is required")
+    try:
+        return document_service.upload_stream(
+            db,
+            domain=domain,
+            title=doc_title[:500],
+            pieces=_iter_text(file),
+            enterprise_id=enterprise_id,
+            decision_id=decision_id,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Document upload failed: {e!s}")
+
+
+async def _next_chunk(stream: AsyncIterator[bytes]) -> Optional[bytes]:
+    try:
+        return await stream.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+def _iter_lines(head: bytes, next_chunk: Callable[[], Optional[bytes]]) -> Iterator[bytes]:
+    """Lines of a streamed body; only the current partial line is buffered."""
+    buf = head
+    while True:
+        *lines, buf = buf.split(b"\n")
+        yield from lines
+        chunk = next_chunk()
+        if chunk is None:
+            break
+        buf += chunk
+    if buf:
+        yield buf
+
+
+@router.post("/documents/bulk")
+async def bulk_upload_documents(
+    request: Request,
+    domain: str = Query(..., description="finance | marketing | ops | tech | knowledge"),
+    batch_size: Optional[int] = Query(None, ge=1, le=5000),
+    db: Session = Depends(get_db),
+):
+    """
+    Bulk ingest. Body is JSONL (one document per line) or a JSON array of documents, each
+    {title, content, enterprise_id?, decision_id?} (knowledge: {source_type, title, content, tags?}).
+    JSONL is read from the request stream as it is ingested; a JSON array is parsed whole and limited
+    to 10 MB (413 above; use JSONL or scripts/ingest_documents.py for large sets).
+    Unchanged documents are skipped. Returns counts and docs_per_second.
+    """
+    from anyio import from_thread
+
+    from app.rag.ingest import iter_jsonl
+
+    stream = request.stream()
+    head = b""
+    while not head.strip():
+        chunk = await _next_chunk(stream)
+        if chunk is None:
+            break
+        head += chunk
+    if head.lstrip()[:1] == b"[":
+        body = head
+        while (chunk := await _next_chunk(stream)) is not None:
+            body += chunk
+            if len(body) > _MAX_JSON_ARRAY_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail="JSON array bodies are limited to 10 MB; send JSONL or use scripts/ingest_documents.py",
+                )
+        try:
+            documents = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON array: {e.msg}")
+    else:
+        # Consumed on the threadpool worker; each further chunk is awaited back on the event loop.
+        documents = iter_jsonl(_iter_lines(head, lambda: from_thread.run(_next_chunk, stream)))
+    try:
+        return await run_in_threadpool(
+            document_service.bulk_upload, db, domain, documents, batch_size=batch_size
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Bulk ingest failed: {e!s}")
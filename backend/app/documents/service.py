@@ -1,9 +1,15 @@
-"""Phase 2: Document upload: call existing RAG upsert; optionally store document_link."""
-from typing import Optional
+"""
+Phase 2: Document upload: call existing RAG upsert; optionally store document_link.
+Documents longer than RAG_CHUNK_TOKENS are stored as chunks instead (rag/chunking.py).
+"""
+from typing import Any, Iterable, Optional
 from uuid import UUID
 from sqlalchemy.orm import Session
 
+from app.config import settings
+from app.rag.chunking import count_tokens, delete_document_chunks, store_chunked_document
 from app.rag.vectorstore import (
+    DOMAIN_MODELS,
     upsert_finance_document,
     upsert_marketing_document,
     upsert_ops_document,
@@ -17,6 +23,21 @@ _DOMAIN_TABLE = {
     "ops": ("ops_documents", upsert_ops_document),
     "tech": ("tech_documents", upsert_tech_document),
 }
+# Domains whose upsert replaces an existing document with the same title (see vectorstore upserts).
+_REPLACE_BY_TITLE = {"marketing", "tech"}
+
+
+def _check_domain(domain: str) -> str:
+    domain_lower = (domain or "").lower()
+    if domain_lower not in _DOMAIN_TABLE:
+        raise ValueError(f"domain must be one of: finance, marketing, ops, tech; got {domain!r}")
+    return domain_lower
+
+
+def _link(db: Session, table_name: str, doc_id: int, enterprise_id: Optional[int], decision_id: Optional[UUID]) -> None:
+    if enterprise_id is not None or decision_id is not None:
+        db.add(DocumentLink(doc_table=table_name, doc_id=doc_id, enterprise_id=enterprise_id, decision_id=decision_id))
+        db.commit()
 
 
 class DocumentService:
@@ -29,22 +50,49 @@ class DocumentService:
         enterprise_id: Optional[int] = None,
         decision_id: Optional[UUID] = None,
     ):
-        """Upsert document into RAG for domain; optionally create document_link."""
-        domain_lower = (domain or "").lower()
-        if domain_lower not in _DOMAIN_TABLE:
-            raise ValueError(f"domain must be one of: finance, marketing, ops, tech; got {domain!r}")
+        """
+        Upsert document into RAG for domain; optionally create document_link.
+        Content over RAG_CHUNK_TOKENS is split into embedded chunks linked to the document.
+        """
+        domain_lower = _check_domain(domain)
         table_name, upsert_fn = _DOMAIN_TABLE[domain_lower]
-        doc = upsert_fn(db, title, content)
-        if enterprise_id is not None or decision_id is not None:
-            link = DocumentLink(
-                doc_table=table_name,
-                doc_id=doc.id,
-                enterprise_id=enterprise_id,
-                decision_id=decision_id,
+        replace = domain_lower in _REPLACE_BY_TITLE
+        if count_tokens(content) > settings.RAG_CHUNK_TOKENS:
+            doc, _report = store_chunked_document(
+                db, DOMAIN_MODELS[domain_lower], title, [content], content=content, replace_by_title=replace
             )
-            db.add(link)
-            db.commit()
+        else:
+            doc = upsert_fn(db, title, content)
+            if replace:  # a replaced long document leaves chunks behind
+                delete_document_chunks(db, table_name, doc.id)
+                db.commit()
+        _link(db, table_name, doc.id, enterprise_id, decision_id)
         return doc
 
+    @staticmethod
+    def upload_stream(
+        db: Session,
+        domain: str,
+        title: str,
+        pieces: Iterable[str],
+        enterprise_id: Optional[int] = None,
+        decision_id: Optional[UUID] = None,
+    ) -> dict:
+        """Chunked upload of text read incrementally (e.g. a large file); memory stays bounded. Returns the chunk report."""
+        domain_lower = _check_domain(domain)
+        table_name, _upsert = _DOMAIN_TABLE[domain_lower]
+        doc, report = store_chunked_document(
+            db, DOMAIN_MODELS[domain_lower], title, pieces, replace_by_title=domain_lower in _REPLACE_BY_TITLE
+        )
+        _link(db, table_name, doc.id, enterprise_id, decision_id)
+        return {"id": doc.id, "domain": domain_lower, "title": doc.title, **report}
+
+    @staticmethod
+    def bulk_upload(db: Session, domain: str, documents: Iterable[Any], **options) -> dict:
+        """Batched ingest of many documents (rag/ingest.py); unchanged content is skipped. Returns the ingest report."""
+        from app.rag.ingest import ingest_documents
+
+        return ingest_documents(db, domain, documents, **options)
+
 
 document_service = DocumentService()
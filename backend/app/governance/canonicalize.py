@@ -9,12 +9,17 @@ Contract (enforcement rules):
 - Timestamps: normalized to ISO8601 Z in _normalize_value (datetime and isoformat())
 - Recursive normalization of nested dict/list; same key order => same string => same hash
 - Deterministic: same logical artifact (after normalization) => same canonical string => same SHA-256 hash
+
+Encoding is a single walk (_emit): each value is normalized, written as canonical JSON parts that are
+flushed in UTF-8 chunks into an incremental SHA-256, and rebuilt as the plain dict json.loads would
+return, so writes no longer pay for normalize + json.dumps + json.loads. The output is byte-identical
+to the json.dumps form above (tests/test_canonicalization.py, including a fuzz corpus).
 """
 import hashlib
 import json
 import re
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable, Optional
 
 # Float values that are not allowed in canonical form
 def _is_bad_float(v: Any) -> bool:
@@ -54,6 +59,167 @@ def _normalize_value(val: Any) -> Any:
     raise ValueError(f"Cannot canonicalize type: {type(val)}")
 
 
+# Escaping identical to json.dumps(ensure_ascii=False) (C-accelerated when available).
+_encode_str = json.encoder.encode_basestring
+
+# Pending string parts buffered before a chunk is UTF-8 encoded into the hash.
+_FLUSH_PARTS = 8192
+
+
+class _CanonicalWriter:
+    """Collects encoded parts; flushes UTF-8 chunks into an incremental SHA-256 and/or keeps the text."""
+
+    __slots__ = ("parts", "hasher", "chunks")
+
+    def __init__(self, hash_output: bool = True, keep_text: bool = True):
+        self.parts: list[str] = []
+        self.hasher = hashlib.sha256() if hash_output else None
+        self.chunks: Optional[list[str]] = [] if keep_text else None
+
+    def flush(self) -> None:
+        if not self.parts:
+            return
+        chunk = "".join(self.parts)
+        self.parts.clear()
+        if self.hasher is not None:
+            self.hasher.update(chunk.encode("utf-8"))
+        if self.chunks is not None:
+            self.chunks.append(chunk)
+
+    def text(self) -> str:
+        self.flush()
+        return "".join(self.chunks or ())
+
+
+def _encode_key(key: Any) -> str:
+    """Dict key as json.dumps writes it (str, float, bool, None, int; anything else is a TypeError)."""
+    if isinstance(key, str):
+        return str.__str__(key)
+    if isinstance(key, float):
+        if _is_bad_float(key):
+            raise ValueError("Out of range float values are not JSON compliant: " + repr(key))
+        return float.__repr__(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {key.__class__.__name__}")
+
+
+_INF = float("inf")
+_CONTAINER = object()  # _emit_leaf sentinel: value is a dict/list, recurse with _emit
+
+
+def _emit_leaf(val: Any, out: Callable[[str], None]) -> Any:
+    """Scalar (or non-JSON type) value: write it and return its storage form; containers return _CONTAINER."""
+    t = type(val)
+    if t is str:
+        out(_encode_str(val))
+        return val
+    if val is None:
+        out("null")
+        return None
+    if val is True:
+        out("true")
+        return True
+    if val is False:
+        out("false")
+        return False
+    if t is int:
+        out(int.__repr__(val))
+        return val
+    if t is float:
+        if val != val or val in (_INF, -_INF):
+            raise ValueError("Canonical JSON forbids NaN/Infinity")
+        out(float.__repr__(val))
+        return val
+    if t is dict or t is list:
+        return _CONTAINER
+    if isinstance(val, int):
+        out(int.__repr__(val))
+        return int.__int__(val)
+    if isinstance(val, float):
+        if _is_bad_float(val):
+            raise ValueError("Canonical JSON forbids NaN/Infinity")
+        out(float.__repr__(val))
+        return float.__float__(val)
+    if isinstance(val, str):
+        val = str.__str__(val)
+        out(_encode_str(val))
+        return val
+    if isinstance(val, (list, dict)):
+        return _CONTAINER
+    # datetime and other isoformat() values: same string as _normalize_value.
+    val = _normalize_value(val)
+    out(_encode_str(val))
+    return val
+
+
+def _emit(val: Any, w: _CanonicalWriter) -> Any:
+    """
+    Normalize val, append its canonical JSON to w.parts and return the value as json.loads would
+    read it back (plain str/int/float, str keys). One walk replaces normalize + dumps + loads.
+    """
+    out = w.parts.append
+    stored = _emit_leaf(val, out)
+    if stored is not _CONTAINER:
+        return stored
+    if len(w.parts) >= _FLUSH_PARTS:
+        w.flush()
+    if isinstance(val, dict):
+        if not val:
+            out("{}")
+            return {}
+        result = {}
+        sep = "{"
+        for k in sorted(val):
+            v = val[k]
+            key = k if type(k) is str else _encode_key(k)
+            t = type(v)
+            if t is str:
+                out(sep + _encode_str(key) + ":" + _encode_str(v))
+                result[key] = v
+            elif t is int or v is None:
+                out(sep + _encode_str(key) + ":" + ("null" if v is None else int.__repr__(v)))
+                result[key] = v
+            else:
+                out(sep + _encode_str(key) + ":")
+                stored = _emit_leaf(v, out)
+                result[key] = _emit(v, w) if stored is _CONTAINER else stored
+            sep = ","
+        out("}")
+        return result
+    if not val:
+        out("[]")
+        return []
+    result = []
+    sep = "["
+    for v in val:
+        if type(v) is str:
+            out(sep + _encode_str(v))
+            result.append(v)
+        else:
+            out(sep)
+            stored = _emit_leaf(v, out)
+            result.append(_emit(v, w) if stored is _CONTAINER else stored)
+        sep = ","
+    out("]")
+    return result
+
+
+def _encode(obj: dict[str, Any], hash_output: bool, keep_text: bool) -> tuple[_CanonicalWriter, dict]:
+    if not isinstance(obj, dict):
+        raise ValueError("Root must be dict")
+    w = _CanonicalWriter(hash_output=hash_output, keep_text=keep_text)
+    stored = _emit(obj, w)
+    w.flush()
+    return w, stored
+
+
 def canonicalize(obj: dict[str, Any]) -> str:
     """
     Produce canonical JSON string (JCS-style):
@@ -62,26 +228,24 @@ def canonicalize(obj: dict[str, Any]) -> str:
     - Forbid NaN/Infinity (raise if present)
     - Timestamps normalized to ISO8601 Z
     - Recursive normalization of nested values
+    Byte-identical to json.dumps(_normalize_value(obj), sort_keys=True, separators=(",", ":"),
+    ensure_ascii=False, allow_nan=False), produced in a single walk.
     """
-    normalized = _normalize_value(obj)
-    if not isinstance(normalized, dict):
-        raise ValueError("Root must be dict")
-    return json.dumps(
-        normalized,
-        sort_keys=True,
-        separators=(",", ":"),
-        ensure_ascii=False,
-        allow_nan=False,
-    )
+    w, _stored = _encode(obj, hash_output=False, keep_text=True)
+    return w.text()
 
 
 def compute_canonical_hash(obj: dict[str, Any]) -> str:
-    """SHA-256 of canonical JSON (UTF-8 bytes). Stored at write time."""
-    return hashlib.sha256(canonicalize(obj).encode("utf-8")).hexdigest()
+    """SHA-256 of canonical JSON (UTF-8 bytes). Stored at write time. Streams; never holds the full string."""
+    w, _stored = _encode(obj, hash_output=True, keep_text=False)
+    return w.hasher.hexdigest()
 
 
 def canonicalize_and_hash(obj: dict[str, Any]) -> tuple[str, str, dict]:
-    """Return (canonical_json_string, hash_hex, dict_for_storage). Use for insert-only artifact write."""
-    canonical_str = canonicalize(obj)
-    h = hashlib.sha256(canonical_str.encode("utf-8")).hexdigest()
-    return canonical_str, h, json.loads(canonical_str)
+    """
+    Return (canonical_json_string, hash_hex, dict_for_storage). Use for insert-only artifact write.
+    One pass: the hash is fed chunk by chunk and dict_for_storage equals json.loads(canonical_json_string)
+    without reparsing it.
+    """
+    w, stored = _encode(obj, hash_output=True, keep_text=True)
+    return w.text(), w.hasher.hexdigest(), stored
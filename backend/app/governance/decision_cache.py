@@ -0,0 +1,184 @@
+"""
+Versioned cache of serialized DecisionOut responses (GET /api/clear/decisions/{id}).
+
+Entries are keyed by decision_id and carry a version: the ledger high-water mark from
+decision_status_projection.ledger_seq plus decisions.updated_at (owner/outcome fields change
+without a ledger event). A hit is only served when the stored version equals the current one, so
+a stale entry can never be returned, even from another worker. Every ledger append also drops the
+entry via status_projection.apply_ledger_event.
+
+Tier 1 is a bounded LRU per worker process. Tier 2 is optional and shared: set
+DECISION_CACHE_REDIS_URL and install redis. Backend errors are logged and treated as a miss.
+"""
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Optional
+from uuid import UUID
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_REDIS_KEY_PREFIX = "clear:decision_out:"
+
+
+def cache_version(ledger_seq: int, updated_at: Optional[datetime]) -> str:
+    """Version string for a decision: ledger high-water mark plus head-row update time."""
+    return f"{ledger_seq}:{updated_at.isoformat() if updated_at else ''}"
+
+
+class _LocalLRU:
+    """Thread-safe bounded LRU: decision_id -> (version, serialized body)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, tuple[str, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[tuple[str, bytes]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, version: str, body: bytes) -> None:
+        with self._lock:
+            self._data[key] = (version, body)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _RedisBackend:
+    """Shared tier: one hash per decision ({version, body}) with a TTL."""
+
+    def __init__(self, url: str, ttl_seconds: int):
+        import redis  # optional dependency
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+
+    def get(self, key: str) -> Optional[tuple[str, bytes]]:
+        raw = self._client.hmget(_REDIS_KEY_PREFIX + key, "version", "body")
+        if raw[0] is None or raw[1] is None:
+            return None
+        return raw[0].decode("utf-8"), raw[1]
+
+    def set(self, key: str, version: str, body: bytes) -> None:
+        name = _REDIS_KEY_PREFIX + key
+        pipe = self._client.pipeline()
+        pipe.hset(name, mapping={"version": version, "body": body})
+        pipe.expire(name, self.ttl_seconds)
+        pipe.execute()
+
+    def delete(self, key: str) -> None:
+        self._client.delete(_REDIS_KEY_PREFIX + key)
+
+
+_local = _LocalLRU(settings.DECISION_CACHE_MAX_ENTRIES)
+_shared: Optional[_RedisBackend] = None
+_shared_init_done = False
+_shared_lock = threading.Lock()
+_stats = {"hits": 0, "shared_hits": 0, "misses": 0, "stale": 0, "invalidations": 0, "backend_errors": 0}
+
+
+def _shared_backend() -> Optional[_RedisBackend]:
+    global _shared, _shared_init_done
+    if _shared_init_done:
+        return _shared
+    with _shared_lock:
+        if not _shared_init_done:
+            url = settings.DECISION_CACHE_REDIS_URL
+            if url:
+                try:
+                    _shared = _RedisBackend(url, settings.DECISION_CACHE_SHARED_TTL_SECONDS)
+                except ImportError:
+                    logger.warning("DECISION_CACHE_REDIS_URL is set but redis is not installed; using per-worker cache only")
+            _shared_init_done = True
+    return _shared
+
+
+def get_cached(decision_id: UUID, version: str) -> Optional[bytes]:
+    """Serialized DecisionOut for this exact version, or None."""
+    if not settings.DECISION_CACHE_ENABLED:
+        return None
+    key = str(decision_id)
+    entry = _local.get(key)
+    if entry is not None:
+        if entry[0] == version:
+            _stats["hits"] += 1
+            return entry[1]
+        _stats["stale"] += 1
+        _local.delete(key)
+    shared = _shared_backend()
+    if shared is not None:
+        try:
+            entry = shared.get(key)
+        except Exception as e:
+            _stats["backend_errors"] += 1
+            logger.warning("decision cache shared get failed: %s", e)
+            entry = None
+        if entry is not None and entry[0] == version:
+            _stats["shared_hits"] += 1
+            _local.set(key, version, entry[1])
+            return entry[1]
+    _stats["misses"] += 1
+    return None
+
+
+def put_cached(decision_id: UUID, version: str, body: bytes) -> None:
+    """Store a serialized DecisionOut under its version (both tiers)."""
+    if not settings.DECISION_CACHE_ENABLED:
+        return
+    key = str(decision_id)
+    _local.set(key, version, body)
+    shared = _shared_backend()
+    if shared is not None:
+        try:
+            shared.set(key, version, body)
+        except Exception as e:
+            _stats["backend_errors"] += 1
+            logger.warning("decision cache shared set failed: %s", e)
+
+
+def invalidate(decision_id: UUID) -> None:
+    """Drop the cached response for a decision (called on every ledger append)."""
+    key = str(decision_id)
+    _stats["invalidations"] += 1
+    _local.delete(key)
+    shared = _shared_backend()
+    if shared is not None:
+        try:
+            shared.delete(key)
+        except Exception as e:
+            _stats["backend_errors"] += 1
+            logger.warning("decision cache shared delete failed: %s", e)
+
+
+def cache_stats() -> dict[str, Any]:
+    """Counters for this worker plus current local size."""
+    return {
+        **_stats,
+        "local_entries": len(_local),
+        "local_max_entries": _local.max_entries,
+        "shared_backend": "redis" if _shared_backend() is not None else None,
+    }
+
+
+def clear_local_cache() -> None:
+    """Empty this worker's LRU (tests, admin)."""
+    _local.clear()
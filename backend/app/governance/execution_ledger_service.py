@@ -6,6 +6,7 @@ from typing import Any, Optional
 from sqlalchemy.orm import Session
 
 from app.db.models import Decision, DecisionLedgerEvent
+from app.governance.status_projection import apply_ledger_event
 from app.schemas.clear.ledger import LedgerEventType
 
 
@@ -17,10 +18,11 @@ EXECUTION_EVENT_TYPES = (
 )
 
 
-def _require_decision(db: Session, decision_id: UUID) -> None:
+def _require_decision(db: Session, decision_id: UUID) -> Decision:
     d = db.query(Decision).filter(Decision.decision_id == decision_id).first()
     if not d:
         raise ValueError("Decision not found")
+    return d
 
 
 def append_task_created(
@@ -37,7 +39,7 @@ def append_task_created(
     actor_role: Optional[str] = None,
 ) -> UUID:
     """Emit TASK_CREATED; return task_key (uuid) for later TASK_UPDATED / MILESTONE_LOGGED."""
-    _require_decision(db, decision_id)
+    decision = _require_decision(db, decision_id)
     task_key = uuid4()
     payload = {
         "task_key": str(task_key),
@@ -58,6 +60,7 @@ def append_task_created(
             actor_role=actor_role,
         )
     )
+    apply_ledger_event(db, decision_id, LedgerEventType.TASK_CREATED.value, decision.enterprise_id)
     db.flush()
     return task_key
 
@@ -72,7 +75,7 @@ def append_task_updated(
     actor_role: Optional[str] = None,
 ) -> None:
     """Emit TASK_UPDATED (e.g. status, due_date, owner). No mutable row update."""
-    _require_decision(db, decision_id)
+    decision = _require_decision(db, decision_id)
     payload = {"task_key": str(task_key), "changes": changes}
     db.add(
         DecisionLedgerEvent(
@@ -84,6 +87,7 @@ def append_task_updated(
             actor_role=actor_role,
         )
     )
+    apply_ledger_event(db, decision_id, LedgerEventType.TASK_UPDATED.value, decision.enterprise_id)
     db.flush()
 
 
@@ -100,7 +104,7 @@ def append_milestone_logged(
     actor_role: Optional[str] = None,
 ) -> None:
     """Emit MILESTONE_LOGGED. No mutable milestone row."""
-    _require_decision(db, decision_id)
+    decision = _require_decision(db, decision_id)
     payload = {
         "task_key": str(task_key),
         "milestone_type": milestone_type,
@@ -118,6 +122,7 @@ def append_milestone_logged(
             actor_role=actor_role,
         )
     )
+    apply_ledger_event(db, decision_id, LedgerEventType.MILESTONE_LOGGED.value, decision.enterprise_id)
     db.flush()
 
 
@@ -132,7 +137,7 @@ def append_outcome_recorded(
     actor_role: Optional[str] = None,
 ) -> None:
     """Emit OUTCOME_RECORDED. No mutable outcome row."""
-    _require_decision(db, decision_id)
+    decision = _require_decision(db, decision_id)
     payload = {"outcome_type": outcome_type, "metrics_json": metrics_json, "notes": notes}
     db.add(
         DecisionLedgerEvent(
@@ -144,6 +149,7 @@ def append_outcome_recorded(
             actor_role=actor_role,
         )
     )
+    apply_ledger_event(db, decision_id, LedgerEventType.OUTCOME_RECORDED.value, decision.enterprise_id)
     db.flush()
 
 
@@ -7,7 +7,7 @@ from typing import Any
 from uuid import UUID
 
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import case, desc, func
 
 from app.db.models import (
     Decision,
@@ -18,7 +18,7 @@ from app.db.models import (
     DiagnosticRun,
     EnterpriseHealthSnapshot,
 )
-from app.governance.ledger_service import _derive_status_from_ledger
+from app.governance.ledger_service import derive_statuses
 
 # Pillar max points
 EXECUTION_MAX = 40   # 15 + 10 + 10 + 5
@@ -26,50 +26,235 @@ GOVERNANCE_MAX = 35  # 10 + 10 + 10 + 5
 LEARNING_MAX = 25    # 10 + 10 + 5
 
 
-def _is_finalized(db: Session, decision_id: UUID) -> bool:
-    status = _derive_status_from_ledger(db, decision_id)
+def _is_finalized(status: str) -> bool:
     return status in ("finalized", "signed", "in_progress", "implemented", "outcome_tracked", "archived")
 
 
-def _decision_from_diagnostic(db: Session, decision_id: UUID) -> bool:
-    return db.query(DiagnosticRun).filter(DiagnosticRun.decision_id == decision_id).limit(1).first() is not None
-
-
 def _artifact_has_execution_plan(artifact_json: dict | None) -> bool:
-    if not artifact_json:
-        return False
-    emr = artifact_json.get("emr") or {}
-    milestones = emr.get("milestones") or []
-    return len(milestones) >= 1
+    """EMR milestones present: a non-empty array (same rule as the jsonb_typeof check in compute_health_scores)."""
+    emr = (artifact_json or {}).get("emr")
+    milestones = emr.get("milestones") if isinstance(emr, dict) else None
+    return isinstance(milestones, list) and len(milestones) >= 1
 
 
 def compute_health_score(db: Session, enterprise_id: int) -> dict[str, Any]:
     """
     Compute current health score for an enterprise.
     Returns: total_score, execution_score, governance_score, learning_score, status_label, trend_direction.
+    The single-enterprise case of compute_health_scores, so both always agree.
     """
-    decisions = db.query(Decision).filter(Decision.enterprise_id == enterprise_id).all()
-    if not decisions:
-        return _empty_score("No decisions")
+    return compute_health_scores(db, [enterprise_id])[enterprise_id]
 
-    decision_ids = [d.decision_id for d in decisions]
-    today = date.today()
 
-    # --- Pillar 1: Execution Discipline (40) ---
-    # Milestones completed on time (15), active decisions with progress (10), overdue ratio (10), evidence on completed (5)
-    all_milestones = (
-        db.query(DecisionExecutionMilestone)
-        .filter(DecisionExecutionMilestone.decision_id.in_(decision_ids))
+def compute_health_scores(db: Session, enterprise_ids: list[int]) -> dict[int, dict[str, Any]]:
+    """
+    Health score for many enterprises at once (compute_health_score is the one-enterprise case).
+    Loads the inputs as flat columns in a fixed number of set-based queries (no per-enterprise or
+    per-decision lookups) and aggregates all three pillars in one grouped pass.
+    """
+    enterprise_ids = list(dict.fromkeys(enterprise_ids))
+    if not enterprise_ids:
+        return {}
+    by_enterprise = Decision.enterprise_id.in_(enterprise_ids)
+    decision_rows = (
+        db.query(Decision.decision_id, Decision.enterprise_id, Decision.responsible_owner, Decision.outcome_review_reminder)
+        .filter(by_enterprise)
         .all()
     )
-    total_milestones = len(all_milestones)
+    decision_ids = [r.decision_id for r in decision_rows]
+    statuses = derive_statuses(db, decision_ids) if decision_ids else {}
+
+    # Latest artifact per decision -> number of EMR milestones (only the count leaves the database).
+    emr_milestones = DecisionArtifact.canonical_json[("emr", "milestones")]
+    plan_counts = dict(
+        db.query(
+            DecisionArtifact.decision_id,
+            case((func.jsonb_typeof(emr_milestones) == "array", func.jsonb_array_length(emr_milestones)), else_=0),
+        )
+        .join(Decision, Decision.decision_id == DecisionArtifact.decision_id)
+        .filter(by_enterprise)
+        .distinct(DecisionArtifact.decision_id)
+        .order_by(DecisionArtifact.decision_id, DecisionArtifact.created_at.desc())
+        .all()
+    )
+    diagnostic_ids = {
+        r[0] for r in db.query(DiagnosticRun.decision_id)
+        .join(Decision, Decision.decision_id == DiagnosticRun.decision_id)
+        .filter(by_enterprise)
+        .distinct()
+    }
+    evidence_ids = {
+        r[0] for r in db.query(DecisionEvidenceLink.decision_id)
+        .join(Decision, Decision.decision_id == DecisionEvidenceLink.decision_id)
+        .filter(by_enterprise)
+        .distinct()
+    }
+    milestone_rows = (
+        db.query(
+            DecisionExecutionMilestone.decision_id,
+            DecisionExecutionMilestone.status,
+            DecisionExecutionMilestone.due_date,
+            DecisionExecutionMilestone.updated_at,
+        )
+        .join(Decision, Decision.decision_id == DecisionExecutionMilestone.decision_id)
+        .filter(by_enterprise)
+        .all()
+    )
+    review_rows = (
+        db.query(OutcomeReview.decision_id, OutcomeReview.key_learnings)
+        .join(Decision, Decision.decision_id == OutcomeReview.decision_id)
+        .filter(by_enterprise)
+        .all()
+    )
+
+    decision_cols = {
+        "decision_id": decision_ids,
+        "enterprise_id": [r.enterprise_id for r in decision_rows],
+        "status": [statuses[r.decision_id] for r in decision_rows],
+        "has_owner": [bool(r.responsible_owner and r.responsible_owner.strip()) for r in decision_rows],
+        "review_reminder": [bool(r.outcome_review_reminder) for r in decision_rows],
+        "has_plan": [(plan_counts.get(r.decision_id) or 0) >= 1 for r in decision_rows],
+        "from_diagnostic": [r.decision_id in diagnostic_ids for r in decision_rows],
+        "has_evidence": [r.decision_id in evidence_ids for r in decision_rows],
+    }
+    milestone_cols = {
+        "decision_id": [m.decision_id for m in milestone_rows],
+        "status": [(m.status or "").lower() for m in milestone_rows],
+        "due_date": [m.due_date for m in milestone_rows],
+        "updated_on": [m.updated_at.date() if m.updated_at else None for m in milestone_rows],
+    }
+    review_cols = {
+        "decision_id": [r.decision_id for r in review_rows],
+        "has_learning": [bool((r.key_learnings or "").strip()) for r in review_rows],
+    }
+    scores = _scores_from_columns(decision_cols, milestone_cols, review_cols, date.today())
+
+    prev_scores = dict(
+        db.query(EnterpriseHealthSnapshot.enterprise_id, EnterpriseHealthSnapshot.score)
+        .filter(
+            EnterpriseHealthSnapshot.enterprise_id.in_(list(scores)),
+            EnterpriseHealthSnapshot.snapshot_date < date.today(),
+        )
+        .distinct(EnterpriseHealthSnapshot.enterprise_id)
+        .order_by(EnterpriseHealthSnapshot.enterprise_id, desc(EnterpriseHealthSnapshot.snapshot_date))
+        .all()
+    ) if scores else {}
+    out = {}
+    for eid in enterprise_ids:
+        if eid not in scores:
+            out[eid] = _empty_score("No decisions")
+            continue
+        result = scores[eid]
+        result["trend_direction"] = _trend_from_previous(prev_scores.get(eid), result["total_score"])
+        out[eid] = result
+    return out
+
+
+def _scores_from_columns(
+    decisions: dict[str, list],
+    milestones: dict[str, list],
+    reviews: dict[str, list],
+    today: date,
+) -> dict[int, dict[str, Any]]:
+    """
+    Grouped scoring over columnar inputs for many enterprises (no DB access); trend_direction is None.
+    decisions: decision_id, enterprise_id, status, has_owner, review_reminder, has_plan,
+    from_diagnostic, has_evidence. milestones: decision_id, status (lowercased), due_date,
+    updated_on. reviews: decision_id, has_learning. Only enterprises with decisions are returned.
+    """
+    enterprise_of = dict(zip(decisions["decision_id"], decisions["enterprise_id"]))
+    active = {did for did, st in zip(decisions["decision_id"], decisions["status"]) if st != "draft"}
+    with_evidence = {did for did, ev in zip(decisions["decision_id"], decisions["has_evidence"]) if ev}
+    counts: dict[int, dict[str, int]] = {}
+    progress: dict[int, set] = {}
+
+    def bucket(eid: int) -> dict[str, int]:
+        c = counts.get(eid)
+        if c is None:
+            c = counts[eid] = dict.fromkeys(_COUNT_KEYS, 0)
+            progress[eid] = set()
+        return c
+
+    for eid, st, owner, reminder, plan, diag in zip(
+        decisions["enterprise_id"], decisions["status"], decisions["has_owner"],
+        decisions["review_reminder"], decisions["has_plan"], decisions["from_diagnostic"],
+    ):
+        c = bucket(eid)
+        c["n_total"] += 1
+        c["n_active"] += st != "draft"
+        c["n_finalized"] += _is_finalized(st)
+        c["n_with_owner"] += owner
+        c["n_with_reminder"] += reminder
+        c["n_with_plan"] += plan
+        c["n_from_diag"] += diag
+
+    for did, st, due, updated_on in zip(
+        milestones["decision_id"], milestones["status"], milestones["due_date"], milestones["updated_on"],
+    ):
+        eid = enterprise_of[did]
+        c = counts[eid]
+        is_completed = st == "completed"
+        c["total_milestones"] += 1
+        if due:
+            c["total_with_due"] += 1
+            if is_completed:
+                if updated_on and updated_on <= due:
+                    c["completed_on_time"] += 1
+                else:
+                    c["completed_late"] += 1
+            elif due < today:
+                c["overdue_count"] += 1
+        if is_completed:
+            c["completed_with_evidence"] += did in with_evidence
+            progress[eid].add(did)
+        elif did in active and st in ("in_progress", "in progress"):
+            progress[eid].add(did)
+
+    reviewed: dict[int, set] = {}
+    for did, has_learning in zip(reviews["decision_id"], reviews["has_learning"]):
+        eid = enterprise_of[did]
+        reviewed.setdefault(eid, set()).add(did)
+        counts[eid]["n_memory"] += has_learning
+
+    for eid, c in counts.items():
+        c["n_with_progress"] = len(progress[eid])
+        c["n_decisions_with_review"] = len(reviewed.get(eid, ()))
+    return {eid: _score_from_counts(c) for eid, c in counts.items()}
+
+
+_COUNT_KEYS = (
+    "total_milestones", "completed_on_time", "completed_late", "overdue_count", "total_with_due",
+    "completed_with_evidence", "n_with_progress", "n_active", "n_total", "n_finalized", "n_with_owner",
+    "n_with_plan", "n_from_diag", "n_with_reminder", "n_decisions_with_review", "n_memory",
+)
+
+
+def _score_from_rows(
+    decisions: list,
+    statuses: dict[UUID, str],
+    all_milestones: list,
+    evidence_ids: set[UUID],
+    plan_ids: set[UUID],
+    diagnostic_ids: set[UUID],
+    reviews: list,
+    today: date,
+) -> dict[str, Any]:
+    """
+    Pure scoring over one enterprise's loaded rows (no DB access); trend_direction is left None.
+    decisions: decision_id, responsible_owner, outcome_review_reminder. milestones: decision_id,
+    status, due_date, updated_at. reviews: decision_id, key_learnings. The id sets mark decisions
+    with any evidence link, a latest artifact with an EMR plan, and a diagnostic run.
+    """
+    # --- Pillar 1 inputs: milestones on time, progress, overdue, evidence on completed ---
     completed_on_time = 0
     completed_late = 0
     overdue_count = 0
     completed_with_evidence = 0
     decisions_with_progress = set()
+    milestones_by_decision: dict[UUID, list] = {}
 
     for m in all_milestones:
+        milestones_by_decision.setdefault(m.decision_id, []).append(m)
         is_completed = (m.status or "").lower() == "completed"
         due = m.due_date
         if is_completed and due:
@@ -80,27 +265,50 @@ def compute_health_score(db: Session, enterprise_id: int) -> dict[str, Any]:
         if due and not is_completed and due < today:
             overdue_count += 1
         if is_completed:
-            # Check if this decision has any evidence link
-            has_ev = db.query(DecisionEvidenceLink).filter(
-                DecisionEvidenceLink.decision_id == m.decision_id
-            ).limit(1).first() is not None
-            if has_ev:
+            # Decision has any evidence link
+            if m.decision_id in evidence_ids:
                 completed_with_evidence += 1
             decisions_with_progress.add(m.decision_id)
 
     # Active = not draft; "active decisions with milestone progress"
     for d in decisions:
-        if _derive_status_from_ledger(db, d.decision_id) != "draft":
-            ms = [x for x in all_milestones if x.decision_id == d.decision_id]
+        if statuses[d.decision_id] != "draft":
+            ms = milestones_by_decision.get(d.decision_id, [])
             if any((x.status or "").lower() == "completed" for x in ms) or any((x.status or "").lower() in ("in_progress", "in progress") for x in ms):
                 decisions_with_progress.add(d.decision_id)
 
-    # Points: milestones on time (15)
-    completed_total = completed_on_time + completed_late
+    return _score_from_counts({
+        "total_milestones": len(all_milestones),
+        "completed_on_time": completed_on_time,
+        "completed_late": completed_late,
+        "overdue_count": overdue_count,
+        "total_with_due": sum(1 for m in all_milestones if m.due_date),
+        "completed_with_evidence": completed_with_evidence,
+        "n_with_progress": len(decisions_with_progress),
+        "n_active": sum(1 for d in decisions if statuses[d.decision_id] != "draft"),
+        # --- Pillar 2 inputs: finalized, owners, execution plans, from diagnostic ---
+        "n_total": len(decisions),
+        "n_finalized": sum(1 for d in decisions if _is_finalized(statuses[d.decision_id])),
+        "n_with_owner": sum(1 for d in decisions if d.responsible_owner and d.responsible_owner.strip()),
+        "n_with_plan": sum(1 for d in decisions if d.decision_id in plan_ids),
+        "n_from_diag": sum(1 for d in decisions if d.decision_id in diagnostic_ids),
+        # --- Pillar 3 inputs: scheduled reviews, reviewed decisions, memory entries ---
+        "n_with_reminder": sum(1 for d in decisions if d.outcome_review_reminder),
+        "n_decisions_with_review": len({r.decision_id for r in reviews}),
+        "n_memory": sum(1 for r in reviews if (r.key_learnings or "").strip()),
+    })
+
+
+def _score_from_counts(c: dict[str, int]) -> dict[str, Any]:
+    """Pillar points from one enterprise's aggregate counts (shared by the row and columnar paths)."""
+    # --- Pillar 1: Execution Discipline (40) ---
+    # Milestones completed on time (15), active decisions with progress (10), overdue ratio (10), evidence on completed (5)
+    total_milestones = c["total_milestones"]
+    completed_total = c["completed_on_time"] + c["completed_late"]
     if total_milestones == 0:
         on_time_ratio = 0.0
     else:
-        on_time_ratio = completed_on_time / total_milestones if total_milestones else 0
+        on_time_ratio = c["completed_on_time"] / total_milestones
     if on_time_ratio >= 0.8:
         pts_on_time = 15
     elif on_time_ratio >= 0.5:
@@ -110,17 +318,14 @@ def compute_health_score(db: Session, enterprise_id: int) -> dict[str, Any]:
     pts_on_time = min(15, max(0, pts_on_time))
 
     # Active decisions with progress (10)
-    active_decisions = [d for d in decisions if _derive_status_from_ledger(db, d.decision_id) != "draft"]
-    n_active = len(active_decisions)
-    n_with_progress = len(decisions_with_progress)
-    pts_progress = min(10, int(10 * (n_with_progress / n_active)) if n_active else 0)
+    n_active = c["n_active"]
+    pts_progress = min(10, int(10 * (c["n_with_progress"] / n_active)) if n_active else 0)
 
     # Overdue ratio (10): lower overdue ratio = higher points
-    total_with_due = sum(1 for m in all_milestones if m.due_date)
-    if total_with_due == 0:
+    if c["total_with_due"] == 0:
         overdue_ratio = 0.0
     else:
-        overdue_ratio = overdue_count / total_with_due
+        overdue_ratio = c["overdue_count"] / c["total_with_due"]
     pts_overdue = int(10 * (1 - min(1.0, overdue_ratio)))
     pts_overdue = min(10, max(0, pts_overdue))
 
@@ -128,49 +333,31 @@ def compute_health_score(db: Session, enterprise_id: int) -> dict[str, Any]:
     if completed_total == 0:
         pts_evidence = 0
     else:
-        pts_evidence = min(5, int(5 * completed_with_evidence / completed_total))
+        pts_evidence = min(5, int(5 * c["completed_with_evidence"] / completed_total))
     execution_score = pts_on_time + pts_progress + pts_overdue + pts_evidence
     execution_score = min(EXECUTION_MAX, execution_score)
 
     # --- Pillar 2: Decision Governance (35) ---
     # Finalized vs draft (10), assigned owners (10), defined execution plans (10), from diagnostic (5)
-    n_finalized = sum(1 for d in decisions if _is_finalized(db, d.decision_id))
-    n_total = len(decisions)
-    pts_finalized = int(10 * (n_finalized / n_total)) if n_total else 0
-
-    n_with_owner = sum(1 for d in decisions if d.responsible_owner and d.responsible_owner.strip())
-    pts_owner = int(10 * (n_with_owner / n_total)) if n_total else 0
-
-    n_with_plan = 0
-    for d in decisions:
-        art = db.query(DecisionArtifact).filter(
-            DecisionArtifact.decision_id == d.decision_id
-        ).order_by(DecisionArtifact.created_at.desc()).limit(1).first()
-        if art and _artifact_has_execution_plan(art.canonical_json or {}):
-            n_with_plan += 1
-    pts_plan = int(10 * (n_with_plan / n_total)) if n_total else 0
-
-    n_from_diag = sum(1 for d in decisions if _decision_from_diagnostic(db, d.decision_id))
-    pts_diag = min(5, int(5 * (n_from_diag / n_total)) if n_total else 0)
+    n_total = c["n_total"]
+    pts_finalized = int(10 * (c["n_finalized"] / n_total)) if n_total else 0
+    pts_owner = int(10 * (c["n_with_owner"] / n_total)) if n_total else 0
+    pts_plan = int(10 * (c["n_with_plan"] / n_total)) if n_total else 0
+    pts_diag = min(5, int(5 * (c["n_from_diag"] / n_total)) if n_total else 0)
 
     governance_score = pts_finalized + pts_owner + pts_plan + pts_diag
     governance_score = min(GOVERNANCE_MAX, governance_score)
 
     # --- Pillar 3: Learning and Review (25) ---
     # Scheduled review (10), reviews on time (10), memory entries (5)
-    n_with_reminder = sum(1 for d in decisions if d.outcome_review_reminder)
-    pts_scheduled = int(10 * (n_with_reminder / n_total)) if n_total else 0
+    pts_scheduled = int(10 * (c["n_with_reminder"] / n_total)) if n_total else 0
 
-    reviews = db.query(OutcomeReview).filter(OutcomeReview.decision_id.in_(decision_ids)).all()
-    n_reviews = len(reviews)
-    n_decisions_with_review = len({r.decision_id for r in reviews})
     # "Reviews completed on time" proxy: decisions that have at least one review
-    pts_reviews = int(10 * (n_decisions_with_review / n_total)) if n_total else 0
+    pts_reviews = int(10 * (c["n_decisions_with_review"] / n_total)) if n_total else 0
 
     # Institutional memory: outcome reviews with key_learnings
-    n_memory = sum(1 for r in reviews if (r.key_learnings or "").strip())
     max_memory_expected = n_total * 2  # cap expectation
-    pts_memory = min(5, int(5 * min(1.0, n_memory / max(1, max_memory_expected))))
+    pts_memory = min(5, int(5 * min(1.0, c["n_memory"] / max(1, max_memory_expected))))
 
     learning_score = pts_scheduled + pts_reviews + pts_memory
     learning_score = min(LEARNING_MAX, learning_score)
@@ -178,16 +365,13 @@ def compute_health_score(db: Session, enterprise_id: int) -> dict[str, Any]:
     total_score = execution_score + governance_score + learning_score
     total_score = min(100, total_score)
 
-    status_label = _status_label(total_score)
-    trend_direction = _get_trend(db, enterprise_id, total_score)
-
     return {
         "total_score": total_score,
         "execution_score": execution_score,
         "governance_score": governance_score,
         "learning_score": learning_score,
-        "status_label": status_label,
-        "trend_direction": trend_direction,
+        "status_label": _status_label(total_score),
+        "trend_direction": None,
         "execution_max": EXECUTION_MAX,
         "governance_max": GOVERNANCE_MAX,
         "learning_max": LEARNING_MAX,
@@ -218,22 +402,12 @@ def _status_label(total: int) -> str:
     return "At risk"
 
 
-def _get_trend(db: Session, enterprise_id: int, current_total: int) -> str | None:
-    """Compare to previous month snapshot. Returns 'up' | 'down' | None."""
-    prev = (
-        db.query(EnterpriseHealthSnapshot)
-        .filter(
-            EnterpriseHealthSnapshot.enterprise_id == enterprise_id,
-            EnterpriseHealthSnapshot.snapshot_date < date.today(),
-        )
-        .order_by(desc(EnterpriseHealthSnapshot.snapshot_date))
-        .limit(1)
-        .first()
-    )
-    if not prev or prev.score is None:
+def _trend_from_previous(prev_score: int | None, current_total: int) -> str | None:
+    """'up' | 'down' vs the previous snapshot score; None when equal or no snapshot."""
+    if prev_score is None:
         return None
-    if current_total > prev.score:
+    if current_total > prev_score:
         return "up"
-    if current_total < prev.score:
+    if current_total < prev_score:
         return "down"
     return None
@@ -1,5 +1,7 @@
-"""Append-only ledger service. State derived from ledger + decision_artifacts; no mutable decision fields."""
+"""Append-only ledger service. State derived from ledger + decision_artifacts; no mutable decision fields.
+Each append also updates decision_status_projection (read model) in the same transaction."""
 import logging
+from typing import Iterable
 from uuid import UUID, uuid4
 
 from sqlalchemy.orm import Session
@@ -7,6 +9,7 @@ from sqlalchemy.orm import Session
 from app.db.models import Decision, DecisionLedgerEvent, DecisionArtifact, Enterprise
 from app.governance.validator import governance_completeness_errors
 from app.governance.canonicalize import canonicalize_and_hash
+from app.governance.status_projection import STATUS_BY_EVENT_TYPE, apply_ledger_event, get_projected_status
 from app.schemas.clear.ledger import LedgerEventType, DerivedDecisionStatus
 
 logger = logging.getLogger(__name__)
@@ -19,28 +22,58 @@ class LedgerServiceError(Exception):
 
 def _derive_status_from_ledger(db: Session, decision_id: UUID) -> str:
     """Compute current status from ledger event sequence (last relevant event wins)."""
-    events = (
-        db.query(DecisionLedgerEvent)
-        .filter(DecisionLedgerEvent.decision_id == decision_id)
-        .order_by(DecisionLedgerEvent.created_at.desc())
-        .all()
+    latest = (
+        db.query(DecisionLedgerEvent.event_type)
+        .filter(
+            DecisionLedgerEvent.decision_id == decision_id,
+            DecisionLedgerEvent.event_type.in_(STATUS_BY_EVENT_TYPE.keys()),
+        )
+        .order_by(DecisionLedgerEvent.created_at.desc(), DecisionLedgerEvent.id.desc())
+        .limit(1)
+        .first()
     )
-    for ev in events:
-        if ev.event_type == LedgerEventType.DECISION_ARCHIVED.value:
-            return DerivedDecisionStatus.ARCHIVED.value
-        if ev.event_type == LedgerEventType.OUTCOME_CAPTURED.value:
-            return DerivedDecisionStatus.OUTCOME_TRACKED.value
-        if ev.event_type == LedgerEventType.IMPLEMENTATION_COMPLETED.value:
-            return DerivedDecisionStatus.IMPLEMENTED.value
-        if ev.event_type == LedgerEventType.IMPLEMENTATION_STARTED.value:
-            return DerivedDecisionStatus.IN_PROGRESS.value
-        if ev.event_type == LedgerEventType.FINALIZATION_ACKNOWLEDGED.value:
-            return DerivedDecisionStatus.SIGNED.value
-        if ev.event_type == LedgerEventType.ARTIFACT_FINALIZED.value:
-            return DerivedDecisionStatus.FINALIZED.value
+    if latest:
+        return STATUS_BY_EVENT_TYPE[latest[0]]
     return DerivedDecisionStatus.DRAFT.value
 
 
+def derive_statuses(db: Session, decision_ids: Iterable[UUID]) -> dict[UUID, str]:
+    """
+    Set-based companion to _derive_status_from_ledger: status for many decisions in one statement.
+    DISTINCT ON (decision_id) keeps the latest status-bearing event per decision; decisions
+    without one are draft. Same ordering (created_at desc, id desc) as the scalar replay.
+    """
+    ids = list(dict.fromkeys(decision_ids))
+    if not ids:
+        return {}
+    rows = (
+        db.query(DecisionLedgerEvent.decision_id, DecisionLedgerEvent.event_type)
+        .filter(
+            DecisionLedgerEvent.decision_id.in_(ids),
+            DecisionLedgerEvent.event_type.in_(STATUS_BY_EVENT_TYPE.keys()),
+        )
+        .distinct(DecisionLedgerEvent.decision_id)
+        .order_by(
+            DecisionLedgerEvent.decision_id,
+            DecisionLedgerEvent.created_at.desc(),
+            DecisionLedgerEvent.id.desc(),
+        )
+        .all()
+    )
+    statuses = {decision_id: DerivedDecisionStatus.DRAFT.value for decision_id in ids}
+    for decision_id, event_type in rows:
+        statuses[decision_id] = STATUS_BY_EVENT_TYPE[event_type]
+    return statuses
+
+
+def get_decision_status(db: Session, decision_id: UUID) -> str:
+    """Current derived status: one indexed read from decision_status_projection; replays the ledger if no row yet."""
+    status = get_projected_status(db, decision_id)
+    if status is not None:
+        return status
+    return _derive_status_from_ledger(db, decision_id)
+
+
 def _latest_artifact_for_decision(db: Session, decision_id: UUID) -> DecisionArtifact | None:
     """Latest artifact (by created_at) for this decision."""
     return (
@@ -62,10 +95,12 @@ def create_decision(
     initial_artifact: dict | None = None,
     actor_id: str | None = None,
     actor_role: str | None = None,
+    commit: bool = True,
 ) -> Decision:
     """
     Create decision + DECISION_INITIATED event. Optionally insert first artifact (ARTIFACT_DRAFT_CREATED).
-    No mutable status/version on decisions table.
+    No mutable status/version on decisions table. commit=False only flushes, for callers that commit
+    the decision together with their own rows.
     """
     decision_uuid = uuid4()
     decision = Decision(
@@ -85,6 +120,7 @@ def create_decision(
             actor_role=actor_role,
         )
     )
+    apply_ledger_event(db, decision_uuid, LedgerEventType.DECISION_INITIATED.value, enterprise_id)
     if initial_artifact is not None:
         _cstr, artifact_hash, artifact_dict = canonicalize_and_hash(initial_artifact)
         version_id = uuid4()
@@ -112,6 +148,10 @@ def create_decision(
                 actor_role=actor_role,
             )
         )
+        apply_ledger_event(db, decision_uuid, LedgerEventType.ARTIFACT_DRAFT_CREATED.value, enterprise_id)
+    if not commit:
+        db.flush()
+        return decision
     db.commit()
     db.refresh(decision)
     return decision
@@ -168,6 +208,7 @@ def append_artifact_created(
             changed_fields_summary=changed_fields_summary,
         )
     )
+    apply_ledger_event(db, decision_id, event_type, decision.enterprise_id)
     db.commit()
     db.refresh(art)
     return art
@@ -211,6 +252,7 @@ def finalize_decision(
             actor_role=actor_role,
         )
     )
+    apply_ledger_event(db, decision_id, LedgerEventType.ARTIFACT_FINALIZED.value, decision.enterprise_id)
     db.commit()
     db.refresh(decision)
     return decision
@@ -240,6 +282,7 @@ def sign_off_decision(
             actor_role=actor_role,
         )
     )
+    apply_ledger_event(db, decision_id, LedgerEventType.FINALIZATION_ACKNOWLEDGED.value, decision.enterprise_id)
     db.commit()
     db.refresh(decision)
     return decision
@@ -277,6 +320,7 @@ def transition_status(
             actor_role=actor_role,
         )
     )
+    apply_ledger_event(db, decision_id, event_type, decision.enterprise_id)
     db.commit()
     db.refresh(decision)
     return decision
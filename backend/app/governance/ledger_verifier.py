@@ -0,0 +1,337 @@
+"""
+Streaming integrity verifier for decision_artifacts and decision_ledger_events.
+
+Both tables are read through server-side cursors (stream_results) in batches, ordered by decision,
+so memory stays bounded by one batch plus one decision's chain. Checks:
+- Artifacts: canonical_hash recomputed from canonical_json on a process pool (hash_mismatch);
+  supersedes chain per decision is a single linear chain from one root (chain_*, supersedes_*);
+  every artifact version has its draft ledger event (artifact_without_event).
+- Events (in append order, by id): first event is DECISION_INITIATED, timestamps never go back,
+  artifact events reference a version of the same decision whose supersedes matches the event type,
+  legacy supersedes_event_id points at an earlier event of the same decision, and the lifecycle
+  replays under the same rules ledger_service enforces (no draft edits after leaving draft,
+  finalize only from draft, sign-off only after finalize).
+
+The report is a plain dict (JSON-serializable): counts per issue kind, the first max_issues issues,
+and throughput. Used by scripts/verify_ledger_integrity.py.
+"""
+import json
+import multiprocessing
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Optional
+
+from sqlalchemy import Text, cast, exists, select
+from sqlalchemy.orm import Session, aliased
+
+from app.db.models import Decision, DecisionArtifact, DecisionLedgerEvent
+from app.governance.canonicalize import compute_canonical_hash
+from app.governance.status_projection import STATUS_BY_EVENT_TYPE
+
+DEFAULT_BATCH_SIZE = 2000
+DEFAULT_MAX_ISSUES = 1000
+
+DRAFT_EVENT_TYPES = ("ARTIFACT_DRAFT_CREATED", "ARTIFACT_DRAFT_UPDATED")
+ARTIFACT_EVENT_TYPES = DRAFT_EVENT_TYPES + ("ARTIFACT_FINALIZED",)
+
+
+def _hash_batch(rows: list[tuple[str, str, str, str]]) -> list[dict[str, Any]]:
+    """Process-pool worker: (decision_id, artifact_id, canonical_json text, stored hash) -> hash issues."""
+    issues = []
+    for decision_id, artifact_id, canonical_text, stored_hash in rows:
+        try:
+            actual = compute_canonical_hash(json.loads(canonical_text))
+        except (TypeError, ValueError) as e:
+            issues.append({
+                "kind": "hash_uncomputable",
+                "decision_id": decision_id,
+                "artifact_id": artifact_id,
+                "detail": str(e),
+            })
+            continue
+        if actual != stored_hash:
+            issues.append({
+                "kind": "hash_mismatch",
+                "decision_id": decision_id,
+                "artifact_id": artifact_id,
+                "detail": {"stored": stored_hash, "recomputed": actual},
+            })
+    return issues
+
+
+class _Report:
+    """Issue collector: counts every issue, keeps the first max_issues."""
+
+    def __init__(self, max_issues: int):
+        self.max_issues = max_issues
+        self.counts: Counter = Counter()
+        self.issues: list[dict[str, Any]] = []
+
+    def add(self, issue: dict[str, Any]) -> None:
+        self.counts[issue["kind"]] += 1
+        if len(self.issues) < self.max_issues:
+            self.issues.append(issue)
+
+    def extend(self, issues: Iterable[dict[str, Any]]) -> None:
+        for issue in issues:
+            self.add(issue)
+
+
+def _check_chain(decision_id: str, versions: list[tuple], report: _Report) -> None:
+    """
+    versions: (artifact_id, version_id, supersedes_version_id, created_at) for one decision, oldest first.
+    The chain must be linear: one root, every supersedes target a version of this decision, no forks.
+    """
+    by_version = {v[1]: v for v in versions}
+    children: dict[Any, list] = {}
+    roots = []
+    for artifact_id, version_id, supersedes, created_at in versions:
+        if supersedes is None:
+            roots.append(version_id)
+            continue
+        parent = by_version.get(supersedes)
+        if parent is None:
+            report.add({
+                "kind": "supersedes_unknown_version",
+                "decision_id": decision_id,
+                "artifact_id": str(artifact_id),
+                "detail": {"supersedes_version_id": str(supersedes)},
+            })
+            continue
+        if parent[3] > created_at:
+            report.add({
+                "kind": "supersedes_newer_version",
+                "decision_id": decision_id,
+                "artifact_id": str(artifact_id),
+                "detail": {"supersedes_version_id": str(supersedes)},
+            })
+        children.setdefault(supersedes, []).append(version_id)
+    if len(roots) != 1:
+        report.add({
+            "kind": "chain_root_count",
+            "decision_id": decision_id,
+            "detail": {"roots": [str(r) for r in roots]},
+        })
+    for parent, kids in children.items():
+        if len(kids) > 1:
+            report.add({
+                "kind": "chain_fork",
+                "decision_id": decision_id,
+                "detail": {"version_id": str(parent), "superseded_by": [str(k) for k in kids]},
+            })
+    if len(roots) == 1:
+        seen = 0
+        stack = [roots[0]]
+        visited = set()
+        while stack:
+            version_id = stack.pop()
+            if version_id in visited:
+                continue
+            visited.add(version_id)
+            seen += 1
+            stack.extend(children.get(version_id, ()))
+        if seen != len(versions):
+            report.add({
+                "kind": "chain_disconnected",
+                "decision_id": decision_id,
+                "detail": {"versions": len(versions), "reachable_from_root": seen},
+            })
+
+
+def _check_events(decision_id: str, events: list[tuple], report: _Report) -> None:
+    """
+    events: one decision's ledger events in append order (id asc):
+    (id, event_id, event_type, created_at, version_id, version_decision_id, version_supersedes,
+     supersedes_event_id, supersedes_event_decision_id, supersedes_event_seq).
+    """
+    status = "draft"
+    prev_created_at = None
+    for seq, event_id, event_type, created_at, version_id, version_decision_id, version_supersedes, \
+            sup_event_id, sup_event_decision_id, sup_event_seq in events:
+        ref = {"decision_id": decision_id, "event_id": str(event_id), "event_type": event_type}
+        if prev_created_at is None:
+            if event_type != "DECISION_INITIATED":
+                report.add({"kind": "first_event_not_initiated", **ref})
+        elif event_type == "DECISION_INITIATED":
+            report.add({"kind": "duplicate_initiated", **ref})
+        if prev_created_at is not None and created_at < prev_created_at:
+            report.add({"kind": "timestamp_regression", **ref, "detail": {"previous_created_at": prev_created_at.isoformat()}})
+        prev_created_at = created_at
+
+        if event_type in ARTIFACT_EVENT_TYPES:
+            if version_id is None:
+                report.add({"kind": "event_version_missing", **ref})
+            elif str(version_decision_id) != decision_id:
+                report.add({"kind": "event_version_other_decision", **ref, "detail": {"version_id": str(version_id)}})
+            elif event_type in DRAFT_EVENT_TYPES and (version_supersedes is None) != (event_type == "ARTIFACT_DRAFT_CREATED"):
+                report.add({"kind": "event_type_supersedes_mismatch", **ref, "detail": {"version_id": str(version_id)}})
+        if sup_event_id is not None and (str(sup_event_decision_id) != decision_id or sup_event_seq is None or sup_event_seq >= seq):
+            report.add({"kind": "supersedes_event_invalid", **ref, "detail": {"supersedes_event_id": str(sup_event_id)}})
+
+        if event_type in DRAFT_EVENT_TYPES and status != "draft":
+            report.add({"kind": "draft_event_after_draft", **ref, "detail": {"status": status}})
+        elif event_type == "ARTIFACT_FINALIZED" and status != "draft":
+            report.add({"kind": "finalize_when_not_draft", **ref, "detail": {"status": status}})
+        elif event_type == "FINALIZATION_ACKNOWLEDGED" and status != "finalized":
+            report.add({"kind": "sign_off_before_finalize", **ref, "detail": {"status": status}})
+        status = STATUS_BY_EVENT_TYPE.get(event_type, status)
+
+
+def _grouped(partitions: Iterable[list], key_index: int = 0) -> Iterable[tuple[Any, list]]:
+    """Regroup a decision-ordered row stream into (decision_id, rows) without materializing it."""
+    current, group = None, []
+    for partition in partitions:
+        for row in partition:
+            if row[key_index] != current and group:
+                yield current, group
+                group = []
+            current = row[key_index]
+            group.append(row)
+    if group:
+        yield current, group
+
+
+def verify_ledger(
+    db: Session,
+    enterprise_id: Optional[int] = None,
+    workers: int = 0,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    max_issues: int = DEFAULT_MAX_ISSUES,
+    progress: Optional[Callable[[str, int], None]] = None,
+) -> dict[str, Any]:
+    """
+    Verify artifacts and ledger events. workers > 1 hashes on a process pool (spawned, so it also
+    works on Windows); otherwise hashing runs inline. progress(stage, rows_done) is called per batch.
+    Read-only.
+    """
+    report = _Report(max_issues)
+    started = time.perf_counter()
+    started_at = datetime.now(timezone.utc)
+    pool = (
+        ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        if workers > 1 else None
+    )
+    pending: deque[Future] = deque()
+
+    def submit(rows: list[tuple[str, str, str, str]]) -> None:
+        if pool is None:
+            report.extend(_hash_batch(rows))
+            return
+        pending.append(pool.submit(_hash_batch, rows))
+        while len(pending) > workers * 2:
+            report.extend(pending.popleft().result())
+
+    # ----- Artifacts: hashes on the pool, chains inline -----
+    has_event = exists().where(
+        DecisionLedgerEvent.version_id == DecisionArtifact.version_id,
+        DecisionLedgerEvent.event_type.in_(DRAFT_EVENT_TYPES),
+    )
+    stmt = select(
+        DecisionArtifact.decision_id,
+        DecisionArtifact.artifact_id,
+        DecisionArtifact.version_id,
+        DecisionArtifact.supersedes_version_id,
+        DecisionArtifact.created_at,
+        DecisionArtifact.canonical_hash,
+        cast(DecisionArtifact.canonical_json, Text),
+        has_event,
+    ).order_by(DecisionArtifact.decision_id, DecisionArtifact.created_at, DecisionArtifact.artifact_id)
+    if enterprise_id is not None:
+        stmt = stmt.where(DecisionArtifact.enterprise_id == enterprise_id)
+    artifacts_checked = 0
+    bytes_hashed = 0
+    decisions_with_artifacts = 0
+    try:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+
+        def artifact_batches():
+            nonlocal artifacts_checked, bytes_hashed
+            for partition in result.partitions(batch_size):
+                submit([(str(r[0]), str(r[1]), r[6], r[5]) for r in partition])
+                artifacts_checked += len(partition)
+                bytes_hashed += sum(len(r[6]) for r in partition)
+                if progress:
+                    progress("artifacts", artifacts_checked)
+                yield partition
+
+        for decision_id, rows in _grouped(artifact_batches()):
+            decisions_with_artifacts += 1
+            decision_id = str(decision_id)
+            _check_chain(decision_id, [(r[1], r[2], r[3], r[4]) for r in rows], report)
+            for r in rows:
+                if not r[7]:
+                    report.add({"kind": "artifact_without_event", "decision_id": decision_id, "artifact_id": str(r[1])})
+        while pending:
+            report.extend(pending.popleft().result())
+        artifacts_elapsed = time.perf_counter() - started
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+    # ----- Events: ordering and references, in append order per decision -----
+    version = aliased(DecisionArtifact)
+    superseded = aliased(DecisionLedgerEvent)
+    stmt = (
+        select(
+            DecisionLedgerEvent.decision_id,
+            DecisionLedgerEvent.id,
+            DecisionLedgerEvent.event_id,
+            DecisionLedgerEvent.event_type,
+            DecisionLedgerEvent.created_at,
+            DecisionLedgerEvent.version_id,
+            version.decision_id,
+            version.supersedes_version_id,
+            DecisionLedgerEvent.supersedes_event_id,
+            superseded.decision_id,
+            superseded.id,
+        )
+        .outerjoin(version, version.version_id == DecisionLedgerEvent.version_id)
+        .outerjoin(superseded, superseded.event_id == DecisionLedgerEvent.supersedes_event_id)
+        .order_by(DecisionLedgerEvent.decision_id, DecisionLedgerEvent.id)
+    )
+    if enterprise_id is not None:
+        stmt = stmt.where(
+            exists().where(Decision.decision_id == DecisionLedgerEvent.decision_id, Decision.enterprise_id == enterprise_id)
+        )
+    events_started = time.perf_counter()
+    events_checked = 0
+    decisions_with_events = 0
+    result = db.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+
+    def event_batches():
+        nonlocal events_checked
+        for partition in result.partitions(batch_size):
+            events_checked += len(partition)
+            if progress:
+                progress("events", events_checked)
+            yield partition
+
+    for decision_id, rows in _grouped(event_batches()):
+        decisions_with_events += 1
+        _check_events(str(decision_id), [tuple(r[1:]) for r in rows], report)
+    events_elapsed = time.perf_counter() - events_started
+    elapsed = time.perf_counter() - started
+
+    return {
+        "ok": not report.counts,
+        "scope": {"enterprise_id": enterprise_id},
+        "started_at": started_at.isoformat(),
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "artifacts_checked": artifacts_checked,
+        "events_checked": events_checked,
+        "decisions_with_artifacts": decisions_with_artifacts,
+        "decisions_with_events": decisions_with_events,
+        "issue_counts": dict(report.counts),
+        "issues": report.issues,
+        "issues_truncated": sum(report.counts.values()) > len(report.issues),
+        "throughput": {
+            "elapsed_seconds": round(elapsed, 3),
+            "artifacts_per_second": round(artifacts_checked / artifacts_elapsed, 1) if artifacts_elapsed else None,
+            "events_per_second": round(events_checked / events_elapsed, 1) if events_elapsed else None,
+            "canonical_json_mb": round(bytes_hashed / 1_000_000, 2),
+            "workers": workers if workers > 1 else 1,
+            "batch_size": batch_size,
+        },
+    }
@@ -29,18 +29,30 @@ def compute_readiness(db: Session, decision_id: UUID) -> dict[str, Any]:
     number_of_reviews = db.query(func.count(OutcomeReview.id)).filter(OutcomeReview.decision_id == decision_id).scalar() or 0
 
     latest = _get_latest_artifact(db, decision_id)
-    emr = (latest.canonical_json or {}).get("emr") or {} if latest else {}
+    artifact_json = (latest.canonical_json or {}) if latest else None
+    emr = (artifact_json or {}).get("emr") or {}
+    milestones = None
+    if not (emr.get("milestones") or []):
+        milestones = db.query(DecisionExecutionMilestone).filter(DecisionExecutionMilestone.decision_id == decision_id).all()
+    return _readiness_from_rows(number_of_reviews, artifact_json, milestones or [])
+
+
+def _readiness_from_rows(number_of_reviews: int, artifact_json: dict | None, milestones: list) -> dict[str, Any]:
+    """
+    Pure band computation. artifact_json is the latest artifact's canonical_json (None if no artifact);
+    milestones (status attribute) are only used when the artifact has no EMR milestones.
+    """
+    emr = (artifact_json or {}).get("emr") or {}
     emr_milestones = emr.get("milestones") or []
     if emr_milestones:
         total_milestones = len(emr_milestones)
         completed_milestones = sum(1 for m in emr_milestones if (m.get("status") or "").lower() == "done")
     else:
-        milestones = db.query(DecisionExecutionMilestone).filter(DecisionExecutionMilestone.decision_id == decision_id).all()
         total_milestones = len(milestones)
         completed_milestones = sum(1 for m in milestones if (m.status or "").lower() == "completed")
     milestone_completion_rate = completed_milestones / total_milestones if total_milestones > 0 else 0.0
 
-    governance = (latest.canonical_json or {}).get("governance") or {} if latest else {}
+    governance = (artifact_json or {}).get("governance") or {}
     approval_status = (governance.get("approval_status") or "draft").lower()
     governance_adherence = 1.0 if approval_status == "approved" else 0.0
 
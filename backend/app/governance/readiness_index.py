@@ -23,7 +23,7 @@ from app.db.models import (
     DecisionEvidenceLink,
     OutcomeReview,
 )
-from app.governance.ledger_service import _derive_status_from_ledger
+from app.governance.ledger_service import derive_statuses
 
 # Weights (points out of 100)
 ACTIVATION_MAX = 20
@@ -31,6 +31,9 @@ HEALTH_MAX = 35
 VELOCITY_MAX = 25
 GOVERNANCE_MAX = 20
 
+# Member roles that count as sharing with partners (governance maturity)
+PARTNER_ROLES = ["capital_partner", "partner", "advisor"]
+
 # Velocity band -> points (Component 3)
 VELOCITY_POINTS = {"fast": 25, "healthy": 20, "slow": 12, "at_risk": 5}
 
@@ -153,10 +156,8 @@ def compute_governance_maturity_metrics(db: Session, enterprise_id: int) -> dict
             "pct_shared_with_partners": 0.0,
             "total_decisions": 0,
         }
-    n = len(decisions)
     decision_ids = [d.decision_id for d in decisions]
-    finalized = sum(1 for d in decisions if _derive_status_from_ledger(db, d.decision_id) not in ("draft",))
-    review_scheduled = sum(1 for d in decisions if getattr(d, "outcome_review_reminder", False))
+    statuses = derive_statuses(db, decision_ids)
     with_evidence = (
         db.query(func.count(func.distinct(DecisionEvidenceLink.decision_id)))
         .filter(DecisionEvidenceLink.decision_id.in_(decision_ids))
@@ -168,11 +169,24 @@ def compute_governance_maturity_metrics(db: Session, enterprise_id: int) -> dict
         db.query(func.count(func.distinct(EnterpriseMember.enterprise_id)))
         .filter(
             EnterpriseMember.enterprise_id == enterprise_id,
-            EnterpriseMember.role.in_(["capital_partner", "partner", "advisor"]),
+            EnterpriseMember.role.in_(PARTNER_ROLES),
         )
         .scalar() or 0
     )
-    pct_shared = 1.0 if partner_count > 0 else 0.0  # binary for now
+    return _governance_metrics_from_rows(decisions, statuses, with_evidence, partner_count > 0)
+
+
+def _governance_metrics_from_rows(
+    decisions: list,
+    statuses: dict,
+    with_evidence: int,
+    has_partner: bool,
+) -> dict[str, Any]:
+    """Pure governance maturity metrics over one enterprise's (non-empty) decisions."""
+    n = len(decisions)
+    finalized = sum(1 for d in decisions if statuses[d.decision_id] not in ("draft",))
+    review_scheduled = sum(1 for d in decisions if getattr(d, "outcome_review_reminder", False))
+    pct_shared = 1.0 if has_partner else 0.0  # binary for now
 
     return {
         "pct_finalized": round(finalized / n, 4) if n else 0.0,
@@ -240,17 +254,22 @@ def _trend_from_snapshots(db: Session, enterprise_id: int, current_index: int) -
             .limit(1)
             .first()
         )
-        if not prev or prev.readiness_index is None:
-            return None
-        if current_index > prev.readiness_index:
-            return "Improving"
-        if current_index < prev.readiness_index:
-            return "Declining"
-        return "Stable"
+        return _trend_from_previous(prev.readiness_index if prev else None, current_index)
     except Exception:
         return None
 
 
+def _trend_from_previous(prev_index: Optional[int], current_index: int) -> Optional[str]:
+    """Improving | Declining | Stable vs the previous snapshot index; None when there is none."""
+    if prev_index is None:
+        return None
+    if current_index > prev_index:
+        return "Improving"
+    if current_index < prev_index:
+        return "Declining"
+    return "Stable"
+
+
 def save_readiness_snapshot(
     db: Session,
     enterprise_id: int,
@@ -0,0 +1,185 @@
+"""
+Decision status projection: read model over decision_ledger_events.
+
+The ledger stays the source of truth. Every ledger append also calls apply_ledger_event in the
+same session, so the projection row commits (or rolls back) together with the event. Status
+lookups become a single primary-key read instead of a replay of every event for the decision.
+rebuild_status_projection / verify_status_projection replay the ledger to repair or report drift.
+"""
+from typing import Any, Iterable, Optional
+from uuid import UUID
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db.models import Decision, DecisionLedgerEvent, DecisionStatusProjection
+from app.governance import decision_cache
+from app.schemas.clear.ledger import LedgerEventType, DerivedDecisionStatus
+
+# Event types that set derived status (last one wins). Other events leave status unchanged.
+STATUS_BY_EVENT_TYPE: dict[str, str] = {
+    LedgerEventType.DECISION_ARCHIVED.value: DerivedDecisionStatus.ARCHIVED.value,
+    LedgerEventType.OUTCOME_CAPTURED.value: DerivedDecisionStatus.OUTCOME_TRACKED.value,
+    LedgerEventType.IMPLEMENTATION_COMPLETED.value: DerivedDecisionStatus.IMPLEMENTED.value,
+    LedgerEventType.IMPLEMENTATION_STARTED.value: DerivedDecisionStatus.IN_PROGRESS.value,
+    LedgerEventType.FINALIZATION_ACKNOWLEDGED.value: DerivedDecisionStatus.SIGNED.value,
+    LedgerEventType.ARTIFACT_FINALIZED.value: DerivedDecisionStatus.FINALIZED.value,
+}
+
+REBUILD_BATCH_SIZE = 500
+
+
+def apply_ledger_event(
+    db: Session,
+    decision_id: UUID,
+    event_type: str,
+    enterprise_id: Optional[int] = None,
+) -> None:
+    """
+    Fold one appended ledger event into the projection (upsert; no commit).
+    Call right after db.add(DecisionLedgerEvent(...)) so both land in the same transaction.
+    Also drops the cached DecisionOut for the decision.
+    """
+    new_status = STATUS_BY_EVENT_TYPE.get(event_type)
+    table = DecisionStatusProjection.__table__
+    stmt = pg_insert(table).values(
+        decision_id=decision_id,
+        enterprise_id=enterprise_id,
+        status=new_status or DerivedDecisionStatus.DRAFT.value,
+        ledger_seq=1,
+        last_event_type=event_type,
+        last_event_at=func.now(),
+    )
+    set_ = {
+        "ledger_seq": table.c.ledger_seq + 1,
+        "last_event_type": event_type,
+        "last_event_at": func.now(),
+        "updated_at": func.now(),
+    }
+    if new_status is not None:
+        set_["status"] = new_status
+    if enterprise_id is not None:
+        set_["enterprise_id"] = enterprise_id
+    db.execute(stmt.on_conflict_do_update(index_elements=[table.c.decision_id], set_=set_))
+    decision_cache.invalidate(decision_id)
+
+
+def get_projected_status(db: Session, decision_id: UUID) -> Optional[str]:
+    """Status from the projection, or None when the decision has no projection row yet."""
+    row = (
+        db.query(DecisionStatusProjection.status)
+        .filter(DecisionStatusProjection.decision_id == decision_id)
+        .first()
+    )
+    return row[0] if row else None
+
+
+def _replayed_states(db: Session, decision_ids: list[UUID]) -> dict[UUID, dict[str, Any]]:
+    """Replay the ledger for a batch of decisions: status, event count, last event type and time."""
+    from app.governance.ledger_service import derive_statuses
+
+    statuses = derive_statuses(db, decision_ids)
+    counts = dict.fromkeys(decision_ids, (0, None))
+    for decision_id, seq, last_at in (
+        db.query(DecisionLedgerEvent.decision_id, func.count(DecisionLedgerEvent.id), func.max(DecisionLedgerEvent.created_at))
+        .filter(DecisionLedgerEvent.decision_id.in_(decision_ids))
+        .group_by(DecisionLedgerEvent.decision_id)
+    ):
+        counts[decision_id] = (int(seq), last_at)
+    last_types = dict(
+        db.query(DecisionLedgerEvent.decision_id, DecisionLedgerEvent.event_type)
+        .filter(DecisionLedgerEvent.decision_id.in_(decision_ids))
+        .distinct(DecisionLedgerEvent.decision_id)
+        .order_by(DecisionLedgerEvent.decision_id, DecisionLedgerEvent.created_at.desc(), DecisionLedgerEvent.id.desc())
+        .all()
+    )
+    return {
+        decision_id: {
+            "status": statuses[decision_id],
+            "ledger_seq": counts[decision_id][0],
+            "last_event_type": last_types.get(decision_id),
+            "last_event_at": counts[decision_id][1],
+        }
+        for decision_id in decision_ids
+    }
+
+
+def _decision_rows(db: Session, decision_ids: Optional[Iterable[UUID]], enterprise_id: Optional[int]) -> list:
+    q = db.query(Decision.decision_id, Decision.enterprise_id)
+    if decision_ids is not None:
+        q = q.filter(Decision.decision_id.in_(list(decision_ids)))
+    if enterprise_id is not None:
+        q = q.filter(Decision.enterprise_id == enterprise_id)
+    return q.order_by(Decision.id).all()
+
+
+def _scan(
+    db: Session,
+    decision_ids: Optional[Iterable[UUID]],
+    enterprise_id: Optional[int],
+    repair: bool,
+) -> dict[str, Any]:
+    """Replay the ledger in batches, compare with the projection and optionally overwrite drifted rows."""
+    table = DecisionStatusProjection.__table__
+    rows = _decision_rows(db, decision_ids, enterprise_id)
+    missing: list[str] = []
+    drift: list[dict[str, Any]] = []
+    for start in range(0, len(rows), REBUILD_BATCH_SIZE):
+        batch = rows[start:start + REBUILD_BATCH_SIZE]
+        batch_ids = [r[0] for r in batch]
+        replayed = _replayed_states(db, batch_ids)
+        projected = {
+            p.decision_id: p
+            for p in db.query(DecisionStatusProjection).filter(DecisionStatusProjection.decision_id.in_(batch_ids))
+        }
+        for decision_id, ent_id in batch:
+            state = replayed[decision_id]
+            row = projected.get(decision_id)
+            if row is None:
+                missing.append(str(decision_id))
+            elif row.status != state["status"] or row.ledger_seq != state["ledger_seq"]:
+                drift.append({
+                    "decision_id": str(decision_id),
+                    "projected_status": row.status,
+                    "ledger_status": state["status"],
+                    "projected_seq": row.ledger_seq,
+                    "ledger_seq": state["ledger_seq"],
+                })
+            else:
+                continue
+            if repair:
+                stmt = pg_insert(table).values(decision_id=decision_id, enterprise_id=ent_id, **state)
+                db.execute(
+                    stmt.on_conflict_do_update(
+                        index_elements=[table.c.decision_id],
+                        set_={**state, "enterprise_id": ent_id, "updated_at": func.now()},
+                    )
+                )
+        if repair:
+            db.commit()
+    return {"checked": len(rows), "missing": missing, "drift": drift, "ok": not missing and not drift}
+
+
+def verify_status_projection(
+    db: Session,
+    decision_ids: Optional[Iterable[UUID]] = None,
+    enterprise_id: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    Replay the ledger and compare with the projection. Read-only.
+    Returns: checked, missing (no projection row), drift (status or ledger_seq differs), ok.
+    """
+    return _scan(db, decision_ids, enterprise_id, repair=False)
+
+
+def rebuild_status_projection(
+    db: Session,
+    decision_ids: Optional[Iterable[UUID]] = None,
+    enterprise_id: Optional[int] = None,
+) -> dict[str, Any]:
+    """
+    Replay the ledger and overwrite every missing or drifted projection row (commits in batches).
+    Returns the verify report as it was before the repair.
+    """
+    return _scan(db, decision_ids, enterprise_id, repair=True)
@@ -1,16 +1,120 @@
 """
 Retrieve curated knowledge snippets for synthesis/chat (RAG). No autonomous ingestion.
 Populate knowledge_chunks via offline script or manual ingest.
+
+Retrieval is hybrid, in one statement: full-text (search_tsv, GIN) and vector (embedding <=> q)
+candidates are fused with reciprocal-rank fusion (score = sum of 1 / (RRF_K + rank)). The query
+embedding has KNOWLEDGE_EMBED_TIMEOUT_SECONDS; if it is slow, unavailable or RAG is disabled,
+retrieval runs lexical-only. Tag filters run in SQL; industry/country matches rank first.
+With KNOWLEDGE_INDEX_ENABLED and a query embedding, the vector candidates come from the in-process
+index (vector_index.py, same filters and similarity threshold) instead of the pgvector scan, and are
+fused with the lexical candidates in the same statement, so results match the SQL path; until its
+snapshot is loaded, the vector candidates come from SQL.
 """
 from __future__ import annotations
 
 from typing import Any
 
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import bindparam, text
 from sqlalchemy.orm import Session
 
 from app.config import settings
-from app.db.models import KnowledgeChunk
-from app.rag.vectorstore import get_embedding
+from app.knowledge import vector_index
+from app.rag.vectorstore import EMBEDDING_DIM, get_embedding
+
+_RRF_K = 60
+
+
+def _tag_variants(values: list[str | None]) -> list[str]:
+    """Case variants so jsonb ?| (GIN) matches tags like "Malaysia" for "malaysia" / "MALAYSIA"."""
+    out: list[str] = []
+    for v in values:
+        v = (v or "").strip()
+        for variant in (v, v.lower(), v.title(), v.upper()):
+            if variant and variant not in out:
+                out.append(variant)
+    return out
+
+
+def _candidates(top_k: int) -> int:
+    """Lexical and vector candidates fetched per search before fusion."""
+    return max(20, top_k * 4)
+
+
+def _hybrid_search(
+    db: Session,
+    query_text: str,
+    query_embedding: list[float] | None,
+    top_k: int,
+    tags: list[str] | None = None,
+    source_types: list[str] | None = None,
+    prefer_tags: list[str] | None = None,
+    vector_ids: list[int] | None = None,
+) -> list[Any]:
+    """
+    RRF of lexical and (when query_embedding is given) vector candidates over knowledge_chunks.
+    tags / source_types filter both candidate sets; rows tagged with any prefer_tags sort first.
+    Terms are OR-ed so short domain queries still match; ts_rank_cd favours rows matching more.
+    vector_ids (best first, already filtered) are used as the vector candidates instead of the scan.
+    """
+    params: dict[str, Any] = {"query": query_text, "candidates": _candidates(top_k), "top_k": top_k, "rrf_k": _RRF_K}
+    filters = ""
+    if tags:
+        filters += " AND kc.tags ?| :tags"
+        params["tags"] = tags
+    if source_types:
+        filters += " AND kc.source_type = ANY(:source_types)"
+        params["source_types"] = source_types
+    ctes = [f"""
+        q AS (SELECT replace(plainto_tsquery('english', :query)::text, ' & ', ' | ')::tsquery AS tsq),
+        lex AS (
+            SELECT kc.id, row_number() OVER (ORDER BY ts_rank_cd(kc.search_tsv, q.tsq) DESC, kc.id) AS rnk
+            FROM knowledge_chunks kc, q
+            WHERE kc.search_tsv @@ q.tsq{filters}
+            ORDER BY rnk
+            LIMIT :candidates
+        )"""]
+    bind_types = []
+    if vector_ids is not None:
+        ctes.append("""
+        vec AS (SELECT v.id, v.rnk FROM unnest(CAST(:vector_ids AS integer[])) WITH ORDINALITY AS v(id, rnk))""")
+        params["vector_ids"] = vector_ids
+    elif query_embedding:
+        threshold = ""
+        if settings.RAG_MIN_SIMILARITY is not None:
+            threshold = " AND (kc.embedding <=> :embedding) <= :max_distance"
+            params["max_distance"] = 1 - settings.RAG_MIN_SIMILARITY
+        ctes.append(f"""
+        vec AS (
+            SELECT kc.id, row_number() OVER (ORDER BY kc.embedding <=> :embedding) AS rnk
+            FROM knowledge_chunks kc
+            WHERE kc.embedding IS NOT NULL{threshold}{filters}
+            ORDER BY kc.embedding <=> :embedding
+            LIMIT :candidates
+        )""")
+        params["embedding"] = query_embedding
+        bind_types.append(bindparam("embedding", type_=Vector(EMBEDDING_DIM)))
+    if vector_ids is not None or query_embedding:
+        fused = """
+        SELECT coalesce(lex.id, vec.id) AS id,
+               coalesce(1.0 / (:rrf_k + lex.rnk), 0) + coalesce(1.0 / (:rrf_k + vec.rnk), 0) AS score
+        FROM lex FULL OUTER JOIN vec ON vec.id = lex.id"""
+    else:
+        fused = "SELECT lex.id, 1.0 / (:rrf_k + lex.rnk) AS score FROM lex"
+    order_by = "fused.score DESC, kc.id"
+    if prefer_tags:
+        order_by = "coalesce(kc.tags ?| :prefer_tags, FALSE) DESC, " + order_by
+        params["prefer_tags"] = prefer_tags
+    sql = f"""
+        WITH {",".join(ctes)},
+        fused AS ({fused})
+        SELECT kc.id, kc.source_type, kc.title, kc.content, kc.tags, fused.score
+        FROM fused JOIN knowledge_chunks kc ON kc.id = fused.id
+        ORDER BY {order_by}
+        LIMIT :top_k
+    """
+    return list(db.execute(text(sql).bindparams(*bind_types), params).all())
 
 
 def retrieve_knowledge_snippets(
@@ -20,11 +124,15 @@ def retrieve_knowledge_snippets(
     topic_keywords: list[str] | None = None,
     db: Session | None = None,
     top_k: int = 5,
+    tags: list[str] | None = None,
+    source_types: list[str] | None = None,
 ) -> list[dict[str, Any]]:
     """
     Return top K short snippets (1–3 sentences) from knowledge_chunks.
     Builds search from domain + industry + country + topic_keywords.
-    Uses vector similarity when embedding is available; else tag match.
+    Hybrid full-text + vector (RRF); lexical-only when no embedding is available in time.
+    Vector candidates from the in-process index when enabled and loaded.
+    tags / source_types restrict results; chunks tagged with the industry or country rank first.
     """
     if not db:
         return []
@@ -39,36 +147,31 @@ def retrieve_knowledge_snippets(
     query_text = " ".join(query_parts)
 
     try:
+        query_embedding = None
         if getattr(settings, "RAG_ENABLED", False):
-            query_embedding = get_embedding(query_text)
-            if query_embedding:
-                embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
-                conn = db.connection().connection
-                with conn.cursor() as cursor:
-                    cursor.execute("""
-                        SELECT id, source_type, title, content, tags
-                        FROM knowledge_chunks
-                        WHERE embedding IS NOT NULL
-                        ORDER BY embedding <=> %s::vector
-                        LIMIT %s
-                    """, (embedding_str, top_k))
-                    rows = cursor.fetchall()
-                snippets = []
-                for row in rows:
-                    _id, source_type, title, content, tags = row[0], row[1], row[2], row[3], row[4]
-                    text = (content or "")[:500].strip()
-                    if not text:
-                        continue
-                    snippets.append({"id": _id, "source_type": source_type or "", "title": title or "", "content": text, "tags": tags or []})
-                return snippets
-        chunks = db.query(KnowledgeChunk).limit(top_k * 2).all()
+            query_embedding = get_embedding(query_text, timeout=settings.KNOWLEDGE_EMBED_TIMEOUT_SECONDS) or None
+        tag_filter = _tag_variants(tags or []) or None
+        prefer_tags = _tag_variants([industry, country]) or None
+        vector_ids = None
+        if query_embedding:
+            hits = vector_index.search(query_embedding, _candidates(top_k), tags=tag_filter, source_types=source_types)
+            if hits is not None:
+                vector_ids = [h["id"] for h in hits]
+        rows = _hybrid_search(
+            db,
+            query_text,
+            query_embedding,
+            top_k,
+            tags=tag_filter,
+            source_types=source_types,
+            prefer_tags=prefer_tags,
+            vector_ids=vector_ids,
+        )
         out = []
-        for c in chunks:
-            text = (c.content or "")[:500].strip()
-            if text:
-                out.append({"id": c.id, "source_type": c.source_type or "", "title": c.title or "", "content": text, "tags": (c.tags or [])})
-            if len(out) >= top_k:
-                break
+        for row in rows:
+            text_ = (row.content or "")[:500].strip()
+            if text_:
+                out.append({"id": row.id, "source_type": row.source_type or "", "title": row.title or "", "content": text_, "tags": row.tags or []})
         return out
     except Exception:
         return []
@@ -0,0 +1,249 @@
+"""
+Optional in-process vector index for knowledge_chunks (KNOWLEDGE_INDEX_ENABLED, requires numpy).
+
+The corpus is small and curated, so its embeddings fit in one contiguous float32 matrix. A snapshot
+is written to KNOWLEDGE_INDEX_DIR as <version>.f32 (rows L2-normalised, so a dot product is cosine
+similarity) plus <version>.json (ids and snippet metadata). Workers memory-map the same file, so
+the pages are shared. The version is a fingerprint of (id, content_hash, embedding model) over the
+table: a changed corpus gets a new file, and unchanged workers just map the existing one.
+
+Queries never block on the database. The version is re-checked in a background thread at most every
+KNOWLEDGE_INDEX_REFRESH_SECONDS, or on the next query after invalidate() (called by bulk ingest).
+Until a snapshot is loaded, search() returns None and callers use the SQL path. Like the SQL vector
+candidates, hits below RAG_MIN_SIMILARITY are dropped; retrieval.py fuses the hits with the lexical
+candidates, so the index replaces only the vector scan.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SNIPPET_CHARS = 500
+
+
+class _Snapshot:
+    def __init__(self, version: str, matrix: Any, meta: list[dict[str, Any]]):
+        self.version = version
+        self.matrix = matrix  # np.memmap (n, dim) float32, rows L2-normalised
+        self.meta = meta  # per row: id, source_type, title, content (truncated), tags
+
+
+_snapshot: Optional[_Snapshot] = None
+_last_check = 0.0
+_refreshing = threading.Lock()
+_stats = {"queries": 0, "served": 0, "not_ready": 0, "refreshes": 0, "builds": 0, "errors": 0}
+_numpy_missing_logged = False
+
+
+def _numpy():
+    """numpy module, or None (logged once) when it is not installed."""
+    global _numpy_missing_logged
+    try:
+        import numpy
+
+        return numpy
+    except ImportError:
+        if not _numpy_missing_logged:
+            logger.warning("KNOWLEDGE_INDEX_ENABLED but numpy is not installed; using SQL retrieval")
+            _numpy_missing_logged = True
+        return None
+
+
+def _index_dir() -> Path:
+    d = Path(settings.KNOWLEDGE_INDEX_DIR or os.path.join(tempfile.gettempdir(), "clear_knowledge_index"))
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def corpus_version(db) -> str:
+    """Fingerprint of the embedded corpus; changes when any chunk is added, removed, edited or (re)embedded."""
+    from sqlalchemy import text
+
+    row = db.execute(text("""
+        SELECT count(*) AS n,
+               md5(coalesce(string_agg(id::text || ':' || coalesce(content_hash, '') || ':'
+                   || coalesce(embedding_model, '') || ':' || (embedding IS NOT NULL)::text, ',' ORDER BY id), '')) AS digest
+        FROM knowledge_chunks
+    """)).one()
+    return f"{row.n}-{row.digest[:16]}"
+
+
+def build_snapshot(db, version: str) -> Path:
+    """Stream embedded chunks into <version>.f32 / .json (atomic renames; bounded memory). Returns the .f32 path."""
+    import numpy as np
+
+    from app.db.models import KnowledgeChunk
+
+    base = _index_dir()
+    f32_path, meta_path = base / f"{version}.f32", base / f"{version}.json"
+    if f32_path.exists() and meta_path.exists():
+        return f32_path
+    tmp_f32 = base / f"{version}.f32.{os.getpid()}.tmp"
+    tmp_meta = base / f"{version}.json.{os.getpid()}.tmp"
+    meta: list[dict[str, Any]] = []
+    dim = None
+    query = (
+        db.query(KnowledgeChunk.id, KnowledgeChunk.source_type, KnowledgeChunk.title,
+                 KnowledgeChunk.content, KnowledgeChunk.tags, KnowledgeChunk.embedding)
+        .filter(KnowledgeChunk.embedding.isnot(None))
+        .order_by(KnowledgeChunk.id)
+        .execution_options(stream_results=True, yield_per=1000)
+    )
+    with open(tmp_f32, "wb") as fh:
+        for row in query:
+            snippet = (row.content or "")[:_SNIPPET_CHARS].strip()
+            vec = np.asarray(row.embedding, dtype=np.float32)
+            norm = float(np.linalg.norm(vec))
+            if not snippet or norm == 0.0:
+                continue
+            dim = dim or vec.shape[0]
+            fh.write((vec / norm).tobytes())
+            meta.append({
+                "id": row.id,
+                "source_type": row.source_type or "",
+                "title": row.title or "",
+                "content": snippet,
+                "tags": row.tags or [],
+            })
+    tmp_meta.write_text(json.dumps({"version": version, "dim": dim or 0, "rows": meta}))
+    os.replace(tmp_f32, f32_path)
+    os.replace(tmp_meta, meta_path)
+    _stats["builds"] += 1
+    for old in base.iterdir():
+        if old.suffix in (".f32", ".json") and old.stem != version:
+            try:
+                old.unlink()  # workers still mapping it keep their pages until they switch
+            except OSError:
+                pass
+    return f32_path
+
+
+def _load(version: str) -> _Snapshot:
+    import numpy as np
+
+    base = _index_dir()
+    payload = json.loads((base / f"{version}.json").read_text())
+    rows, dim = payload["rows"], payload["dim"]
+    if not rows:
+        matrix = np.zeros((0, dim or 1), dtype=np.float32)
+    else:
+        matrix = np.memmap(base / f"{version}.f32", dtype=np.float32, mode="r", shape=(len(rows), dim))
+    return _Snapshot(version, matrix, rows)
+
+
+def refresh(force: bool = False) -> Optional[str]:
+    """Check the corpus version; build/map a new snapshot if it changed. Returns the loaded version."""
+    global _snapshot, _last_check
+    from app.db.database import SessionLocal
+
+    _last_check = time.time()
+    db = SessionLocal()
+    try:
+        version = corpus_version(db)
+        if force or _snapshot is None or _snapshot.version != version:
+            build_snapshot(db, version)
+            _snapshot = _load(version)
+            _stats["refreshes"] += 1
+            logger.info("knowledge index loaded: version=%s rows=%s", version, len(_snapshot.meta))
+    finally:
+        db.close()
+    return _snapshot.version if _snapshot else None
+
+
+def refresh_in_background() -> None:
+    """Run refresh() in a daemon thread unless one is already running (startup warm-up and scheduled checks)."""
+    if not _refreshing.acquire(blocking=False):
+        return
+
+    def _run():
+        try:
+            refresh()
+        except Exception as e:
+            _stats["errors"] += 1
+            logger.warning("knowledge index refresh failed: %s", e)
+        finally:
+            _refreshing.release()
+
+    threading.Thread(target=_run, name="knowledge-index-refresh", daemon=True).start()
+
+
+def invalidate() -> None:
+    """Corpus changed (e.g. after ingest): re-check the version on the next query."""
+    global _last_check
+    _last_check = 0.0
+
+
+def search(
+    query_embedding: list[float],
+    top_k: int,
+    tags: Optional[list[str]] = None,
+    source_types: Optional[list[str]] = None,
+    prefer_tags: Optional[list[str]] = None,
+) -> Optional[list[dict[str, Any]]]:
+    """
+    Top-k snippets by cosine similarity from the mapped snapshot, or None when disabled / numpy missing /
+    not loaded yet. tags / source_types filter, as does RAG_MIN_SIMILARITY; rows tagged with any
+    prefer_tags rank first.
+    """
+    if not settings.KNOWLEDGE_INDEX_ENABLED:
+        return None
+    np = _numpy()
+    if np is None:
+        return None
+    _stats["queries"] += 1
+    if time.time() - _last_check > settings.KNOWLEDGE_INDEX_REFRESH_SECONDS:
+        refresh_in_background()
+    snap = _snapshot
+    if snap is None or not query_embedding:
+        _stats["not_ready"] += 1
+        return None
+    if not snap.meta:
+        _stats["served"] += 1
+        return []
+    q = np.asarray(query_embedding, dtype=np.float32)
+    norm = float(np.linalg.norm(q))
+    if norm == 0.0 or q.shape[0] != snap.matrix.shape[1]:
+        return None
+    scores = snap.matrix @ (q / norm)
+    if settings.RAG_MIN_SIMILARITY is not None:
+        scores = np.where(scores >= settings.RAG_MIN_SIMILARITY, scores, -np.inf)
+    if tags or source_types:
+        tag_set, type_set = set(tags or []), set(source_types or [])
+        mask = np.fromiter(
+            (
+                (not tag_set or bool(tag_set.intersection(m["tags"])))
+                and (not type_set or m["source_type"] in type_set)
+                for m in snap.meta
+            ),
+            dtype=bool,
+            count=len(snap.meta),
+        )
+        scores = np.where(mask, scores, -np.inf)
+    k = min(max(top_k * 4 if prefer_tags else top_k, top_k), scores.shape[0])
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    hits = [(int(i), float(scores[i])) for i in top if np.isfinite(scores[i])]
+    if prefer_tags:
+        preferred = set(prefer_tags)
+        hits.sort(key=lambda h: (not preferred.intersection(snap.meta[h[0]]["tags"]), -h[1]))
+    _stats["served"] += 1
+    return [{**snap.meta[i], "similarity": round(score, 4)} for i, score in hits[:top_k]]
+
+
+def index_stats() -> dict[str, Any]:
+    snap = _snapshot
+    return {
+        **_stats,
+        "enabled": settings.KNOWLEDGE_INDEX_ENABLED,
+        "version": snap.version if snap else None,
+        "rows": len(snap.meta) if snap else 0,
+        "bytes": int(snap.matrix.nbytes) if snap else 0,
+    }
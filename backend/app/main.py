@@ -105,6 +105,11 @@ async def lifespan(app: FastAPI):
         print("[OK] pgvector extension initialized")
     except Exception as e:
         print(f"Warning: pgvector extension initialization failed: {e}")
+
+    if settings.KNOWLEDGE_INDEX_ENABLED:
+        from app.knowledge.vector_index import refresh_in_background
+
+        refresh_in_background()
     
     # Migrations are run by run.ps1 / run.sh before starting the server so the
     # lifespan stays minimal and the server stays running (avoids exit on some Windows setups).
@@ -129,6 +134,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Estimate"],
 )
 # IP-based rate limits: auth 10/min, telemetry 60/min, diagnostic 30/min (429 + Retry-After: 60)
 app.add_middleware(RateLimitMiddleware)
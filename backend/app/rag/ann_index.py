@@ -0,0 +1,164 @@
+"""
+Approximate nearest-neighbour (pgvector HNSW / IVFFlat) indexes on the RAG embedding columns.
+
+One managed index per table, named ix_<table>_embedding_<method>, always on vector_cosine_ops
+(vector_search orders by <=>). Builds run CONCURRENTLY on an autocommit connection so searches keep
+working; rebuild creates the new index before dropping the old one. Query-time recall/speed is set
+per connection from RAG_HNSW_EF_SEARCH / RAG_IVFFLAT_PROBES (app/db/database.py); apply_search_params
+overrides them for the current transaction. Pick values with scripts/bench_ann_index.py.
+"""
+import math
+import time
+from typing import Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+
+ANN_TABLES = (
+    "finance_documents", "marketing_documents", "ops_documents", "tech_documents", "knowledge_chunks", "document_chunks",
+)
+ANN_METHODS = ("hnsw", "ivfflat")
+
+
+def index_name(table: str, method: str) -> str:
+    return f"ix_{table}_embedding_{method}"
+
+
+def _check(table: str, method: str, tables: tuple[str, ...] = ANN_TABLES) -> None:
+    if table not in tables:
+        raise ValueError(f"table must be one of: {', '.join(tables)}; got {table!r}")
+    if method not in ANN_METHODS:
+        raise ValueError(f"method must be one of: {', '.join(ANN_METHODS)}; got {method!r}")
+
+
+def auto_ivfflat_lists(row_count: int) -> int:
+    """pgvector guidance: rows / 1000 up to 1M rows, sqrt(rows) above; at least 1."""
+    if row_count <= 1_000_000:
+        return max(1, row_count // 1000)
+    return int(math.sqrt(row_count))
+
+
+def index_ddl(
+    table: str,
+    method: str,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    lists: Optional[int] = None,
+    name: Optional[str] = None,
+    concurrently: bool = True,
+    column: str = "embedding",
+) -> str:
+    """CREATE INDEX statement for table.embedding (parameters already resolved); column for shadow builds."""
+    if method == "hnsw":
+        with_clause = f"m = {int(m or settings.RAG_HNSW_M)}, ef_construction = {int(ef_construction or settings.RAG_HNSW_EF_CONSTRUCTION)}"
+    else:
+        if not lists:
+            raise ValueError("lists is required for ivfflat")
+        with_clause = f"lists = {int(lists)}"
+    return (
+        f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name or index_name(table, method)} "
+        f"ON {table} USING {method} ({column} vector_cosine_ops) WITH ({with_clause})"
+    )
+
+
+def _autocommit(engine: Engine) -> Connection:
+    return engine.connect().execution_options(isolation_level="AUTOCOMMIT")
+
+
+def list_ann_indexes(db: Session) -> list[dict[str, Any]]:
+    """HNSW/IVFFlat indexes on the RAG tables with definition, size and validity."""
+    rows = db.execute(
+        text("""
+            SELECT t.relname AS table_name, i.relname AS index_name, am.amname AS method,
+                   pg_get_indexdef(i.oid) AS definition, pg_relation_size(i.oid) AS size_bytes,
+                   ix.indisvalid AS valid, t.reltuples::bigint AS approx_rows
+            FROM pg_index ix
+            JOIN pg_class i ON i.oid = ix.indexrelid
+            JOIN pg_class t ON t.oid = ix.indrelid
+            JOIN pg_am am ON am.oid = i.relam
+            WHERE am.amname IN ('hnsw', 'ivfflat') AND t.relname = ANY(:tables)
+            ORDER BY t.relname, i.relname
+        """),
+        {"tables": list(ANN_TABLES)},
+    ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def create_ann_index(
+    engine: Engine,
+    table: str,
+    method: Optional[str] = None,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    lists: Optional[int] = None,
+    maintenance_work_mem: Optional[str] = None,
+    tables: tuple[str, ...] = ANN_TABLES,
+) -> dict[str, Any]:
+    """
+    Build the managed index for table (no-op if it exists). IVFFlat lists default to auto_ivfflat_lists
+    of the current row count (build after loading data). Returns name, DDL and build seconds.
+    """
+    method = method or settings.RAG_ANN_INDEX_METHOD
+    _check(table, method, tables)
+    with _autocommit(engine) as conn:
+        if method == "ivfflat" and not lists:
+            lists = auto_ivfflat_lists(conn.execute(text(f"SELECT count(*) FROM {table}")).scalar() or 0)
+        ddl = index_ddl(table, method, m=m, ef_construction=ef_construction, lists=lists)
+        if maintenance_work_mem:
+            conn.execute(text("SELECT set_config('maintenance_work_mem', :v, false)"), {"v": maintenance_work_mem})
+        started = time.perf_counter()
+        conn.execute(text(ddl))
+        elapsed = time.perf_counter() - started
+    return {"table": table, "index": index_name(table, method), "ddl": ddl, "build_seconds": round(elapsed, 2)}
+
+
+def drop_ann_index(engine: Engine, table: str, method: str, tables: tuple[str, ...] = ANN_TABLES) -> dict[str, Any]:
+    _check(table, method, tables)
+    with _autocommit(engine) as conn:
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name(table, method)}"))
+    return {"table": table, "index": index_name(table, method), "dropped": True}
+
+
+def rebuild_ann_index(
+    engine: Engine,
+    table: str,
+    method: Optional[str] = None,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    lists: Optional[int] = None,
+    maintenance_work_mem: Optional[str] = None,
+    tables: tuple[str, ...] = ANN_TABLES,
+) -> dict[str, Any]:
+    """
+    Rebuild with (possibly new) parameters without a window of sequential scans: build under a
+    temporary name, drop the old index, rename. Use after bulk loads (IVFFlat centroids go stale)
+    or to change m / ef_construction / lists.
+    """
+    method = method or settings.RAG_ANN_INDEX_METHOD
+    _check(table, method, tables)
+    final = index_name(table, method)
+    tmp = f"{final}_new"
+    with _autocommit(engine) as conn:
+        if method == "ivfflat" and not lists:
+            lists = auto_ivfflat_lists(conn.execute(text(f"SELECT count(*) FROM {table}")).scalar() or 0)
+        ddl = index_ddl(table, method, m=m, ef_construction=ef_construction, lists=lists, name=tmp)
+        if maintenance_work_mem:
+            conn.execute(text("SELECT set_config('maintenance_work_mem', :v, false)"), {"v": maintenance_work_mem})
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {tmp}"))
+        started = time.perf_counter()
+        conn.execute(text(ddl))
+        elapsed = time.perf_counter() - started
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {final}"))
+        conn.execute(text(f"ALTER INDEX {tmp} RENAME TO {final}"))
+    return {"table": table, "index": final, "ddl": ddl.replace(tmp, final), "build_seconds": round(elapsed, 2)}
+
+
+def apply_search_params(db: Session, ef_search: Optional[int] = None, probes: Optional[int] = None) -> None:
+    """Override hnsw.ef_search / ivfflat.probes for the current transaction only."""
+    if ef_search is not None:
+        db.execute(text("SELECT set_config('hnsw.ef_search', :v, true)"), {"v": str(int(ef_search))})
+    if probes is not None:
+        db.execute(text("SELECT set_config('ivfflat.probes', :v, true)"), {"v": str(int(probes))})
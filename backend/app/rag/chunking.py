@@ -0,0 +1,286 @@
+"""
+Chunking for long RAG documents: token-aware splitting with overlap, streamed into document_chunks.
+
+iter_chunks reads text incrementally (any iterable of str, e.g. a file read in blocks), cuts it into
+sentence/line units, and packs units into chunks of at most RAG_CHUNK_TOKENS, carrying the last
+RAG_CHUNK_OVERLAP_TOKENS worth of units into the next chunk. Only the current window is held in
+memory. Tokens are counted with tiktoken (cl100k_base, the text-embedding-3-small encoding) when it
+is installed, else estimated at 4 characters per token.
+
+store_chunked_document writes a parent row (finance/marketing/ops/tech; no embedding of its own)
+and its chunks in batches of EMBEDDING_BATCH_SIZE: one get_embeddings call and one multi-row upsert
+per batch. chunk_id is sha256(doc_table, doc_id, chunk_index, text), so re-uploading a document
+under the same parent reuses unchanged chunks without embedding them again. Domain searches
+(vectorstore._vector_select) rank parent and chunk embeddings together and dedupe to the parent.
+"""
+import hashlib
+import logging
+import re
+from collections import deque
+from typing import Any, Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models import DocumentChunk
+from app.rag.reembed import write_shadow_embeddings
+from app.rag.vectorstore import _embedding_model, _embedding_or_none, get_embeddings
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends followed by whitespace, or line breaks.
+_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*")
+_MAX_PENDING_CHARS = 20_000  # text without any boundary is cut at whitespace past this length
+
+_encoding: Any = None
+_encoding_loaded = False
+
+
+class Chunk(NamedTuple):
+    index: int
+    text: str
+    token_count: int
+
+
+def _get_encoding() -> Any:
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            logger.info("tiktoken not available; estimating chunk tokens at 4 chars/token")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    enc = _get_encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def chunk_id(doc_table: str, doc_id: int, index: int, text: str) -> str:
+    """Stable id: the same text at the same position of the same parent always gets the same id."""
+    return hashlib.sha256(f"{doc_table}:{doc_id}:{index}:{text}".encode("utf-8")).hexdigest()
+
+
+def _units(pieces: Iterable[str]) -> Iterator[str]:
+    """Sentence/line units (with trailing whitespace) from streamed text; holds at most one partial unit."""
+    pending = ""
+    for piece in pieces:
+        pending += piece
+        end = 0
+        for m in _BOUNDARY.finditer(pending):
+            yield pending[end:m.end()]
+            end = m.end()
+        pending = pending[end:]
+        if len(pending) > _MAX_PENDING_CHARS:
+            cut = pending.rfind(" ", 0, _MAX_PENDING_CHARS) + 1 or _MAX_PENDING_CHARS
+            yield pending[:cut]
+            pending = pending[cut:]
+    if pending:
+        yield pending
+
+
+def _split_long_unit(unit: str, max_tokens: int) -> Iterator[tuple[str, int]]:
+    """Pack the words of a unit longer than max_tokens into pieces of at most max_tokens."""
+    words = re.findall(r"\S+\s*", unit)
+    buf, buf_tokens = "", 0
+    for word in words:
+        n = count_tokens(word)
+        if n > max_tokens:  # one huge "word" (e.g. base64): hard cut by characters
+            if buf:
+                yield buf, buf_tokens
+                buf, buf_tokens = "", 0
+            step = max_tokens * 4
+            for i in range(0, len(word), step):
+                part = word[i:i + step]
+                yield part, count_tokens(part)
+            continue
+        if buf and buf_tokens + n > max_tokens:
+            yield buf, buf_tokens
+            buf, buf_tokens = "", 0
+        buf += word
+        buf_tokens += n
+    if buf:
+        yield buf, buf_tokens
+
+
+def iter_chunks(
+    pieces: Iterable[str], max_tokens: Optional[int] = None, overlap_tokens: Optional[int] = None
+) -> Iterator[Chunk]:
+    """Chunks of at most max_tokens (RAG_CHUNK_TOKENS), overlapping by up to overlap_tokens (RAG_CHUNK_OVERLAP_TOKENS)."""
+    max_tokens = max(1, max_tokens or settings.RAG_CHUNK_TOKENS)
+    overlap = settings.RAG_CHUNK_OVERLAP_TOKENS if overlap_tokens is None else overlap_tokens
+    overlap = max(0, min(overlap, max_tokens - 1))
+    window: deque[tuple[str, int]] = deque()
+    window_tokens = 0
+    fresh = False  # window holds text not yet emitted
+    index = 0
+
+    def _emit() -> Chunk:
+        return Chunk(index, "".join(u for u, _n in window).strip(), window_tokens)
+
+    for unit in _units(pieces):
+        if not unit.strip():
+            continue
+        n = count_tokens(unit)
+        parts = [(unit, n)] if n <= max_tokens else list(_split_long_unit(unit, max_tokens))
+        for part, n in parts:
+            if window and window_tokens + n > max_tokens:
+                if fresh:
+                    yield _emit()
+                    index += 1
+                    fresh = False
+                    kept = 0
+                    for i in range(len(window) - 1, -1, -1):
+                        if kept + window[i][1] > overlap:
+                            break
+                        kept += window[i][1]
+                    while window_tokens > kept:
+                        window_tokens -= window.popleft()[1]
+                while window and window_tokens + n > max_tokens:
+                    window_tokens -= window.popleft()[1]
+            window.append((part, n))
+            window_tokens += n
+            fresh = True
+    if fresh:
+        yield _emit()
+
+
+class _Recorder:
+    """Pass-through over the input pieces: sha256 of everything read, and the text read since the last drain."""
+
+    def __init__(self, pieces: Iterable[str]):
+        self._pieces = pieces
+        self._pending: list[str] = []
+        self.sha = hashlib.sha256()
+
+    def __iter__(self) -> Iterator[str]:
+        for piece in self._pieces:
+            self._pending.append(piece)
+            self.sha.update(piece.encode("utf-8"))
+            yield piece
+
+    def drain(self) -> str:
+        text = "".join(self._pending)
+        self._pending.clear()
+        return text
+
+
+def delete_document_chunks(db: Session, doc_table: str, doc_id: int) -> None:
+    db.execute(delete(DocumentChunk).where(DocumentChunk.doc_table == doc_table, DocumentChunk.doc_id == doc_id))
+
+
+def _write_chunks(db: Session, doc_table: str, doc_id: int, title: str, chunks: list[Chunk], report: dict) -> list[str]:
+    ids = [chunk_id(doc_table, doc_id, c.index, c.text) for c in chunks]
+    reusable = set(
+        db.scalars(
+            select(DocumentChunk.chunk_id).where(DocumentChunk.chunk_id.in_(ids), DocumentChunk.embedding.isnot(None))
+        )
+    )
+    new = [(cid, c) for cid, c in zip(ids, chunks) if cid not in reusable]
+    report["chunks"] += len(chunks)
+    report["reused"] += len(chunks) - len(new)
+    if new:
+        # The title gives each chunk its document context (same idea as the tech embedding text).
+        texts = [f"{title}\n\n{c.text}" for _cid, c in new]
+        embeddings = get_embeddings(texts)
+        rows = []
+        for (cid, c), embedding in zip(new, embeddings):
+            embedding = _embedding_or_none(embedding)
+            if embedding is None:
+                report["embedding_failures"] += 1
+            rows.append({
+                "chunk_id": cid,
+                "doc_table": doc_table,
+                "doc_id": doc_id,
+                "chunk_index": c.index,
+                "content": c.text,
+                "token_count": c.token_count,
+                "embedding": embedding,
+                "embedding_model": _embedding_model(embedding),
+            })
+        stmt = pg_insert(DocumentChunk.__table__).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["chunk_id"],
+            set_={"embedding": stmt.excluded.embedding, "embedding_model": stmt.excluded.embedding_model},
+        )
+        chunk_pks = dict(db.execute(stmt.returning(DocumentChunk.chunk_id, DocumentChunk.id)).all())
+        report["embedded"] += len(rows)
+        if settings.EMBEDDING_SHADOW_MODEL:
+            pairs = [(chunk_pks[row["chunk_id"]], text) for row, text in zip(rows, texts)]
+            write_shadow_embeddings(db, DocumentChunk.__tablename__, pairs)
+    return ids
+
+
+def store_chunked_document(
+    db: Session,
+    model: Any,
+    title: str,
+    pieces: Iterable[str],
+    content: Optional[str] = None,
+    replace_by_title: bool = False,
+    max_tokens: Optional[int] = None,
+    overlap_tokens: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> tuple[Any, dict]:
+    """
+    Store a long document as a parent row of model plus embedded chunks; returns (parent, report).
+    pieces is the text, streamed. When content (the same text, already in memory) is given it is stored
+    on the parent directly; otherwise the parent's content is appended batch by batch so memory stays
+    bounded. replace_by_title reuses an existing parent with this title (and its unchanged chunks);
+    chunks no longer produced are deleted. Commits on success, rolls back on error.
+    """
+    doc_table = model.__tablename__
+    batch_size = max(1, batch_size or settings.EMBEDDING_BATCH_SIZE)
+    report = {"chunks": 0, "embedded": 0, "reused": 0, "embedding_failures": 0}
+    recorder = _Recorder(pieces)
+    try:
+        doc = db.query(model).filter(model.title == title).first() if replace_by_title else None
+        if doc is None:
+            doc = model(title=title, content=content or "", embedding=None)
+            db.add(doc)
+        else:
+            doc.content, doc.embedding = content or "", None
+        doc.content_hash = None
+        db.flush()
+
+        def _flush(batch: list[Chunk]) -> list[str]:
+            ids = _write_chunks(db, doc_table, doc.id, title, batch, report)
+            if content is None:
+                db.execute(update(model).where(model.id == doc.id).values(content=model.content + recorder.drain()))
+            return ids
+
+        seen: list[str] = []
+        batch: list[Chunk] = []
+        for chunk in iter_chunks(recorder, max_tokens, overlap_tokens):
+            batch.append(chunk)
+            if len(batch) >= batch_size:
+                seen.extend(_flush(batch))
+                batch = []
+        seen.extend(_flush(batch) if batch else [])
+        if content is None:
+            rest = recorder.drain()
+            if rest:
+                db.execute(update(model).where(model.id == doc.id).values(content=model.content + rest))
+        db.execute(
+            delete(DocumentChunk).where(
+                DocumentChunk.doc_table == doc_table,
+                DocumentChunk.doc_id == doc.id,
+                DocumentChunk.chunk_id.not_in(seen),
+            )
+        )
+        if not report["embedding_failures"]:
+            doc.content_hash = recorder.sha.hexdigest()
+        db.commit()
+        db.refresh(doc)
+    except Exception:
+        db.rollback()
+        raise
+    return doc, report
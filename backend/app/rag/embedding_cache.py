@@ -0,0 +1,270 @@
+"""
+Two-tier cache for embeddings (rag/vectorstore.get_embedding), keyed by (model, sha256(text)).
+
+Tier 1 is a bounded LRU per worker process. Tier 2 is the embedding_cache table, shared by all
+workers and restarts; it uses its own short session so callers' transactions are never touched.
+Entries older than EMBEDDING_CACHE_MAX_AGE_DAYS are treated as misses; expired rows are deleted
+at most once an hour from the write path and on demand via evict_expired(). Database errors are
+logged and treated as a miss, so a missing table only costs the remote call it would have made.
+"""
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_EVICT_INTERVAL_SECONDS = 3600
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 hex of the exact input text (UTF-8)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class _EmbeddingLRU:
+    """Thread-safe bounded LRU: (model, text_hash) -> (stored_at epoch seconds, embedding)."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[tuple[str, str], tuple[float, list[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple[str, str], max_age_seconds: float) -> Optional[list[float]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry[0] > max_age_seconds:
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: tuple[str, str], embedding: list[float], stored_at: Optional[float] = None) -> None:
+        with self._lock:
+            self._data[key] = (stored_at if stored_at is not None else time.time(), embedding)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def evict_older_than(self, max_age_seconds: float) -> int:
+        cutoff = time.time() - max_age_seconds
+        with self._lock:
+            expired = [k for k, (stored_at, _e) in self._data.items() if stored_at < cutoff]
+            for k in expired:
+                del self._data[k]
+            return len(expired)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_local = _EmbeddingLRU(settings.EMBEDDING_CACHE_MAX_ENTRIES)
+_stats = {"hits": 0, "db_hits": 0, "misses": 0, "writes": 0, "evicted": 0, "backend_errors": 0}
+_last_evict_at = 0.0
+
+
+def _max_age_seconds() -> float:
+    return settings.EMBEDDING_CACHE_MAX_AGE_DAYS * 86400.0
+
+
+def get_cached_embedding(model: str, text: str) -> Optional[list[float]]:
+    """Cached embedding for (model, text), or None. Checks the LRU, then the table."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return None
+    key = (model, text_hash(text))
+    max_age = _max_age_seconds()
+    embedding = _local.get(key, max_age)
+    if embedding is not None:
+        _stats["hits"] += 1
+        return embedding
+    if settings.EMBEDDING_CACHE_PERSIST:
+        try:
+            row = _db_get(key, max_age)
+        except Exception as e:
+            _stats["backend_errors"] += 1
+            logger.warning("embedding cache db get failed: %s", e)
+            row = None
+        if row is not None:
+            embedding, created_at = row
+            _stats["db_hits"] += 1
+            _local.set(key, embedding, stored_at=created_at.timestamp())
+            return embedding
+    _stats["misses"] += 1
+    return None
+
+
+def put_cached_embedding(model: str, text: str, embedding: list[float]) -> None:
+    """Store an embedding in both tiers. Empty embeddings (API failures) are never cached."""
+    if not settings.EMBEDDING_CACHE_ENABLED or not embedding:
+        return
+    key = (model, text_hash(text))
+    _local.set(key, embedding)
+    _stats["writes"] += 1
+    if settings.EMBEDDING_CACHE_PERSIST:
+        try:
+            _db_put(key, embedding)
+        except Exception as e:
+            _stats["backend_errors"] += 1
+            logger.warning("embedding cache db put failed: %s", e)
+        if time.time() - _last_evict_at > _EVICT_INTERVAL_SECONDS:
+            evict_expired()
+
+
+def get_cached_embeddings(model: str, texts: list[str]) -> dict[str, list[float]]:
+    """Batch lookup: {text: embedding} for the texts found in either tier (one table query)."""
+    if not settings.EMBEDDING_CACHE_ENABLED or not texts:
+        return {}
+    max_age = _max_age_seconds()
+    found: dict[str, list[float]] = {}
+    remote: dict[str, str] = {}
+    for text in dict.fromkeys(texts):
+        h = text_hash(text)
+        embedding = _local.get((model, h), max_age)
+        if embedding is not None:
+            _stats["hits"] += 1
+            found[text] = embedding
+        else:
+            remote[h] = text
+    if remote and settings.EMBEDDING_CACHE_PERSIST:
+        try:
+            rows = _db_get_many(model, list(remote), max_age)
+        except Exception as e:
+            _stats["backend_errors"] += 1
+            logger.warning("embedding cache db get failed: %s", e)
+            rows = {}
+        for h, (embedding, created_at) in rows.items():
+            _stats["db_hits"] += 1
+            _local.set((model, h), embedding, stored_at=created_at.timestamp())
+            found[remote.pop(h)] = embedding
+    _stats["misses"] += len(remote)
+    return found
+
+
+def put_cached_embeddings(model: str, items: dict[str, list[float]]) -> None:
+    """Batch store {text: embedding} in both tiers (one multi-row upsert). Empty embeddings are skipped."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return
+    rows = {text_hash(text): embedding for text, embedding in items.items() if embedding}
+    if not rows:
+        return
+    for h, embedding in rows.items():
+        _local.set((model, h), embedding)
+    _stats["writes"] += len(rows)
+    if settings.EMBEDDING_CACHE_PERSIST:
+        try:
+            _db_put_many(model, rows)
+        except Exception as e:
+            _stats["backend_errors"] += 1
+            logger.warning("embedding cache db put failed: %s", e)
+        if time.time() - _last_evict_at > _EVICT_INTERVAL_SECONDS:
+            evict_expired()
+
+
+def _db_get(key: tuple[str, str], max_age_seconds: float) -> Optional[tuple[list[float], datetime]]:
+    return _db_get_many(key[0], [key[1]], max_age_seconds).get(key[1])
+
+
+def _db_get_many(model: str, hashes: list[str], max_age_seconds: float) -> dict[str, tuple[list[float], datetime]]:
+    from app.db.database import SessionLocal
+    from app.db.models import EmbeddingCacheEntry
+
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(EmbeddingCacheEntry.text_hash, EmbeddingCacheEntry.embedding, EmbeddingCacheEntry.created_at)
+            .filter(
+                EmbeddingCacheEntry.model == model,
+                EmbeddingCacheEntry.text_hash.in_(hashes),
+                EmbeddingCacheEntry.created_at >= cutoff,
+            )
+            .all()
+        )
+    finally:
+        db.close()
+    return {h: ([float(x) for x in embedding], created_at) for h, embedding, created_at in rows}
+
+
+def _db_put(key: tuple[str, str], embedding: list[float]) -> None:
+    _db_put_many(key[0], {key[1]: embedding})
+
+
+def _db_put_many(model: str, rows: dict[str, list[float]]) -> None:
+    from sqlalchemy import func
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+    from app.db.database import SessionLocal
+    from app.db.models import EmbeddingCacheEntry
+
+    table = EmbeddingCacheEntry.__table__
+    stmt = pg_insert(table).values([
+        {"model": model, "text_hash": h, "embedding": embedding} for h, embedding in rows.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.model, table.c.text_hash],
+        set_={"embedding": stmt.excluded.embedding, "created_at": func.now()},
+    )
+    db = SessionLocal()
+    try:
+        db.execute(stmt)
+        db.commit()
+    finally:
+        db.close()
+
+
+def evict_expired() -> dict[str, int]:
+    """Drop entries older than EMBEDDING_CACHE_MAX_AGE_DAYS from both tiers. Returns counts."""
+    global _last_evict_at
+    _last_evict_at = time.time()
+    max_age = _max_age_seconds()
+    out = {"local": _local.evict_older_than(max_age), "db": 0}
+    if settings.EMBEDDING_CACHE_PERSIST:
+        from app.db.database import SessionLocal
+        from app.db.models import EmbeddingCacheEntry
+
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+        db = SessionLocal()
+        try:
+            out["db"] = (
+                db.query(EmbeddingCacheEntry)
+                .filter(EmbeddingCacheEntry.created_at < cutoff)
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            _stats["backend_errors"] += 1
+            logger.warning("embedding cache eviction failed: %s", e)
+        finally:
+            db.close()
+    _stats["evicted"] += out["local"] + out["db"]
+    return out
+
+
+def cache_stats() -> dict[str, Any]:
+    """Counters for this worker plus current local size."""
+    lookups = _stats["hits"] + _stats["db_hits"] + _stats["misses"]
+    return {
+        **_stats,
+        "hit_rate": round((_stats["hits"] + _stats["db_hits"]) / lookups, 4) if lookups else None,
+        "local_entries": len(_local),
+        "local_max_entries": _local.max_entries,
+        "persist": settings.EMBEDDING_CACHE_PERSIST,
+        "max_age_days": settings.EMBEDDING_CACHE_MAX_AGE_DAYS,
+    }
+
+
+def clear_local_cache() -> None:
+    """Empty this worker's LRU (tests, admin)."""
+    _local.clear()
@@ -0,0 +1,292 @@
+"""
+Bulk ingestion into the RAG tables: finance/marketing/ops/tech documents and knowledge_chunks.
+
+Documents are read lazily from any iterable (or a JSONL stream via iter_jsonl) in batches of
+INGEST_BATCH_SIZE. Per batch: one lookup of existing rows by identity key (title; source_type + title
+for knowledge), documents whose content hash is unchanged are skipped, the rest are embedded with
+vectorstore.get_embeddings (batched requests, bounded concurrency), new rows go out as one multi-row
+INSERT and changed rows as one executemany UPDATE. The transaction is committed every
+INGEST_COMMIT_EVERY documents and at the end. Embedding text matches the single-document upserts.
+Like DocumentService.upload, a finance/marketing/ops/tech document over RAG_CHUNK_TOKENS is stored as a
+parent row without embedding plus embedded document_chunks (rag/chunking.py); on re-ingest its
+unchanged chunks are reused and only the stale ones deleted.
+
+A document whose embedding failed is stored without embedding or content_hash, so the next run
+retries it instead of skipping it.
+"""
+import itertools
+import json
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional
+from uuid import UUID
+
+from sqlalchemy import bindparam, delete, tuple_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.rag.chunking import _write_chunks, count_tokens, iter_chunks
+from app.db.models import (
+    DocumentChunk,
+    DocumentLink,
+    FinanceDocument,
+    KnowledgeChunk,
+    MarketingDocument,
+    OpsDocument,
+    TechDocument,
+)
+from app.rag.embedding_cache import text_hash
+from app.rag.reembed import write_shadow_embeddings
+from app.rag.vectorstore import _embedding_model, _embedding_or_none, get_embeddings
+
+_MAX_ERRORS = 50
+
+# domain -> (model, identity key columns, embedding text)
+DOMAINS: dict[str, tuple[Any, tuple[str, ...], Callable[[dict], str]]] = {
+    "finance": (FinanceDocument, ("title",), lambda d: d["content"]),
+    "marketing": (MarketingDocument, ("title",), lambda d: d["content"]),
+    "ops": (OpsDocument, ("title",), lambda d: d["content"]),
+    "tech": (TechDocument, ("title",), lambda d: f"{d['title']}\n\n{d['content']}"),
+    "knowledge": (KnowledgeChunk, ("source_type", "title"), lambda d: d["content"][:8000]),
+}
+
+
+def iter_jsonl(lines: Iterable[Any]) -> Iterator[dict]:
+    """Parse a JSONL stream (str or bytes lines). Blank lines are skipped; bad lines yield an _error record."""
+    for n, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            doc = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"_error": f"line {n}: invalid JSON ({e.msg})"}
+            continue
+        yield doc if isinstance(doc, dict) else {"_error": f"line {n}: expected an object"}
+
+
+def _normalize(domain: str, model: Any, raw: Any) -> dict:
+    """Validated row dict, or raises ValueError."""
+    if not isinstance(raw, dict):
+        raise ValueError("document must be an object")
+    if raw.get("_error"):
+        raise ValueError(raw["_error"])
+    title = (raw.get("title") or "").strip()
+    content = raw.get("content") or ""
+    if not title or not content.strip():
+        raise ValueError(f"title and content are required (title={title[:80]!r})")
+    if len(title) > model.__table__.c.title.type.length:
+        raise ValueError(f"title longer than {model.__table__.c.title.type.length} chars: {title[:80]!r}")
+    doc = {"title": title, "content": content}
+    if domain == "knowledge":
+        source_type = (raw.get("source_type") or "").strip()
+        if not source_type:
+            raise ValueError(f"source_type is required for knowledge (title={title[:80]!r})")
+        doc["source_type"] = source_type
+        doc["tags"] = raw.get("tags")
+    else:
+        try:
+            doc["enterprise_id"] = int(raw["enterprise_id"]) if raw.get("enterprise_id") is not None else None
+            doc["decision_id"] = UUID(str(raw["decision_id"])) if raw.get("decision_id") else None
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid enterprise_id or decision_id (title={title[:80]!r})")
+    return doc
+
+
+def _write_batch(db: Session, domain: str, docs: list[dict], report: dict, embed_kwargs: dict) -> None:
+    model, key_cols, embed_text = DOMAINS[domain]
+    table = model.__table__
+
+    # Last occurrence wins for a repeated key within the batch.
+    by_key: dict[tuple, dict] = {}
+    for doc in docs:
+        k = tuple(doc[c] for c in key_cols)
+        if k in by_key:
+            report["duplicates"] += 1
+        by_key[k] = doc
+    for doc in by_key.values():
+        doc["content_hash"] = text_hash(doc["content"])
+
+    key_expr = table.c[key_cols[0]] if len(key_cols) == 1 else tuple_(*(table.c[c] for c in key_cols))
+    key_values = [k[0] for k in by_key] if len(key_cols) == 1 else list(by_key)
+    existing: dict[tuple, list[tuple[int, Optional[str]]]] = {}
+    for row in db.execute(
+        table.select().with_only_columns(table.c.id, table.c.content_hash, *(table.c[c] for c in key_cols))
+        .where(key_expr.in_(key_values))
+    ):
+        existing.setdefault(tuple(getattr(row, c) for c in key_cols), []).append((row.id, row.content_hash))
+
+    to_insert: list[dict] = []
+    to_update: list[dict] = []
+    for k, doc in by_key.items():
+        rows = existing.get(k)
+        if rows and any(h == doc["content_hash"] for _id, h in rows):
+            report["skipped_unchanged"] += 1
+            continue
+        if rows:
+            doc["_id"] = max(row_id for row_id, _h in rows)
+            to_update.append(doc)
+        else:
+            to_insert.append(doc)
+    pending = to_insert + to_update
+    if not pending:
+        return
+
+    chunked = [d for d in pending if domain != "knowledge" and count_tokens(d["content"]) > settings.RAG_CHUNK_TOKENS]
+    for d in chunked:  # embedded per chunk in _write_chunked
+        d["_chunked"] = True
+        d["embedding"] = d["embedding_model"] = None
+    whole = [d for d in pending if not d.get("_chunked")]
+    embeddings = get_embeddings([embed_text(d) for d in whole], **embed_kwargs)
+    for doc, embedding in zip(whole, embeddings):
+        doc["embedding"] = _embedding_or_none(embedding)
+        doc["embedding_model"] = _embedding_model(doc["embedding"])
+        if doc["embedding"] is None:
+            report["embedding_failures"] += 1
+            doc["content_hash"] = None
+
+    columns = ("title", "content", "embedding", "embedding_model", "content_hash") + (
+        ("source_type", "tags") if domain == "knowledge" else ()
+    )
+    if to_insert:
+        # RETURNING order is not guaranteed to follow VALUES order; match ids back by the identity key
+        # (unique in the batch after dedupe; title alone is not for knowledge).
+        stmt = pg_insert(table).values([{c: d[c] for c in columns} for d in to_insert])
+        returned = db.execute(stmt.returning(table.c.id, *(table.c[c] for c in key_cols))).all()
+        inserted_ids = {tuple(row[1:]): row[0] for row in returned}
+        for d in to_insert:
+            d["_id"] = inserted_ids[tuple(d[c] for c in key_cols)]
+        report["inserted"] += len(to_insert)
+    if to_update:
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values(**{c: bindparam(f"v_{c}") for c in columns if c not in key_cols})
+        )
+        db.connection().execute(
+            stmt,
+            [{"_id": d["_id"], **{f"v_{c}": d[c] for c in columns if c not in key_cols}} for d in to_update],
+        )
+        report["updated"] += len(to_update)
+        replaced = [d["_id"] for d in to_update if domain != "knowledge" and not d.get("_chunked")]
+        if replaced:  # short content now; chunks of an earlier long version no longer apply
+            db.execute(
+                delete(DocumentChunk).where(DocumentChunk.doc_table == table.name, DocumentChunk.doc_id.in_(replaced))
+            )
+    if chunked:
+        _write_chunked(db, table, chunked, report)
+
+    if settings.EMBEDDING_SHADOW_MODEL and whole:
+        write_shadow_embeddings(db, table.name, [(d["_id"], embed_text(d)) for d in whole])
+
+    if domain != "knowledge":
+        links = [
+            {"doc_table": table.name, "doc_id": d["_id"], "enterprise_id": d["enterprise_id"], "decision_id": d["decision_id"]}
+            for d in pending
+            if d["enterprise_id"] is not None or d["decision_id"] is not None
+        ]
+        if links:
+            db.execute(pg_insert(DocumentLink.__table__).values(links))
+
+
+def _write_chunked(db: Session, table: Any, docs: list[dict], report: dict) -> None:
+    """Chunks of long documents whose parent rows are written; a parent with failed chunk embeddings loses its content_hash."""
+    chunk_report = {"chunks": 0, "embedded": 0, "reused": 0, "embedding_failures": 0}
+    failed = []
+    for d in docs:
+        failures = chunk_report["embedding_failures"]
+        ids = _write_chunks(db, table.name, d["_id"], d["title"], list(iter_chunks([d["content"]])), chunk_report)
+        db.execute(
+            delete(DocumentChunk).where(
+                DocumentChunk.doc_table == table.name, DocumentChunk.doc_id == d["_id"], DocumentChunk.chunk_id.not_in(ids)
+            )
+        )
+        if chunk_report["embedding_failures"] > failures:
+            failed.append(d["_id"])
+    if failed:
+        db.execute(update(table).where(table.c.id.in_(failed)).values(content_hash=None))
+    report["chunked"] += len(docs)
+    report["chunks"] += chunk_report["chunks"]
+    report["embedding_failures"] += len(failed)
+
+
+def ingest_documents(
+    db: Session,
+    domain: str,
+    documents: Iterable[Any],
+    batch_size: Optional[int] = None,
+    commit_every: Optional[int] = None,
+    embedding_batch_size: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    progress: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Ingest documents ({title, content} plus enterprise_id/decision_id, or source_type/tags for knowledge)
+    into one domain. Returns counts, elapsed seconds and docs_per_second. Invalid documents are counted
+    as failed and listed (capped) in errors; database errors roll back the open transaction and raise.
+    """
+    domain = (domain or "").lower()
+    if domain not in DOMAINS:
+        raise ValueError(f"domain must be one of: {', '.join(DOMAINS)}; got {domain!r}")
+    model = DOMAINS[domain][0]
+    batch_size = max(1, batch_size or settings.INGEST_BATCH_SIZE)
+    commit_every = max(batch_size, commit_every or settings.INGEST_COMMIT_EVERY)
+    embed_kwargs = {"batch_size": embedding_batch_size, "max_concurrency": max_concurrency}
+    report: dict[str, Any] = {
+        "domain": domain,
+        "received": 0,
+        "inserted": 0,
+        "updated": 0,
+        "skipped_unchanged": 0,
+        "duplicates": 0,
+        "chunked": 0,
+        "chunks": 0,
+        "failed": 0,
+        "embedding_failures": 0,
+        "errors": [],
+    }
+    started = time.perf_counter()
+    uncommitted = 0
+    it = iter(documents)
+    try:
+        while True:
+            raw_batch = list(itertools.islice(it, batch_size))
+            if not raw_batch:
+                break
+            report["received"] += len(raw_batch)
+            docs = []
+            for raw in raw_batch:
+                try:
+                    docs.append(_normalize(domain, model, raw))
+                except ValueError as e:
+                    report["failed"] += 1
+                    if len(report["errors"]) < _MAX_ERRORS:
+                        report["errors"].append(str(e))
+            if docs:
+                _write_batch(db, domain, docs, report, embed_kwargs)
+            uncommitted += len(raw_batch)
+            if uncommitted >= commit_every:
+                db.commit()
+                uncommitted = 0
+            if progress:
+                progress(_with_rate(report, started))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if domain == "knowledge" and (report["inserted"] or report["updated"]):
+        from app.knowledge.vector_index import invalidate
+
+        invalidate()
+    return _with_rate(report, started)
+
+
+def _with_rate(report: dict, started: float) -> dict:
+    elapsed = time.perf_counter() - started
+    return {
+        **report,
+        "elapsed_seconds": round(elapsed, 3),
+        "docs_per_second": round(report["received"] / elapsed, 1) if elapsed > 0 else None,
+    }
@@ -0,0 +1,431 @@
+"""
+Re-embedding of RAG rows: repair NULL embeddings, move rows to a new model, and shadow-column cutover.
+
+Every embedding column has an embedding_model column naming the model that produced it. A job
+(reembed_jobs) walks each table by id (keyset) and re-embeds rows whose vector is NULL or from
+another model, in batches of REEMBED_BATCH_SIZE (one request each), paced to
+REEMBED_REQUESTS_PER_MINUTE. Each batch's vectors and the job's checkpoint commit together, so a
+crashed or stopped job resumes where it left off. Rows that fail again stay NULL and are counted;
+a later job retries them. Parent documents stored as document_chunks have no embedding of their own
+and are skipped.
+
+Targets:
+- "embedding": the live column, with EMBEDDING_MODEL.
+- "shadow": embedding_shadow / embedding_shadow_model, with EMBEDDING_SHADOW_MODEL. While that setting
+  is on, every write path also fills the shadow column (write_shadow_embeddings), so after a
+  backfill job the shadow column is complete. cutover_shadow then swaps the columns per table in
+  one transaction (with an ANN index prebuilt on the shadow column); the old vectors stay in
+  embedding_shadow, so running cutover again rolls back. Deploy with EMBEDDING_MODEL set to the new
+  model right after cutover. Column types stay vector(1536): a model with another dimension also
+  needs EMBEDDING_DIM and the column types changed.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Optional
+from uuid import UUID
+
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.database import SessionLocal
+from app.db.models import ReembedJob
+from app.rag.ann_index import ANN_TABLES, auto_ivfflat_lists, index_ddl, index_name, list_ann_indexes
+from app.rag.vectorstore import EMBEDDING_DIM, _embedding_or_none, get_embeddings
+
+logger = logging.getLogger(__name__)
+
+REEMBED_TABLES = ANN_TABLES
+REEMBED_TARGETS = ("embedding", "shadow")
+# Parent tables whose long documents live in document_chunks (no parent embedding by design).
+_CHUNKED_PARENTS = ("finance_documents", "marketing_documents", "ops_documents", "tech_documents")
+_MAX_ERRORS = 50
+
+_shadow_ready: set[str] = set()
+_shadow_missing_logged: set[str] = set()
+
+
+def _check_tables(tables: Optional[list[str]]) -> list[str]:
+    tables = list(tables or REEMBED_TABLES)
+    unknown = [t for t in tables if t not in REEMBED_TABLES]
+    if unknown:
+        raise ValueError(f"tables must be among: {', '.join(REEMBED_TABLES)}; got {unknown}")
+    return tables
+
+
+def _columns(target: str) -> tuple[str, str]:
+    return ("embedding", "embedding_model") if target == "embedding" else ("embedding_shadow", "embedding_shadow_model")
+
+
+def _target_model(target: str) -> str:
+    if target not in REEMBED_TARGETS:
+        raise ValueError(f"target must be one of: {', '.join(REEMBED_TARGETS)}; got {target!r}")
+    if target == "shadow":
+        if not settings.EMBEDDING_SHADOW_MODEL:
+            raise ValueError("EMBEDDING_SHADOW_MODEL is not set")
+        return settings.EMBEDDING_SHADOW_MODEL
+    return settings.EMBEDDING_MODEL
+
+
+def _target_dim(target: str) -> int:
+    return EMBEDDING_DIM if target == "embedding" else settings.EMBEDDING_SHADOW_DIM
+
+
+def has_shadow_columns(db: Session, table: str) -> bool:
+    if table in _shadow_ready:
+        return True
+    found = db.execute(
+        text("""
+            SELECT count(*) FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = :t
+              AND column_name IN ('embedding_shadow', 'embedding_shadow_model')
+        """),
+        {"t": table},
+    ).scalar() == 2
+    if found:
+        _shadow_ready.add(table)
+    return found
+
+
+def prepare_shadow_columns(engine: Engine, tables: Optional[list[str]] = None, dim: Optional[int] = None) -> list[dict]:
+    """Add embedding_shadow vector(dim) (EMBEDDING_SHADOW_DIM) and embedding_shadow_model where missing."""
+    dim = int(dim or settings.EMBEDDING_SHADOW_DIM)
+    out = []
+    with engine.begin() as conn:
+        for table in _check_tables(tables):
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS embedding_shadow vector({dim}), "
+                f"ADD COLUMN IF NOT EXISTS embedding_shadow_model varchar(100)"
+            ))
+            out.append({"table": table, "column": "embedding_shadow", "dim": dim})
+    return out
+
+
+def _update_vectors(db: Session, table: str, target: str, model: str, pairs: list[tuple[int, list[float]]]) -> None:
+    if not pairs:
+        return
+    vec_col, model_col = _columns(target)
+    stmt = text(f"UPDATE {table} SET {vec_col} = :e, {model_col} = :m WHERE id = :id").bindparams(
+        bindparam("e", type_=Vector())
+    )
+    db.execute(stmt, [{"id": row_id, "e": embedding, "m": model} for row_id, embedding in pairs])
+
+
+def write_shadow_embeddings(db: Session, table: str, items: list[tuple[int, str]]) -> int:
+    """
+    Dual-write: embed (id, text) pairs with EMBEDDING_SHADOW_MODEL into table's shadow column (no commit).
+    No-op without the setting; logs once per table if the shadow columns were not prepared. Returns rows written.
+    """
+    model = settings.EMBEDDING_SHADOW_MODEL
+    if not model or not items:
+        return 0
+    if not has_shadow_columns(db, table):
+        if table not in _shadow_missing_logged:
+            logger.warning("EMBEDDING_SHADOW_MODEL set but %s has no shadow columns; run prepare-shadow", table)
+            _shadow_missing_logged.add(table)
+        return 0
+    embeddings = get_embeddings([t for _id, t in items], model=model)
+    pairs = [
+        (row_id, e) for (row_id, _t), e in zip(items, embeddings)
+        if _embedding_or_none(e, settings.EMBEDDING_SHADOW_DIM) is not None
+    ]
+    _update_vectors(db, table, "shadow", model, pairs)
+    return len(pairs)
+
+
+def _pending_clause(table: str, target: str) -> str:
+    """WHERE clause (alias t) for rows needing a vector from :model in the target column."""
+    vec_col, model_col = _columns(target)
+    clause = f"(t.{vec_col} IS NULL OR t.{model_col} IS DISTINCT FROM :model)"
+    if table in _CHUNKED_PARENTS:
+        clause += (
+            f" AND NOT EXISTS (SELECT 1 FROM document_chunks dc WHERE dc.doc_table = '{table}' AND dc.doc_id = t.id)"
+        )
+    return clause
+
+
+def _count_pending(db: Session, table: str, target: str, model: str) -> int:
+    return db.execute(
+        text(f"SELECT count(*) FROM {table} t WHERE {_pending_clause(table, target)}"), {"model": model}
+    ).scalar() or 0
+
+
+def embedding_status(db: Session, tables: Optional[list[str]] = None) -> list[dict[str, Any]]:
+    """
+    Per table: rows, rows with an EMBEDDING_MODEL vector, missing (NULL) and outdated (other model);
+    with shadow columns, shadow_pending for EMBEDDING_SHADOW_MODEL.
+    """
+    out = []
+    for table in _check_tables(tables):
+        skip = (
+            f" AND NOT EXISTS (SELECT 1 FROM document_chunks dc WHERE dc.doc_table = '{table}' AND dc.doc_id = t.id)"
+            if table in _CHUNKED_PARENTS else ""
+        )
+        row = db.execute(
+            text(f"""
+                SELECT count(*) AS total,
+                       count(*) FILTER (WHERE t.embedding IS NOT NULL AND t.embedding_model = :model) AS current,
+                       count(*) FILTER (WHERE t.embedding IS NULL{skip}) AS missing,
+                       count(*) FILTER (WHERE t.embedding IS NOT NULL AND t.embedding_model IS DISTINCT FROM :model) AS outdated
+                FROM {table} t
+            """),
+            {"model": settings.EMBEDDING_MODEL},
+        ).one()
+        item = {"table": table, "model": settings.EMBEDDING_MODEL, **row._asdict()}
+        if has_shadow_columns(db, table):
+            item["shadow_model"] = settings.EMBEDDING_SHADOW_MODEL
+            item["shadow_pending"] = (
+                _count_pending(db, table, "shadow", settings.EMBEDDING_SHADOW_MODEL)
+                if settings.EMBEDDING_SHADOW_MODEL else None
+            )
+        out.append(item)
+    return out
+
+
+def create_reembed_job(db: Session, target: str = "embedding", tables: Optional[list[str]] = None) -> ReembedJob:
+    """Count the rows needing work per table and persist the job (commits)."""
+    model = _target_model(target)
+    tables = _check_tables(tables)
+    if target == "shadow":
+        missing = [t for t in tables if not has_shadow_columns(db, t)]
+        if missing:
+            raise ValueError(f"shadow columns missing on {missing}; run prepare-shadow first")
+    state = {}
+    total = 0
+    for table in tables:
+        pending = _count_pending(db, table, target, model)
+        state[table] = {"after_id": 0, "pending_at_start": pending, "embedded": 0, "failed": 0, "done": pending == 0}
+        total += pending
+    job = ReembedJob(
+        target=target,
+        model=model,
+        tables=state,
+        total_rows=total,
+        status="pending" if total else "completed",
+        errors=[],
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+def _fetch_batch(db: Session, table: str, target: str, model: str, after_id: int, limit: int) -> list[tuple[int, str]]:
+    """Next (id, embedding text) rows after after_id. Texts match the write paths (see rag/ingest.DOMAINS)."""
+    from app.rag.ingest import DOMAINS
+
+    where = _pending_clause(table, target)
+    params = {"model": model, "after": after_id, "limit": limit}
+    if table == "document_chunks":
+        rows = db.execute(
+            text(f"""
+                SELECT t.id, t.content, coalesce(f.title, m.title, o.title, d.title, '') AS title
+                FROM document_chunks t
+                LEFT JOIN finance_documents f ON t.doc_table = 'finance_documents' AND f.id = t.doc_id
+                LEFT JOIN marketing_documents m ON t.doc_table = 'marketing_documents' AND m.id = t.doc_id
+                LEFT JOIN ops_documents o ON t.doc_table = 'ops_documents' AND o.id = t.doc_id
+                LEFT JOIN tech_documents d ON t.doc_table = 'tech_documents' AND d.id = t.doc_id
+                WHERE t.id > :after AND {where}
+                ORDER BY t.id
+                LIMIT :limit
+            """),
+            params,
+        ).all()
+        return [(r.id, f"{r.title}\n\n{r.content}") for r in rows]
+    embed_text = next(fn for model_cls, _key, fn in DOMAINS.values() if model_cls.__tablename__ == table)
+    rows = db.execute(
+        text(f"SELECT t.id, t.title, t.content FROM {table} t WHERE t.id > :after AND {where} ORDER BY t.id LIMIT :limit"),
+        params,
+    ).all()
+    return [(r.id, embed_text({"title": r.title, "content": r.content or ""})) for r in rows]
+
+
+def _claim_job(db: Session, job_id: UUID) -> ReembedJob:
+    """Lock the job row and mark it running; refuses a job another runner is actively working on (commits)."""
+    job = db.query(ReembedJob).filter(ReembedJob.id == job_id).with_for_update().first()
+    if job is None:
+        db.rollback()
+        raise ValueError(f"Re-embed job {job_id} not found")
+    if job.status == "completed":
+        db.rollback()
+        return job
+    now = datetime.now(timezone.utc)
+    if (
+        job.status == "running"
+        and job.heartbeat_at is not None
+        and (now - job.heartbeat_at).total_seconds() < settings.REEMBED_JOB_STALE_SECONDS
+    ):
+        db.rollback()
+        raise ValueError(f"Re-embed job {job_id} is already running")
+    job.status = "running"
+    job.started_at = job.started_at or now
+    job.heartbeat_at = now
+    job.finished_at = None
+    db.commit()
+    return job
+
+
+def run_reembed_job(job_id: UUID, max_batches: Optional[int] = None) -> dict[str, Any]:
+    """
+    Process (or resume) a job until every table is done, or for at most max_batches batches.
+    Blocks; returns progress. Raises ValueError if the job is missing or already running elsewhere.
+    """
+    db = SessionLocal()
+    try:
+        job = _claim_job(db, job_id)
+        if job.status == "completed":
+            return get_reembed_job_progress(db, job_id)
+        dim = _target_dim(job.target)
+        interval = 60.0 / max(1, settings.REEMBED_REQUESTS_PER_MINUTE)
+        batch_size = max(1, settings.REEMBED_BATCH_SIZE)
+        batches = 0
+        try:
+            for table in list(job.tables):
+                while not job.tables[table]["done"]:
+                    if max_batches is not None and batches >= max_batches:
+                        job.status = "pending"
+                        db.commit()
+                        return get_reembed_job_progress(db, job_id)
+                    started = time.monotonic()
+                    state = dict(job.tables[table])
+                    rows = _fetch_batch(db, table, job.target, job.model, state["after_id"], batch_size)
+                    if rows:
+                        embeddings = get_embeddings(
+                            [t for _id, t in rows], batch_size=batch_size, max_concurrency=1, model=job.model
+                        )
+                        pairs = [
+                            (row_id, e) for (row_id, _t), e in zip(rows, embeddings)
+                            if _embedding_or_none(e, dim) is not None
+                        ]
+                        _update_vectors(db, table, job.target, job.model, pairs)
+                        state["after_id"] = rows[-1][0]
+                        state["embedded"] += len(pairs)
+                        state["failed"] += len(rows) - len(pairs)
+                        job.rows_embedded += len(pairs)
+                        job.rows_failed += len(rows) - len(pairs)
+                        job.requests += 1
+                        batches += 1
+                    state["done"] = len(rows) < batch_size
+                    job.tables = {**job.tables, table: state}
+                    job.heartbeat_at = datetime.now(timezone.utc)
+                    elapsed = time.monotonic() - started
+                    job.active_seconds = (job.active_seconds or 0.0) + elapsed
+                    db.commit()  # vectors and checkpoint together
+                    if rows and not state["done"] and elapsed < interval:
+                        time.sleep(interval - elapsed)
+            job.status = "completed"
+            job.finished_at = datetime.now(timezone.utc)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.exception("re-embed job %s failed", job_id)
+            job = db.query(ReembedJob).filter(ReembedJob.id == job_id).first()
+            job.status = "failed"
+            job.errors = ((job.errors or []) + [str(e)])[-_MAX_ERRORS:]
+            db.commit()
+        return get_reembed_job_progress(db, job_id)
+    finally:
+        db.close()
+
+
+def start_reembed_job(job_id: UUID) -> threading.Thread:
+    """Run a job on a daemon thread (admin API)."""
+
+    def target() -> None:
+        try:
+            run_reembed_job(job_id)
+        except Exception:
+            logger.exception("re-embed job %s runner crashed", job_id)
+
+    thread = threading.Thread(target=target, name=f"reembed-job-{job_id}", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_reembed_job_progress(db: Session, job_id: UUID) -> Optional[dict[str, Any]]:
+    """Job status, per-table checkpoints and counts, rows/second over active time, and ETA; None if missing."""
+    job = db.query(ReembedJob).filter(ReembedJob.id == job_id).first()
+    if job is None:
+        return None
+    processed = job.rows_embedded + job.rows_failed
+    rate = processed / job.active_seconds if job.active_seconds else None
+    remaining = max(0, job.total_rows - processed)
+    return {
+        "job_id": str(job.id),
+        "status": job.status,
+        "target": job.target,
+        "model": job.model,
+        "total_rows": job.total_rows,
+        "rows_embedded": job.rows_embedded,
+        "rows_failed": job.rows_failed,
+        "requests": job.requests,
+        "progress_pct": round(100.0 * min(processed, job.total_rows) / job.total_rows, 1) if job.total_rows else 100.0,
+        "rows_per_second": round(rate, 1) if rate else None,
+        "eta_seconds": round(remaining / rate) if rate and job.status != "completed" else None,
+        "tables": job.tables,
+        "errors": job.errors or [],
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "heartbeat_at": job.heartbeat_at.isoformat() if job.heartbeat_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def list_reembed_jobs(db: Session, limit: int = 20) -> list[dict[str, Any]]:
+    """Most recent jobs with their progress."""
+    ids = [r[0] for r in db.query(ReembedJob.id).order_by(ReembedJob.created_at.desc()).limit(limit)]
+    return [get_reembed_job_progress(db, job_id) for job_id in ids]
+
+
+def cutover_shadow(engine: Engine, tables: Optional[list[str]] = None, force: bool = False) -> list[dict[str, Any]]:
+    """
+    Swap embedding <-> embedding_shadow (and the model columns) per table. Refuses a table whose shadow
+    column still has pending rows unless force. For each managed ANN index on embedding, a matching
+    index is first built CONCURRENTLY on the shadow column, then swapped in within the same transaction
+    as the columns, so searches never lose their index.
+    """
+    tables = _check_tables(tables)
+    out = []
+    db = SessionLocal()
+    try:
+        shadow_model = _target_model("shadow")
+        for table in tables:
+            if not has_shadow_columns(db, table):
+                raise ValueError(f"{table} has no shadow columns")
+            pending = _count_pending(db, table, "shadow", shadow_model)
+            if pending and not force:
+                raise ValueError(f"{table}: {pending} rows not yet embedded with {shadow_model}; run a shadow job first")
+        managed = [
+            (i["table_name"], i["method"]) for i in list_ann_indexes(db)
+            if i["index_name"] == index_name(i["table_name"], i["method"])
+        ]
+        db.rollback()
+    finally:
+        db.close()
+    for table in tables:
+        prebuilt = []
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for method in [m for t, m in managed if t == table]:
+                name = f"{index_name(table, method)}_shadow"
+                lists = None
+                if method == "ivfflat":
+                    lists = auto_ivfflat_lists(conn.execute(text(f"SELECT count(*) FROM {table}")).scalar() or 0)
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                conn.execute(text(index_ddl(table, method, lists=lists, name=name, column="embedding_shadow")))
+                prebuilt.append((method, name))
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table} RENAME COLUMN embedding TO embedding_swap"))
+            conn.execute(text(f"ALTER TABLE {table} RENAME COLUMN embedding_shadow TO embedding"))
+            conn.execute(text(f"ALTER TABLE {table} RENAME COLUMN embedding_swap TO embedding_shadow"))
+            conn.execute(text(f"ALTER TABLE {table} RENAME COLUMN embedding_model TO embedding_model_swap"))
+            conn.execute(text(f"ALTER TABLE {table} RENAME COLUMN embedding_shadow_model TO embedding_model"))
+            conn.execute(text(f"ALTER TABLE {table} RENAME COLUMN embedding_model_swap TO embedding_shadow_model"))
+            for method, name in prebuilt:
+                conn.execute(text(f"DROP INDEX IF EXISTS {index_name(table, method)}"))
+                conn.execute(text(f"ALTER INDEX {name} RENAME TO {index_name(table, method)}"))
+        out.append({"table": table, "swapped": True, "indexes": [index_name(table, m) for m, _n in prebuilt]})
+    return out
@@ -2,15 +2,19 @@
 Unified RAG vectorstore implementation for all document types.
 Supports Finance, Marketing, Operations, and Technology documents.
 """
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import text, select
-from openai import OpenAI
+from sqlalchemy import Row, Select, func, literal, select, union_all
+from openai import BadRequestError, OpenAI
 
 from app.config import settings
+from app.rag.embedding_cache import text_hash
+from app.utils.single_flight import SingleFlight
 from app.db.models import (
+    DocumentChunk,
     FinanceDocument,
     MarketingDocument,
+    KnowledgeChunk,
     OpsDocument,
     TechDocument
 )
@@ -27,31 +31,215 @@ def get_openai_client() -> OpenAI:
     return _client
 
 
-# OpenAI text-embedding-3-small dimension
+# Column dimension of every embedding column (vector(1536), text-embedding-3-small).
 EMBEDDING_DIM = 1536
+EMBEDDING_MODEL = settings.EMBEDDING_MODEL
 
+# Concurrent misses for the same (model, sha256(text)) share one request, from get_embedding and get_embeddings.
+_embedding_flight = SingleFlight("embeddings", lambda: settings.SINGLE_FLIGHT_ENABLED)
+
+
+def get_embedding(text: str, timeout: Optional[float] = None) -> List[float]:
+    """
+    Get embedding vector for text using OpenAI. Cached by (model, sha256(text)); see rag/embedding_cache.
+    With timeout, the request gets that many seconds and no retries (latency-bound callers fall back).
+    A miss already being fetched by another caller waits for that request (the leader's timeout applies).
+    """
+    from app.rag.embedding_cache import get_cached_embedding
+
+    cached = get_cached_embedding(EMBEDDING_MODEL, text)
+    if cached is not None:
+        return cached
+    return _embedding_flight.do((EMBEDDING_MODEL, text_hash(text)), lambda: _fetch_embedding(text, timeout))
+
+
+def _fetch_embedding(text: str, timeout: Optional[float]) -> List[float]:
+    from app.rag.embedding_cache import put_cached_embedding
 
-def get_embedding(text: str) -> List[float]:
-    """Get embedding vector for text using OpenAI."""
     client = get_openai_client()
+    if timeout is not None:
+        client = client.with_options(timeout=timeout, max_retries=0)
     try:
         response = client.embeddings.create(
-            model="text-embedding-3-small",
+            model=EMBEDDING_MODEL,
             input=text
         )
-        return response.data[0].embedding
+        embedding = response.data[0].embedding
     except Exception as e:
         print(f"Error getting embedding: {e}")
         return []
+    put_cached_embedding(EMBEDDING_MODEL, text, embedding)
+    return embedding
+
+
+def get_embeddings(
+    texts: List[str],
+    batch_size: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+    model: Optional[str] = None,
+) -> List[List[float]]:
+    """
+    Embeddings for many texts, in input order. Cache lookups and writes are batched; the remaining
+    unique texts go out in requests of EMBEDDING_BATCH_SIZE inputs, at most EMBEDDING_MAX_CONCURRENCY
+    in flight. A failed request yields [] for its texts (same contract as get_embedding); a request the
+    API rejects (e.g. one input over the model's token limit) is split in halves and retried, so only
+    the offending inputs get [].
+    model defaults to EMBEDDING_MODEL (re-embedding passes the shadow model).
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.rag.embedding_cache import get_cached_embeddings, put_cached_embeddings
+
+    model = model or EMBEDDING_MODEL
+    batch_size = max(1, batch_size or settings.EMBEDDING_BATCH_SIZE)
+    max_concurrency = max(1, max_concurrency or settings.EMBEDDING_MAX_CONCURRENCY)
+    found = get_cached_embeddings(model, [t for t in texts if t])
+    pending = [t for t in dict.fromkeys(texts) if t and t not in found]
+    # Texts another caller is already fetching are waited for instead of sent again.
+    led: Dict[str, Any] = {}
+    shared: Dict[str, Any] = {}
+    if pending and _embedding_flight.enabled():
+        for t in pending:
+            key = (model, text_hash(t))
+            call, leader = _embedding_flight.acquire(key)
+            if leader:
+                led[t] = (key, call)
+            else:
+                shared[t] = call.future
+        pending = list(led)
+    batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+
+    def _embed_batch(batch: List[str]) -> List[List[float]]:
+        try:
+            response = get_openai_client().embeddings.create(model=model, input=batch)
+            return [d.embedding for d in sorted(response.data, key=lambda d: d.index)]
+        except BadRequestError as e:
+            if len(batch) == 1:
+                print(f"Error getting embedding (input rejected): {e}")
+                return [[]]
+            mid = len(batch) // 2
+            return _embed_batch(batch[:mid]) + _embed_batch(batch[mid:])
+        except Exception as e:
+            print(f"Error getting embeddings for batch of {len(batch)}: {e}")
+            return [[] for _ in batch]
+
+    fetched: Dict[str, List[float]] = {}
+    try:
+        if batches:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(batches))) as pool:
+                for batch, embeddings in zip(batches, pool.map(_embed_batch, batches)):
+                    fetched.update(zip(batch, embeddings))
+            put_cached_embeddings(model, fetched)
+    finally:
+        for t, (key, call) in led.items():
+            _embedding_flight.finish(key, call, fetched.get(t, []))
+    for t, future in shared.items():
+        try:
+            fetched[t] = future.result()
+        except Exception:
+            fetched[t] = []
+    found.update(fetched)
+    return [found.get(t, []) if t else [] for t in texts]
 
 
-def _embedding_or_none(embedding: Optional[List[float]]) -> Optional[List[float]]:
+def _embedding_or_none(embedding: Optional[List[float]], dim: int = EMBEDDING_DIM) -> Optional[List[float]]:
     """Return embedding if valid for DB (length 1536), else None to avoid pgvector errors."""
-    if not embedding or len(embedding) != EMBEDDING_DIM:
+    if not embedding or len(embedding) != dim:
         return None
     return embedding
 
 
+def _embedding_model(embedding: Optional[List[float]]) -> Optional[str]:
+    """Value for the embedding_model column: the model that produced a stored embedding."""
+    return EMBEDDING_MODEL if embedding is not None else None
+
+
+def _dual_write(db: Session, doc: Any, text: str) -> None:
+    """With EMBEDDING_SHADOW_MODEL set, also embed text into the row's shadow column (rag/reembed.py)."""
+    if settings.EMBEDDING_SHADOW_MODEL:
+        from app.rag.reembed import write_shadow_embeddings
+
+        write_shadow_embeddings(db, doc.__tablename__, [(doc.id, text)])
+        db.commit()
+
+
+# Domain tables whose long documents are stored as document_chunks (rag/chunking.py).
+CHUNKED_TABLES = ("finance_documents", "marketing_documents", "ops_documents", "tech_documents")
+# Nearest parents and chunks fetched per search before deduping to parents.
+_CHUNK_CANDIDATES_PER_HIT = 4
+
+
+def _vector_select(
+    model: Any,
+    query_embedding: List[float],
+    top_k: int,
+    min_similarity: Optional[float],
+    columns: List[Any],
+) -> Select:
+    if model.__tablename__ not in CHUNKED_TABLES:
+        distance = model.embedding.cosine_distance(query_embedding)
+        stmt = select(*columns, (1 - distance).label("similarity")).where(model.embedding.isnot(None))
+        if min_similarity is not None:
+            stmt = stmt.where(distance <= 1 - min_similarity)
+        return stmt.order_by(distance).limit(top_k)
+
+    # Parent embeddings (short documents) and chunk embeddings (long documents) compete; each parent
+    # appears once, with its best-matching text as content.
+    candidates = top_k * _CHUNK_CANDIDATES_PER_HIT
+    parent_distance = model.embedding.cosine_distance(query_embedding)
+    chunk_distance = DocumentChunk.embedding.cosine_distance(query_embedding)
+    hits = union_all(
+        select(model.id.label("doc_id"), model.content.label("content"), parent_distance.label("distance"))
+        .where(model.embedding.isnot(None))
+        .order_by(parent_distance)
+        .limit(candidates),
+        select(DocumentChunk.doc_id, DocumentChunk.content, chunk_distance.label("distance"))
+        .where(DocumentChunk.doc_table == model.__tablename__, DocumentChunk.embedding.isnot(None))
+        .order_by(chunk_distance)
+        .limit(candidates),
+    ).subquery("hits")
+    best = select(
+        hits,
+        func.row_number().over(partition_by=hits.c.doc_id, order_by=hits.c.distance).label("rank_in_doc"),
+    ).subquery("best")
+    columns = [best.c.content.label("content") if c is model.content else c for c in columns]
+    stmt = (
+        select(*columns, (1 - best.c.distance).label("similarity"))
+        .select_from(model)
+        .join(best, best.c.doc_id == model.id)
+        .where(best.c.rank_in_doc == 1)
+    )
+    if min_similarity is not None:
+        stmt = stmt.where(best.c.distance <= 1 - min_similarity)
+    return stmt.order_by(best.c.distance).limit(top_k)
+
+
+def vector_search(
+    db: Session,
+    model: Any,
+    query_embedding: List[float],
+    top_k: int,
+    min_similarity: Optional[float] = None,
+    columns: Optional[List[Any]] = None,
+) -> List[Row]:
+    """
+    Nearest neighbours of query_embedding in model's table, in one statement.
+    Selects columns (default id, title, content, created_at) plus similarity = 1 - (embedding <=> q),
+    nearest first; rows have attribute access (row.title, row.similarity). Rows below min_similarity
+    are dropped. ORDER BY uses the bare distance so an HNSW/IVFFlat index on embedding applies.
+    For the domain document tables, chunks of long documents are searched too and hits are deduped
+    to the parent: one row per document, content = its best-matching chunk (or the whole document).
+    """
+    if columns is None:
+        columns = [model.id, model.title, model.content, model.created_at]
+    stmt = _vector_select(model, query_embedding, top_k, min_similarity, columns)
+    return list(db.execute(stmt).all())
+
+
+def _min_similarity(min_similarity: Optional[float]) -> Optional[float]:
+    return min_similarity if min_similarity is not None else settings.RAG_MIN_SIMILARITY
+
+
 # Finance Documents
 def upsert_finance_document(db: Session, title: str, content: str) -> FinanceDocument:
     """Create or update a finance document with embedding."""
@@ -60,19 +248,24 @@ def upsert_finance_document(db: Session, title: str, content: str) -> FinanceDoc
         doc = FinanceDocument(
             title=title,
             content=content,
-            embedding=embedding
+            embedding=embedding,
+            embedding_model=_embedding_model(embedding),
+            content_hash=text_hash(content)
         )
         db.add(doc)
         db.commit()
         db.refresh(doc)
+        _dual_write(db, doc, content)
         return doc
     except Exception as e:
         db.rollback()
         raise
 
 
-def search_finance_docs(db: Session, query: str, top_k: int = 4) -> List[FinanceDocument]:
-    """Search finance documents using vector similarity."""
+def search_finance_docs(
+    db: Session, query: str, top_k: int = 4, min_similarity: Optional[float] = None
+) -> List[Row]:
+    """Search finance documents using vector similarity (rows: id, title, content, created_at, similarity)."""
     if not settings.RAG_ENABLED:
         return []
     
@@ -80,28 +273,7 @@ def search_finance_docs(db: Session, query: str, top_k: int = 4) -> List[Finance
         query_embedding = get_embedding(query)
         if not query_embedding:
             return []
-        
-        # Use pgvector cosine similarity search
-        embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
-        conn = db.connection().connection
-        
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT id, title, content, created_at
-                FROM finance_documents
-                WHERE embedding IS NOT NULL
-                ORDER BY embedding <=> %s::vector
-                LIMIT %s
-            """, (embedding_str, top_k))
-            results = cursor.fetchall()
-        
-        docs = []
-        for row in results:
-            doc = db.query(FinanceDocument).filter(FinanceDocument.id == row[0]).first()
-            if doc:
-                docs.append(doc)
-        
-        return docs
+        return vector_search(db, FinanceDocument, query_embedding, top_k, _min_similarity(min_similarity))
     except Exception as e:
         print(f"Error searching finance docs: {e}")
         return []
@@ -115,103 +287,103 @@ def upsert_marketing_document(db: Session, title: str, content: str) -> Marketin
     if existing:
         existing.content = content
         existing.embedding = embedding
+        existing.embedding_model = _embedding_model(embedding)
+        existing.content_hash = text_hash(content)
         db.commit()
         db.refresh(existing)
+        _dual_write(db, existing, content)
         return existing
     doc = MarketingDocument(
         title=title,
         content=content,
-        embedding=embedding
+        embedding=embedding,
+        embedding_model=_embedding_model(embedding),
+        content_hash=text_hash(content)
     )
     db.add(doc)
     db.commit()
     db.refresh(doc)
+    _dual_write(db, doc, content)
     return doc
 
 
-def search_marketing_docs(db: Session, query: str, top_k: int = 4) -> List[MarketingDocument]:
-    """Search marketing documents using vector similarity."""
+def search_marketing_docs(
+    db: Session, query: str, top_k: int = 4, min_similarity: Optional[float] = None
+) -> List[Row]:
+    """Search marketing documents using vector similarity (rows: id, title, content, created_at, similarity)."""
     if not settings.RAG_ENABLED:
         return []
     
     query_embedding = get_embedding(query)
     if not query_embedding:
         return []
-    
-    embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
-    conn = db.connection().connection
-    
-    with conn.cursor() as cursor:
-        cursor.execute("""
-            SELECT id, title, content, created_at
-            FROM marketing_documents
-            WHERE embedding IS NOT NULL
-            ORDER BY embedding <=> %s::vector
-            LIMIT %s
-        """, (embedding_str, top_k))
-        results = cursor.fetchall()
-    
-    docs = []
-    for row in results:
-        doc = db.query(MarketingDocument).filter(MarketingDocument.id == row[0]).first()
-        if doc:
-            docs.append(doc)
-    
-    return docs
+    return vector_search(db, MarketingDocument, query_embedding, top_k, _min_similarity(min_similarity))
 
 
 # Operations Documents
 def upsert_ops_document(db: Session, title: str, content: str) -> OpsDocument:
     """Upsert an operations document with embedding."""
     embedding = _embedding_or_none(get_embedding(content))
-    doc = OpsDocument(title=title, content=content, embedding=embedding)
+    doc = OpsDocument(
+        title=title,
+        content=content,
+        embedding=embedding,
+        embedding_model=_embedding_model(embedding),
+        content_hash=text_hash(content),
+    )
     db.add(doc)
     db.commit()
     db.refresh(doc)
+    _dual_write(db, doc, content)
     return doc
 
 
-def search_ops_docs(db: Session, query: str, top_k: Optional[int] = None) -> List[OpsDocument]:
-    """Search operations documents using vector similarity."""
+def search_ops_docs(
+    db: Session, query: str, top_k: Optional[int] = None, min_similarity: Optional[float] = None
+) -> List[Row]:
+    """Search operations documents using vector similarity (rows: id, title, content, created_at, similarity)."""
     if top_k is None:
         top_k = settings.RAG_TOP_K
     
     embedding = get_embedding(query)
     if not embedding:
         return []
-    
-    stmt = (
-        select(OpsDocument)
-        .order_by(OpsDocument.embedding.cosine_distance(embedding))
-        .limit(top_k)
-    )
-    return list(db.execute(stmt).scalars())
+    return vector_search(db, OpsDocument, embedding, top_k, _min_similarity(min_similarity))
 
 
 # Technology Documents (native pgvector: store list, search with <=>)
 def upsert_tech_document(db: Session, title: str, content: str) -> TechDocument:
     """Insert or update a technical document with embedding (native vector(1536))."""
-    embedding = _embedding_or_none(get_embedding(f"{title}\n\n{content}"))
+    embed_text = f"{title}\n\n{content}"
+    embedding = _embedding_or_none(get_embedding(embed_text))
     existing = db.query(TechDocument).filter(TechDocument.title == title).first()
     if existing:
         existing.content = content
         existing.embedding = embedding
+        existing.embedding_model = _embedding_model(embedding)
+        existing.content_hash = text_hash(content)
         db.commit()
         db.refresh(existing)
+        _dual_write(db, existing, embed_text)
         return existing
     doc = TechDocument(
         title=title,
         content=content,
-        embedding=embedding
+        embedding=embedding,
+        embedding_model=_embedding_model(embedding),
+        content_hash=text_hash(content)
     )
     db.add(doc)
     db.commit()
     db.refresh(doc)
+    _dual_write(db, doc, embed_text)
     return doc
 
 
-def search_tech_docs(db: Session, query: str, top_k: int = 4) -> List[Dict[str, Any]]:
-    """Search technical documents using pgvector cosine distance (<=>)."""
+def search_tech_docs(
+    db: Session, query: str, top_k: int = 4, min_similarity: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """Search technical documents using pgvector cosine distance (<=>); similarity is 1 - distance."""
     if not settings.RAG_ENABLED:
         return []
     
@@ -219,30 +391,78 @@ def search_tech_docs(db: Session, query: str, top_k: int = 4) -> List[Dict[str,
         query_embedding = get_embedding(query)
         if not query_embedding:
             return []
-        
-        embedding_str = "[" + ",".join(map(str, query_embedding)) + "]"
-        conn = db.connection().connection
-        
-        with conn.cursor() as cursor:
-            cursor.execute("""
-                SELECT id, title, content
-                FROM tech_documents
-                WHERE embedding IS NOT NULL
-                ORDER BY embedding <=> %s::vector
-                LIMIT %s
-            """, (embedding_str, top_k))
-            results = cursor.fetchall()
-        
-        # Return same shape as before: list of dicts with title, content, similarity.
-        # Cosine similarity = 1 - cosine_distance; we don't have distance in cursor, so use 1.0 for "match".
-        docs = []
-        for row in results:
-            doc_id, title, content = row[0], row[1], row[2]
-            doc = db.query(TechDocument).filter(TechDocument.id == doc_id).first()
-            if doc:
-                docs.append({"title": doc.title, "content": doc.content, "similarity": 1.0})
-        return docs
+        rows = vector_search(db, TechDocument, query_embedding, top_k, _min_similarity(min_similarity))
+        return [{"title": r.title, "content": r.content, "similarity": float(r.similarity)} for r in rows]
     except Exception as e:
         print(f"Error searching tech docs: {e}")
         return []
 
+
+# Multi-domain retrieval
+DOMAIN_MODELS: Dict[str, Any] = {
+    "finance": FinanceDocument,
+    "marketing": MarketingDocument,
+    "ops": OpsDocument,
+    "tech": TechDocument,
+    "knowledge": KnowledgeChunk,
+}
+
+
+def multi_domain_search(
+    db: Session,
+    queries: Dict[str, str],
+    top_k: Union[int, Dict[str, int]] = 4,
+    min_similarity: Optional[float] = None,
+) -> Dict[str, List[Row]]:
+    """
+    Top-k hits for several domains at once: {domain: query} -> {domain: rows}.
+    All query strings are embedded in one batched request (get_embeddings) and the per-table
+    searches run as a single UNION ALL statement. Rows carry domain, id, title, content, similarity,
+    nearest first. top_k may be a per-domain dict (missing domains use RAG_TOP_K). Domains whose
+    query is empty or could not be embedded map to [].
+    """
+    if not settings.RAG_ENABLED:
+        return {}
+    unknown = set(queries) - set(DOMAIN_MODELS)
+    if unknown:
+        raise ValueError(f"unknown domains {sorted(unknown)}; expected {', '.join(DOMAIN_MODELS)}")
+    domains = [d for d, q in queries.items() if q and q.strip()]
+    out: Dict[str, List[Row]] = {d: [] for d in queries}
+    if not domains:
+        return out
+    threshold = _min_similarity(min_similarity)
+    parts = []
+    for domain, embedding in zip(domains, get_embeddings([queries[d] for d in domains])):
+        if not embedding:
+            continue
+        model = DOMAIN_MODELS[domain]
+        k = top_k.get(domain, settings.RAG_TOP_K) if isinstance(top_k, dict) else top_k
+        columns = [literal(domain).label("domain"), model.id, model.title, model.content]
+        parts.append(_vector_select(model, embedding, k, threshold, columns))
+    if not parts:
+        return out
+    stmt = parts[0] if len(parts) == 1 else union_all(*parts)
+    for row in db.execute(stmt):
+        out[row.domain].append(row)
+    for rows in out.values():
+        rows.sort(key=lambda r: r.similarity, reverse=True)
+    return out
+
+
+async def search_in_own_session(search_fn: Any, *args: Any, **kwargs: Any) -> Any:
+    """
+    Await a sync search (search_*_docs, multi_domain_search) from async code: it runs in a worker
+    thread on a session of its own, never on the caller's request session.
+    """
+    import asyncio
+
+    from app.db.database import SessionLocal
+
+    def _run() -> Any:
+        db = SessionLocal()
+        try:
+            return search_fn(db, *args, **kwargs)
+        finally:
+            db.close()
+
+    return await asyncio.to_thread(_run)
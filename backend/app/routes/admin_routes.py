@@ -1,21 +1,13 @@
 """Admin-only routes: monthly snapshots, etc. Gated by ADMIN_API_KEY."""
-from datetime import date
-from typing import Optional
+from typing import List, Optional
+from uuid import UUID
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from app.config import settings
 from app.db.database import get_db
-from app.db.models import (
-    Enterprise,
-    EnterpriseHealthSnapshot,
-    EnterpriseReadinessSnapshot,
-    DecisionVelocitySnapshot,
-    CohortEnterprise,
-    PortfolioEnterprise,
-)
 
 router = APIRouter(prefix="/api/admin", tags=["Admin"])
 
@@ -37,136 +29,6 @@ class RunMonthlySnapshotsBody(BaseModel):
     portfolio_id: Optional[int] = None
 
 
-def _resolve_enterprise_ids(db: Session, body: RunMonthlySnapshotsBody) -> list[int]:
-    """Return list of enterprise IDs from body filters, or all enterprises."""
-    if body.enterprise_id is not None:
-        ent = db.query(Enterprise).filter(Enterprise.id == body.enterprise_id).first()
-        if not ent:
-            return []
-        return [body.enterprise_id]
-    if body.cohort_id is not None:
-        rows = db.query(CohortEnterprise.enterprise_id).filter(
-            CohortEnterprise.cohort_id == body.cohort_id
-        ).distinct().all()
-        return [r[0] for r in rows]
-    if body.portfolio_id is not None:
-        rows = db.query(PortfolioEnterprise.enterprise_id).filter(
-            PortfolioEnterprise.portfolio_id == body.portfolio_id
-        ).distinct().all()
-        return [r[0] for r in rows]
-    rows = db.query(Enterprise.id).all()
-    return [r[0] for r in rows]
-
-
-def _save_health_snapshot_idempotent(db: Session, enterprise_id: int) -> bool:
-    """Compute health score and upsert snapshot for current month (first day). Returns True if wrote/updated."""
-    from app.governance.health_score import compute_health_score
-    today = date.today()
-    snapshot_date = today.replace(day=1)
-    result = compute_health_score(db, enterprise_id)
-    existing = (
-        db.query(EnterpriseHealthSnapshot)
-        .filter(
-            EnterpriseHealthSnapshot.enterprise_id == enterprise_id,
-            EnterpriseHealthSnapshot.snapshot_date == snapshot_date,
-        )
-        .first()
-    )
-    if existing:
-        existing.score = result["total_score"]
-        existing.execution_score = result["execution_score"]
-        existing.governance_score = result["governance_score"]
-        existing.learning_score = result["learning_score"]
-        db.commit()
-    else:
-        snap = EnterpriseHealthSnapshot(
-            enterprise_id=enterprise_id,
-            score=result["total_score"],
-            execution_score=result["execution_score"],
-            governance_score=result["governance_score"],
-            learning_score=result["learning_score"],
-            snapshot_date=snapshot_date,
-        )
-        db.add(snap)
-        db.commit()
-    return True
-
-
-def _save_velocity_snapshot_idempotent(db: Session, enterprise_id: int) -> bool:
-    """Compute velocity and upsert snapshot for current month. Returns True if wrote/updated."""
-    from app.clear.decision_velocity import compute_decision_velocity, save_velocity_snapshot
-    today = date.today()
-    snapshot_date = today.replace(day=1)
-    vel = compute_decision_velocity(db, enterprise_id=enterprise_id)
-    avg_cycle = vel.get("avg_cycle_days")
-    if avg_cycle is None:
-        avg_cycle = 0.0
-    existing = (
-        db.query(DecisionVelocitySnapshot)
-        .filter(
-            DecisionVelocitySnapshot.enterprise_id == enterprise_id,
-            DecisionVelocitySnapshot.snapshot_date == snapshot_date,
-        )
-        .first()
-    )
-    if existing:
-        existing.avg_cycle_days = round(float(avg_cycle), 2)
-        existing.avg_time_to_decision = round(vel.get("avg_time_to_decision") or 0, 2)
-        existing.avg_time_to_execution = round(vel.get("avg_time_to_execution") or 0, 2)
-        existing.avg_time_to_review = round(vel.get("avg_time_to_review") or 0, 2)
-        existing.velocity_band = vel.get("velocity_band")
-        db.commit()
-    else:
-        save_velocity_snapshot(
-            db,
-            enterprise_id=enterprise_id,
-            avg_cycle_days=float(avg_cycle),
-            snapshot_date=snapshot_date,
-            avg_time_to_decision=vel.get("avg_time_to_decision"),
-            avg_time_to_execution=vel.get("avg_time_to_execution"),
-            avg_time_to_review=vel.get("avg_time_to_review"),
-            velocity_band=vel.get("velocity_band"),
-        )
-    return True
-
-
-def _save_readiness_snapshot_idempotent(db: Session, enterprise_id: int) -> bool:
-    """Compute ECRI and upsert snapshot for current month. Returns True if wrote/updated."""
-    from app.governance.readiness_index import compute_readiness_index_for_enterprise, save_readiness_snapshot
-    today = date.today()
-    snapshot_date = today.replace(day=1)
-    result = compute_readiness_index_for_enterprise(db, enterprise_id)
-    existing = (
-        db.query(EnterpriseReadinessSnapshot)
-        .filter(
-            EnterpriseReadinessSnapshot.enterprise_id == enterprise_id,
-            EnterpriseReadinessSnapshot.snapshot_date == snapshot_date,
-        )
-        .first()
-    )
-    if existing:
-        existing.readiness_index = result["readiness_index"]
-        existing.activation_component = result.get("activation_component")
-        existing.health_component = result.get("health_component")
-        existing.velocity_component = result.get("velocity_component")
-        existing.governance_component = result.get("governance_component")
-        existing.readiness_band = result.get("readiness_band")
-        db.commit()
-    else:
-        save_readiness_snapshot(
-            db,
-            enterprise_id=enterprise_id,
-            readiness_index=result["readiness_index"],
-            snapshot_date=snapshot_date,
-            activation_component=result.get("activation_component"),
-            health_component=result.get("health_component"),
-            velocity_component=result.get("velocity_component"),
-            governance_component=result.get("governance_component"),
-            readiness_band=result.get("readiness_band"),
-        )
-    return True
-
-
 @router.post("/snapshots/run-monthly")
 def run_monthly_snapshots(
     body: Optional[RunMonthlySnapshotsBody] = None,
@@ -174,34 +36,252 @@ def run_monthly_snapshots(
     db: Session = Depends(get_db),
 ):
     """
-    Run monthly Health, Velocity, and ECRI snapshots for enterprises.
+    Start a background job for monthly Health, Velocity, and ECRI snapshots.
     Optional body: enterprise_id, cohort_id, or portfolio_id to limit scope; otherwise all enterprises.
-    Snapshots are idempotent per month (upsert by first day of month).
+    Snapshots are idempotent per month (upsert by first day of month). Returns the job's initial
+    progress; poll GET /snapshots/jobs/{job_id}/progress.
     """
+    from app.clear.snapshot_jobs import create_snapshot_job, get_snapshot_job_progress, start_snapshot_job
+
     body = body or RunMonthlySnapshotsBody()
-    enterprise_ids = _resolve_enterprise_ids(db, body)
-    counts = {"health": 0, "velocity": 0, "readiness": 0}
-    errors: list[str] = []
-
-    for eid in enterprise_ids:
-        try:
-            _save_health_snapshot_idempotent(db, eid)
-            counts["health"] += 1
-        except Exception as e:
-            errors.append(f"enterprise_id={eid} health: {e!s}")
-        try:
-            _save_velocity_snapshot_idempotent(db, eid)
-            counts["velocity"] += 1
-        except Exception as e:
-            errors.append(f"enterprise_id={eid} velocity: {e!s}")
-        try:
-            _save_readiness_snapshot_idempotent(db, eid)
-            counts["readiness"] += 1
-        except Exception as e:
-            errors.append(f"enterprise_id={eid} readiness: {e!s}")
+    job = create_snapshot_job(db, scope=body.model_dump())
+    if job.total_chunks:
+        start_snapshot_job(job.id)
+    return get_snapshot_job_progress(db, job.id)
+
+
+@router.get("/snapshots/jobs")
+def list_monthly_snapshot_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """Most recent snapshot jobs with their progress."""
+    from app.clear.snapshot_jobs import list_snapshot_jobs
+
+    return list_snapshot_jobs(db, limit=limit)
+
+
+@router.get("/snapshots/jobs/{job_id}")
+def get_monthly_snapshot_job(
+    job_id: UUID,
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """Snapshot job status with per-chunk detail (status, attempts, errors)."""
+    from app.clear.snapshot_jobs import get_snapshot_job_progress
+
+    out = get_snapshot_job_progress(db, job_id, include_chunks=True)
+    if out is None:
+        raise HTTPException(status_code=404, detail="Snapshot job not found")
+    return out
+
+
+@router.get("/snapshots/jobs/{job_id}/progress")
+def get_monthly_snapshot_job_progress(
+    job_id: UUID,
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """Snapshot job progress: chunk counts by status, enterprises processed, snapshots written, errors."""
+    from app.clear.snapshot_jobs import get_snapshot_job_progress
+
+    out = get_snapshot_job_progress(db, job_id)
+    if out is None:
+        raise HTTPException(status_code=404, detail="Snapshot job not found")
+    return out
+
+
+@router.post("/snapshots/jobs/{job_id}/resume")
+def resume_monthly_snapshot_job(
+    job_id: UUID,
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """
+    Resume an interrupted or failed job in the background. Done chunks are skipped; failed chunks
+    are retried; chunks stuck in "running" are reclaimed once older than SNAPSHOT_JOB_STALE_SECONDS.
+    """
+    from app.clear.snapshot_jobs import get_snapshot_job_progress, start_snapshot_job
+
+    out = get_snapshot_job_progress(db, job_id)
+    if out is None:
+        raise HTTPException(status_code=404, detail="Snapshot job not found")
+    if out["status"] != "completed":
+        start_snapshot_job(job_id)
+    return out
+
+
+@router.get("/cache-stats")
+async def get_cache_stats(_: None = Depends(require_admin_key)):
+    """Per-worker cache counters (hits, misses, invalidations, size), LLM concurrency slots in use, single-flight fan-in."""
+    from app.agents.llm import llm_stats
+    from app.agents.llm_cache import cache_stats as llm_cache_stats
+    from app.governance.decision_cache import cache_stats
+    from app.knowledge.vector_index import index_stats
+    from app.rag.embedding_cache import cache_stats as embedding_cache_stats
+    from app.utils.single_flight import single_flight_stats
 
     return {
-        "enterprises_processed": len(enterprise_ids),
-        "snapshots_written": counts,
-        "errors": errors,
+        "decision_out": cache_stats(),
+        "embeddings": embedding_cache_stats(),
+        "knowledge_index": index_stats(),
+        "llm": llm_stats(),
+        "llm_responses": llm_cache_stats(),
+        "single_flight": single_flight_stats(),
     }
+
+
+@router.post("/embedding-cache/evict")
+def evict_embedding_cache(_: None = Depends(require_admin_key)):
+    """Delete embedding cache entries older than EMBEDDING_CACHE_MAX_AGE_DAYS (this worker's LRU and the table)."""
+    from app.rag.embedding_cache import evict_expired
+
+    return {"evicted": evict_expired()}
+
+
+@router.post("/llm-cache/evict")
+def evict_llm_cache(_: None = Depends(require_admin_key)):
+    """Delete LLM response cache entries older than LLM_CACHE_TTL_SECONDS and trim the table to LLM_CACHE_MAX_ROWS."""
+    from app.agents.llm_cache import evict_expired
+
+    return {"evicted": evict_expired()}
+
+
+@router.get("/ann-indexes")
+def list_ann_indexes(
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """HNSW/IVFFlat indexes on the RAG tables plus the per-connection search settings in effect."""
+    from app.rag.ann_index import list_ann_indexes as _list_ann_indexes
+
+    return {
+        "indexes": _list_ann_indexes(db),
+        "search_params": {
+            "hnsw.ef_search": settings.RAG_HNSW_EF_SEARCH,
+            "ivfflat.probes": settings.RAG_IVFFLAT_PROBES,
+        },
+    }
+
+
+@router.get("/embeddings/status")
+def get_embedding_status(
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """Per RAG table: rows embedded with EMBEDDING_MODEL, missing (NULL) and outdated vectors, shadow backlog."""
+    from app.rag.reembed import embedding_status
+
+    return embedding_status(db)
+
+
+class StartReembedJobBody(BaseModel):
+    """target: embedding (repair / move to EMBEDDING_MODEL) or shadow (backfill EMBEDDING_SHADOW_MODEL)."""
+    target: str = "embedding"
+    tables: Optional[List[str]] = None
+
+
+@router.post("/reembed-jobs")
+def start_reembed_job(
+    body: Optional[StartReembedJobBody] = None,
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """
+    Start a background re-embedding job for rows with NULL or other-model vectors. Returns the job's
+    initial progress; poll GET /reembed-jobs/{job_id}.
+    """
+    from app.rag.reembed import create_reembed_job, get_reembed_job_progress, start_reembed_job as _start
+
+    body = body or StartReembedJobBody()
+    try:
+        job = create_reembed_job(db, target=body.target, tables=body.tables)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if job.total_rows:
+        _start(job.id)
+    return get_reembed_job_progress(db, job.id)
+
+
+@router.get("/reembed-jobs")
+def list_reembed_jobs(
+    limit: int = Query(20, ge=1, le=100),
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """Most recent re-embedding jobs with their progress."""
+    from app.rag.reembed import list_reembed_jobs as _list
+
+    return _list(db, limit=limit)
+
+
+@router.get("/reembed-jobs/{job_id}")
+def get_reembed_job(
+    job_id: UUID,
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """Re-embedding job progress: per-table checkpoints, rows embedded/failed, rows_per_second, ETA."""
+    from app.rag.reembed import get_reembed_job_progress
+
+    out = get_reembed_job_progress(db, job_id)
+    if out is None:
+        raise HTTPException(status_code=404, detail="Re-embed job not found")
+    return out
+
+
+@router.post("/reembed-jobs/{job_id}/resume")
+def resume_reembed_job(
+    job_id: UUID,
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """Resume an interrupted or failed job from its checkpoints (refused while another runner is active)."""
+    from app.rag.reembed import get_reembed_job_progress, start_reembed_job as _start
+
+    out = get_reembed_job_progress(db, job_id)
+    if out is None:
+        raise HTTPException(status_code=404, detail="Re-embed job not found")
+    if out["status"] == "running" and out["heartbeat_at"]:
+        from datetime import datetime, timezone
+
+        age = (datetime.now(timezone.utc) - datetime.fromisoformat(out["heartbeat_at"])).total_seconds()
+        if age < settings.REEMBED_JOB_STALE_SECONDS:
+            raise HTTPException(status_code=409, detail="Re-embed job is already running")
+    if out["status"] != "completed":
+        _start(job_id)
+    return out
+
+
+@router.get("/diagnostic-jobs")
+def list_diagnostic_jobs(
+    status: Optional[str] = Query(None, description="queued | running | completed | dead"),
+    limit: int = Query(20, ge=1, le=100),
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """Diagnostic job queue: counts by status, age of the oldest due job, and the most recent jobs."""
+    from app.diagnostic.job_queue import JOB_STATUSES, diagnostic_queue_stats, list_diagnostic_jobs as _list
+
+    if status is not None and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of: {', '.join(JOB_STATUSES)}")
+    return {**diagnostic_queue_stats(db), "jobs": _list(db, status=status, limit=limit)}
+
+
+@router.post("/diagnostic-jobs/{job_id}/requeue")
+def requeue_diagnostic_job(
+    job_id: UUID,
+    _: None = Depends(require_admin_key),
+    db: Session = Depends(get_db),
+):
+    """Put a dead-lettered diagnostic job back on the queue with fresh attempts."""
+    from app.diagnostic.job_queue import requeue_diagnostic_job as _requeue
+
+    try:
+        out = _requeue(db, job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if out is None:
+        raise HTTPException(status_code=404, detail="Diagnostic job not found")
+    return out
@@ -15,7 +15,7 @@ from app.db.models import (
     AdvisorReview,
 )
 from app.clear.members import resolve_role_by_token
-from app.governance.ledger_service import get_latest_artifact_for_decision, _derive_status_from_ledger
+from app.governance.ledger_service import get_latest_artifact_for_decision, derive_statuses
 from app.governance.readiness import compute_readiness
 from app.clear.timeline_service import get_enterprise_timeline
 
@@ -163,10 +163,11 @@ def list_advisor_enterprise_decisions(
         .order_by(desc(Decision.created_at))
         .all()
     )
+    statuses = derive_statuses(db, [d.decision_id for d in decisions])
     out = []
     for d in decisions:
         art = get_latest_artifact_for_decision(db, d.decision_id)
-        status = _derive_status_from_ledger(db, d.decision_id) if art else "draft"
+        status = statuses[d.decision_id] if art else "draft"
         snap = (art.canonical_json or {}).get("decision_snapshot") or {} if art else {}
         out.append({
             "decision_id": str(d.decision_id),
@@ -209,10 +210,10 @@ def get_advisor_decision(
 
 def _decision_to_out(db: Session, d: Decision) -> dict:
     """Build DecisionOut-like dict for a decision (used by advisor read-only view)."""
-    from app.governance.ledger_service import get_latest_artifact_for_decision, _artifact_count_for_decision, _derive_status_from_ledger
+    from app.governance.ledger_service import get_latest_artifact_for_decision, _artifact_count_for_decision, get_decision_status
     art = get_latest_artifact_for_decision(db, d.decision_id)
     version_count = _artifact_count_for_decision(db, d.decision_id)
-    status = _derive_status_from_ledger(db, d.decision_id) if art else "draft"
+    status = get_decision_status(db, d.decision_id) if art else "draft"
     return {
         "decision_id": str(d.decision_id),
         "enterprise_id": d.enterprise_id,
@@ -8,11 +8,13 @@ from app.schemas.cfo.cfo_input import CFOInput
 from app.schemas.cfo.cfo_analysis import CFOAnalysisOut, CFOAnalysisListItem
 from app.schemas.cfo.cfo_chat import CFOChatRequest, CFOChatResponse
 from app.db.models import CFOAnalysis, CFOChatMessage
-from app.agents.cfo_agent import run_ai_cfo_agent, run_ai_cfo_chat
+from app.agents.cfo_agent import run_ai_cfo_agent, run_ai_cfo_chat, stream_ai_cfo_chat
+from app.agents.llm_cache import cache_route
 from app.governance_engine.rtco_service import create_decision_from_analysis
 from app.enterprise.decision_context_service import store_context
 from app.tools.financial_tools import compute_financial_summary
-from app.rag.vectorstore import search_finance_docs
+from app.rag.vectorstore import search_finance_docs, search_in_own_session
+from app.utils.sse import persist_rows, stream_reply
 import logging
 
 logger = logging.getLogger(__name__)
@@ -43,8 +45,8 @@ async def diagnose(
             "financial_risk_management",
         ]:
             try:
-                finance_docs = search_finance_docs(
-                    db=db,
+                finance_docs = await search_in_own_session(
+                    search_finance_docs,
                     query=f"SME {input_data.biggest_challenge} best practices",
                     top_k=4
                 )
@@ -53,11 +55,12 @@ async def diagnose(
                 logger.warning(f"RAG search failed: {e}")
         
         # Step 3: Call AI-CFO agent
-        analysis_json = run_ai_cfo_agent(
-            input_data=input_data,
-            docs=docs,
-            tools_results=tools_results
-        )
+        with cache_route("cfo_diagnose"):
+            analysis_json = await run_ai_cfo_agent(
+                input_data=input_data,
+                docs=docs,
+                tools_results=tools_results
+            )
         
         # Step 4: Save to database
         payload = input_data.model_dump(exclude={"enterprise_id", "decision_context"})
@@ -167,13 +170,28 @@ async def get_analysis(
 @router.post("/chat", response_model=CFOChatResponse)
 async def chat_with_ai_cfo(
     payload: CFOChatRequest,
+    stream: bool = Query(False, description="Stream the reply as Server-Sent Events (token, then done)."),
     db: Session = Depends(get_db)
 ):
-    """Lightweight chat endpoint for ad-hoc AI-CFO questions."""
+    """
+    Lightweight chat endpoint for ad-hoc AI-CFO questions. With stream=true the reply is sent token
+    by token and saved once complete; a client disconnect cancels the completion and nothing is saved.
+    """
     if not payload.message.strip():
         raise HTTPException(status_code=400, detail="Message cannot be empty")
 
     session_id = payload.session_id or str(uuid4())
+    if stream:
+        def finalize(reply: str) -> dict:
+            chat_record, = persist_rows(CFOChatMessage(
+                session_id=session_id,
+                user_id=payload.user_id,
+                user_message=payload.message,
+                ai_response=reply,
+            ))
+            return {"session_id": session_id, "created_at": chat_record.created_at}
+
+        return stream_reply(stream_ai_cfo_chat(payload.message), finalize)
 
     try:
         reply = run_ai_cfo_chat(payload.message)
@@ -10,12 +10,15 @@ from typing import List, Optional, Any
 
 from app.config import settings
 
-from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Request, UploadFile
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Request, Response, UploadFile
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from app.utils.sse import SSE_HEADERS, sse
+from sqlalchemy import func, text, tuple_
 from sqlalchemy.orm import Session
 
 from app.db.database import get_db
-from app.db.models import Decision, DecisionLedgerEvent, DecisionArtifact, DecisionEvidenceLink, Enterprise, DecisionChatSession, DecisionExecutionMilestone, HumanReviewRequest, OutcomeReview, DiagnosticRun, IdeaStageLead, UsageEvent, ImpactFeedback, DecisionComment, EnterpriseMember, AdvisorReviewRequest
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.db.models import Decision, DecisionLedgerEvent, DecisionArtifact, DecisionEvidenceLink, Enterprise, DecisionChatSession, DecisionExecutionMilestone, HumanReviewRequest, OutcomeReview, DiagnosticRun, IdeaStageLead, UsageEvent, ImpactFeedback, DecisionComment, EnterpriseMember, AdvisorReviewRequest, DecisionStatusProjection
 from app.schemas.clear.artifact import DecisionArtifactSchema
 from app.schemas.clear.enterprise import EnterpriseCreate, EnterpriseOut, EnterpriseUpdate
 from app.schemas.clear.ledger import (
@@ -50,8 +53,11 @@ from app.governance.ledger_service import (
     get_latest_artifact_for_decision,
     _derive_status_from_ledger,
     _artifact_count_for_decision,
+    get_decision_status,
+    derive_statuses,
 )
 from app.governance.validator import governance_completeness_errors
+from app.governance import decision_cache
 from app.governance.bootstrap import create_draft_from_analysis
 from app.schemas.clear.diagnostic_run import (
     DiagnosticRunRequest,
@@ -73,14 +79,15 @@ from app.schemas.clear.diagnostic_run import (
     DecisionCommentOut,
     ImpactFeedbackCreate,
 )
-from app.diagnostic.run_service import run_diagnostic_run
+from app.agents.llm_cache import cache_route
+from app.diagnostic.run_service import complete_diagnostic_run, run_diagnostic_run
 from app.governance.readiness import compute_readiness
 from app.governance.health_score import compute_health_score
 from app.clear.portfolio_service import list_portfolio_enriched
 from app.clear.timeline_service import get_enterprise_timeline
 from app.clear.decision_velocity import compute_decision_velocity
 from app.clear.members import invite_member, get_member_role_for_decision, list_members
-from app.clear.usage import record_event, EVENT_DIAGNOSTIC_COMPLETED, EVENT_DECISION_CREATED, EVENT_PLAN_COMMITTED, EVENT_OUTCOME_REVIEW_CREATED, EVENT_ADVISOR_CHAT_SENT, EVENT_ADVISOR_CHAT_REPLY
+from app.clear.usage import record_event, EVENT_PLAN_COMMITTED, EVENT_OUTCOME_REVIEW_CREATED, EVENT_ADVISOR_CHAT_SENT, EVENT_ADVISOR_CHAT_REPLY
 from app.clear.activation import compute_activation_for_enterprise
 from app.clear.activation_reminders import run_activation_reminders
 
@@ -154,15 +161,53 @@ IDEA_STAGE_BUSINESS_STAGES = frozenset(
 )
 
 
+def _stream_diagnostic_run(body: DiagnosticRunRequest, trace_id: str, t0: float) -> StreamingResponse:
+    """
+    SSE mode: started, one agent event per agent as it finishes (summary, risk_level), synthesis, then
+    decision (the DiagnosticRunResponse body), then done; error instead on failure. The run uses its own
+    Session and keeps going if the client disconnects.
+    """
+    from app.db.database import SessionLocal
+    from app.diagnostic.run_stream import stream_run
+
+    async def _run(emit) -> None:
+        db = SessionLocal()
+        try:
+            emit("started", {"trace_id": trace_id})
+            with cache_route("diagnostic_run"):
+                result = await run_diagnostic_run(
+                    db,
+                    diagnostic_data=body.diagnostic_data,
+                    onboarding_context=body.onboarding_context,
+                    enterprise_id=body.enterprise_id,
+                    actor_id="guest",
+                    actor_role="msme",
+                    on_event=emit,
+                )
+            emit("decision", complete_diagnostic_run(db, body, result, trace_id, t0).model_dump())
+        finally:
+            db.close()
+
+    return StreamingResponse(stream_run(_run), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.post("/diagnostic/run", response_model=DiagnosticRunResponse)
 async def diagnostic_run_endpoint(
     body: DiagnosticRunRequest,
+    stream: bool = Query(False, description="Stream progress as Server-Sent Events (agent, synthesis, decision)."),
+    async_: bool = Query(False, alias="async", description="Queue the run for a diagnostic worker and return 202 with a job id."),
     db: Session = Depends(get_db),
 ):
     """
     Run multi-agent diagnostic: CFO, CMO, COO, CTO with diagnostic_data.
-    If businessStage indicates idea/validation stage, off-ramp: no agents, no decision; return idea_stage=True.
+    If businessStage indicates idea/validation stage, off-ramp: no agents, no decision; return idea_stage=True
+    (immediately, in every mode).
+    With stream=true the response is text/event-stream (see _stream_diagnostic_run).
+    With async=1 the run is queued (app/diagnostic/job_queue.py) and the response is 202 with job_id;
+    poll GET /diagnostic/jobs/{job_id}, then GET /diagnostic/jobs/{job_id}/result.
     """
+    if stream and async_:
+        raise HTTPException(status_code=400, detail="stream and async cannot be combined")
     diagnostic_data = body.diagnostic_data or {}
     business_stage = (diagnostic_data.get("businessStage") or "").strip().lower()
     if business_stage in IDEA_STAGE_BUSINESS_STAGES:
@@ -180,7 +225,7 @@ async def diagnostic_run_endpoint(
             db.rollback()
         trace_id = str(uuid.uuid4())
         logger.info("diagnostic_run idea_stage off_ramp trace_id=%s", trace_id)
-        return DiagnosticRunResponse(
+        response = DiagnosticRunResponse(
             decision_id=None,
             idea_stage=True,
             idea_stage_message="CLEAR is designed for operating businesses. We've noted your interest for a future validation path.",
@@ -190,45 +235,45 @@ async def diagnostic_run_endpoint(
             enterprise_id=None,
             trace_id=trace_id,
         )
+        if stream:
+            events = [sse("decision", response.model_dump()), sse("done", {})]
+            return StreamingResponse(iter(events), media_type="text/event-stream", headers=SSE_HEADERS)
+        return response
 
     trace_id = str(uuid.uuid4())
     t0 = time.perf_counter()
-    try:
-        result = await run_diagnostic_run(
-            db,
-            diagnostic_data=body.diagnostic_data,
-            onboarding_context=body.onboarding_context,
-            enterprise_id=body.enterprise_id,
-            actor_id="guest",
-            actor_role="msme",
-        )
-        if body.decision_context and result.get("decision_id"):
-            try:
-                from app.enterprise.decision_context_service import store_context
-                store_context(UUID(result["decision_id"]), body.decision_context, db, body.enterprise_id)
-                db.commit()
-            except Exception as e:
-                logger.warning("Store decision context failed (non-blocking): %s", e)
-                db.rollback()
+    if stream:
+        return _stream_diagnostic_run(body, trace_id, t0)
+    if async_:
+        from app.diagnostic.job_queue import enqueue_diagnostic_job
+
         try:
-            record_event(db, EVENT_DIAGNOSTIC_COMPLETED, enterprise_id=result.get("enterprise_id"), decision_id=UUID(result["decision_id"]) if result.get("decision_id") else None)
-            record_event(db, EVENT_DECISION_CREATED, enterprise_id=result.get("enterprise_id"), decision_id=UUID(result["decision_id"]) if result.get("decision_id") else None)
-        except Exception:
-            pass
-        latency_sec = time.perf_counter() - t0
-        logger.info("diagnostic_run completed trace_id=%s latency_sec=%.2f decision_id=%s", trace_id, latency_sec, result.get("decision_id"))
-        if latency_sec > getattr(settings, "SLO_DIAGNOSTIC_RUN_P95_SEC", 90):
-            logger.warning("diagnostic_run above SLO trace_id=%s latency_sec=%.2f", trace_id, latency_sec)
-        return DiagnosticRunResponse(
-            decision_id=result["decision_id"],
-            idea_stage=False,
-            synthesis_summary=result["synthesis_summary"],
-            synthesis=result.get("synthesis"),
-            next_step=result.get("next_step", "playbooks"),
-            next_step_payload=result.get("next_step_payload", {}),
-            enterprise_id=result.get("enterprise_id"),
-            trace_id=trace_id,
+            job = enqueue_diagnostic_job(db, body.model_dump(mode="json"), trace_id=trace_id)
+        except Exception as e:
+            logger.exception("diagnostic/run enqueue failed: %s", e)
+            raise HTTPException(status_code=500, detail="Could not queue diagnostic run. Please try again.")
+        logger.info("diagnostic_run queued trace_id=%s job_id=%s", trace_id, job.id)
+        return JSONResponse(
+            status_code=202,
+            content={
+                "job_id": str(job.id),
+                "status": job.status,
+                "trace_id": trace_id,
+                "status_url": f"/api/clear/diagnostic/jobs/{job.id}",
+                "result_url": f"/api/clear/diagnostic/jobs/{job.id}/result",
+            },
         )
+    try:
+        with cache_route("diagnostic_run"):
+            result = await run_diagnostic_run(
+                db,
+                diagnostic_data=body.diagnostic_data,
+                onboarding_context=body.onboarding_context,
+                enterprise_id=body.enterprise_id,
+                actor_id="guest",
+                actor_role="msme",
+            )
+        return complete_diagnostic_run(db, body, result, trace_id, t0)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -236,6 +281,36 @@ async def diagnostic_run_endpoint(
         raise HTTPException(status_code=500, detail="Diagnostic run failed. Please try again.")
 
 
+@router.get("/diagnostic/jobs/{job_id}")
+def get_diagnostic_job_status(job_id: UUID, db: Session = Depends(get_db)):
+    """Status of a queued diagnostic run: queued (with queue_position) | running | completed | dead, attempts, last_error."""
+    from app.diagnostic.job_queue import get_diagnostic_job
+
+    out = get_diagnostic_job(db, job_id)
+    if out is None:
+        raise HTTPException(status_code=404, detail="Diagnostic job not found")
+    return out
+
+
+@router.get("/diagnostic/jobs/{job_id}/result", response_model=DiagnosticRunResponse)
+def get_diagnostic_job_result(job_id: UUID, db: Session = Depends(get_db)):
+    """
+    Result of a completed job (the DiagnosticRunResponse body). 202 with the job status while it is queued
+    or running; 409 with last_error if the job is dead.
+    """
+    from app.diagnostic.job_queue import get_diagnostic_job
+
+    out = get_diagnostic_job(db, job_id, include_result=True)
+    if out is None:
+        raise HTTPException(status_code=404, detail="Diagnostic job not found")
+    if out["status"] == "dead":
+        raise HTTPException(status_code=409, detail=f"Diagnostic job failed: {out['last_error']}")
+    if out["status"] != "completed":
+        out.pop("result", None)
+        return JSONResponse(status_code=202, content=out)
+    return out["result"]
+
+
 @router.post("/human-review")
 def human_review_request(
     body: HumanReviewRequestSchema,
@@ -479,7 +554,7 @@ def bootstrap_draft_from_analysis(
 
 
 def _decision_to_out(d: Decision, latest_art: Optional[DecisionArtifact], db: Session) -> DecisionOut:
-    status = _derive_status_from_ledger(db, d.decision_id)
+    status = get_decision_status(db, d.decision_id)
     version_count = _artifact_count_for_decision(db, d.decision_id)
     return DecisionOut(
         decision_id=d.decision_id,
@@ -500,36 +575,105 @@ def _decision_to_out(d: Decision, latest_art: Optional[DecisionArtifact], db: Se
 
 @router.get("/decisions", response_model=List[DecisionListItem])
 def list_decisions(
+    response: Response,
     enterprise_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
-    skip: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page"),
+    skip: int = Query(0, ge=0, description="Deprecated offset paging; ignored when cursor is set"),
     limit: int = Query(50, ge=1, le=100),
+    include_total: bool = Query(False, description="Set X-Total-Estimate header"),
     db: Session = Depends(get_db),
 ):
-    """List decisions (filter by enterprise_id, status). State derived from ledger."""
-    q = db.query(Decision)
+    """
+    List decisions newest first (filter by enterprise_id, status). Status comes from the
+    decision_status_projection read model and is filtered in SQL, so every page is full.
+    Keyset paging on (created_at, decision_id): pass X-Next-Cursor back as ?cursor=.
+    """
+    projected_status = func.coalesce(DecisionStatusProjection.status, DerivedDecisionStatus.DRAFT.value)
+    q = (
+        db.query(Decision, DecisionStatusProjection.status)
+        .outerjoin(DecisionStatusProjection, DecisionStatusProjection.decision_id == Decision.decision_id)
+    )
     if enterprise_id is not None:
         q = q.filter(Decision.enterprise_id == enterprise_id)
-    q = q.order_by(Decision.created_at.desc()).offset(skip).limit(limit)
-    rows = q.all()
-    out = []
-    for r in rows:
-        derived_status = _derive_status_from_ledger(db, r.decision_id)
-        if status is not None and derived_status != status:
-            continue
-        version_count = _artifact_count_for_decision(db, r.decision_id)
-        out.append(DecisionListItem(decision_id=r.decision_id, enterprise_id=r.enterprise_id, current_status=derived_status, current_artifact_version=version_count, created_at=r.created_at))
-    return out
+    if status is not None:
+        q = q.filter(projected_status == status)
+    if include_total:
+        response.headers["X-Total-Estimate"] = str(_decision_total_estimate(db, q, filtered=enterprise_id is not None or status is not None))
+    if cursor:
+        try:
+            cursor_created_at, cursor_decision_id = decode_cursor(cursor)
+            cursor_decision_id = UUID(cursor_decision_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        q = q.filter(tuple_(Decision.created_at, Decision.decision_id) < tuple_(cursor_created_at, cursor_decision_id))
+    q = q.order_by(Decision.created_at.desc(), Decision.decision_id.desc())
+    if not cursor and skip:
+        q = q.offset(skip)
+    rows = q.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if has_more:
+        last = rows[-1][0]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.decision_id)
+
+    decision_ids = [d.decision_id for d, _ in rows]
+    # Decisions without a projection row yet (pre-migration data) fall back to ledger replay.
+    replayed = derive_statuses(db, [d.decision_id for d, s in rows if s is None])
+    version_counts = dict(
+        db.query(DecisionArtifact.decision_id, func.count(DecisionArtifact.artifact_id))
+        .filter(DecisionArtifact.decision_id.in_(decision_ids))
+        .group_by(DecisionArtifact.decision_id)
+        .all()
+    ) if decision_ids else {}
+    return [
+        DecisionListItem(
+            decision_id=d.decision_id,
+            enterprise_id=d.enterprise_id,
+            current_status=s if s is not None else replayed[d.decision_id],
+            current_artifact_version=version_counts.get(d.decision_id, 0),
+            created_at=d.created_at,
+        )
+        for d, s in rows
+    ]
+
+
+def _decision_total_estimate(db: Session, q, filtered: bool) -> int:
+    """Row count for X-Total-Estimate: planner estimate for the whole table, exact count when filtered."""
+    if not filtered:
+        est = db.execute(text("SELECT reltuples::bigint FROM pg_class WHERE relname = 'decisions'")).scalar()
+        if est is not None and est >= 0:
+            return int(est)
+    return q.order_by(None).count()
 
 
 @router.get("/decisions/{decision_id}", response_model=DecisionOut)
 def get_decision(decision_id: UUID, db: Session = Depends(get_db)):
-    """Get decision by decision_id (UUID)."""
-    d = db.query(Decision).filter(Decision.decision_id == decision_id).first()
-    if not d:
+    """
+    Get decision by decision_id (UUID). Served from the versioned DecisionOut cache when the
+    ledger high-water mark (projection ledger_seq) and decisions.updated_at are unchanged.
+    """
+    row = (
+        db.query(Decision, DecisionStatusProjection.ledger_seq)
+        .outerjoin(DecisionStatusProjection, DecisionStatusProjection.decision_id == Decision.decision_id)
+        .filter(Decision.decision_id == decision_id)
+        .first()
+    )
+    if not row:
         raise HTTPException(status_code=404, detail="Decision not found")
+    d, ledger_seq = row
+    version = decision_cache.cache_version(ledger_seq, d.updated_at) if ledger_seq is not None else None
+    if version is not None:
+        body = decision_cache.get_cached(d.decision_id, version)
+        if body is not None:
+            return Response(content=body, media_type="application/json")
     latest = get_latest_artifact_for_decision(db, d.decision_id)
-    return _decision_to_out(d, latest, db)
+    out = _decision_to_out(d, latest, db)
+    if version is None:
+        return out
+    body = out.model_dump_json().encode("utf-8")
+    decision_cache.put_cached(d.decision_id, version, body)
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/decision-velocity")
@@ -1348,16 +1492,46 @@ def decision_chat_start(decision_id: UUID, db: Session = Depends(get_db)):
     return {"session_id": session_id, "initial_assistant_message": initial_message, "chat_context": chat_context, "trace_id": trace_id}
 
 
+def _record_chat_turn(enterprise_id: Optional[int], decision_id: UUID, trace_id: str, t0: float) -> dict:
+    """Usage events + latency log for a completed streamed decision-chat reply (own session)."""
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        record_event(db, EVENT_ADVISOR_CHAT_SENT, enterprise_id=enterprise_id, decision_id=decision_id)
+        record_event(db, EVENT_ADVISOR_CHAT_REPLY, enterprise_id=enterprise_id, decision_id=decision_id)
+    except Exception:
+        pass
+    finally:
+        db.close()
+    latency_sec = time.perf_counter() - t0
+    logger.info("chat_message trace_id=%s decision_id=%s latency_sec=%.2f streamed=1", trace_id, decision_id, latency_sec)
+    return {"trace_id": trace_id}
+
+
 @router.post("/decisions/{decision_id}/chat/message")
-def decision_chat_message(decision_id: UUID, body: ChatMessageRequest, db: Session = Depends(get_db)):
-    """Send a message in decision-scoped chat; returns assistant reply (stateless, context from artifact)."""
-    from app.diagnostic.decision_chat import generate_assistant_reply
+def decision_chat_message(
+    decision_id: UUID,
+    body: ChatMessageRequest,
+    stream: bool = Query(False, description="Stream the reply as Server-Sent Events (token, then done)."),
+    db: Session = Depends(get_db),
+):
+    """
+    Send a message in decision-scoped chat; returns assistant reply (stateless, context from artifact).
+    With stream=true the reply is sent token by token (done carries trace_id); a client disconnect
+    cancels the completion.
+    """
+    from app.diagnostic.decision_chat import generate_assistant_reply, stream_assistant_reply
 
     trace_id = str(uuid.uuid4())
     t0 = time.perf_counter()
     d = db.query(Decision).filter(Decision.decision_id == decision_id).first()
     if not d:
         raise HTTPException(status_code=404, detail="Decision not found")
+    if stream:
+        tokens = stream_assistant_reply(db, decision_id, body.message)
+        enterprise_id = d.enterprise_id
+        return stream_reply(tokens, lambda reply: _record_chat_turn(enterprise_id, decision_id, trace_id, t0))
     assistant_message = generate_assistant_reply(db, decision_id, body.message)
     try:
         record_event(db, EVENT_ADVISOR_CHAT_SENT, enterprise_id=d.enterprise_id, decision_id=decision_id)
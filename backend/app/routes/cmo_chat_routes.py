@@ -7,15 +7,15 @@ from pydantic import BaseModel
 from typing import Optional, List
 from openai import OpenAI
 
+from app.agents.llm import stream_chat_completion
 from app.db.database import get_db
 from app.db.models import User, CMOChatMessage
 from app.config import settings
 from app.rag.vectorstore import search_marketing_docs
+from app.utils.sse import persist_rows, stream_reply
 
 router = APIRouter(prefix="/api/cmo/chat", tags=["chat"])
 
-# Initialize OpenAI client
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
 
 # Chat system prompt
 CHAT_SYSTEM_PROMPT = """You are "AI-CMO", an expert marketing consultant for SMEs in Southeast Asia.
@@ -31,6 +31,18 @@ You help business owners with:
 Be practical, actionable, and consider SME resource constraints. Provide specific, measurable advice."""
 
 
+def _store_chat_turn(user_id: Optional[int], question: str, answer: str, sources: list[str]) -> dict:
+    """Save the question and the completed streamed answer; like the non-stream path, a failed save is only logged."""
+    try:
+        persist_rows(
+            CMOChatMessage(user_id=user_id, role="user", content=question, sources=None),
+            CMOChatMessage(user_id=user_id, role="assistant", content=answer, sources=sources or None),
+        )
+    except Exception as db_error:
+        print(f"Warning: Failed to save chat messages to database: {db_error}")
+    return {"sources": sources or None}
+
+
 class ChatRequest(BaseModel):
     """Chat request schema."""
     question: str
@@ -55,6 +67,7 @@ class ChatMessageResponse(BaseModel):
 @router.post("")
 async def chat_with_cmo(
     request: ChatRequest,
+    stream: bool = Query(False, description="Stream the answer as Server-Sent Events (token, then done)."),
     db: Session = Depends(get_db)
 ):
     """
@@ -62,6 +75,7 @@ async def chat_with_cmo(
     
     Args:
         request: Chat request with question
+        stream: Send the answer token by token; messages are saved once it completes
         db: Database session
     
     Returns:
@@ -88,15 +102,21 @@ async def chat_with_cmo(
 {rag_context}
 
 Please provide a helpful, actionable answer to the user's marketing question."""
+
+    messages = [
+        {"role": "system", "content": CHAT_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+    if stream:
+        tokens = stream_chat_completion(model=settings.LLM_MODEL, messages=messages, temperature=0.7)
+        return stream_reply(tokens, lambda answer: _store_chat_turn(request.user_id, request.question, answer, sources))
     
     try:
-        # Call OpenAI API
+        # Call OpenAI API (client built per call so importing the app never needs OPENAI_API_KEY)
+        client = OpenAI(api_key=settings.OPENAI_API_KEY)
         response = client.chat.completions.create(
             model=settings.LLM_MODEL,
-            messages=[
-                {"role": "system", "content": CHAT_SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt}
-            ],
+            messages=messages,
             temperature=0.7
         )
         
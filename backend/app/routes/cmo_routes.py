@@ -12,6 +12,7 @@ from app.enterprise.decision_context_service import store_context
 from app.schemas.cmo.cmo_input import CMOInputSchema
 from app.schemas.cmo.cmo_analysis import CMOAnalysisSchema, CMOAnalysisResponse
 from app.agents.cmo_agent import run_ai_cmo_agent
+from app.agents.llm_cache import cache_route
 from app.utils.pagination import PaginationParams, PaginatedResponse
 
 router = APIRouter(prefix="/api/cmo", tags=["CMO"])
@@ -27,7 +28,8 @@ async def diagnose_marketing(
     Run AI-CMO diagnostic analysis.
     """
     input_dict = input_data.model_dump(exclude={"enterprise_id", "decision_context"})
-    analysis_result = run_ai_cmo_agent(input_dict, db)
+    with cache_route("cmo_diagnose"):
+        analysis_result = await run_ai_cmo_agent(input_dict)
     
     analysis_record = CMOAnalysis(
         user_id=user_id,
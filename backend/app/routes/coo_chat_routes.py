@@ -6,10 +6,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.agents.coo_agent import run_chat_agent
+from app.agents.coo_agent import run_chat_agent, stream_chat_agent
 from app.db.database import get_db
 from app.db.models import COOChatMessage, COOAnalysis
 from app.schemas.coo.chat import ChatMessageIn, ChatMessageOut, ChatResponse
+from app.utils.sse import persist_rows, stream_reply
 
 logger = logging.getLogger(__name__)
 
@@ -29,9 +30,13 @@ def _serialize_message(model: COOChatMessage) -> ChatMessageOut:
 @router.post("/message", response_model=ChatResponse)
 async def send_message(
     chat_input: ChatMessageIn,
+    stream: bool = Query(False, description="Stream the reply as Server-Sent Events (token, then done)."),
     db: Session = Depends(get_db),
-) -> ChatResponse:
-    """Send a message to the AI-COO chat agent."""
+):
+    """
+    Send a message to the AI-COO chat agent. With stream=true the reply is sent token by token and
+    saved once complete; a client disconnect cancels the completion and nothing is saved.
+    """
     logger.info("chat_message_request", extra={"extra_data": {"has_analysis": chat_input.analysis_id is not None}})
     
     session_id = chat_input.session_id or str(uuid.uuid4())
@@ -67,6 +72,26 @@ async def send_message(
     )
     db.add(user_msg)
     db.commit()
+
+    if stream:
+        tokens = stream_chat_agent(
+            user_message=chat_input.message,
+            chat_history=chat_history,
+            analysis_context=analysis_context,
+        )
+        analysis_id = chat_input.analysis_id
+        def finalize(reply: str) -> dict:
+            assistant_msg, = persist_rows(COOChatMessage(
+                user_id=None,
+                analysis_id=analysis_id,
+                role="assistant",
+                content=reply,
+                session_id=session_id,
+            ))
+            logger.info("chat_message_response", extra={"extra_data": {"session_id": session_id, "streamed": True}})
+            return {"session_id": session_id, "message_id": assistant_msg.id}
+
+        return stream_reply(tokens, finalize)
     
     assistant_response = await run_chat_agent(
         user_message=chat_input.message,
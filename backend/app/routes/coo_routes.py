@@ -6,12 +6,13 @@ from sqlalchemy import select
 from sqlalchemy.orm import Session
 
 from app.agents.coo_agent import run_ai_coo_agent
+from app.agents.llm_cache import cache_route
 from app.config import settings
 from app.db.database import get_db
 from app.db.models import COOAnalysis
 from app.governance_engine.rtco_service import create_decision_from_analysis
 from app.enterprise.decision_context_service import store_context
-from app.rag.vectorstore import search_ops_docs
+from app.rag.vectorstore import search_in_own_session, search_ops_docs
 from app.schemas.coo.coo_analysis import COOAnalysisOut, COOAnalysisPage
 from app.schemas.coo.coo_input import COOInput
 from app.utils.pagination import paginate
@@ -65,8 +66,8 @@ async def diagnose(
     docs: list[str] | None = None
     if settings.RAG_ENABLED and coo_input.biggest_operational_challenge in RAG_TRIGGER_CHALLENGES:
         try:
-            rag_results = search_ops_docs(
-                db,
+            rag_results = await search_in_own_session(
+                search_ops_docs,
                 "SME operations best practices for inventory and throughput in Asia and South-East Asia",
                 top_k=settings.RAG_TOP_K,
             )
@@ -76,7 +77,8 @@ async def diagnose(
             logger.warning("RAG lookup failed: %s", exc)
 
     payload = coo_input.model_dump(exclude={"enterprise_id", "decision_context"})
-    ai_response = _normalize_ai_response(await run_ai_coo_agent(coo_input, docs=docs))
+    with cache_route("coo_diagnose"):
+        ai_response = _normalize_ai_response(await run_ai_coo_agent(coo_input, docs=docs))
     logger.info(
         "coo_diagnose_response",
         extra={
@@ -3,11 +3,12 @@ Chat routes for tech strategy questions.
 """
 from typing import Optional, List
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from sqlalchemy import desc
 from pydantic import BaseModel
 
+from app.agents.llm import stream_chat_completion
 from app.db.database import get_db
 from app.db.models import CTOChatMessage, User
 from app.rag.vectorstore import search_tech_docs
@@ -15,6 +16,7 @@ from app.config import settings
 from openai import OpenAI
 from openai import APIError, APIConnectionError, APITimeoutError, RateLimitError
 import httpx
+from app.utils.sse import persist_rows, stream_reply
 
 router = APIRouter(prefix="/api/cto/chat", tags=["chat"])
 
@@ -93,11 +95,13 @@ async def chat(
     request: ChatRequest,
     user_email: str = "user@example.com",  # TODO: Get from auth
     user_name: str = "User",
+    stream: bool = Query(False, description="Stream the reply as Server-Sent Events (token, then done)."),
     db: Session = Depends(get_db)
 ):
     """
     Chat with AI-CTO about technology strategy.
-    Messages are saved to the database.
+    Messages are saved to the database. With stream=true the reply is sent token by token and saved
+    once complete; a client disconnect cancels the completion and nothing is saved.
     """
     client = get_openai_client()
     if not client:
@@ -177,6 +181,15 @@ async def chat(
                 detail="Invalid message format"
             )
         
+        if stream:
+            user_id = user.id
+            tokens = stream_chat_completion(model=settings.LLM_MODEL, messages=messages, temperature=0.7)
+            def finalize(reply: str) -> dict:
+                assistant_msg, = persist_rows(CTOChatMessage(user_id=user_id, role="assistant", content=reply))
+                return {"role": "assistant", "message_id": assistant_msg.id}
+
+            return stream_reply(tokens, finalize)
+
         # Get response from OpenAI
         try:
             # Validate messages format
@@ -13,8 +13,9 @@ from app.enterprise.decision_context_service import store_context
 from app.schemas.cto.cto_input import CTOInputSchema
 from app.schemas.cto.cto_analysis import CTOAnalysisSchema, CTOAnalysisResponse
 from app.tools.tech_tools import calculate_all_tools
-from app.rag.vectorstore import search_tech_docs
+from app.rag.vectorstore import search_in_own_session, search_tech_docs
 from app.agents.cto_agent import run_ai_cto_agent
+from app.agents.llm_cache import cache_route
 from app.utils.pagination import PaginationParams, PaginatedResponse
 import json
 
@@ -50,11 +51,12 @@ async def diagnose_technology(
         rag_context = []
         try:
             query_text = f"{input_data.biggest_challenge} {input_data.tech_stack_maturity} {input_data.notes or ''}"
-            rag_context = search_tech_docs(db, query_text, top_k=4)
+            rag_context = await search_in_own_session(search_tech_docs, query_text, top_k=4)
         except Exception as e:
             print(f"RAG search error (non-critical): {e}")
         
-        analysis_data = run_ai_cto_agent(input_dict, tools_results, rag_context)
+        with cache_route("cto_diagnose"):
+            analysis_data = await run_ai_cto_agent(input_dict, tools_results, rag_context)
         
         analysis = CTOAnalysis(
             user_id=user.id,
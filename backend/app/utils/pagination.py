@@ -1,5 +1,8 @@
 """Pagination utilities."""
-from typing import Generic, TypeVar, List
+import base64
+import json
+from datetime import datetime
+from typing import Any, Generic, TypeVar, List, Tuple
 from pydantic import BaseModel
 from fastapi import Query
 
@@ -57,3 +60,19 @@ def paginate(query, page: int = 1, page_size: int = 10):
     
     return items, total
 
+
+
+def encode_cursor(created_at: datetime, row_id: Any) -> str:
+    """Opaque keyset cursor for (created_at, id) ordering: urlsafe base64 of a JSON pair."""
+    raw = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Inverse of encode_cursor. Raises ValueError on a malformed or tampered cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), str(row_id)
+    except (TypeError, ValueError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
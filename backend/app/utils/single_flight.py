@@ -0,0 +1,183 @@
+"""
+Single-flight request coalescing: concurrent calls with the same key share one in-flight call.
+
+The first caller for a key (the leader) makes the call; callers arriving while it is in flight wait
+for its result (or exception) instead of making their own. Nothing is remembered once the call
+finishes, so this only removes duplicate concurrent work; caching stays with embedding_cache and
+llm_cache. Sync callers (any thread) and async callers (any event loop) share the same calls, through
+a concurrent.futures.Future.
+
+Async calls run as a task on the leader's loop. A cancelled async waiter just stops waiting; the call
+itself is cancelled only when every waiter has gone (so asyncio.wait_for on one agent never aborts
+a request other callers still need). A sync caller never joins a call led by a task on its own
+running loop (it would block that loop); it makes its own call.
+
+Per-group counters (single_flight_stats): flights = calls actually made, callers = everyone served,
+fan_in_ratio = callers / flights.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+_groups: dict[str, "SingleFlight"] = {}
+_groups_lock = threading.Lock()
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+class _Call:
+    __slots__ = ("future", "waiters", "callers", "loop", "task")
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.future: Future = Future()
+        self.waiters = 1  # callers still waiting (an async call is cancelled when this drops to 0)
+        self.callers = 1  # callers served by this call, for fan-in
+        self.loop = loop  # set for async-led calls
+        self.task: Optional[asyncio.Task] = None
+
+
+class SingleFlight:
+    """One group of coalesced calls (e.g. embeddings). Thread-safe; usable from sync and async code."""
+
+    def __init__(self, name: str, enabled: Callable[[], bool] = lambda: True):
+        self.name = name
+        self._enabled = enabled
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._stats = {"flights": 0, "callers": 0, "errors": 0, "cancelled": 0, "max_fan_in": 0}
+        with _groups_lock:
+            _groups[name] = self
+
+    def enabled(self) -> bool:
+        return bool(self._enabled())
+
+    # ----- low level: for callers that coalesce several keys at once (batches) -----
+
+    def acquire(self, key: Hashable) -> tuple[_Call, bool]:
+        """(call, is_leader). The leader must finish(key, call, ...) it; others wait on call.future."""
+        loop = _running_loop()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and not (call.loop is not None and call.loop is loop):
+                call.waiters += 1
+                call.callers += 1
+                return call, False
+            call = _Call()
+            if key not in self._calls:
+                self._calls[key] = call
+            return call, True
+
+    def finish(self, key: Hashable, call: _Call, result: Any = None, error: Optional[BaseException] = None) -> None:
+        """Publish the leader's result (or error) to the waiters and retire the call."""
+        cancelled = isinstance(error, asyncio.CancelledError)
+        self._retire(key, call, cancelled=cancelled, error=error is not None)
+        if call.future.done():
+            return
+        if cancelled:
+            call.future.cancel()
+        elif error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)
+
+    def _retire(self, key: Hashable, call: _Call, cancelled: bool = False, error: bool = False) -> None:
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+            if call.callers == 0:  # already counted
+                return
+            self._stats["flights"] += 1
+            self._stats["callers"] += call.callers
+            self._stats["max_fan_in"] = max(self._stats["max_fan_in"], call.callers)
+            if cancelled:
+                self._stats["cancelled"] += 1
+            elif error:
+                self._stats["errors"] += 1
+            call.callers = 0
+
+    # ----- sync -----
+
+    def do(self, key: Optional[Hashable], fn: Callable[[], Any]) -> Any:
+        """fn() shared with concurrent callers of the same key; key None (or disabled) calls fn directly."""
+        if key is None or not self.enabled():
+            return fn()
+        call, leader = self.acquire(key)
+        if not leader:
+            return call.future.result()
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, call, error=e)
+            raise
+        self.finish(key, call, result)
+        return result
+
+    # ----- async -----
+
+    async def do_async(self, key: Optional[Hashable], fn: Callable[[], Awaitable[Any]]) -> Any:
+        """await fn() shared with concurrent callers of the same key; see the module docstring for cancellation."""
+        if key is None or not self.enabled():
+            return await fn()
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                call.callers += 1
+            else:
+                call = _Call(loop)
+                self._calls[key] = call
+                call.task = loop.create_task(fn())
+                call.task.add_done_callback(lambda t, c=call: self._task_done(key, c, t))
+        try:
+            return await asyncio.shield(asyncio.wrap_future(call.future))
+        except asyncio.CancelledError:
+            self._leave(key, call)
+            raise
+
+    def _task_done(self, key: Hashable, call: _Call, task: asyncio.Task) -> None:
+        if task.cancelled():
+            self.finish(key, call, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self.finish(key, call, error=task.exception())
+        else:
+            self.finish(key, call, task.result())
+
+    def _leave(self, key: Hashable, call: _Call) -> None:
+        """A cancelled async waiter stops waiting; the last one out cancels the shared task."""
+        with self._lock:
+            call.waiters -= 1
+            last = call.waiters == 0
+            if last and self._calls.get(key) is call:
+                del self._calls[key]  # callers arriving now start a fresh call
+        if last and call.task is not None and not call.task.done():
+            call.loop.call_soon_threadsafe(call.task.cancel)
+
+    # ----- metrics -----
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            s = dict(self._stats)
+            in_flight = len(self._calls)
+        s["shared"] = s["callers"] - s["flights"]
+        s["fan_in_ratio"] = round(s["callers"] / s["flights"], 3) if s["flights"] else None
+        s["in_flight"] = in_flight
+        s["enabled"] = self.enabled()
+        return s
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.update(dict.fromkeys(self._stats, 0))
+
+
+def single_flight_stats() -> dict[str, dict[str, Any]]:
+    """Counters for every group in this process (for admin cache-stats)."""
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {g.name: g.stats() for g in groups}
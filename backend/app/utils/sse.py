@@ -0,0 +1,79 @@
+"""Server-Sent Events helpers: event formatting and token streaming for chat replies."""
+import inspect
+import json
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Union
+
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "Connection": "keep-alive"}
+
+
+def sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def token_events(
+    tokens: AsyncIterator[str],
+    finalize: Optional[Callable[[str], Union[dict, None, Awaitable[Optional[dict]]]]] = None,
+) -> AsyncIterator[str]:
+    """
+    Relay a token stream as SSE: a "token" event ({"delta": ...}) per chunk, then "done" with
+    {"message": full text, **finalize(full text)} once the stream has completed; "error" on failure.
+    finalize persists the reply (it runs only for complete replies); a sync finalize runs in the
+    threadpool so its DB commit does not block the event loop. When the client disconnects the
+    generator is closed, which closes tokens and with it the upstream LLM request.
+    """
+    parts: list[str] = []
+    try:
+        async for delta in tokens:
+            if delta:
+                parts.append(delta)
+                yield sse("token", {"delta": delta})
+        message = "".join(parts).strip()
+        if not message:
+            raise ValueError("Empty response from AI model")
+        extra = None
+        if inspect.iscoroutinefunction(finalize):
+            extra = await finalize(message)
+        elif finalize is not None:
+            extra = await run_in_threadpool(finalize, message)
+        if inspect.isawaitable(extra):
+            extra = await extra
+        yield sse("done", {"message": message, **(extra or {})})
+    except Exception as e:
+        logger.exception("streamed reply failed: %s", e)
+        yield sse("error", {"detail": str(e) or type(e).__name__})
+    finally:
+        aclose = getattr(tokens, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+def persist_rows(*rows: Any) -> list:
+    """
+    Add rows in their own session, commit, and return them refreshed (ids, server defaults). For
+    stream finalizers: the request session may already be closed when a streamed reply completes.
+    """
+    from app.db.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        db.add_all(rows)
+        db.commit()
+        for row in rows:
+            db.refresh(row)
+        return list(rows)
+    finally:
+        db.close()
+
+
+def stream_reply(
+    tokens: AsyncIterator[str],
+    finalize: Optional[Callable[[str], Union[dict, None, Awaitable[Optional[dict]]]]] = None,
+) -> StreamingResponse:
+    """text/event-stream response for token_events(tokens, finalize)."""
+    return StreamingResponse(token_events(tokens, finalize), media_type="text/event-stream", headers=SSE_HEADERS)
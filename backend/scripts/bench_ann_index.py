@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark pgvector ANN indexes: recall@k against exact search, and p50/p99 query latency.
+
+For each corpus size, builds a scratch table (ann_bench) of clustered synthetic vectors in the
+configured Postgres (generated server-side), computes exact top-k for a query sample with index
+scans disabled, then for each index method builds the index with the given parameters (same DDL as
+app/rag/ann_index.py) and sweeps the query-time knob (hnsw.ef_search or ivfflat.probes).
+The scratch table is dropped at the end unless --keep. Use a local/dev database: 1M x 1536 takes
+several GB and a long build.
+
+Usage (from backend):
+  python scripts/bench_ann_index.py
+  python scripts/bench_ann_index.py --sizes 10000 100000 --methods hnsw ivfflat --queries 200
+  python scripts/bench_ann_index.py --sizes 1000000 --m 16 --ef-construction 64 --maintenance-work-mem 4GB
+  python scripts/bench_ann_index.py --sizes 50000 --ef-search 20 40 80 --json results.json
+Requires .env with DATABASE_URL and the vector extension.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ensure backend is on path and .env is loaded
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+try:
+    from dotenv import load_dotenv
+    load_dotenv(backend_dir / ".env")
+except ImportError:
+    pass
+
+TABLE = "ann_bench"
+_INSERT_CHUNK = 10_000
+
+
+def _vec(v: list[float]) -> str:
+    return "[" + ",".join(f"{x:.6f}" for x in v) + "]"
+
+
+def _percentiles(samples: list[float]) -> tuple[float, float]:
+    if len(samples) < 2:
+        return samples[0], samples[0]
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return q[49], q[98]
+
+
+def _load_corpus(engine, n: int, dim: int, centers: list[list[float]], noise: float) -> float:
+    from sqlalchemy import text
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+        conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}_centers"))
+        conn.execute(text(f"CREATE TABLE {TABLE} (id integer PRIMARY KEY, embedding vector({dim}) NOT NULL)"))
+        conn.execute(text(f"CREATE TABLE {TABLE}_centers (id integer PRIMARY KEY, v double precision[] NOT NULL)"))
+        conn.execute(
+            text(f"INSERT INTO {TABLE}_centers (id, v) VALUES (:id, :v)"),
+            [{"id": i, "v": c} for i, c in enumerate(centers)],
+        )
+    for lo in range(0, n, _INSERT_CHUNK):
+        hi = min(n, lo + _INSERT_CHUNK) - 1
+        with engine.begin() as conn:
+            conn.execute(
+                text(f"""
+                    INSERT INTO {TABLE} (id, embedding)
+                    SELECT g, (
+                        SELECT array_agg(c.v[d] + :noise * (random() - 0.5) ORDER BY d)
+                        FROM generate_series(1, :dim) d
+                    )::vector
+                    FROM generate_series(:lo, :hi) g
+                    JOIN {TABLE}_centers c ON c.id = g % :k
+                """),
+                {"noise": noise, "dim": dim, "lo": lo, "hi": hi, "k": len(centers)},
+            )
+        print(f"  loaded {hi + 1}/{n}", file=sys.stderr)
+    with engine.begin() as conn:
+        conn.execute(text(f"ANALYZE {TABLE}"))
+    return time.perf_counter() - started
+
+
+def _run_queries(engine, queries: list[str], k: int, setup: list[str]) -> tuple[list[list[int]], list[float], bool]:
+    """Run the queries in one transaction after setup statements (SET LOCAL). Returns ids, latencies (ms), index used."""
+    from sqlalchemy import text
+
+    ids, latencies = [], []
+    with engine.connect() as conn:
+        with conn.begin():
+            for stmt in setup:
+                conn.execute(text(stmt))
+            plan = "\n".join(
+                r[0] for r in conn.execute(
+                    text(f"EXPLAIN SELECT id FROM {TABLE} ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k"),
+                    {"q": queries[0], "k": k},
+                )
+            )
+            for q in queries:
+                started = time.perf_counter()
+                rows = conn.execute(
+                    text(f"SELECT id FROM {TABLE} ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k"),
+                    {"q": q, "k": k},
+                ).all()
+                latencies.append((time.perf_counter() - started) * 1000)
+                ids.append([r[0] for r in rows])
+    return ids, latencies, "Index Scan" in plan and "embedding" in plan
+
+
+def _recall(exact: list[list[int]], approx: list[list[int]], k: int) -> float:
+    hits = sum(len(set(e[:k]) & set(a[:k])) for e, a in zip(exact, approx))
+    return hits / (k * len(exact))
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Recall@k and latency benchmark for pgvector HNSW / IVFFlat")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10_000], help="Corpus sizes (10k-1M)")
+    p.add_argument("--dim", type=int, default=1536, help="Vector dimension (1536 = text-embedding-3-small)")
+    p.add_argument("--methods", nargs="+", choices=["hnsw", "ivfflat"], default=["hnsw", "ivfflat"])
+    p.add_argument("--k", type=int, default=10, help="Top-k for recall@k")
+    p.add_argument("--queries", type=int, default=100, help="Query sample size")
+    p.add_argument("--clusters", type=int, default=100, help="Synthetic topic clusters")
+    p.add_argument("--noise", type=float, default=2.0, help="Per-dimension spread around cluster centres")
+    p.add_argument("--m", type=int, default=None, help="HNSW m (default RAG_HNSW_M)")
+    p.add_argument("--ef-construction", type=int, default=None, help="HNSW ef_construction (default RAG_HNSW_EF_CONSTRUCTION)")
+    p.add_argument("--lists", type=int, default=None, help="IVFFlat lists (default rows / 1000)")
+    p.add_argument("--ef-search", type=int, nargs="+", default=[10, 20, 40, 80, 160], help="hnsw.ef_search sweep")
+    p.add_argument("--probes", type=int, nargs="+", default=[1, 5, 10, 20, 50], help="ivfflat.probes sweep")
+    p.add_argument("--maintenance-work-mem", default=None, help="e.g. 2GB for faster builds")
+    p.add_argument("--seed", type=int, default=7)
+    p.add_argument("--keep", action="store_true", help="Keep the scratch table")
+    p.add_argument("--json", default=None, help="Also write results to this file")
+    args = p.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        print("ERROR: DATABASE_URL not set. Set it or run from backend with .env.")
+        return 1
+    from sqlalchemy import text
+
+    from app.db.database import engine
+    from app.rag.ann_index import auto_ivfflat_lists, create_ann_index, drop_ann_index
+
+    rng = random.Random(args.seed)
+    centers = [[rng.gauss(0, 1) for _ in range(args.dim)] for _ in range(args.clusters)]
+    queries = [
+        _vec([x + args.noise * (rng.random() - 0.5) for x in rng.choice(centers)]) for _ in range(args.queries)
+    ]
+    results = []
+    print(f"{'rows':>9} {'index':>8} {'param':>16} {'build s':>8} {'size MB':>8} {'recall@k':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    try:
+        for n in args.sizes:
+            load_s = _load_corpus(engine, n, args.dim, centers, args.noise)
+            exact_ids, exact_ms, _ = _run_queries(engine, queries, args.k, ["SET LOCAL enable_indexscan = off"])
+            p50, p99 = _percentiles(exact_ms)
+            results.append({"rows": n, "index": "exact", "load_seconds": round(load_s, 1), "recall": 1.0, "p50_ms": round(p50, 3), "p99_ms": round(p99, 3)})
+            print(f"{n:>9} {'exact':>8} {'-':>16} {'-':>8} {'-':>8} {1.0:>9.3f} {p50:>8.2f} {p99:>8.2f}")
+            for method in args.methods:
+                lists = args.lists or auto_ivfflat_lists(n)
+                built = create_ann_index(
+                    engine, TABLE, method=method, m=args.m, ef_construction=args.ef_construction,
+                    lists=lists, maintenance_work_mem=args.maintenance_work_mem, tables=(TABLE,),
+                )
+                with engine.connect() as conn:
+                    size_mb = conn.execute(text("SELECT pg_relation_size(:i)"), {"i": built["index"]}).scalar() / 1e6
+                knob, values = ("hnsw.ef_search", args.ef_search) if method == "hnsw" else ("ivfflat.probes", args.probes)
+                for value in values:
+                    ids, ms, used = _run_queries(engine, queries, args.k, [f"SET LOCAL {knob} = {int(value)}"])
+                    recall = _recall(exact_ids, ids, args.k)
+                    p50, p99 = _percentiles(ms)
+                    label = f"{knob.split('.')[1]}={value}"
+                    results.append({
+                        "rows": n, "index": method, "ddl": built["ddl"], "build_seconds": built["build_seconds"],
+                        "size_mb": round(size_mb, 1), knob: value, "recall": round(recall, 4),
+                        "p50_ms": round(p50, 3), "p99_ms": round(p99, 3), "index_used": used,
+                    })
+                    print(
+                        f"{n:>9} {method:>8} {label:>16} {built['build_seconds']:>8.1f} {size_mb:>8.1f} "
+                        f"{recall:>9.3f} {p50:>8.2f} {p99:>8.2f}{'' if used else '  (planner chose seq scan)'}"
+                    )
+                drop_ann_index(engine, TABLE, method, tables=(TABLE,))
+    finally:
+        if not args.keep:
+            with engine.begin() as conn:
+                conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+                conn.execute(text(f"DROP TABLE IF EXISTS {TABLE}_centers"))
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
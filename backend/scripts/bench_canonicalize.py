@@ -0,0 +1,109 @@
+"""
+Micro-benchmark: single-pass canonical encoder vs the previous normalize + json.dumps + json.loads path.
+Builds decision artifacts with large EMR plans (milestones, metrics, config) and times
+canonicalize_and_hash and compute_canonical_hash against the reference. Also checks that both produce
+the same bytes and hash. No database needed.
+Run from backend:
+  python scripts/bench_canonicalize.py
+  python scripts/bench_canonicalize.py --milestones 2000 --repeat 20
+"""
+import argparse
+import hashlib
+import json
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.governance.canonicalize import _normalize_value, canonicalize_and_hash, compute_canonical_hash
+
+
+def _reference_canonicalize_and_hash(obj: dict) -> tuple[str, str, dict]:
+    """Previous implementation (three passes, two copies)."""
+    canonical_str = json.dumps(
+        _normalize_value(obj), sort_keys=True, separators=(",", ":"), ensure_ascii=False, allow_nan=False
+    )
+    return canonical_str, hashlib.sha256(canonical_str.encode("utf-8")).hexdigest(), json.loads(canonical_str)
+
+
+def build_artifact(milestones: int) -> dict:
+    """Decision artifact shaped like emr_rules output, with a large EMR plan."""
+    start = datetime(2026, 1, 5, 9, 0, tzinfo=timezone.utc)
+    return {
+        "problem_statement": "Cash runway is under six months; need to extend and stabilise operations.",
+        "decision_context": {"domain": "cfo", "enterprise_id": 42, "created_at": start},
+        "constraints": [{"id": f"c{i}", "type": "regulatory", "description": "Must comply with local rules."} for i in range(20)],
+        "options_considered": [
+            {"id": f"o{i}", "title": f"Option {i}", "summary": "Bank line or equity round; see analysis.", "score": i * 0.5}
+            for i in range(10)
+        ],
+        "chosen_option_id": "o1",
+        "rationale": "Bank line keeps ownership and covers the gap. " * 20,
+        "risk_level": "yellow",
+        "emr": {
+            "config": {"cadence": "weekly", "next_review_date": start + timedelta(days=30), "profile": "A"},
+            "milestones": [
+                {
+                    "id": f"ms_{i}",
+                    "title": f"Milestone {i}: weekly cash review and variance note",
+                    "description": "Review burn, runway and receivables; flag variances over 10% to the board.",
+                    "owner": "Founder",
+                    "due_date": start + timedelta(days=7 * i),
+                    "status": "pending" if i % 3 else "completed",
+                    "evidence": [{"type": "link", "url": f"https://example.com/evidence/{i}", "note": "Bank statement"}],
+                }
+                for i in range(milestones)
+            ],
+            "metrics": [
+                {
+                    "id": f"met_{i}",
+                    "name": "Runway / net cash",
+                    "target_value": 180000.0 + i,
+                    "unit": "USD",
+                    "actual_value": None if i % 2 else 150000.5 + i,
+                    "source": "manual",
+                    "input_type": "number",
+                }
+                for i in range(max(1, milestones // 4))
+            ],
+        },
+    }
+
+
+def _time(fn, obj: dict, repeat: int) -> list[float]:
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(obj)
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Benchmark canonical JSON encoding + SHA-256 for EMR-laden artifacts")
+    p.add_argument("--milestones", type=int, nargs="*", default=[50, 500, 5000], help="EMR milestone counts to test")
+    p.add_argument("--repeat", type=int, default=10, help="Runs per case (median reported)")
+    args = p.parse_args()
+
+    print(f"{'milestones':>10} {'bytes':>10} {'reference ms':>13} {'single-pass ms':>15} {'hash-only ms':>13} {'speedup':>8}")
+    for n in args.milestones:
+        artifact = build_artifact(n)
+        ref = _reference_canonicalize_and_hash(artifact)
+        new = canonicalize_and_hash(artifact)
+        if ref[0] != new[0] or ref[1] != new[1] or ref[2] != new[2]:
+            print(f"MISMATCH for milestones={n}")
+            return 1
+        ref_ms = statistics.median(_time(_reference_canonicalize_and_hash, artifact, args.repeat)) * 1000
+        new_ms = statistics.median(_time(canonicalize_and_hash, artifact, args.repeat)) * 1000
+        hash_ms = statistics.median(_time(compute_canonical_hash, artifact, args.repeat)) * 1000
+        size = len(new[0].encode("utf-8"))
+        print(f"{n:>10} {size:>10} {ref_ms:>13.2f} {new_ms:>15.2f} {hash_ms:>13.2f} {ref_ms / new_ms:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
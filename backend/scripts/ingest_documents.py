@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Bulk ingest documents into a RAG domain from JSONL (one {"title", "content", ...} object per line).
+Knowledge lines also need "source_type" (optional "tags"); domain documents may carry
+"enterprise_id" / "decision_id" to create document links.
+
+Same engine as POST /api/documents/bulk (app/rag/ingest.py): batched embeddings with bounded
+concurrency, multi-row inserts in large transactions, unchanged documents skipped by content hash.
+Progress goes to stderr; the final report (including docs_per_second) is printed as JSON.
+
+Usage (from backend):
+  python scripts/ingest_documents.py --domain finance docs.jsonl
+  cat docs.jsonl | python scripts/ingest_documents.py --domain knowledge -
+  python scripts/ingest_documents.py --domain tech docs.jsonl --batch-size 1000 --concurrency 8
+Requires .env with DATABASE_URL, OPENAI_API_KEY and migration z5e6f7a8b9c0 applied.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Ensure backend is on path and .env is loaded
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+try:
+    from dotenv import load_dotenv
+    load_dotenv(backend_dir / ".env")
+except ImportError:
+    pass
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Bulk ingest JSONL documents into a RAG domain")
+    p.add_argument("path", help="JSONL file, or - for stdin")
+    p.add_argument("--domain", required=True, help="finance | marketing | ops | tech | knowledge")
+    p.add_argument("--batch-size", type=int, default=None, help="Documents per batch (default INGEST_BATCH_SIZE)")
+    p.add_argument("--commit-every", type=int, default=None, help="Documents per transaction (default INGEST_COMMIT_EVERY)")
+    p.add_argument("--embedding-batch-size", type=int, default=None, help="Inputs per embedding request (default EMBEDDING_BATCH_SIZE)")
+    p.add_argument("--concurrency", type=int, default=None, help="Embedding requests in flight (default EMBEDDING_MAX_CONCURRENCY)")
+    p.add_argument("--quiet", action="store_true", help="No per-batch progress on stderr")
+    args = p.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        print("ERROR: DATABASE_URL not set. Set it or run from backend with .env.")
+        return 1
+    from app.db.database import SessionLocal
+    from app.rag.ingest import ingest_documents, iter_jsonl
+
+    def _progress(report: dict) -> None:
+        print(
+            f"  {report['received']} received, {report['inserted']} inserted, {report['updated']} updated, "
+            f"{report['skipped_unchanged']} unchanged, {report['failed']} failed ({report['docs_per_second']} docs/s)",
+            file=sys.stderr,
+        )
+
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8")
+    db = SessionLocal()
+    try:
+        report = ingest_documents(
+            db,
+            args.domain,
+            iter_jsonl(stream),
+            batch_size=args.batch_size,
+            commit_every=args.commit_every,
+            embedding_batch_size=args.embedding_batch_size,
+            max_concurrency=args.concurrency,
+            progress=None if args.quiet else _progress,
+        )
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+        if stream is not sys.stdin:
+            stream.close()
+    print(json.dumps(report, indent=2))
+    return 0 if not report["failed"] and not report["embedding_failures"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
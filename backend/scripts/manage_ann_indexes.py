@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Create, rebuild, drop or list the HNSW / IVFFlat indexes on the RAG embedding columns
+(finance/marketing/ops/tech documents, knowledge_chunks, document_chunks). See app/rag/ann_index.py.
+Builds run CONCURRENTLY, so searches keep working; rebuild swaps in the new index.
+Defaults come from RAG_ANN_INDEX_METHOD / RAG_HNSW_M / RAG_HNSW_EF_CONSTRUCTION (IVFFlat lists:
+rows / 1000). Choose values with scripts/bench_ann_index.py first.
+
+Usage (from backend):
+  python scripts/manage_ann_indexes.py list
+  python scripts/manage_ann_indexes.py create --table knowledge_chunks
+  python scripts/manage_ann_indexes.py create --all --method hnsw --m 24 --ef-construction 128
+  python scripts/manage_ann_indexes.py rebuild --table finance_documents --method ivfflat --lists 300
+  python scripts/manage_ann_indexes.py drop --table tech_documents --method ivfflat
+Requires .env with DATABASE_URL.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Ensure backend is on path and .env is loaded
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+try:
+    from dotenv import load_dotenv
+    load_dotenv(backend_dir / ".env")
+except ImportError:
+    pass
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Manage pgvector ANN indexes on the RAG tables")
+    p.add_argument("action", choices=["list", "create", "rebuild", "drop"])
+    p.add_argument("--table", default=None, help="Table to act on")
+    p.add_argument("--all", action="store_true", help="Act on every RAG table")
+    p.add_argument("--method", choices=["hnsw", "ivfflat"], default=None, help="Index type (default RAG_ANN_INDEX_METHOD)")
+    p.add_argument("--m", type=int, default=None, help="HNSW max connections per layer")
+    p.add_argument("--ef-construction", type=int, default=None, help="HNSW build candidate list size")
+    p.add_argument("--lists", type=int, default=None, help="IVFFlat list count (default rows / 1000)")
+    p.add_argument("--maintenance-work-mem", default=None, help="e.g. 2GB; speeds up large builds")
+    args = p.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        print("ERROR: DATABASE_URL not set. Set it or run from backend with .env.")
+        return 1
+    from app.config import settings
+    from app.db.database import SessionLocal, engine
+    from app.rag.ann_index import ANN_TABLES, create_ann_index, drop_ann_index, list_ann_indexes, rebuild_ann_index
+
+    if args.action == "list":
+        db = SessionLocal()
+        try:
+            print(json.dumps(list_ann_indexes(db), indent=2, default=str))
+        finally:
+            db.close()
+        return 0
+
+    if not args.all and not args.table:
+        print("ERROR: pass --table or --all", file=sys.stderr)
+        return 1
+    tables = ANN_TABLES if args.all else (args.table,)
+    results = []
+    try:
+        for table in tables:
+            if args.action == "drop":
+                results.append(drop_ann_index(engine, table, args.method or settings.RAG_ANN_INDEX_METHOD))
+                continue
+            fn = create_ann_index if args.action == "create" else rebuild_ann_index
+            print(f"{args.action} {table} ...", file=sys.stderr)
+            results.append(
+                fn(
+                    engine,
+                    table,
+                    method=args.method,
+                    m=args.m,
+                    ef_construction=args.ef_construction,
+                    lists=args.lists,
+                    maintenance_work_mem=args.maintenance_work_mem,
+                )
+            )
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""
+Verify or rebuild decision_status_projection by replaying decision_ledger_events.
+Run from backend:
+  python scripts/rebuild_status_projection.py                 # verify only; exit 1 on drift
+  python scripts/rebuild_status_projection.py --rebuild       # overwrite missing/drifted rows
+  python scripts/rebuild_status_projection.py --enterprise-id 1 --json
+Requires .env with DATABASE_URL and migration z1a2b3c4d5e6 applied.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Ensure backend is on path and .env is loaded
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+try:
+    from dotenv import load_dotenv
+    load_dotenv(backend_dir / ".env")
+except ImportError:
+    pass
+
+from app.db.database import SessionLocal
+from app.governance.status_projection import rebuild_status_projection, verify_status_projection
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Verify or rebuild the decision status projection from the ledger")
+    p.add_argument("--rebuild", action="store_true", help="Overwrite missing or drifted projection rows")
+    p.add_argument("--enterprise-id", type=int, default=None, help="Limit to one enterprise")
+    p.add_argument("--json", action="store_true", help="Print the full report as JSON")
+    args = p.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        print("ERROR: DATABASE_URL not set. Set it or run from backend with .env.")
+        return 1
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            report = rebuild_status_projection(db, enterprise_id=args.enterprise_id)
+        else:
+            report = verify_status_projection(db, enterprise_id=args.enterprise_id)
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Checked: {report['checked']} decisions")
+        print(f"Missing projection rows: {len(report['missing'])}")
+        print(f"Drifted projection rows: {len(report['drift'])}")
+        for d in report["drift"][:50]:
+            print(
+                f"  {d['decision_id']}: projected={d['projected_status']} (seq {d['projected_seq']}) "
+                f"ledger={d['ledger_status']} (seq {d['ledger_seq']})"
+            )
+        if args.rebuild and not report["ok"]:
+            print("Rebuilt missing/drifted rows from the ledger.")
+    if args.rebuild:
+        return 0
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Re-embed RAG rows (app/rag/reembed.py): repair NULL vectors, move rows to EMBEDDING_MODEL, or backfill
+and cut over a shadow column for a model migration. Jobs are resumable; progress is also available at
+GET /api/admin/reembed-jobs/{job_id}.
+
+Usage (from backend):
+  python scripts/reembed.py status
+  python scripts/reembed.py run                              # NULL / other-model rows, all tables
+  python scripts/reembed.py run --tables knowledge_chunks --max-batches 10
+  python scripts/reembed.py resume --job <job_id>
+  python scripts/reembed.py jobs
+Model migration (set EMBEDDING_SHADOW_MODEL, and EMBEDDING_SHADOW_DIM if not 1536):
+  python scripts/reembed.py prepare-shadow                   # add embedding_shadow columns
+  python scripts/reembed.py run --target shadow              # backfill; app writes dual-write meanwhile
+  python scripts/reembed.py cutover                          # swap columns, then deploy EMBEDDING_MODEL=<new>
+Requires .env with DATABASE_URL.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+from uuid import UUID
+
+# Ensure backend is on path and .env is loaded
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+try:
+    from dotenv import load_dotenv
+    load_dotenv(backend_dir / ".env")
+except ImportError:
+    pass
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Re-embed RAG rows and manage shadow-column model migrations")
+    p.add_argument("action", choices=["status", "run", "resume", "jobs", "prepare-shadow", "cutover"])
+    p.add_argument("--target", choices=["embedding", "shadow"], default="embedding")
+    p.add_argument("--tables", nargs="+", default=None, help="Limit to these tables")
+    p.add_argument("--job", default=None, help="Job id (resume)")
+    p.add_argument("--max-batches", type=int, default=None, help="Stop after this many batches (resume later)")
+    p.add_argument("--force", action="store_true", help="cutover even if shadow rows are pending")
+    args = p.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        print("ERROR: DATABASE_URL not set. Set it or run from backend with .env.")
+        return 1
+    from app.db.database import SessionLocal, engine
+    from app.rag import reembed
+
+    db = SessionLocal()
+    try:
+        if args.action == "status":
+            out = reembed.embedding_status(db, args.tables)
+        elif args.action == "jobs":
+            out = reembed.list_reembed_jobs(db)
+        elif args.action == "prepare-shadow":
+            out = reembed.prepare_shadow_columns(engine, args.tables)
+        elif args.action == "cutover":
+            out = reembed.cutover_shadow(engine, args.tables, force=args.force)
+        else:
+            if args.action == "run":
+                job_id = reembed.create_reembed_job(db, target=args.target, tables=args.tables).id
+                print(f"job {job_id}", file=sys.stderr)
+            elif args.job:
+                job_id = UUID(args.job)
+            else:
+                print("ERROR: resume needs --job", file=sys.stderr)
+                return 1
+            out = reembed.run_reembed_job(job_id, max_batches=args.max_batches)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+    print(json.dumps(out, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
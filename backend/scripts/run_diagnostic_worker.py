@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Diagnostic job worker: claims queued diagnostic runs (POST /api/clear/diagnostic/run?async=1) from
+diagnostic_jobs and runs them (app/diagnostic/job_queue.py). Run as many worker processes as needed,
+on any host with database access; they share the queue via FOR UPDATE SKIP LOCKED.
+
+SIGINT / SIGTERM stop claiming and let in-flight jobs finish. A worker killed mid-job leaves the job
+"running"; it is reclaimed once its heartbeat is older than DIAGNOSTIC_JOB_STALE_SECONDS, and the retry
+reuses the decision if the killed attempt had already created it.
+
+Usage (from backend):
+  python scripts/run_diagnostic_worker.py
+  python scripts/run_diagnostic_worker.py --concurrency 8
+  python scripts/run_diagnostic_worker.py --drain   # run what is due, then exit (cron / tests)
+Requires .env with DATABASE_URL, OPENAI_API_KEY and migrations up to zb1e2f3a4b5c6 applied.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+from pathlib import Path
+
+# Ensure backend is on path and .env is loaded
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+try:
+    from dotenv import load_dotenv
+    load_dotenv(backend_dir / ".env")
+except ImportError:
+    pass
+
+
+async def _run(args: argparse.Namespace) -> int:
+    from app.diagnostic.job_queue import run_worker
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:  # Windows
+            pass
+    processed = await run_worker(
+        concurrency=args.concurrency,
+        poll_seconds=args.poll_seconds,
+        stop=stop,
+        drain=args.drain,
+        worker_id=args.worker_id,
+    )
+    print(f"Processed {processed} diagnostic job(s)", file=sys.stderr)
+    return 0
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Run queued diagnostic jobs")
+    p.add_argument("--concurrency", type=int, default=None, help="Jobs run at once (default DIAGNOSTIC_JOB_WORKER_CONCURRENCY)")
+    p.add_argument("--poll-seconds", type=float, default=None, help="Idle poll interval (default DIAGNOSTIC_JOB_POLL_SECONDS)")
+    p.add_argument("--drain", action="store_true", help="Exit once nothing is due and nothing is running")
+    p.add_argument("--worker-id", default=None, help="Recorded on claimed jobs (default host:pid)")
+    args = p.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        print("ERROR: DATABASE_URL not set. Set it or run from backend with .env.")
+        return 1
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    return asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
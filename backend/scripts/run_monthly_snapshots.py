@@ -1,65 +1,99 @@
 #!/usr/bin/env python3
 """
-Run monthly Health, Velocity, and ECRI snapshots via the admin API.
+Run monthly Health, Velocity, and ECRI snapshots.
 Use from cron or manually on the first of the month.
 
-Usage:
-  python run_monthly_snapshots.py --admin-api-key YOUR_KEY
-  python run_monthly_snapshots.py --base-url https://api.example.com --admin-api-key YOUR_KEY
-  python run_monthly_snapshots.py --admin-api-key YOUR_KEY --enterprise-id 1
-  python run_monthly_snapshots.py --admin-api-key YOUR_KEY --cohort-id 2
-  python run_monthly_snapshots.py --admin-api-key YOUR_KEY --portfolio-id 3
+By default the job runs in this process with the same engine as the admin API
+(app/clear/snapshot_jobs.py): chunked, on a worker pool, checkpointed in snapshot_jobs.
+If the run is interrupted, resume it with --resume JOB_ID (done chunks are skipped).
+With --admin-api-key the job is started through the admin API instead and polled until done.
+
+Usage (from backend):
+  python scripts/run_monthly_snapshots.py
+  python scripts/run_monthly_snapshots.py --workers 8 --chunk-size 100
+  python scripts/run_monthly_snapshots.py --cohort-id 2
+  python scripts/run_monthly_snapshots.py --resume 5f0c...-...
+  python scripts/run_monthly_snapshots.py --admin-api-key YOUR_KEY --base-url https://api.example.com
+Requires .env with DATABASE_URL and migration z3c4d5e6f7a8 applied (in-process mode).
 """
 import argparse
 import json
+import os
 import sys
-import urllib.request
+import time
 import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
 
+# Ensure backend is on path and .env is loaded
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+try:
+    from dotenv import load_dotenv
+    load_dotenv(backend_dir / ".env")
+except ImportError:
+    pass
 
-def main() -> int:
-    p = argparse.ArgumentParser(description="Run monthly snapshots via admin API")
-    p.add_argument("--base-url", default="http://localhost:8000", help="Backend base URL")
-    p.add_argument("--admin-api-key", required=True, help="Admin API key (required)")
-    p.add_argument("--enterprise-id", type=int, default=None, help="Run for one enterprise")
-    p.add_argument("--cohort-id", type=int, default=None, help="Run for enterprises in cohort")
-    p.add_argument("--portfolio-id", type=int, default=None, help="Run for enterprises in portfolio")
-    args = p.parse_args()
 
-    body: dict = {}
-    if args.enterprise_id is not None:
-        body["enterprise_id"] = args.enterprise_id
-    if args.cohort_id is not None:
-        body["cohort_id"] = args.cohort_id
-    if args.portfolio_id is not None:
-        body["portfolio_id"] = args.portfolio_id
+def _print_result(data: dict) -> int:
+    print(json.dumps(data, indent=2))
+    errors = data.get("errors") or []
+    if errors:
+        print("Errors occurred:", file=sys.stderr)
+        for e in errors:
+            print(f"  - {e}", file=sys.stderr)
+    return 0 if data.get("status") == "completed" and not errors else 1
+
+
+def _run_local(args: argparse.Namespace, scope: dict) -> int:
+    if not os.environ.get("DATABASE_URL"):
+        print("ERROR: DATABASE_URL not set. Set it or run from backend with .env.")
+        return 1
+    from app.clear.snapshot_jobs import create_snapshot_job, run_snapshot_job
+    from app.db.database import SessionLocal
+
+    if args.resume:
+        job_id = UUID(args.resume)
+    else:
+        db = SessionLocal()
+        try:
+            job_id = create_snapshot_job(db, scope=scope, chunk_size=args.chunk_size).id
+        finally:
+            db.close()
+        print(f"Snapshot job {job_id} (resume with --resume {job_id})", file=sys.stderr)
+    return _print_result(run_snapshot_job(job_id, workers=args.workers))
+
 
-    url = f"{args.base_url.rstrip('/')}/api/admin/snapshots/run-monthly"
+def _request(args: argparse.Namespace, method: str, path: str, body: Optional[dict] = None) -> dict:
     req = urllib.request.Request(
-        url,
-        data=json.dumps(body).encode("utf-8"),
-        headers={
-            "Content-Type": "application/json",
-            "Admin-Api-Key": args.admin_api_key,
-        },
-        method="POST",
+        f"{args.base_url.rstrip('/')}/api/admin{path}",
+        data=json.dumps(body).encode("utf-8") if body is not None else None,
+        headers={"Content-Type": "application/json", "Admin-Api-Key": args.admin_api_key},
+        method=method,
     )
+    with urllib.request.urlopen(req, timeout=60) as resp:
+        return json.loads(resp.read().decode())
+
+
+def _run_api(args: argparse.Namespace, scope: dict) -> int:
     try:
-        with urllib.request.urlopen(req, timeout=300) as resp:
-            data = json.loads(resp.read().decode())
-            print(json.dumps(data, indent=2))
-            errors = data.get("errors") or []
-            if errors:
-                print("Errors occurred:", file=sys.stderr)
-                for e in errors:
-                    print(f"  - {e}", file=sys.stderr)
-                return 1
-            return 0
+        if args.resume:
+            data = _request(args, "POST", f"/snapshots/jobs/{args.resume}/resume")
+        else:
+            data = _request(args, "POST", "/snapshots/run-monthly", scope)
+        job_id = data["job_id"]
+        print(f"Snapshot job {job_id}", file=sys.stderr)
+        while data.get("status") not in ("completed", "failed"):
+            time.sleep(args.poll_seconds)
+            data = _request(args, "GET", f"/snapshots/jobs/{job_id}/progress")
+            print(f"  {data['progress_pct']}% ({data['chunks']})", file=sys.stderr)
+        return _print_result(data)
     except urllib.error.HTTPError as e:
         print(f"HTTP {e.code}: {e.reason}", file=sys.stderr)
         try:
-            body = e.read().decode()
-            print(body, file=sys.stderr)
+            print(e.read().decode(), file=sys.stderr)
         except Exception:
             pass
         return 1
@@ -68,5 +102,29 @@ def main() -> int:
         return 1
 
 
+def main() -> int:
+    p = argparse.ArgumentParser(description="Run monthly snapshots (in-process, or via admin API with --admin-api-key)")
+    p.add_argument("--enterprise-id", type=int, default=None, help="Run for one enterprise")
+    p.add_argument("--cohort-id", type=int, default=None, help="Run for enterprises in cohort")
+    p.add_argument("--portfolio-id", type=int, default=None, help="Run for enterprises in portfolio")
+    p.add_argument("--resume", default=None, metavar="JOB_ID", help="Resume an interrupted job instead of starting one")
+    p.add_argument("--workers", type=int, default=None, help="Worker pool size (default SNAPSHOT_JOB_WORKERS)")
+    p.add_argument("--chunk-size", type=int, default=None, help="Enterprises per chunk (default SNAPSHOT_JOB_CHUNK_SIZE)")
+    p.add_argument("--admin-api-key", default=None, help="Run through the admin API instead of in-process")
+    p.add_argument("--base-url", default="http://localhost:8000", help="Backend base URL (API mode)")
+    p.add_argument("--poll-seconds", type=float, default=5.0, help="Progress poll interval (API mode)")
+    args = p.parse_args()
+
+    scope = {
+        "enterprise_id": args.enterprise_id,
+        "cohort_id": args.cohort_id,
+        "portfolio_id": args.portfolio_id,
+    }
+    scope = {k: v for k, v in scope.items() if v is not None}
+    if args.admin_api_key:
+        return _run_api(args, scope)
+    return _run_local(args, scope)
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -10,8 +10,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
 
 from sqlalchemy.orm import Session
 from app.db.database import SessionLocal
-from app.db.models import KnowledgeChunk
-from app.rag.vectorstore import get_embedding
+from app.rag.ingest import ingest_documents
 
 
 CHUNKS = [
@@ -103,39 +102,19 @@ CHUNKS = [
 ]
 
 
-def seed(db: Session) -> int:
-    count = 0
-    for c in CHUNKS:
-        existing = db.query(KnowledgeChunk).filter(
-            KnowledgeChunk.title == c["title"],
-            KnowledgeChunk.source_type == c["source_type"],
-        ).first()
-        if existing:
-            continue
-        chunk = KnowledgeChunk(
-            source_type=c["source_type"],
-            title=c["title"],
-            content=c["content"],
-            tags=c["tags"],
-        )
-        db.add(chunk)
-        db.flush()
-        try:
-            emb = get_embedding(c["content"][:8000])
-            if emb:
-                chunk.embedding = emb
-        except Exception:
-            pass
-        count += 1
-    db.commit()
-    return count
+def seed(db: Session) -> dict:
+    """Bulk ingest CHUNKS (one embedding batch); chunks with unchanged content are skipped."""
+    return ingest_documents(db, "knowledge", CHUNKS)
 
 
 def main():
     db = SessionLocal()
     try:
-        n = seed(db)
-        print(f"Inserted {n} knowledge chunks (finance/ops wedge).")
+        report = seed(db)
+        print(
+            f"Inserted {report['inserted']}, updated {report['updated']}, "
+            f"unchanged {report['skipped_unchanged']} knowledge chunks (finance/ops wedge)."
+        )
     finally:
         db.close()
 
@@ -0,0 +1,72 @@
+"""
+Verify decision_artifacts and decision_ledger_events end to end (read-only).
+Streams both tables through server-side cursors, recomputes canonical hashes on a process pool,
+checks supersedes chains and event ordering, and prints a JSON report of mismatches and throughput.
+Run from backend:
+  python scripts/verify_ledger_integrity.py                      # full ledger; exit 1 on any issue
+  python scripts/verify_ledger_integrity.py --workers 8 --batch-size 5000 --output report.json
+  python scripts/verify_ledger_integrity.py --enterprise-id 1
+Requires .env with DATABASE_URL.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+# Ensure backend is on path and .env is loaded
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+try:
+    from dotenv import load_dotenv
+    load_dotenv(backend_dir / ".env")
+except ImportError:
+    pass
+
+from app.db.database import SessionLocal
+from app.governance.ledger_verifier import DEFAULT_BATCH_SIZE, DEFAULT_MAX_ISSUES, verify_ledger
+
+
+def main() -> int:
+    p = argparse.ArgumentParser(description="Verify ledger integrity: artifact hashes, supersedes chains, event ordering")
+    p.add_argument("--enterprise-id", type=int, default=None, help="Limit to one enterprise")
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Hashing processes (1 = inline)")
+    p.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Rows per cursor fetch / hashing batch")
+    p.add_argument("--max-issues", type=int, default=DEFAULT_MAX_ISSUES, help="Issues listed in the report (all are counted)")
+    p.add_argument("--output", default=None, help="Write the JSON report to this file instead of stdout")
+    p.add_argument("--quiet", action="store_true", help="No progress on stderr")
+    args = p.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        print("ERROR: DATABASE_URL not set. Set it or run from backend with .env.", file=sys.stderr)
+        return 1
+
+    def progress(stage: str, rows: int) -> None:
+        print(f"\r{stage}: {rows} rows", end="", file=sys.stderr, flush=True)
+
+    db = SessionLocal()
+    try:
+        report = verify_ledger(
+            db,
+            enterprise_id=args.enterprise_id,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            max_issues=args.max_issues,
+            progress=None if args.quiet else progress,
+        )
+    finally:
+        db.close()
+    if not args.quiet:
+        print(file=sys.stderr)
+
+    body = json.dumps(report, indent=2, default=str)
+    if args.output:
+        Path(args.output).write_text(body, encoding="utf-8")
+        print(f"Report written to {args.output}: ok={report['ok']} issues={report['issue_counts']}", file=sys.stderr)
+    else:
+        print(body)
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
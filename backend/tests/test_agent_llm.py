@@ -0,0 +1,99 @@
+"""
+Async agent LLM access: per-provider concurrency limit, cancellation on timeout and the response cache
+(no network, no DB).
+Run from backend: python -m pytest tests/test_agent_llm.py -v
+"""
+import asyncio
+from types import SimpleNamespace
+from unittest import mock
+
+from app.agents import llm, llm_cache
+from app.config import settings
+from app.diagnostic import run_service
+
+
+def _fake_client(peak: dict, delay: float):
+    async def create(**kwargs):
+        peak["now"] += 1
+        peak["max"] = max(peak["max"], peak["now"])
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            peak["now"] -= 1
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))])
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_provider_limit_bounds_in_flight_requests():
+    peak = {"now": 0, "max": 0}
+    client = _fake_client(peak, 0.01)
+
+    async def main():
+        # Distinct requests: identical ones would be coalesced into a single call.
+        await asyncio.gather(*(llm.chat_completion(model="m", messages=[{"role": "user", "content": str(i)}]) for i in range(10)))
+        return llm.llm_stats()
+
+    with mock.patch.dict(settings.LLM_MAX_CONCURRENCY, {"openai": 3}), \
+            mock.patch.object(llm, "get_async_client", return_value=client):
+        stats = asyncio.run(main())
+    assert peak["max"] == 3
+    assert stats["openai"] == {"limit": 3, "waiting": 0, "in_flight": 0}
+
+
+def test_agent_timeout_cancels_request_and_frees_slot():
+    peak = {"now": 0, "max": 0}
+    client = _fake_client(peak, 10)
+
+    async def slow_agent(payload, onboarding_context=None, rag=None):
+        return await llm.chat_completion(model="m", messages=[])
+
+    async def main():
+        runners = {d: slow_agent for d in ("cfo", "cmo", "coo", "cto")}
+        with mock.patch.object(run_service, "AGENT_RUNNERS", runners), \
+                mock.patch.object(run_service, "AGENT_TIMEOUT", 0.05), \
+                mock.patch.object(run_service, "_prefetch_rag", mock.AsyncMock(return_value=None)):
+            results = await run_service.run_agents({d: {} for d in runners})
+        await asyncio.sleep(0)
+        return results, llm.llm_stats()
+
+    with mock.patch.object(llm, "get_async_client", return_value=client):
+        results, stats = asyncio.run(main())
+    assert [d for d, _ in results] == ["cfo", "cmo", "coo", "cto"]
+    assert all(out["_error"] == "timeout" for _, out in results)
+    assert peak["now"] == 0
+    assert stats["openai"]["in_flight"] == 0 and stats["openai"]["waiting"] == 0
+
+
+def test_cache_key_normalizes_messages_but_not_params():
+    base = {"model": "m", "temperature": 0.7, "messages": [{"role": "user", "content": "Hello  \r\nworld\n"}]}
+    same = {"model": "m", "temperature": 0.7, "messages": [{"role": "USER", "content": "  Hello\nworld"}]}
+    hotter = {**base, "temperature": 0.2}
+    assert llm_cache.cache_key("openai", base) == llm_cache.cache_key("openai", same)
+    assert llm_cache.cache_key("openai", base) != llm_cache.cache_key("openai", hotter)
+    assert llm_cache.cache_key("openai", {**base, "stream": True}) is None
+
+
+def test_repeat_call_under_enabled_route_is_served_from_cache():
+    peak = {"now": 0, "max": 0}
+    client = _fake_client(peak, 0)
+    calls = mock.Mock(wraps=client.chat.completions.create)
+    client.chat.completions.create = calls
+    request = {"model": "m", "temperature": 0.7, "messages": [{"role": "user", "content": "same prompt"}]}
+
+    async def main():
+        with llm_cache.cache_route("cfo_diagnose"):
+            first = await llm.chat_completion(**request)
+            second = await llm.chat_completion(**request)
+        with llm_cache.cache_route("not_listed"):
+            await llm.chat_completion(**request)
+        return first, second
+
+    llm_cache.clear_local_cache()
+    with mock.patch.multiple(settings, LLM_CACHE_ENABLED=True, LLM_CACHE_PERSIST=False, LLM_CACHE_ROUTES="cfo_diagnose"), \
+            mock.patch.object(llm, "get_async_client", return_value=client):
+        first, second = asyncio.run(main())
+    llm_cache.clear_local_cache()
+    assert calls.call_count == 2
+    assert second.cached and second.choices[0].message.content == first.choices[0].message.content
+    assert llm_cache.cache_stats()["routes"]["cfo_diagnose"]["hits"] >= 1
@@ -0,0 +1,29 @@
+"""
+ANN index management: DDL generation and IVFFlat list sizing (no DB).
+Run from backend: python -m pytest tests/test_ann_index.py -v
+"""
+import pytest
+
+from app.rag.ann_index import auto_ivfflat_lists, index_ddl, index_name
+
+
+def test_hnsw_ddl_uses_cosine_ops_and_params():
+    ddl = index_ddl("knowledge_chunks", "hnsw", m=24, ef_construction=128)
+    assert ddl == (
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_knowledge_chunks_embedding_hnsw "
+        "ON knowledge_chunks USING hnsw (embedding vector_cosine_ops) WITH (m = 24, ef_construction = 128)"
+    )
+
+
+def test_ivfflat_ddl_requires_lists():
+    assert "WITH (lists = 300)" in index_ddl("finance_documents", "ivfflat", lists=300, concurrently=False)
+    with pytest.raises(ValueError):
+        index_ddl("finance_documents", "ivfflat")
+    assert index_name("ops_documents", "ivfflat") == "ix_ops_documents_embedding_ivfflat"
+
+
+def test_auto_lists_follow_pgvector_guidance():
+    assert auto_ivfflat_lists(0) == 1
+    assert auto_ivfflat_lists(50_000) == 50
+    assert auto_ivfflat_lists(1_000_000) == 1000
+    assert auto_ivfflat_lists(4_000_000) == 2000
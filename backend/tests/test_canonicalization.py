@@ -4,8 +4,13 @@ Run from backend: python -m pytest tests/test_canonicalization.py -v
 Or: python tests/test_canonicalization.py (if run as script, runs assertions and prints OK).
 Loads only canonicalize.py to avoid DB/psycopg dependency when proving hash determinism.
 """
+import enum
+import hashlib
 import importlib.util
+import json
+import random
 import sys
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 
 backend = Path(__file__).resolve().parent.parent
@@ -81,8 +86,109 @@ def test_forbid_nan_infinity():
         pass
 
 
+def _reference_canonicalize(obj):
+    """Pre-streaming canonical form: normalize, then json.dumps (what stored hashes were computed with)."""
+    return json.dumps(
+        mod._normalize_value(obj),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        allow_nan=False,
+    )
+
+
+class _Color(str, enum.Enum):
+    RED = "red"
+
+
+class _Level(enum.IntEnum):
+    HIGH = 3
+
+
+_STRINGS = ["", "a", "Need capital.", "quote\"back\\slash", "tab\tnl\ncr\r", "\x00\x1f\x7f", "caf\u00e9",
+            "\u2028\u2029", "\U0001F600 emoji", "\u4e2d\u6587", "</script>", "0", "true", " spaced "]
+_FLOATS = [0.0, -0.0, 1.5, -2.25, 1e-7, 1e16, 1.7976931348623157e308, 5e-324, 0.1 + 0.2, 100.0, 3.14159]
+
+
+def _fuzz_value(rng, depth):
+    roll = rng.random()
+    if depth <= 0 or roll < 0.55:
+        kind = rng.randrange(12)
+        if kind == 0:
+            return None
+        if kind == 1:
+            return rng.random() < 0.5
+        if kind == 2:
+            return rng.choice([0, 1, -1, 2 ** 53 + 1, -(10 ** 30), rng.randrange(-10 ** 6, 10 ** 6)])
+        if kind == 3:
+            return rng.choice(_FLOATS)
+        if kind in (4, 5, 6):
+            return rng.choice(_STRINGS) + "".join(chr(rng.randrange(32, 0x2FFF)) for _ in range(rng.randrange(4)))
+        if kind == 7:
+            return datetime(2026, 1, 1, 12, 30, 5, 123456) + timedelta(days=rng.randrange(400))
+        if kind == 8:
+            return datetime(2025, 6, 1, 8, 0, tzinfo=timezone.utc) + timedelta(minutes=rng.randrange(10 ** 5))
+        if kind == 9:
+            return date(2026, 2, 1) + timedelta(days=rng.randrange(100))
+        if kind == 10:
+            return _Color.RED
+        return _Level.HIGH
+    if roll < 0.75:
+        return [_fuzz_value(rng, depth - 1) for _ in range(rng.randrange(5))]
+    return _fuzz_dict(rng, depth - 1)
+
+
+def _fuzz_dict(rng, depth):
+    key_kind = rng.randrange(4)
+    out = {}
+    for _ in range(rng.randrange(6)):
+        if key_kind == 0:
+            key = rng.randrange(-50, 50)
+        elif key_kind == 1:
+            key = rng.choice([0.5, -1.25, 2.0, 1e20])
+        else:
+            key = rng.choice(_STRINGS) + str(rng.randrange(100))
+        out[key] = _fuzz_value(rng, depth)
+    return out
+
+
+def _same_types(a, b):
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, dict):
+        return list(a) == list(b) and all(_same_types(a[k], b[k]) for k in a)
+    if isinstance(a, list):
+        return len(a) == len(b) and all(_same_types(x, y) for x, y in zip(a, b))
+    return True
+
+
+def test_streaming_encoder_matches_reference_on_fuzz_corpus():
+    """Single-pass encoder: same bytes, same hash, same storage dict as normalize + dumps + loads."""
+    rng = random.Random(20260208)
+    for _ in range(1500):
+        obj = _fuzz_dict(rng, depth=4)
+        expected = _reference_canonicalize(obj)
+        canonical_str, h, stored = canonicalize_and_hash(obj)
+        assert canonical_str == expected
+        assert canonicalize(obj) == expected
+        assert h == compute_canonical_hash(obj) == hashlib.sha256(expected.encode("utf-8")).hexdigest()
+        reparsed = json.loads(expected)
+        assert stored == reparsed and _same_types(stored, reparsed)
+
+
+def test_streaming_encoder_flushes_large_artifacts():
+    """Artifacts larger than one hash chunk hash the same as the reference."""
+    artifact = {"emr": {"milestones": [{"title": f"Step {i}", "due": datetime(2026, 3, 1) + timedelta(days=i)} for i in range(5000)]}}
+    expected = _reference_canonicalize(artifact)
+    canonical_str, h, _stored = canonicalize_and_hash(artifact)
+    assert canonical_str == expected
+    assert h == hashlib.sha256(expected.encode("utf-8")).hexdigest()
+
+
 if __name__ == "__main__":
     test_same_artifact_same_hash()
     test_canonical_string_is_deterministic()
     test_forbid_nan_infinity()
+    test_streaming_encoder_matches_reference_on_fuzz_corpus()
+    test_streaming_encoder_flushes_large_artifacts()
     print("Canonicalization proof: all assertions passed.")
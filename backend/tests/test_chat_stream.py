@@ -0,0 +1,90 @@
+"""
+Token streaming for chat replies: SSE relay, persist-on-complete and upstream cancellation (no network, no DB).
+Run from backend: python -m pytest tests/test_chat_stream.py -v
+"""
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+from unittest import mock
+
+from app.agents import llm
+from app.utils.sse import token_events
+
+
+class _FakeStream:
+    def __init__(self, deltas):
+        self._deltas = list(deltas)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self._deltas:
+            raise StopAsyncIteration
+        await asyncio.sleep(0)
+        delta = SimpleNamespace(content=self._deltas.pop(0))
+        return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+    async def close(self):
+        self.closed = True
+
+
+def _client(stream):
+    async def create(**kwargs):
+        assert kwargs["stream"] is True
+        return stream
+
+    return SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+
+def test_tokens_are_relayed_and_reply_saved_once_complete():
+    stream = _FakeStream(["Cash ", "first", None, "."])
+    saved = []
+
+    async def main():
+        tokens = llm.stream_chat_completion(model="m", messages=[])
+        return [c async for c in token_events(tokens, lambda reply: saved.append(reply) or {"message_id": 7})]
+
+    with mock.patch.object(llm, "get_async_client", return_value=_client(stream)):
+        chunks = asyncio.run(main())
+    assert [c.split("\n", 1)[0] for c in chunks] == ["event: token"] * 3 + ["event: done"]
+    assert json.loads(chunks[-1].split("data: ", 1)[1]) == {"message": "Cash first.", "message_id": 7}
+    assert saved == ["Cash first."] and stream.closed
+
+
+def test_sync_finalize_runs_off_the_event_loop_thread():
+    threads = []
+
+    async def tokens():
+        yield "ok"
+
+    async def async_finalize(reply):
+        threads.append(("async", threading.current_thread()))
+        return {}
+
+    async def main():
+        [c async for c in token_events(tokens(), lambda reply: threads.append(("sync", threading.current_thread())))]
+        [c async for c in token_events(tokens(), async_finalize)]
+
+    asyncio.run(main())
+    loop_thread = threading.current_thread()
+    assert threads[0][0] == "sync" and threads[0][1] is not loop_thread
+    assert threads[1] == ("async", loop_thread)
+
+
+def test_disconnect_closes_upstream_and_saves_nothing():
+    stream = _FakeStream(["a", "b", "c", "d"])
+    saved = []
+
+    async def main():
+        relay = token_events(llm.stream_chat_completion(model="m", messages=[]), saved.append)
+        assert (await relay.__anext__()).startswith("event: token")
+        await relay.aclose()
+        return llm.llm_stats()
+
+    with mock.patch.object(llm, "get_async_client", return_value=_client(stream)):
+        stats = asyncio.run(main())
+    assert saved == [] and stream.closed
+    assert stats["openai"]["in_flight"] == 0
@@ -0,0 +1,53 @@
+"""
+Long-document chunking: token budget, overlap, streamed input and stable chunk ids (no DB, no embeddings).
+Run from backend: python -m pytest tests/test_chunking.py -v
+"""
+from sqlalchemy.dialects import postgresql
+
+from app.db.models import FinanceDocument, KnowledgeChunk
+from app.rag.chunking import chunk_id, count_tokens, iter_chunks
+from app.rag.vectorstore import _vector_select
+
+TEXT = " ".join(f"Sentence number {i} is about cash flow and runway." for i in range(200))
+
+
+def test_chunks_respect_budget_and_cover_text():
+    chunks = list(iter_chunks([TEXT], max_tokens=60, overlap_tokens=0))
+    assert len(chunks) > 1
+    assert [c.index for c in chunks] == list(range(len(chunks)))
+    assert all(c.token_count <= 60 for c in chunks)
+    assert " ".join(c.text for c in chunks) == TEXT
+
+
+def test_overlap_repeats_trailing_sentences():
+    chunks = list(iter_chunks([TEXT], max_tokens=60, overlap_tokens=20))
+    for prev, nxt in zip(chunks, chunks[1:]):
+        last_sentence = prev.text.rsplit(". ", 1)[-1]
+        assert nxt.text.startswith(last_sentence.rstrip("."))
+
+
+def test_streamed_pieces_match_whole_text():
+    pieces = [TEXT[i:i + 37] for i in range(0, len(TEXT), 37)]
+    assert list(iter_chunks(pieces, 60, 20)) == list(iter_chunks([TEXT], 60, 20))
+
+
+def test_oversized_unit_is_split():
+    word_run = "word " * 500
+    chunks = list(iter_chunks([word_run], max_tokens=50, overlap_tokens=0))
+    assert len(chunks) > 1 and all(c.token_count <= 50 for c in chunks)
+    assert count_tokens("") == 0
+
+
+def test_chunk_id_is_stable_and_positional():
+    assert chunk_id("finance_documents", 1, 0, "a") == chunk_id("finance_documents", 1, 0, "a")
+    assert chunk_id("finance_documents", 1, 0, "a") != chunk_id("finance_documents", 1, 1, "a")
+    assert len(chunk_id("ops_documents", 2, 0, "b")) == 64
+
+
+def test_domain_search_dedupes_chunks_to_parent():
+    emb = [0.0] * 1536
+    cols = [FinanceDocument.id, FinanceDocument.title, FinanceDocument.content]
+    sql = str(_vector_select(FinanceDocument, emb, 4, None, cols).compile(dialect=postgresql.dialect()))
+    assert "document_chunks" in sql and "row_number()" in sql
+    plain = str(_vector_select(KnowledgeChunk, emb, 4, None, [KnowledgeChunk.id]).compile(dialect=postgresql.dialect()))
+    assert "document_chunks" not in plain
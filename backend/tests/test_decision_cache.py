@@ -0,0 +1,41 @@
+"""
+Versioned DecisionOut cache: hits only on the current version, bounded LRU, invalidation.
+Run from backend: python -m pytest tests/test_decision_cache.py -v
+"""
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from app.governance import decision_cache
+from app.governance.decision_cache import _LocalLRU, cache_version
+
+
+def test_hit_requires_matching_version():
+    decision_cache.clear_local_cache()
+    decision_id = uuid4()
+    updated_at = datetime(2026, 2, 8, tzinfo=timezone.utc)
+    v1 = cache_version(3, updated_at)
+    decision_cache.put_cached(decision_id, v1, b'{"v":1}')
+    assert decision_cache.get_cached(decision_id, v1) == b'{"v":1}'
+    assert decision_cache.get_cached(decision_id, cache_version(4, updated_at)) is None
+    # Stale entry was dropped on the mismatch.
+    assert decision_cache.get_cached(decision_id, v1) is None
+
+
+def test_invalidate_drops_entry():
+    decision_cache.clear_local_cache()
+    decision_id = uuid4()
+    v = cache_version(1, None)
+    decision_cache.put_cached(decision_id, v, b"{}")
+    decision_cache.invalidate(decision_id)
+    assert decision_cache.get_cached(decision_id, v) is None
+
+
+def test_local_lru_is_bounded():
+    lru = _LocalLRU(2)
+    lru.set("a", "1", b"a")
+    lru.set("b", "1", b"b")
+    assert lru.get("a") is not None  # a is now most recent
+    lru.set("c", "1", b"c")
+    assert len(lru) == 2
+    assert lru.get("b") is None
+    assert lru.get("a") == ("1", b"a")
@@ -0,0 +1,58 @@
+"""
+Decision velocity: cycle timings per decision and the averages, band and trend over cycles (no DB: the
+pure helpers behind the single-query compute_decision_velocity).
+Run from backend: python -m pytest tests/test_decision_velocity.py -v
+"""
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.clear.decision_velocity import _cycle_from_timestamps, _trend_from_previous, _velocity_from_cycles
+
+T0 = datetime(2026, 1, 1, 9, tzinfo=timezone.utc)
+
+
+def _day(n: float) -> datetime:
+    return T0 + timedelta(days=n)
+
+
+def test_cycle_timings_match_per_decision_logic():
+    did = uuid4()
+    cycle = _cycle_from_timestamps(did, 3, T0, _day(10), _day(15), _day(40))
+    assert cycle == {
+        "decision_id": str(did),
+        "enterprise_id": 3,
+        "time_to_decision_days": 10.0,
+        "time_to_execution_days": 5.0,
+        "time_to_review_days": 25.0,
+        "total_cycle_days": 40.0,
+    }
+    # Never finalized: the stages touching finalization are unknown, the cycle still counts.
+    never_finalized = _cycle_from_timestamps(uuid4(), 3, T0, None, _day(20), _day(50))
+    assert (never_finalized["time_to_decision_days"], never_finalized["time_to_execution_days"]) == (None, None)
+    assert (never_finalized["time_to_review_days"], never_finalized["total_cycle_days"]) == (30.0, 50.0)
+    # Milestone created before finalization: negative spans clamp to 0.
+    assert _cycle_from_timestamps(uuid4(), 3, T0, _day(12), _day(8), _day(22))["time_to_execution_days"] == 0.0
+    # No review yet: not a full cycle.
+    assert _cycle_from_timestamps(uuid4(), 3, T0, _day(10), _day(15), None) is None
+
+
+def test_velocity_averages_band_and_trend():
+    cycles = [
+        _cycle_from_timestamps(uuid4(), 3, T0, _day(10), _day(15), _day(40)),
+        _cycle_from_timestamps(uuid4(), 3, T0, None, _day(20), _day(50)),
+        _cycle_from_timestamps(uuid4(), 3, T0, _day(12), _day(8), _day(22)),
+    ]
+    seen = []
+    out = _velocity_from_cycles(cycles, lambda avg: seen.append(avg) or _trend_from_previous(45, avg))
+    # cycle (40 + 50 + 22) / 3; unknown stages count as 0: (10 + 0 + 12) / 3, (5 + 0 + 0) / 3, (25 + 30 + 14) / 3
+    assert (out["avg_cycle_days"], out["avg_time_to_decision"], out["avg_time_to_execution"], out["avg_time_to_review"]) == (
+        37.3, 7.3, 1.7, 23.0
+    )
+    assert out["velocity_band"] == "healthy" and out["cycle_count"] == 3 and out["per_decision"] == cycles
+    assert out["trend_direction"] == "improving" and seen == [112 / 3]
+
+
+def test_no_cycles_and_trend_directions():
+    out = _velocity_from_cycles([], lambda avg: 1 / 0)  # trend is not consulted without cycles
+    assert (out["avg_cycle_days"], out["velocity_band"], out["trend_direction"], out["cycle_count"]) == (None, None, "stable", 0)
+    assert [_trend_from_previous(p, 30.0) for p in (None, 40, 20, "30")] == ["stable", "improving", "slowing", "stable"]
@@ -0,0 +1,183 @@
+"""
+Diagnostic job worker loop: concurrency limit, drain and stop, retry backoff, heartbeat, decision reuse on
+retry and owner-checked writes after a reclaim (no DB: sessions, claim and run are patched).
+Run from backend: python -m pytest tests/test_diagnostic_jobs.py -v
+"""
+import asyncio
+import itertools
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.config import settings
+from app.diagnostic import job_queue
+
+
+def test_retry_backoff_doubles_per_attempt(monkeypatch):
+    monkeypatch.setattr(settings, "DIAGNOSTIC_JOB_RETRY_BACKOFF_SECONDS", 10.0)
+    assert [job_queue.retry_delay_seconds(n) for n in (1, 2, 3)] == [10.0, 20.0, 40.0]
+
+
+def test_worker_respects_concurrency_and_drains(monkeypatch):
+    pending = list(range(7))
+    state = {"running": 0, "peak": 0}
+
+    def claim(worker_id):
+        return pending.pop(0) if pending else None
+
+    async def run(job_id):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.01)
+        state["running"] -= 1
+        return "completed"
+
+    monkeypatch.setattr(job_queue, "_claim_in_own_session", claim)
+    monkeypatch.setattr(job_queue, "run_diagnostic_job", run)
+    processed = asyncio.run(job_queue.run_worker(concurrency=3, poll_seconds=0.01, drain=True, worker_id="t"))
+    assert processed == 7
+    assert state["peak"] == 3
+
+
+def test_stop_waits_for_in_flight_jobs(monkeypatch):
+    ids = itertools.count()
+    finished = []
+
+    async def run(job_id):
+        await asyncio.sleep(0.05)
+        finished.append(job_id)
+        return "completed"
+
+    monkeypatch.setattr(job_queue, "_claim_in_own_session", lambda worker_id: next(ids))
+    monkeypatch.setattr(job_queue, "run_diagnostic_job", run)
+
+    async def main():
+        stop = asyncio.Event()
+        worker = asyncio.create_task(job_queue.run_worker(concurrency=2, poll_seconds=0.01, stop=stop, worker_id="t"))
+        await asyncio.sleep(0.01)
+        stop.set()
+        return await worker
+
+    processed = asyncio.run(main())
+    assert processed == 2
+    assert sorted(finished) == [0, 1]
+
+
+class _FakeQuery:
+    def __init__(self, job, owner_check=False):
+        self._job = job
+        self._owner_check = owner_check
+
+    def filter(self, *args):
+        return self
+
+    def with_for_update(self):
+        return _FakeQuery(self._job, owner_check=True)  # the owner-checked lock of an attempt's final write
+
+    def first(self):
+        if self._owner_check and (self._job.status, self._job.worker_id, self._job.attempts) != ("running", "w", 2):
+            return None
+        return self._job
+
+
+class _FakeSession:
+    def __init__(self, job):
+        self.job = job
+        self.commits = 0
+
+    def query(self, model):
+        return _FakeQuery(self.job)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _patch_job_run(monkeypatch, job, run):
+    from app.diagnostic import run_service
+
+    monkeypatch.setattr(job_queue, "SessionLocal", lambda: _FakeSession(job))
+    monkeypatch.setattr(run_service, "run_diagnostic_run", run)
+    completed = []
+
+    def complete(db, body, result, trace_id, t0, side_effects=True):
+        completed.append(side_effects)
+        return SimpleNamespace(
+            decision_id=result["decision_id"], model_dump=lambda mode: {"decision_id": result["decision_id"]}
+        )
+
+    monkeypatch.setattr(run_service, "complete_diagnostic_run", complete)
+    return completed
+
+
+def _job(decision_id=None):
+    return SimpleNamespace(
+        id=uuid4(), trace_id="t", payload={"diagnostic_data": {}}, attempts=2, worker_id="w",
+        decision_id=decision_id, status="running", result=None, last_error="boom", finished_at=None,
+    )
+
+
+def test_retry_reuses_decision_of_earlier_attempt(monkeypatch):
+    from app.diagnostic import run_service
+
+    decision_id = uuid4()
+    job = _job(decision_id)
+
+    async def run(*args, **kwargs):
+        raise AssertionError("agents must not run again")
+
+    completed = _patch_job_run(monkeypatch, job, run)
+    monkeypatch.setattr(run_service, "diagnostic_run_result", lambda db, d: {"decision_id": str(d), "reused": True})
+    assert asyncio.run(job_queue.run_diagnostic_job(job.id)) == "completed"
+    assert job.decision_id == decision_id and job.result == {"decision_id": str(decision_id)}
+    assert completed == [False]  # usage events and decision context are not recorded again
+
+
+def test_reclaimed_attempt_does_not_overwrite_new_owner(monkeypatch):
+    job = _job()
+
+    async def run(db, **kwargs):
+        job.worker_id, job.attempts = "other", 3  # stale reclaim while this attempt was still running
+        return {"decision_id": str(uuid4())}
+
+    _patch_job_run(monkeypatch, job, run)
+    assert asyncio.run(job_queue.run_diagnostic_job(job.id)) == "reclaimed"
+    assert (job.status, job.result, job.finished_at) == ("running", None, None)
+
+    async def fail(db, **kwargs):
+        job.worker_id, job.attempts = "other", 3
+        raise RuntimeError("agents down")
+
+    job = _job()
+    _patch_job_run(monkeypatch, job, fail)
+    assert asyncio.run(job_queue.run_diagnostic_job(job.id)) == "reclaimed"
+    assert (job.status, job.last_error) == ("running", "boom")
+
+
+def test_heartbeat_refreshes_while_job_runs(monkeypatch):
+    job = _job()
+    touched = []
+
+    async def run(db, **kwargs):
+        assert kwargs["job_id"] == job.id  # the decision is linked to the job when created
+        await asyncio.sleep(0.06)
+        return {"decision_id": str(uuid4())}
+
+    _patch_job_run(monkeypatch, job, run)
+    monkeypatch.setattr(settings, "DIAGNOSTIC_JOB_HEARTBEAT_SECONDS", 0.01)
+    monkeypatch.setattr(job_queue, "_touch_heartbeat", lambda *owner: touched.append(owner))
+
+    async def main():
+        status = await job_queue.run_diagnostic_job(job.id)
+        beats = len(touched)
+        await asyncio.sleep(0.03)
+        return status, beats
+
+    status, beats = asyncio.run(main())
+    assert status == "completed" and beats >= 2
+    assert len(touched) == beats  # stopped with the job
+    assert touched[0] == (job.id, "w", 2)
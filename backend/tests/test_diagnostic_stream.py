@@ -0,0 +1,59 @@
+"""
+Streaming diagnostic run relay: event order, keepalive comments and runs that outlive the client (no DB).
+Run from backend: python -m pytest tests/test_diagnostic_stream.py -v
+"""
+import asyncio
+import json
+
+from app.diagnostic.run_stream import sse, stream_run
+
+
+def _events(chunks):
+    return [c.split("\n", 1)[0] for c in chunks]
+
+
+def test_relay_emits_events_keepalives_and_done():
+    async def run(emit):
+        emit("agent", {"domain": "cmo"})
+        await asyncio.sleep(0.05)
+        emit("decision", {"decision_id": "d1"})
+
+    async def main():
+        return [chunk async for chunk in stream_run(run, keepalive_seconds=0.01)]
+
+    chunks = asyncio.run(main())
+    events = [e for e in _events(chunks) if e != ": keepalive"]
+    assert events == ["event: agent", "event: decision", "event: done"]
+    assert ": keepalive\n\n" in chunks
+    assert json.loads(chunks[-2].split("data: ", 1)[1]) == {"decision_id": "d1"}
+
+
+def test_run_errors_become_error_events():
+    async def run(emit):
+        raise ValueError("All agents failed; cannot create decision.")
+
+    async def main():
+        return [chunk async for chunk in stream_run(run, keepalive_seconds=1)]
+
+    chunks = asyncio.run(main())
+    assert _events(chunks) == ["event: error", "event: done"]
+    assert '"status": 400' in chunks[0]
+
+
+def test_run_continues_after_client_disconnects():
+    finished = []
+
+    async def run(emit):
+        emit("agent", {"domain": "cmo"})
+        await asyncio.sleep(0.05)
+        finished.append(True)
+
+    async def main():
+        relay = stream_run(run, keepalive_seconds=1)
+        assert (await relay.__anext__()).startswith("event: agent")
+        await relay.aclose()
+        await asyncio.sleep(0.1)
+
+    asyncio.run(main())
+    assert finished == [True]
+    assert sse("x", {"a": 1}) == 'event: x\ndata: {"a": 1}\n\n'
@@ -0,0 +1,51 @@
+"""
+Embedding cache: (model, sha256(text)) keys, LRU bound, age expiry, counters. Local tier only (no DB).
+Run from backend: python -m pytest tests/test_embedding_cache.py -v
+"""
+import time
+
+from app.config import settings
+from app.rag import embedding_cache
+from app.rag.embedding_cache import _EmbeddingLRU, text_hash
+
+
+def test_round_trip_is_keyed_by_model_and_text(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PERSIST", False)
+    embedding_cache.clear_local_cache()
+    embedding_cache.put_cached_embedding("m1", "SME cash flow best practices", [0.1, 0.2])
+    assert embedding_cache.get_cached_embedding("m1", "SME cash flow best practices") == [0.1, 0.2]
+    assert embedding_cache.get_cached_embedding("m2", "SME cash flow best practices") is None
+    assert embedding_cache.get_cached_embedding("m1", "SME cash flow best practice") is None
+
+
+def test_failed_embeddings_are_not_cached(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PERSIST", False)
+    embedding_cache.clear_local_cache()
+    embedding_cache.put_cached_embedding("m1", "x", [])
+    assert embedding_cache.get_cached_embedding("m1", "x") is None
+
+
+def test_lru_bound_and_age_expiry():
+    lru = _EmbeddingLRU(max_entries=2)
+    lru.set(("m", "a"), [1.0])
+    lru.set(("m", "b"), [2.0])
+    assert lru.get(("m", "a"), 60) == [1.0]  # a is now most recent
+    lru.set(("m", "c"), [3.0])
+    assert lru.get(("m", "b"), 60) is None
+    lru.set(("m", "old"), [4.0], stored_at=time.time() - 120)
+    assert lru.get(("m", "old"), 60) is None
+    lru.set(("m", "old"), [4.0], stored_at=time.time() - 120)
+    assert lru.evict_older_than(60) == 1
+
+
+def test_counters_track_hits_and_misses(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PERSIST", False)
+    embedding_cache.clear_local_cache()
+    before = embedding_cache.cache_stats()
+    embedding_cache.get_cached_embedding("m1", "miss")
+    embedding_cache.put_cached_embedding("m1", "hit", [0.5])
+    embedding_cache.get_cached_embedding("m1", "hit")
+    after = embedding_cache.cache_stats()
+    assert after["misses"] == before["misses"] + 1
+    assert after["hits"] == before["hits"] + 1
+    assert text_hash("hit") == text_hash("hit") != text_hash("hit ")
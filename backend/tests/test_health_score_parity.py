@@ -0,0 +1,104 @@
+"""
+Parity: columnar multi-enterprise health scoring (compute_health_scores, which compute_health_score
+delegates to) must equal the per-enterprise row scoring used by the portfolio engine, on randomized
+inputs; both use the same "has plan" rule.
+Run from backend: python -m pytest tests/test_health_score_parity.py -v
+"""
+import random
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+from uuid import uuid4
+
+from app.governance.health_score import _artifact_has_execution_plan, _score_from_rows, _scores_from_columns
+
+TODAY = date(2026, 2, 8)
+STATUSES = ["draft", "finalized", "signed", "in_progress", "implemented", "outcome_tracked", "archived"]
+MILESTONE_STATUSES = ["pending", "completed", "Completed", "in_progress", "In Progress", None]
+
+
+def _random_portfolio(rng: random.Random, n_enterprises: int):
+    enterprises = []
+    for eid in range(1, n_enterprises + 1):
+        decisions, milestones, reviews = [], [], []
+        statuses, evidence, plans, diagnostics = {}, set(), set(), set()
+        for _ in range(rng.randint(1, 6)):
+            did = uuid4()
+            decisions.append(SimpleNamespace(
+                decision_id=did,
+                enterprise_id=eid,
+                responsible_owner=rng.choice([None, "", "  ", "owner"]),
+                outcome_review_reminder=rng.random() < 0.4,
+            ))
+            statuses[did] = rng.choice(STATUSES)
+            if rng.random() < 0.5:
+                evidence.add(did)
+            if rng.random() < 0.5:
+                plans.add(did)
+            if rng.random() < 0.3:
+                diagnostics.add(did)
+            for _ in range(rng.randint(0, 4)):
+                due = rng.choice([None, TODAY - timedelta(days=rng.randint(1, 30)), TODAY + timedelta(days=rng.randint(0, 30))])
+                updated = rng.choice([None, datetime(2026, 1, rng.randint(1, 31), 12, tzinfo=timezone.utc)])
+                milestones.append(SimpleNamespace(decision_id=did, status=rng.choice(MILESTONE_STATUSES), due_date=due, updated_at=updated))
+            for _ in range(rng.randint(0, 3)):
+                reviews.append(SimpleNamespace(decision_id=did, key_learnings=rng.choice([None, "", " \n", "learned"])))
+        enterprises.append((eid, decisions, statuses, milestones, evidence, plans, diagnostics, reviews))
+    return enterprises
+
+
+def _columns(enterprises):
+    decision_cols = {k: [] for k in ("decision_id", "enterprise_id", "status", "has_owner", "review_reminder", "has_plan", "from_diagnostic", "has_evidence")}
+    milestone_cols = {k: [] for k in ("decision_id", "status", "due_date", "updated_on")}
+    review_cols = {k: [] for k in ("decision_id", "has_learning")}
+    for eid, decisions, statuses, milestones, evidence, plans, diagnostics, reviews in enterprises:
+        for d in decisions:
+            decision_cols["decision_id"].append(d.decision_id)
+            decision_cols["enterprise_id"].append(eid)
+            decision_cols["status"].append(statuses[d.decision_id])
+            decision_cols["has_owner"].append(bool(d.responsible_owner and d.responsible_owner.strip()))
+            decision_cols["review_reminder"].append(bool(d.outcome_review_reminder))
+            decision_cols["has_plan"].append(d.decision_id in plans)
+            decision_cols["from_diagnostic"].append(d.decision_id in diagnostics)
+            decision_cols["has_evidence"].append(d.decision_id in evidence)
+        for m in milestones:
+            milestone_cols["decision_id"].append(m.decision_id)
+            milestone_cols["status"].append((m.status or "").lower())
+            milestone_cols["due_date"].append(m.due_date)
+            milestone_cols["updated_on"].append(m.updated_at.date() if m.updated_at else None)
+        for r in reviews:
+            review_cols["decision_id"].append(r.decision_id)
+            review_cols["has_learning"].append(bool((r.key_learnings or "").strip()))
+    return decision_cols, milestone_cols, review_cols
+
+
+def test_columnar_scores_match_row_scores():
+    rng = random.Random(20260208)
+    for _ in range(25):
+        enterprises = _random_portfolio(rng, rng.randint(1, 12))
+        columnar = _scores_from_columns(*_columns(enterprises), TODAY)
+        assert set(columnar) == {e[0] for e in enterprises}
+        for eid, decisions, statuses, milestones, evidence, plans, diagnostics, reviews in enterprises:
+            expected = _score_from_rows(decisions, statuses, milestones, evidence, plans, diagnostics, reviews, TODAY)
+            assert columnar[eid] == expected, eid
+
+
+def test_plan_rule_matches_batch_jsonb_check():
+    """has plan = EMR milestones is a non-empty array (compute_health_scores counts only jsonb arrays)."""
+    assert _artifact_has_execution_plan({"emr": {"milestones": [{"title": "m1"}]}})
+    for artifact in (None, {}, {"emr": None}, {"emr": []}, {"emr": {"milestones": []}},
+                     {"emr": {"milestones": {"title": "m1"}}}, {"emr": {"milestones": "m1"}}):
+        assert not _artifact_has_execution_plan(artifact), artifact
+
+
+def test_scalar_score_is_the_batch_score(monkeypatch):
+    from app.governance import health_score
+
+    calls = []
+
+    def batch(db, enterprise_ids):
+        calls.append(enterprise_ids)
+        return {eid: {"total_score": 42, "trend_direction": "up"} for eid in enterprise_ids}
+
+    monkeypatch.setattr(health_score, "compute_health_scores", batch)
+    assert health_score.compute_health_score(object(), 7) == {"total_score": 42, "trend_direction": "up"}
+    assert calls == [[7]]
@@ -0,0 +1,145 @@
+"""
+Bulk ingestion helpers: JSONL parsing, document validation, batched embeddings, chunking of long documents
+(fake client and session, local cache only).
+Run from backend: python -m pytest tests/test_ingest.py -v
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from app.config import settings
+from app.db.models import FinanceDocument, KnowledgeChunk
+from app.rag import embedding_cache, ingest, vectorstore
+from app.rag.ingest import _normalize, _write_batch, iter_jsonl
+
+
+def test_iter_jsonl_skips_blanks_and_flags_bad_lines():
+    docs = list(iter_jsonl([b'{"title": "a", "content": "x"}\n', "\n", "nope", "[1]"]))
+    assert docs[0] == {"title": "a", "content": "x"}
+    assert docs[1]["_error"].startswith("line 3: invalid JSON")
+    assert docs[2]["_error"] == "line 4: expected an object"
+
+
+def test_normalize_validates_required_fields():
+    assert _normalize("finance", FinanceDocument, {"title": " Q3 plan ", "content": "c"})["title"] == "Q3 plan"
+    with pytest.raises(ValueError):
+        _normalize("finance", FinanceDocument, {"title": "t", "content": "  "})
+    with pytest.raises(ValueError):
+        _normalize("finance", FinanceDocument, {"title": "t" * 501, "content": "c"})
+    with pytest.raises(ValueError):
+        _normalize("finance", FinanceDocument, {"title": "t", "content": "c", "decision_id": "not-a-uuid"})
+    with pytest.raises(ValueError):
+        _normalize("knowledge", KnowledgeChunk, {"title": "t", "content": "c"})
+
+
+def test_get_embeddings_batches_dedupes_and_keeps_order(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PERSIST", False)
+    embedding_cache.clear_local_cache()
+    requests = []
+
+    def create(model, input):
+        requests.append(list(input))
+        data = [SimpleNamespace(index=i, embedding=[float(len(t))]) for i, t in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+    fake = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+    texts = ["a", "bb", "a", "", "cccc", "ddd"]
+    with mock.patch.object(vectorstore, "get_openai_client", return_value=fake):
+        out = vectorstore.get_embeddings(texts, batch_size=2, max_concurrency=2)
+        assert out == [[1.0], [2.0], [1.0], [], [4.0], [3.0]]
+        assert sorted(len(r) for r in requests) == [2, 2]
+        requests.clear()
+        assert vectorstore.get_embeddings(["bb", "ddd"]) == [[2.0], [3.0]]
+        assert requests == []
+
+
+def test_oversized_input_fails_alone_not_its_batch(monkeypatch):
+    import httpx
+    from openai import BadRequestError
+
+    monkeypatch.setattr(settings, "EMBEDDING_CACHE_PERSIST", False)
+    embedding_cache.clear_local_cache()
+    requests = []
+
+    def create(model, input):
+        requests.append(len(input))
+        if any(len(t) > 10 for t in input):  # the API rejects the whole request
+            response = httpx.Response(400, request=httpx.Request("POST", "https://api.openai.com/v1/embeddings"))
+            raise BadRequestError("maximum context length exceeded", response=response, body=None)
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[float(len(t))]) for i, t in enumerate(input)])
+
+    fake = SimpleNamespace(embeddings=SimpleNamespace(create=create))
+    texts = ["a", "bb", "x" * 50, "ccc", "dddd", "eeeee", "ffffff", "g"]
+    with mock.patch.object(vectorstore, "get_openai_client", return_value=fake):
+        out = vectorstore.get_embeddings(texts, batch_size=8)
+    assert out == [[1.0], [2.0], [], [3.0], [4.0], [5.0], [6.0], [1.0]]
+    assert requests[0] == 8 and len(requests) <= 7  # split in halves down to the bad input
+
+
+def test_inserted_ids_match_full_knowledge_key(monkeypatch):
+    """Same title, different source_type: each row gets its own id (and its own shadow vector)."""
+    docs = [
+        {"title": "Cash runway", "content": "guide text", "source_type": "guide", "tags": None},
+        {"title": "Cash runway", "content": "case text", "source_type": "case_study", "tags": None},
+    ]
+    shadow_pairs = []
+
+    class FakeDB:
+        def execute(self, stmt):
+            if stmt.is_select:  # existing-row lookup: nothing stored yet
+                return []
+            # INSERT ... RETURNING id, source_type, title, in an order different from VALUES
+            return SimpleNamespace(all=lambda: [(2, "case_study", "Cash runway"), (1, "guide", "Cash runway")])
+
+    monkeypatch.setattr(settings, "EMBEDDING_SHADOW_MODEL", "shadow-model")
+    monkeypatch.setattr(ingest, "get_embeddings", lambda texts, **kw: [[0.0] * vectorstore.EMBEDDING_DIM for _ in texts])
+    monkeypatch.setattr(ingest, "write_shadow_embeddings", lambda db, table, pairs: shadow_pairs.extend(pairs))
+    report = dict.fromkeys(("duplicates", "skipped_unchanged", "embedding_failures", "inserted", "updated"), 0)
+    _write_batch(FakeDB(), "knowledge", docs, report, {})
+    assert report["inserted"] == 2
+    assert sorted(shadow_pairs) == [(1, "guide text"), (2, "case text")]
+
+
+def test_reingested_long_document_keeps_its_chunks(monkeypatch):
+    """A long document is chunked on the bulk path too; re-ingesting it reuses its chunks instead of wiping them."""
+    monkeypatch.setattr(settings, "RAG_CHUNK_TOKENS", 20)
+    monkeypatch.setattr(settings, "EMBEDDING_SHADOW_MODEL", None)
+    long_text = " ".join(f"Sentence {i} about cash runway." for i in range(40))
+    executed, chunk_calls = [], []
+
+    class FakeDB:
+        def execute(self, stmt):
+            if stmt.is_select:  # stored earlier (e.g. by /documents/file) with other content
+                return [SimpleNamespace(id=5, content_hash="old", title="Runway")]
+            executed.append(stmt)
+
+        def connection(self):
+            return SimpleNamespace(execute=lambda stmt, rows: executed.append(stmt))
+
+    def write_chunks(db, doc_table, doc_id, title, chunks, report):
+        chunk_calls.append((doc_table, doc_id, len(chunks)))
+        report["chunks"] += len(chunks)
+        return [f"c{c.index}" for c in chunks]
+
+    monkeypatch.setattr(ingest, "_write_chunks", write_chunks)
+    monkeypatch.setattr(ingest, "get_embeddings", lambda texts, **kw: [[0.0] * vectorstore.EMBEDDING_DIM for _ in texts])
+    report = dict.fromkeys(
+        ("duplicates", "skipped_unchanged", "embedding_failures", "inserted", "updated", "chunked", "chunks"), 0
+    )
+    docs = [{"title": "Runway", "content": long_text, "enterprise_id": None, "decision_id": None}]
+    _write_batch(FakeDB(), "finance", docs, report, {})
+
+    assert report["updated"] == 1 and report["chunked"] == 1 and report["chunks"] > 1
+    assert chunk_calls == [("finance_documents", 5, report["chunks"])]
+    assert docs[0]["embedding"] is None  # no whole-text embedding for the parent
+    deletes = [str(s) for s in executed if s.is_delete]
+    assert len(deletes) == 1 and "NOT IN" in deletes[0]  # only chunks no longer produced are removed
+
+
+def test_bulk_body_lines_are_split_across_stream_chunks():
+    from app.documents.routes import _iter_lines
+
+    chunks = iter([b'"content": "x"}\n{"title": "b",', b' "content": "y"}\n', b"\n"])
+    lines = list(_iter_lines(b'{"title": "a", ', lambda: next(chunks, None)))
+    assert [d["title"] for d in iter_jsonl(lines)] == ["a", "b"]
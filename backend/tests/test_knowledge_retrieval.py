@@ -0,0 +1,40 @@
+"""
+Knowledge snippet retrieval: tag filter variants, the no-DB guard and index candidates feeding the fusion
+(hybrid SQL itself needs Postgres).
+Run from backend: python -m pytest tests/test_knowledge_retrieval.py -v
+"""
+from app.knowledge.retrieval import _tag_variants, retrieve_knowledge_snippets
+
+
+def test_tag_variants_cover_stored_casing():
+    assert _tag_variants(["malaysia", None, " "]) == ["malaysia", "Malaysia", "MALAYSIA"]
+    assert _tag_variants(["F&B", "SEA"]) == ["F&B", "f&b", "SEA", "sea", "Sea"]
+
+
+def test_no_db_returns_empty():
+    assert retrieve_knowledge_snippets("cfo", industry="retail", db=None) == []
+
+
+def test_index_hits_are_fused_with_lexical_candidates(monkeypatch):
+    from types import SimpleNamespace
+
+    from app.config import settings
+    from app.knowledge import retrieval
+
+    calls = {}
+
+    def search(query_embedding, k, tags=None, source_types=None):
+        calls["k"] = k
+        return [{"id": 7}, {"id": 3}]
+
+    def hybrid(db, query_text, query_embedding, top_k, **kwargs):
+        calls["vector_ids"] = kwargs["vector_ids"]
+        return [SimpleNamespace(id=3, source_type="guide", title="t", content="c", tags=[])]
+
+    monkeypatch.setattr(settings, "RAG_ENABLED", True)
+    monkeypatch.setattr(retrieval, "get_embedding", lambda text, timeout=None: [1.0, 0.0])
+    monkeypatch.setattr(retrieval.vector_index, "search", search)
+    monkeypatch.setattr(retrieval, "_hybrid_search", hybrid)
+    out = retrieve_knowledge_snippets("cfo", db=object(), top_k=5)
+    assert [r["id"] for r in out] == [3]
+    assert calls == {"k": 20, "vector_ids": [7, 3]}  # index supplies the vector candidates; RRF still runs
@@ -0,0 +1,62 @@
+"""
+In-process knowledge vector index: top-k, filters, similarity threshold and prefer-tags ordering over a loaded snapshot
+(building one from knowledge_chunks needs Postgres).
+Run from backend: python -m pytest tests/test_knowledge_vector_index.py -v
+"""
+from unittest import mock
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.config import settings  # noqa: E402
+from app.knowledge import vector_index  # noqa: E402
+
+
+def _snapshot():
+    matrix = np.array([[1.0, 0.0], [0.8, 0.6], [0.0, 1.0]], dtype=np.float32)
+    meta = [
+        {"id": 1, "source_type": "guide", "title": "a", "content": "A", "tags": ["finance"]},
+        {"id": 2, "source_type": "case", "title": "b", "content": "B", "tags": ["finance", "Malaysia"]},
+        {"id": 3, "source_type": "guide", "title": "c", "content": "C", "tags": ["ops"]},
+    ]
+    return vector_index._Snapshot("v1", matrix, meta)
+
+
+@pytest.fixture
+def loaded():
+    with mock.patch.object(settings, "KNOWLEDGE_INDEX_ENABLED", True), \
+         mock.patch.object(vector_index, "_snapshot", _snapshot()), \
+         mock.patch.object(vector_index, "_last_check", float("inf")):
+        yield
+
+
+def test_disabled_or_not_loaded_returns_none():
+    with mock.patch.object(settings, "KNOWLEDGE_INDEX_ENABLED", False):
+        assert vector_index.search([1.0, 0.0], 2) is None
+    with mock.patch.object(settings, "KNOWLEDGE_INDEX_ENABLED", True), \
+         mock.patch.object(vector_index, "_snapshot", None), \
+         mock.patch.object(vector_index, "refresh_in_background") as refresh:
+        assert vector_index.search([1.0, 0.0], 2) is None
+        refresh.assert_called_once()
+
+
+def test_top_k_by_cosine(loaded):
+    hits = vector_index.search([2.0, 0.0], 2)
+    assert [h["id"] for h in hits] == [1, 2]
+    assert hits[0]["similarity"] == 1.0
+
+
+def test_filters_and_prefer_tags(loaded):
+    assert [h["id"] for h in vector_index.search([1.0, 0.0], 3, source_types=["guide"])] == [1, 3]
+    assert [h["id"] for h in vector_index.search([1.0, 0.0], 3, tags=["ops"])] == [3]
+    assert [h["id"] for h in vector_index.search([1.0, 0.0], 2, prefer_tags=["Malaysia"])] == [2, 1]
+
+
+def test_min_similarity_drops_weak_hits(loaded):
+    with mock.patch.object(settings, "RAG_MIN_SIMILARITY", 0.7):
+        assert [h["id"] for h in vector_index.search([1.0, 0.0], 3)] == [1, 2]  # id 3 has similarity 0
+
+
+def test_dimension_mismatch_falls_back(loaded):
+    assert vector_index.search([1.0, 0.0, 0.0], 2) is None
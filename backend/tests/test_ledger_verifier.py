@@ -0,0 +1,76 @@
+"""
+Ledger verifier checks on in-memory rows (no DB): supersedes chains, event ordering, hash batches.
+Run from backend: python -m pytest tests/test_ledger_verifier.py -v
+"""
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from app.governance.canonicalize import canonicalize, compute_canonical_hash
+from app.governance.ledger_verifier import _Report, _check_chain, _check_events, _hash_batch
+
+T0 = datetime(2026, 2, 8, tzinfo=timezone.utc)
+
+
+def _kinds(report):
+    return dict(report.counts)
+
+
+def test_linear_chain_is_clean_and_forks_are_reported():
+    v1, v2, v3 = uuid4(), uuid4(), uuid4()
+    chain = [(uuid4(), v1, None, T0), (uuid4(), v2, v1, T0 + timedelta(minutes=1)), (uuid4(), v3, v2, T0 + timedelta(minutes=2))]
+    report = _Report(10)
+    _check_chain("d", chain, report)
+    assert _kinds(report) == {}
+
+    forked = chain[:2] + [(uuid4(), v3, v1, T0 + timedelta(minutes=2))]
+    report = _Report(10)
+    _check_chain("d", forked, report)
+    assert _kinds(report) == {"chain_fork": 1}
+
+    report = _Report(10)
+    _check_chain("d", [(uuid4(), v1, uuid4(), T0)], report)
+    assert _kinds(report) == {"supersedes_unknown_version": 1, "chain_root_count": 1}
+
+
+def _event(seq, event_type, minutes, decision_id="d", version=None, supersedes=None):
+    return (seq, uuid4(), event_type, T0 + timedelta(minutes=minutes),
+            version, decision_id if version else None, supersedes, None, None, None)
+
+
+def test_event_replay_flags_ordering_and_lifecycle_violations():
+    v1, v2 = uuid4(), uuid4()
+    good = [
+        _event(1, "DECISION_INITIATED", 0),
+        _event(2, "ARTIFACT_DRAFT_CREATED", 0, version=v1),
+        _event(3, "ARTIFACT_DRAFT_UPDATED", 1, version=v2, supersedes=v1),
+        _event(4, "ARTIFACT_FINALIZED", 2, version=v2, supersedes=v1),
+        _event(5, "FINALIZATION_ACKNOWLEDGED", 3),
+    ]
+    report = _Report(10)
+    _check_events("d", good, report)
+    assert _kinds(report) == {}
+
+    bad = good + [_event(6, "ARTIFACT_DRAFT_UPDATED", 1, version=uuid4(), supersedes=v2)]
+    report = _Report(10)
+    _check_events("d", bad, report)
+    assert _kinds(report) == {"timestamp_regression": 1, "draft_event_after_draft": 1}
+
+    report = _Report(10)
+    _check_events("d", [_event(1, "FINALIZATION_ACKNOWLEDGED", 0)], report)
+    assert _kinds(report) == {"first_event_not_initiated": 1, "sign_off_before_finalize": 1}
+
+
+def test_hash_batch_reports_mismatches_only():
+    artifact = {"b": 1, "a": [1.5, "x"]}
+    text = canonicalize(artifact)
+    rows = [("d", "a1", text, compute_canonical_hash(artifact)), ("d", "a2", text, "0" * 64)]
+    issues = _hash_batch(rows)
+    assert [i["artifact_id"] for i in issues] == ["a2"]
+    assert issues[0]["kind"] == "hash_mismatch"
+
+
+def test_report_counts_everything_but_keeps_max_issues():
+    report = _Report(2)
+    report.extend({"kind": "hash_mismatch"} for _ in range(5))
+    assert report.counts["hash_mismatch"] == 5
+    assert len(report.issues) == 2
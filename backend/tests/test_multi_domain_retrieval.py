@@ -0,0 +1,33 @@
+"""
+Multi-domain RAG retrieval: argument validation and the per-run query set (no DB, no embeddings).
+Run from backend: python -m pytest tests/test_multi_domain_retrieval.py -v
+"""
+import pytest
+
+from app.config import settings
+from app.diagnostic.mapping import build_all_payloads
+from app.diagnostic.run_service import _rag_queries
+from app.rag.vectorstore import multi_domain_search
+
+
+def test_unknown_domain_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "RAG_ENABLED", True)
+    with pytest.raises(ValueError):
+        multi_domain_search(None, {"legal": "contracts"})
+
+
+def test_empty_queries_skip_embedding_and_search(monkeypatch):
+    monkeypatch.setattr(settings, "RAG_ENABLED", True)
+    assert multi_domain_search(None, {"finance": "", "ops": "   "}) == {"finance": [], "ops": []}
+
+
+def test_disabled_rag_returns_nothing(monkeypatch):
+    monkeypatch.setattr(settings, "RAG_ENABLED", False)
+    assert multi_domain_search(None, {"finance": "cash"}) == {}
+
+
+def test_run_queries_cover_every_document_domain():
+    payloads = build_all_payloads({"situation_description": "cash is tight"}, {"industry": "retail"})
+    queries = _rag_queries(payloads)
+    assert set(queries) == {"finance", "marketing", "ops", "tech"}
+    assert all(q.strip() for q in queries.values())
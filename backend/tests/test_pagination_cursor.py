@@ -0,0 +1,24 @@
+"""
+Keyset cursor round-trip for GET /api/clear/decisions paging.
+Run from backend: python -m pytest tests/test_pagination_cursor.py -v
+"""
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import pytest
+
+from app.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 2, 8, 12, 30, 15, 123456, tzinfo=timezone.utc)
+    decision_id = uuid4()
+    cursor = encode_cursor(created_at, decision_id)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, str(decision_id))
+
+
+@pytest.mark.parametrize("cursor", ["garbage", "", "W10", encode_cursor(datetime.now(timezone.utc), 1)[:-3]])
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
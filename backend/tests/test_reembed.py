@@ -0,0 +1,40 @@
+"""
+Re-embedding jobs: target/table validation, pending-row selection and the dual-write no-op (no DB calls).
+Run from backend: python -m pytest tests/test_reembed.py -v
+"""
+import pytest
+
+from app.config import settings
+from app.rag.reembed import _check_tables, _pending_clause, _target_model, write_shadow_embeddings
+from app.rag.vectorstore import _embedding_or_none
+
+
+def test_target_and_tables_are_validated(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_SHADOW_MODEL", None)
+    assert _target_model("embedding") == settings.EMBEDDING_MODEL
+    with pytest.raises(ValueError):
+        _target_model("shadow")
+    with pytest.raises(ValueError):
+        _target_model("live")
+    with pytest.raises(ValueError):
+        _check_tables(["users"])
+    assert "knowledge_chunks" in _check_tables(None)
+
+
+def test_pending_rows_skip_chunked_parents():
+    parent = _pending_clause("finance_documents", "embedding")
+    assert "t.embedding IS NULL OR t.embedding_model IS DISTINCT FROM :model" in parent
+    assert "document_chunks" in parent
+    assert "document_chunks" not in _pending_clause("knowledge_chunks", "embedding")
+    assert "t.embedding_shadow IS NULL" in _pending_clause("document_chunks", "shadow")
+
+
+def test_dual_write_is_noop_without_shadow_model(monkeypatch):
+    monkeypatch.setattr(settings, "EMBEDDING_SHADOW_MODEL", None)
+    assert write_shadow_embeddings(None, "finance_documents", [(1, "text")]) == 0
+
+
+def test_embedding_dimension_check():
+    assert _embedding_or_none([0.1] * 1536) is not None
+    assert _embedding_or_none([0.1] * 3072) is None
+    assert _embedding_or_none([0.1] * 3072, dim=3072) is not None
@@ -0,0 +1,148 @@
+"""
+Single-flight coalescing: shared calls for sync and async callers, cancellation, fan-in counters, and
+coalesced embeddings (no network, no DB).
+Run from backend: python -m pytest tests/test_single_flight.py -v
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from unittest import mock
+
+import pytest
+
+from app.config import settings
+from app.rag import vectorstore
+from app.utils.single_flight import SingleFlight
+
+
+def test_sync_callers_share_one_call_and_errors():
+    flight = SingleFlight("test_sync")
+    calls = []
+    gate = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        gate.wait(1)
+        return "v"
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        futures = [pool.submit(flight.do, "k", fetch) for _ in range(5)]
+        time.sleep(0.05)
+        gate.set()
+        assert [f.result() for f in futures] == ["v"] * 5
+    assert len(calls) == 1
+    stats = flight.stats()
+    assert (stats["flights"], stats["callers"], stats["fan_in_ratio"], stats["in_flight"]) == (1, 5, 5.0, 0)
+
+    def boom():
+        raise RuntimeError("provider down")
+
+    with pytest.raises(RuntimeError):
+        flight.do("k", boom)
+    assert flight.stats()["errors"] == 1
+    assert flight.do("k", lambda: "again") == "again"  # nothing is remembered after a call finishes
+
+
+def test_async_waiters_share_call_and_cancel_only_when_all_leave():
+    flight = SingleFlight("test_async")
+    started = []
+
+    async def fetch():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return 42
+
+    async def main():
+        results = await asyncio.gather(*(flight.do_async("k", fetch) for _ in range(4)))
+        slow = [asyncio.create_task(flight.do_async("slow", lambda: asyncio.sleep(10))) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        slow[0].cancel()
+        await asyncio.sleep(0.01)
+        still_running = flight.stats()["in_flight"]
+        slow[1].cancel()
+        await asyncio.gather(*slow, return_exceptions=True)
+        await asyncio.sleep(0)
+        return results, still_running
+
+    results, still_running = asyncio.run(main())
+    assert results == [42] * 4 and len(started) == 1
+    assert still_running == 1  # one waiter left: the shared call keeps going
+    stats = flight.stats()
+    assert stats["cancelled"] == 1 and stats["in_flight"] == 0
+
+
+def test_sync_caller_joins_async_call_from_another_thread():
+    flight = SingleFlight("test_mixed")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "shared"
+
+    async def main():
+        leader = asyncio.create_task(flight.do_async("k", fetch))
+        await asyncio.sleep(0.01)
+        follower = await asyncio.to_thread(flight.do, "k", lambda: calls.append(2) or "own")
+        return await leader, follower
+
+    assert asyncio.run(main()) == ("shared", "shared")
+    assert calls == [1]
+
+
+def test_disabled_or_keyless_calls_are_not_coalesced():
+    flight = SingleFlight("test_off", enabled=lambda: False)
+    assert flight.do("k", lambda: 1) == 1
+    assert flight.do(None, lambda: 2) == 2
+    assert flight.stats()["flights"] == 0
+
+
+def test_batch_embeddings_wait_for_texts_already_in_flight():
+    requested = []
+    gate = threading.Event()
+
+    def create(model, input):
+        batch = input if isinstance(input, list) else [input]
+        requested.append(batch)
+        gate.wait(1)
+        data = [SimpleNamespace(index=i, embedding=[float(len(t))]) for i, t in enumerate(batch)]
+        return SimpleNamespace(data=data)
+
+    client = SimpleNamespace(embeddings=SimpleNamespace(create=create), with_options=lambda **kw: client)
+    with mock.patch.object(settings, "EMBEDDING_CACHE_ENABLED", False), \
+            mock.patch.object(vectorstore, "get_openai_client", return_value=client):
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            single = pool.submit(vectorstore.get_embedding, "alpha")
+            time.sleep(0.05)
+            batch = pool.submit(vectorstore.get_embeddings, ["alpha", "beta"])
+            time.sleep(0.05)
+            gate.set()
+            assert single.result() == [5.0]
+            assert batch.result() == [[5.0], [4.0]]
+    assert requested == [["alpha"], ["beta"]]  # "alpha" was sent once
+
+
+def test_identical_chat_completions_share_one_request():
+    from app.agents import llm
+
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(0.02)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="hi"), finish_reason="stop")])
+
+    client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    request = {"model": "m", "messages": [{"role": "user", "content": "seed"}], "temperature": 0.5}
+
+    async def main():
+        same = await asyncio.gather(*(llm.chat_completion(**request) for _ in range(5)))
+        other = await llm.chat_completion(**{**request, "temperature": 0.2})
+        return same, other
+
+    with mock.patch.object(llm, "get_async_client", return_value=client):
+        same, other = asyncio.run(main())
+    assert len(calls) == 2
+    assert all(r is same[0] for r in same) and other is not same[0]
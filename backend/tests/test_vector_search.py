@@ -0,0 +1,70 @@
+"""
+vector_search statement shape: similarity column, bare-distance ORDER BY (so an ANN index applies),
+optional similarity threshold, and the parent/chunk UNION for domain tables (compiled only, no DB).
+Run from backend: python -m pytest tests/test_vector_search.py -v
+"""
+from unittest import mock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.config import settings
+from app.db.models import FinanceDocument, KnowledgeChunk
+from app.rag import vectorstore
+from app.rag.vectorstore import _min_similarity, _vector_select
+
+EMB = [0.0] * vectorstore.EMBEDDING_DIM
+
+
+def _compile(stmt):
+    compiled = stmt.compile(dialect=postgresql.dialect())
+    return " ".join(str(compiled).split()), compiled.params
+
+
+def test_plain_table_selects_similarity_and_orders_by_bare_distance():
+    sql, params = _compile(_vector_select(KnowledgeChunk, EMB, 5, None, [KnowledgeChunk.id]))
+    distance = "knowledge_chunks.embedding <=> %(embedding_1)s"
+    assert f"- ({distance}) AS similarity" in sql
+    assert sql.endswith(f"ORDER BY {distance} LIMIT %(param_2)s::INTEGER")  # not ORDER BY similarity
+    assert "<= %(" not in sql  # no threshold requested
+    assert params["param_1"] == 1 and params["param_2"] == 5
+
+
+def test_threshold_filters_on_distance_only_when_given():
+    sql, params = _compile(_vector_select(KnowledgeChunk, EMB, 5, 0.3, [KnowledgeChunk.id]))
+    assert "WHERE knowledge_chunks.embedding IS NOT NULL AND (knowledge_chunks.embedding <=> %(embedding_1)s) <= %(param_2)s" in sql
+    assert params["param_2"] == pytest.approx(0.7)
+    with mock.patch.object(settings, "RAG_MIN_SIMILARITY", 0.25):
+        assert _min_similarity(None) == 0.25 and _min_similarity(0.5) == 0.5
+    with mock.patch.object(settings, "RAG_MIN_SIMILARITY", None):
+        assert _min_similarity(None) is None
+
+
+def test_domain_table_unions_parenthesized_parent_and_chunk_branches():
+    cols = [FinanceDocument.id, FinanceDocument.title, FinanceDocument.content]
+    sql, params = _compile(_vector_select(FinanceDocument, EMB, 4, 0.3, cols))
+    # Each branch keeps its own ORDER BY bare distance / LIMIT, which Postgres only accepts in parentheses.
+    assert "FROM ((SELECT finance_documents.id AS doc_id" in sql
+    assert "ORDER BY finance_documents.embedding <=> %(embedding_1)s LIMIT %(param_1)s::INTEGER) UNION ALL (SELECT document_chunks.doc_id" in sql
+    assert "ORDER BY document_chunks.embedding <=> %(embedding_2)s LIMIT %(param_2)s::INTEGER)) AS hits" in sql
+    assert params["param_1"] == params["param_2"] == 4 * vectorstore._CHUNK_CANDIDATES_PER_HIT
+    # One row per parent (its best text as content), threshold and order on the best distance.
+    assert "best.content AS content" in sql and "- best.distance AS similarity" in sql
+    assert "WHERE best.rank_in_doc = %(rank_in_doc_1)s::INTEGER AND best.distance <= %(distance_2)s ORDER BY best.distance" in sql
+    assert params["doc_table_1"] == "finance_documents"
+
+
+def test_vector_search_defaults_columns_and_executes_one_statement():
+    executed = []
+
+    class FakeDB:
+        def execute(self, stmt):
+            executed.append(stmt)
+            return mock.Mock(all=lambda: ["row"])
+
+    assert vectorstore.vector_search(FakeDB(), KnowledgeChunk, EMB, 3) == ["row"]
+    sql, _params = _compile(executed[0])
+    assert len(executed) == 1
+    assert sql.startswith(
+        "SELECT knowledge_chunks.id, knowledge_chunks.title, knowledge_chunks.content, knowledge_chunks.created_at,"
+    )
@@ -1,5 +1,6 @@
 /**
- * Server-side proxy for POST /api/admin/snapshots/run-monthly.
+ * Server-side proxy for POST /api/admin/snapshots/run-monthly (starts a background job)
+ * and GET /api/admin/snapshots/jobs/{job_id}/progress (?job_id=...).
  * Sends ADMIN_API_KEY from env so the key is never exposed to the client.
  */
 import { NextRequest, NextResponse } from "next/server";
@@ -35,3 +36,23 @@ export async function POST(request: NextRequest) {
   }
   return NextResponse.json(data);
 }
+
+export async function GET(request: NextRequest) {
+  const adminKey = process.env.ADMIN_API_KEY;
+  if (!adminKey) {
+    return NextResponse.json(
+      { detail: "Admin API key not configured (ADMIN_API_KEY)" },
+      { status: 503 }
+    );
+  }
+  const jobId = request.nextUrl.searchParams.get("job_id");
+  if (!jobId) {
+    return NextResponse.json({ detail: "job_id is required" }, { status: 400 });
+  }
+  const res = await fetch(`${BACKEND_URL}/api/admin/snapshots/jobs/${encodeURIComponent(jobId)}/progress`, {
+    headers: { "Admin-Api-Key": adminKey },
+    cache: "no-store",
+  });
+  const data = await res.json().catch(() => ({}));
+  return NextResponse.json(data, { status: res.status });
+}
@@ -11,6 +11,10 @@ import { Loader2, Play } from "lucide-react";
 type Scope = "all" | "cohort" | "portfolio";
 
 interface RunResult {
+  job_id: string;
+  status: "pending" | "running" | "completed" | "failed";
+  progress_pct: number;
+  total_enterprises: number;
   enterprises_processed: number;
   snapshots_written: { health: number; velocity: number; readiness: number };
   errors: string[];
@@ -63,7 +67,19 @@ export default function AdminPage() {
         setError(data.detail || `Request failed: ${res.status}`);
         return;
       }
-      setResult(data as RunResult);
+      let job = data as RunResult;
+      setResult(job);
+      while (job.status === "pending" || job.status === "running") {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        const poll = await fetch(`/api/admin/run-snapshots?job_id=${encodeURIComponent(job.job_id)}`);
+        const pollData = await poll.json();
+        if (!poll.ok) {
+          setError(pollData.detail || `Request failed: ${poll.status}`);
+          return;
+        }
+        job = pollData as RunResult;
+        setResult(job);
+      }
     } catch (e) {
       setError(e instanceof Error ? e.message : "Request failed");
     } finally {
@@ -142,7 +158,8 @@ export default function AdminPage() {
             {error && <p className="text-destructive text-sm">{error}</p>}
             {result && (
               <div className="rounded-lg border bg-muted/30 p-4 text-sm space-y-2">
-                <p><strong>Enterprises processed:</strong> {result.enterprises_processed}</p>
+                <p><strong>Status:</strong> {result.status} ({result.progress_pct}%)</p>
+                <p><strong>Enterprises processed:</strong> {result.enterprises_processed} of {result.total_enterprises}</p>
                 <p><strong>Snapshots written:</strong> health {result.snapshots_written.health}, velocity {result.snapshots_written.velocity}, readiness {result.snapshots_written.readiness}</p>
                 {result.errors.length > 0 && (
                   <div>
@@ -159,6 +159,7 @@ export async function createEnterprise(body: Partial<EnterpriseOut>): Promise<En
 export async function listDecisions(params?: {
   enterprise_id?: number;
   status?: string;
+  cursor?: string;
   skip?: number;
   limit?: number;
 }): Promise<DecisionListItem[]> {